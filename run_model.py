@@ -3,9 +3,11 @@
 Simple script to run the CFB Mismatch Model.
 
 This enhanced wrapper will:
-- If CFBD_API_KEY is set: fetch fresh CFBD data for the current season and analyze
+- If CFBD_API_KEY is set: fetch fresh CFBD data for the current season, analyze
+  and score the top passing mismatches
 - Otherwise: run analysis with existing local inputs only
-- Fall back to module invocation if the `cfb-mismatch` console command isn't found
+- Run the whole pipeline in this process (no `cfb-mismatch` subprocess), so it
+  works even when the console command isn't on PATH
 - Print helpful environment info and check for expected outputs
 
 Usage: python run_model.py
@@ -15,8 +17,6 @@ Optional: set RUN_SEASON=YYYY to override the current year.
 import sys
 import os
 import platform
-import shutil
-import subprocess
 from datetime import datetime
 
 EXPECTED_FILES = [
@@ -27,24 +27,26 @@ EXPECTED_FILES = [
 ]
 
 
-def run_cmd(cmd):
-    print(f"$ {' '.join(cmd)}")
+def run_in_process(season, use_cfbd):
+    """Run the pipeline in this interpreter. Returns a process-style exit code."""
     try:
-        result = subprocess.run(cmd, check=True)
-        return result.returncode
-    except subprocess.CalledProcessError as e:
-        return e.returncode
-    except FileNotFoundError:
-        return 127
+        from cfb_mismatch.pipeline import run_pipeline
+
+        run_pipeline(season=season if use_cfbd else None, fetch_cfbd=use_cfbd)
+        return 0
+    except Exception as e:
+        print(f"\n\u2717 Error: {e}", file=sys.stderr)
+        return 1
 
 
 essential_help = """
 Troubleshooting steps:
 1) Install the package into your active environment:
    pip install -e .
-2) Verify the CLI is available:
+2) Verify the package imports and the CLI works:
    cfb-mismatch --help   (or)
    {py} -m cfb_mismatch.cli --help
+   Make sure configs/settings.yaml and configs/weights.yaml exist.
 3) To enable fresh CFBD data fetch, set your API key:
    export CFBD_API_KEY="your-key"    # macOS/Linux
    $env:CFBD_API_KEY="your-key"     # Windows PowerShell
@@ -70,9 +72,6 @@ def main():
     if season is None:
         season = datetime.now().year
 
-    # CLI availability
-    have_cli = shutil.which("cfb-mismatch") is not None
-
     # CFBD API key presence decides whether we fetch fresh data
     api_key = os.getenv("CFBD_API_KEY")
     use_cfbd = bool(api_key)
@@ -85,18 +84,8 @@ def main():
         print("You can set RUN_SEASON to override season year when CFBD is enabled.")
     print()
 
-    # Build command
-    if have_cli:
-        base = ["cfb-mismatch"]
-    else:
-        print("'cfb-mismatch' not found on PATH. Using module invocation...")
-        base = [sys.executable, "-m", "cfb_mismatch.cli"]
-
-    cmd = base + ["analyze"]
-    if use_cfbd:
-        cmd += ["--season", str(season), "--fetch-cfbd"]
-
-    code = run_cmd(cmd)
+    print("Running pipeline in-process (fetch -> analyze -> top mismatches -> publish)")
+    code = run_in_process(season, use_cfbd)
 
     if code == 0:
         print()
@@ -137,12 +126,6 @@ def main():
     print()
     print(essential_help.format(py=os.path.basename(sys.executable)))
     print()
-    # Also suggest direct module invocation with args that were attempted
-    if have_cli:
-        alt = [os.path.basename(sys.executable), "-m", "cfb_mismatch.cli"] + cmd[1:]
-        print("Try:")
-        print(" ", " ".join(alt))
-        print()
     return 1
 
 
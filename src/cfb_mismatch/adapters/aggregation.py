@@ -0,0 +1,292 @@
+"""
+Team aggregation of player stats via mergeable sufficient statistics.
+
+Each player-stats file is aggregated to one row per team: every numeric column
+becomes a player-game-count weighted mean over the players with a value (a
+plain mean when those players' weights sum to zero). Those means only need a
+handful of per-team sums, so a file can be folded in chunk by chunk and the
+result is the same as aggregating the whole file at once:
+
+- ``wsum``: sum of value * weight over non-null values
+- ``wts``: sum of weights over non-null values
+- ``count``: number of non-null values
+- ``sum``: plain sum of non-null values
+
+plus the number of players and the total weight per team.
+
+The sums are kept per (team, position), so the team totals and any
+position-group breakdown (e.g. WR-only or CB-only means) come out of the same
+single grouped pass over the player rows.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.adapters.schema import read_stats_csv
+
+WEIGHT_COL = 'player_game_count'
+TEAM_COL = 'team_name'
+POSITION_COL = 'position'
+GROUP_COL = 'position_group'
+
+# Numeric columns that are identifiers or the weight itself, not stats
+EXCLUDE_COLS = {'player_id', 'franchise_id', WEIGHT_COL}
+
+_PARTS = ('wsum', 'wts', 'count', 'sum')
+_EPSILON = 1e-9
+
+
+def stat_columns(df: pd.DataFrame) -> List[str]:
+    """Return the numeric stat columns of a player-stats frame, in file order."""
+    numeric_cols = df.select_dtypes(include=['number']).columns
+    return [col for col in numeric_cols if col not in EXCLUDE_COLS]
+
+
+def partial_team_sums(df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Compute the per-team sufficient statistics of a (chunk of a) stats file.
+
+    Args:
+        df: Player-level stats with ``team_name`` and ``player_game_count``
+        columns: Stat columns to aggregate (default: ``stat_columns(df)``)
+
+    Returns:
+        DataFrame indexed by (team, position) with ``players``, ``weight``
+        and one ``(part, column)`` column per stat and sufficient statistic
+    """
+    if WEIGHT_COL not in df.columns:
+        raise ValueError(f"Expected '{WEIGHT_COL}' column for weighting")
+    if columns is None:
+        columns = stat_columns(df)
+
+    df = df[df[TEAM_COL].notna()]
+    teams = df[TEAM_COL].astype(str).to_numpy()
+    if POSITION_COL in df.columns:
+        positions = df[POSITION_COL].astype(str).where(df[POSITION_COL].notna(), '').to_numpy()
+    else:
+        positions = np.full(len(df), '', dtype=object)
+    weights = df[WEIGHT_COL].to_numpy(dtype=float, na_value=np.nan)
+    weights = np.nan_to_num(weights, nan=0.0)
+
+    values = np.column_stack([
+        df[col].to_numpy(dtype=float, na_value=np.nan) for col in columns
+    ]) if columns else np.empty((len(df), 0))
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+
+    parts = {
+        'wsum': filled * weights[:, None],
+        'wts': present * weights[:, None],
+        'count': present.astype(float),
+        'sum': filled,
+    }
+    frame = pd.DataFrame(
+        np.hstack([parts[part] for part in _PARTS]),
+        columns=pd.MultiIndex.from_product([_PARTS, columns]),
+    )
+    frame[('players', '')] = 1.0
+    frame[('weight', '')] = weights
+    return frame.groupby([teams, positions]).sum()
+
+
+def _finalize_sums(sums: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Turn summed sufficient statistics into counts and weighted means."""
+    sums = sums[sums[('players', '')] > 0.5].sort_index()
+    result = pd.DataFrame({
+        'player_count': sums[('players', '')].astype(int).to_numpy(),
+        'player_game_count_total': sums[('weight', '')].to_numpy(),
+    }, index=sums.index)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for col in columns:
+            part = {name: sums.get((name, col), pd.Series(0.0, index=sums.index)).to_numpy()
+                    for name in _PARTS}
+            # Tolerance: sums that went through ``subtract`` may keep a tiny residue
+            mean = np.where(
+                part['wts'] > _EPSILON,
+                part['wsum'] / part['wts'],
+                part['sum'] / part['count'],
+            )
+            result[col] = np.where(part['count'] > 0.5, mean, np.nan)
+
+    return result
+
+
+def position_group_map(groups: Dict[str, Iterable[str]]) -> Dict[str, str]:
+    """Invert ``{group: [positions]}`` into ``{position: group}``."""
+    mapping = {}
+    for group, positions in groups.items():
+        for position in positions:
+            mapping[str(position)] = group
+    return mapping
+
+
+class TeamAccumulator:
+    """
+    Online team aggregation: feed player rows with ``add``, then ``finalize``.
+
+    Memory is bounded by teams x positions x stat columns regardless of how
+    many rows are added, so a file can be streamed in chunks.
+    """
+
+    def __init__(self):
+        self.columns: List[str] = []
+        self.sums: Optional[pd.DataFrame] = None
+
+    def add(self, df: pd.DataFrame) -> 'TeamAccumulator':
+        """Fold a chunk of player rows into the running sums."""
+        for col in stat_columns(df):
+            if col not in self.columns:
+                self.columns.append(col)
+
+        partial = partial_team_sums(df, [col for col in self.columns if col in df.columns])
+        if self.sums is None:
+            self.sums = partial
+        else:
+            self.sums = self.sums.add(partial, fill_value=0)
+        return self
+
+    def copy(self) -> 'TeamAccumulator':
+        """Return an independent copy of the running sums."""
+        other = TeamAccumulator()
+        other.columns = list(self.columns)
+        other.sums = None if self.sums is None else self.sums.copy()
+        return other
+
+    def subtract(self, df: pd.DataFrame) -> 'TeamAccumulator':
+        """Remove rows previously passed to ``add`` from the running sums."""
+        if self.sums is None or df.empty:
+            return self
+        partial = partial_team_sums(df, [col for col in self.columns if col in df.columns])
+        self.sums = self.sums.sub(partial, fill_value=0)
+        return self
+
+    def finalize(self) -> pd.DataFrame:
+        """
+        Return the team aggregates (same layout as ``aggregate_*_by_team``).
+
+        Returns:
+            DataFrame with team_name, player_count, player_game_count_total and
+            the weighted mean of every stat column, sorted by team
+        """
+        if self.sums is None or self.sums.empty:
+            return pd.DataFrame(columns=[TEAM_COL, 'player_count', 'player_game_count_total'])
+
+        team_sums = self.sums.groupby(level=0).sum()
+        result = _finalize_sums(team_sums, self.columns)
+        result.insert(0, TEAM_COL, result.index.astype(str))
+        return result.reset_index(drop=True)
+
+    def finalize_groups(self, groups: Dict[str, Iterable[str]]) -> pd.DataFrame:
+        """
+        Return team aggregates per position group.
+
+        Args:
+            groups: Position group name -> positions, e.g. ``{'wr': ['WR']}``;
+                positions outside every group are left out
+
+        Returns:
+            DataFrame with team_name, position_group, player_count,
+            player_game_count_total and the weighted mean of every stat column
+        """
+        columns = [TEAM_COL, GROUP_COL, 'player_count', 'player_game_count_total']
+        if self.sums is None or self.sums.empty:
+            return pd.DataFrame(columns=columns)
+
+        mapping = position_group_map(groups)
+        labels = self.sums.index.get_level_values(1).map(mapping)
+        mask = labels.notna()
+        if not mask.any():
+            return pd.DataFrame(columns=columns)
+
+        sums = self.sums[mask]
+        teams = sums.index.get_level_values(0)
+        group_sums = sums.groupby([teams, labels[mask]]).sum()
+        result = _finalize_sums(group_sums, self.columns)
+        result.insert(0, TEAM_COL, result.index.get_level_values(0).astype(str))
+        result.insert(1, GROUP_COL, result.index.get_level_values(1).astype(str))
+        return result.reset_index(drop=True)
+
+
+def aggregate_by_team(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate an in-memory player-stats frame to one row per team."""
+    if WEIGHT_COL not in df.columns:
+        raise ValueError(f"Expected '{WEIGHT_COL}' column for weighting")
+    return TeamAccumulator().add(df).finalize()
+
+
+def aggregate_by_team_and_group(
+    df: pd.DataFrame,
+    groups: Dict[str, Iterable[str]]
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Aggregate a player-stats frame per team and per (team, position group).
+
+    Both come from one grouped pass, so the cost does not grow with the
+    number of groups.
+
+    Returns:
+        Tuple of (team aggregates, position-group aggregates)
+    """
+    if WEIGHT_COL not in df.columns:
+        raise ValueError(f"Expected '{WEIGHT_COL}' column for weighting")
+    accumulator = TeamAccumulator().add(df)
+    return accumulator.finalize(), accumulator.finalize_groups(groups)
+
+
+def accumulate_chunks(chunks: Iterable[pd.DataFrame]) -> TeamAccumulator:
+    """Fold an iterable of player-stats chunks into one accumulator."""
+    accumulator = TeamAccumulator()
+    for chunk in chunks:
+        accumulator.add(chunk)
+    return accumulator
+
+
+def aggregate_chunks(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Aggregate an iterable of player-stats chunks to one row per team."""
+    return accumulate_chunks(chunks).finalize()
+
+
+def stream_accumulate_file(
+    file_path: str,
+    file_type: str,
+    chunksize: int = 100_000,
+    float_dtype: str = 'float64'
+) -> TeamAccumulator:
+    """
+    Fold a stats CSV into a ``TeamAccumulator`` without loading it whole.
+
+    Args:
+        file_path: Path to the player stats CSV
+        file_type: Key of ``schema.FILE_SCHEMAS`` (e.g. 'receiving_scheme')
+        chunksize: Rows parsed per chunk; bounds peak memory
+        float_dtype: Dtype for rate stats ('float64' or 'float32')
+
+    Returns:
+        Accumulator holding the whole file's sufficient statistics
+    """
+    header = pd.read_csv(file_path, nrows=0).columns
+    missing = [col for col in (TEAM_COL, WEIGHT_COL) if col not in header]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    chunks = read_stats_csv(file_path, file_type, float_dtype, chunksize=chunksize)
+    with chunks:
+        return accumulate_chunks(chunks)
+
+
+def stream_aggregate_file(
+    file_path: str,
+    file_type: str,
+    chunksize: int = 100_000,
+    float_dtype: str = 'float64'
+) -> pd.DataFrame:
+    """
+    Aggregate a stats CSV to team level without loading it whole.
+
+    Returns:
+        Team aggregates identical to loading the file and aggregating it
+    """
+    return stream_accumulate_file(file_path, file_type, chunksize, float_dtype).finalize()
@@ -7,9 +7,12 @@ This module provides functions to:
 """
 
 import os
+import re
 import pandas as pd
 import requests
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cfb_mismatch.output import file_digest, write_frames, report_writes
 
 
 # Helper to normalize CFBD games columns to snake_case expected by this package
@@ -20,8 +23,38 @@ _DEF_GAMES_COL_MAP = {
     'awayTeam': 'away_team',
     'homePoints': 'home_points',
     'awayPoints': 'away_points',
-    'id': 'game_id'
+    'id': 'game_id',
+    'seasonType': 'season_type',
+    'startDate': 'start_date',
+    'neutralSite': 'neutral_site',
+    'homeConference': 'home_conference',
+    'awayConference': 'away_conference',
+}
+
+_GAMES_FILE_RE = re.compile(r'^(\d{4})_(regular|postseason)_games\.(csv|parquet)$')
+
+# Game fields of a CFBD /lines record, and the fields of each provider's line
+_LINES_GAME_COL_MAP = {
+    'id': 'game_id',
+    'season': 'season',
+    'seasonType': 'season_type',
+    'week': 'week',
+    'startDate': 'start_date',
+    'homeTeam': 'home_team',
+    'awayTeam': 'away_team',
+    'homeScore': 'home_points',
+    'awayScore': 'away_points',
 }
+_LINES_COL_MAP = {
+    'provider': 'provider',
+    'spread': 'spread',
+    'spreadOpen': 'spread_open',
+    'overUnder': 'over_under',
+    'overUnderOpen': 'over_under_open',
+    'homeMoneyline': 'home_moneyline',
+    'awayMoneyline': 'away_moneyline',
+}
+LINE_COLUMNS = list(_LINES_GAME_COL_MAP.values()) + list(_LINES_COL_MAP.values())
 
 def _normalize_games_columns(df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
     if df is None or df.empty:
@@ -63,6 +96,125 @@ def load_cfbd_games(
         return None
 
 
+def list_cfbd_seasons(data_dir: str = "data/cfbd", season_type: str = "regular") -> List[int]:
+    """
+    List the seasons with a games file in the local game store.
+
+    Args:
+        data_dir: Directory containing CFBD data files
+        season_type: Type of season ('regular' or 'postseason')
+
+    Returns:
+        Sorted list of season years
+    """
+    if not os.path.isdir(data_dir):
+        return []
+    seasons = set()
+    for name in os.listdir(data_dir):
+        match = _GAMES_FILE_RE.match(name)
+        if match and match.group(2) == season_type:
+            seasons.add(int(match.group(1)))
+    return sorted(seasons)
+
+
+def game_store_digests(data_dir: str = "data/cfbd") -> Dict[str, str]:
+    """
+    Content hashes of every games file in the local game store.
+
+    Args:
+        data_dir: Directory containing CFBD data files
+
+    Returns:
+        File name -> SHA-256, sorted by name (empty if the store is missing)
+    """
+    if not os.path.isdir(data_dir):
+        return {}
+    return {
+        name: file_digest(os.path.join(data_dir, name))
+        for name in sorted(os.listdir(data_dir))
+        if _GAMES_FILE_RE.match(name)
+    }
+
+
+def load_cfbd_game_store(
+    data_dir: str = "data/cfbd",
+    season_type: str = "regular",
+    seasons: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
+    """
+    Load the games of several seasons from the local game store.
+
+    Args:
+        data_dir: Directory containing CFBD data files
+        season_type: Type of season ('regular' or 'postseason')
+        seasons: Seasons to load (default: every season in the store)
+
+    Returns:
+        DataFrame of all games with a ``season`` column (empty if none found)
+    """
+    frames = []
+    for season in (seasons if seasons is not None else list_cfbd_seasons(data_dir, season_type)):
+        games_df = load_cfbd_games(season, season_type, data_dir)
+        if games_df is None or games_df.empty:
+            continue
+        if 'season' not in games_df.columns:
+            games_df = games_df.assign(season=season)
+        frames.append(games_df)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def flatten_cfbd_lines(records: List[dict]) -> pd.DataFrame:
+    """
+    Flatten CFBD /lines records to one row per (game, provider).
+
+    Spreads are from the home team's side (negative: home favored).
+
+    Args:
+        records: JSON records returned by the /lines endpoint
+
+    Returns:
+        DataFrame with ``LINE_COLUMNS`` (empty if no game has a line)
+    """
+    rows = []
+    for record in records or []:
+        game = {name: record.get(key) for key, name in _LINES_GAME_COL_MAP.items()}
+        for line in record.get('lines') or []:
+            row = dict(game)
+            row.update({name: line.get(key) for key, name in _LINES_COL_MAP.items()})
+            rows.append(row)
+    lines = pd.DataFrame(rows, columns=LINE_COLUMNS)
+    for col in ('spread', 'spread_open', 'over_under', 'over_under_open', 'home_moneyline', 'away_moneyline'):
+        lines[col] = pd.to_numeric(lines[col], errors='coerce')
+    return lines
+
+
+def load_cfbd_lines(
+    season: int,
+    season_type: str = "regular",
+    data_dir: str = "data/cfbd"
+) -> Optional[pd.DataFrame]:
+    """
+    Load the betting lines of a season saved by ``fetch_and_save_cfbd_lines``.
+
+    Args:
+        season: Year of the season
+        season_type: Type of season ('regular' or 'postseason')
+        data_dir: Directory containing CFBD data files
+
+    Returns:
+        DataFrame with one row per (game, provider), or None if no file exists
+    """
+    csv_path = os.path.join(data_dir, f"{season}_{season_type}_lines.csv")
+    parquet_path = os.path.join(data_dir, f"{season}_{season_type}_lines.parquet")
+    if os.path.exists(csv_path):
+        return pd.read_csv(csv_path)
+    elif os.path.exists(parquet_path):
+        return pd.read_parquet(parquet_path)
+    return None
+
+
 def load_cfbd_team_info(data_dir: str = "data/cfbd") -> Optional[pd.DataFrame]:
     """
     Load CFBD team information.
@@ -326,20 +478,91 @@ def fetch_cfbd_team_info_from_api(api_key: Optional[str] = None) -> Optional[pd.
         return None
 
 
+def fetch_cfbd_lines_from_api(
+    season: int,
+    season_type: str = "regular",
+    api_key: Optional[str] = None
+) -> Optional[pd.DataFrame]:
+    """
+    Fetch the betting lines of a season from the CFBD API.
+
+    Args:
+        season: Year of the season (e.g., 2024)
+        season_type: Type of season ('regular' or 'postseason')
+        api_key: CFBD API key. If None, will try to get from CFBD_API_KEY environment variable
+
+    Returns:
+        DataFrame with one row per (game, provider), or None if fetch fails
+    """
+    if api_key is None:
+        api_key = os.getenv("CFBD_API_KEY")
+
+    if not api_key:
+        print("⚠ CFBD_API_KEY not found in environment")
+        return None
+
+    url = "https://api.collegefootballdata.com/lines"
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Accept": "application/json"
+    }
+    params = {
+        "year": season,
+        "seasonType": season_type
+    }
+
+    try:
+        response = requests.get(url, headers=headers, params=params)
+        response.raise_for_status()
+        return flatten_cfbd_lines(response.json())
+
+    except requests.exceptions.RequestException as e:
+        print(f"✗ Error fetching lines from CFBD API: {e}")
+        return None
+    except Exception as e:
+        print(f"✗ Unexpected error fetching lines: {e}")
+        return None
+
+
+def fetch_and_save_cfbd_lines(
+    season: int,
+    season_type: str = "regular",
+    data_dir: str = "data/cfbd",
+    api_key: Optional[str] = None,
+    formats: Iterable[str] = ('csv', 'parquet')
+) -> Optional[pd.DataFrame]:
+    """
+    Fetch a season's betting lines and save them as ``{season}_{season_type}_lines``.
+
+    Returns:
+        The lines, or None if the fetch failed
+    """
+    lines_df = fetch_cfbd_lines_from_api(season, season_type, api_key)
+    if lines_df is not None:
+        os.makedirs(data_dir, exist_ok=True)
+        report_writes(write_frames({os.path.join(data_dir, f"{season}_{season_type}_lines"): lines_df}, formats))
+    return lines_df
+
+
 def fetch_and_save_cfbd_data(
     season: int,
     season_type: str = "regular",
     data_dir: str = "data/cfbd",
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    formats: Iterable[str] = ('csv', 'parquet')
 ) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
     """
     Fetch CFBD data from API and save to files.
+
+    All files are written concurrently and atomically, and files whose
+    content is unchanged are not rewritten.
     
     Args:
         season: Year of the season
         season_type: Type of season ('regular' or 'postseason')
         data_dir: Directory to save data files
         api_key: CFBD API key. If None, will try to get from CFBD_API_KEY environment variable
+        formats: Output formats to write (see ``cfb_mismatch.output.OUTPUT_FORMATS``)
         
     Returns:
         Tuple of (games_df, team_info_df)
@@ -353,21 +576,15 @@ def fetch_and_save_cfbd_data(
     team_info_df = fetch_cfbd_team_info_from_api(api_key)
     
     # Save to files if fetch was successful
+    frames = {}
     if games_df is not None:
         games_df = _normalize_games_columns(games_df)
-        prefix = os.path.join(data_dir, f"{season}_{season_type}")
-        games_csv = f"{prefix}_games.csv"
-        games_parquet = f"{prefix}_games.parquet"
-        games_df.to_csv(games_csv, index=False)
-        games_df.to_parquet(games_parquet, index=False)
-        print(f"✓ Saved games to {games_csv} and {games_parquet}")
+        frames[os.path.join(data_dir, f"{season}_{season_type}_games")] = games_df
     
     if team_info_df is not None:
-        team_info_csv = os.path.join(data_dir, "team_info.csv")
-        team_info_parquet = os.path.join(data_dir, "team_info.parquet")
-        team_info_df.to_csv(team_info_csv, index=False)
-        team_info_df.to_parquet(team_info_parquet, index=False)
-        print(f"✓ Saved team info to {team_info_csv} and {team_info_parquet}")
+        frames[os.path.join(data_dir, "team_info")] = team_info_df
+
+    report_writes(write_frames(frames, formats))
     
     return games_df, team_info_df
 
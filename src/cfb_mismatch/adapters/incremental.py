@@ -0,0 +1,172 @@
+"""
+Incremental team aggregation from successive player-file exports.
+
+Each week's PFF export differs from the previous one only for the players who
+played. ``PlayerDeltaStore`` keeps the per-team sufficient statistics together
+with a hash and the stat values of every player row, keyed by ``player_id``.
+A new export is diffed against the stored one and only the added, removed and
+changed players are subtracted from / added to the team sums, so the update
+costs time proportional to the changed rows.
+
+Stores are pickled per stats file under ``stats_store_dir``.
+"""
+
+import os
+import pickle
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.adapters.aggregation import (
+    POSITION_COL,
+    TEAM_COL,
+    WEIGHT_COL,
+    TeamAccumulator,
+    stat_columns,
+)
+from cfb_mismatch.output import write_bytes_atomic
+
+KEY_COL = 'player_id'
+
+# Bump when the pickled layout changes; older stores are rebuilt
+STORE_VERSION = 2
+
+
+def _keyed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Index a player frame by (player_id, occurrence).
+
+    The occurrence number keeps rows unique when a player appears more than
+    once (e.g. a concatenated multi-season export).
+    """
+    ids = df[KEY_COL].astype('Int64').fillna(-1).to_numpy(dtype=np.int64)
+    occurrence = df.groupby(ids, sort=False).cumcount().to_numpy()
+    index = pd.MultiIndex.from_arrays([ids, occurrence], names=[KEY_COL, 'occurrence'])
+    return df.set_axis(index, axis=0)
+
+
+class PlayerDeltaStore:
+    """
+    Persistent per-team sufficient statistics that update from export deltas.
+
+    Args:
+        file_type: Stats file type the store belongs to (e.g. 'receiving_scheme')
+    """
+
+    def __init__(self, file_type: str):
+        self.file_type = file_type
+        self.version = STORE_VERSION
+        self.columns: List[str] = []
+        self.hashes = pd.Series(dtype='uint64')
+        self.rows: Optional[pd.DataFrame] = None
+        self.accumulator = TeamAccumulator()
+
+    def _contributions(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Reduce player rows to what the team sums need (team, position, weight, stats)."""
+        positions = df[POSITION_COL] if POSITION_COL in df.columns else pd.Series(None, index=df.index)
+        return pd.DataFrame({
+            TEAM_COL: df[TEAM_COL].astype(str).where(df[TEAM_COL].notna()),
+            POSITION_COL: positions.astype(object).where(positions.notna()),
+            WEIGHT_COL: df[WEIGHT_COL].to_numpy(dtype=float, na_value=np.nan),
+            **{col: df[col].to_numpy(dtype=float, na_value=np.nan) for col in self.columns},
+        }, index=df.index)
+
+    def rebuild(self, df: pd.DataFrame) -> Dict[str, int]:
+        """Aggregate an export from scratch and remember its rows."""
+        keyed = _keyed(df)
+        self.columns = stat_columns(df)
+        self.rows = self._contributions(keyed)
+        self.hashes = pd.util.hash_pandas_object(keyed, index=False)
+        self.accumulator = TeamAccumulator().add(self.rows)
+        return {'added': len(keyed), 'removed': 0, 'changed': 0}
+
+    def update(self, df: pd.DataFrame) -> Dict[str, int]:
+        """
+        Apply a new export, touching only the players whose rows changed.
+
+        Args:
+            df: Full player-level export (as returned by the adapter loaders)
+
+        Returns:
+            Number of added, removed and changed player rows
+        """
+        if KEY_COL not in df.columns or WEIGHT_COL not in df.columns:
+            raise ValueError(f"Expected '{KEY_COL}' and '{WEIGHT_COL}' columns")
+        if self.rows is None or stat_columns(df) != self.columns:
+            return self.rebuild(df)
+
+        keyed = _keyed(df)
+        hashes = pd.util.hash_pandas_object(keyed, index=False)
+
+        old_keys, new_keys = self.hashes.index, hashes.index
+        removed = old_keys.difference(new_keys)
+        added = new_keys.difference(old_keys)
+        common = new_keys.intersection(old_keys)
+        changed = common[hashes.loc[common].to_numpy() != self.hashes.loc[common].to_numpy()]
+
+        outgoing = removed.append(changed)
+        incoming = added.append(changed)
+        if len(outgoing):
+            self.accumulator.subtract(self.rows.loc[outgoing])
+        if len(incoming):
+            new_rows = self._contributions(keyed.loc[incoming])
+            self.accumulator.add(new_rows)
+            self.rows = pd.concat([self.rows.drop(outgoing), new_rows])
+        else:
+            self.rows = self.rows.drop(outgoing)
+
+        self.hashes = hashes
+        return {'added': len(added), 'removed': len(removed), 'changed': len(changed)}
+
+    def team_stats(self) -> pd.DataFrame:
+        """Return the current team aggregates (same layout as ``aggregate_by_team``)."""
+        return self.accumulator.finalize()
+
+    def save(self, path: str):
+        """Persist the store atomically."""
+        write_bytes_atomic(path, pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL), skip_unchanged=False)
+
+    @classmethod
+    def load(cls, path: str, file_type: str) -> 'PlayerDeltaStore':
+        """Load a store from ``path``, or return an empty one if missing or stale."""
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    store = pickle.load(f)
+                if isinstance(store, cls) and store.version == STORE_VERSION and store.file_type == file_type:
+                    return store
+            except (OSError, pickle.UnpicklingError, AttributeError, EOFError) as e:
+                print(f"⚠ Rebuilding unreadable stats store {path}: {e}")
+        return cls(file_type)
+
+
+def store_path(store_dir: str, file_type: str) -> str:
+    return os.path.join(store_dir, f"{file_type}.pkl")
+
+
+def update_store(df: pd.DataFrame, file_type: str, store_dir: str) -> PlayerDeltaStore:
+    """
+    Update the persisted store for ``file_type`` with a new export.
+
+    Args:
+        df: Full player-level export
+        file_type: Stats file type (e.g. 'receiving_scheme')
+        store_dir: Directory holding the pickled stores
+
+    Returns:
+        The updated store
+    """
+    path = store_path(store_dir, file_type)
+    store = PlayerDeltaStore.load(path, file_type)
+    delta = store.update(df)
+    if any(delta.values()):
+        store.save(path)
+    print(f"✓ {file_type}: {delta['added']} added, {delta['removed']} removed, "
+          f"{delta['changed']} changed player rows")
+    return store
+
+
+def update_team_stats(df: pd.DataFrame, file_type: str, store_dir: str) -> pd.DataFrame:
+    """Update the persisted store with a new export and return the team aggregates."""
+    return update_store(df, file_type, store_dir).team_stats()
@@ -0,0 +1,375 @@
+"""
+Historical backtest of the mismatch signals over the local CFBD game store.
+
+For every season and week in the store, each game is scored with features
+built only from games completed before that week (point-in-time), and the
+scores are compared with the final result. A signal is a home-minus-away
+edge; the backtest reports hit rates, correlation with the margin and a
+logistic calibration of each signal.
+
+Point-in-time features come from ``aggregate_team_games`` over the prior
+weeks and, when given, from the pre-game Elo ratings (see ``ratings``) and
+the rolling and exponentially weighted margins (see ``rolling``). Those
+histories hold completed games only, so ``add_upcoming_signals`` gives games
+without a score the ratings and form as they stand before their week. The
+PFF-based ``mismatch_score`` and pass tilt are season-level exports: a
+season's summary adds them to that season's games only (``add_season_signals``)
+as static signals, which still carry in-season lookahead.
+
+Per-week feature snapshots are cached on disk, keyed by a hash of the games
+they were built from, and seasons are scored in parallel in a process pool;
+the static summary signals reach the workers through shared memory.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.adapters.cfbd_data import aggregate_team_games, list_cfbd_seasons, load_cfbd_games
+from cfb_mismatch.manifest import hash_frame
+from cfb_mismatch.mismatches import compute_metrics, standardize_summary, team_key
+from cfb_mismatch.output import write_frame
+from cfb_mismatch.ratings import EloRatings, add_elo_signal, add_matchup_elo
+from cfb_mismatch.rolling import TeamForm, add_form_signal, add_matchup_form
+from cfb_mismatch.shared import attach, share_frame
+
+# Team features available before kickoff (from aggregate_team_games)
+FEATURE_COLUMNS = ['games_played', 'win_pct', 'avg_points_scored', 'avg_points_allowed', 'point_differential']
+
+# Home-minus-away edges evaluated by the backtest
+POINT_IN_TIME_SIGNALS = [
+    'point_differential_edge', 'win_pct_edge', 'elo_edge', 'margin_rolling_edge', 'margin_ewm_edge'
+]
+STATIC_SIGNALS = ['mismatch_score_edge', 'pass_tilt_edge']
+
+_RESULT_COLUMNS = ['week', 'home_team', 'away_team', 'home_points', 'away_points']
+
+
+def completed_games(games: pd.DataFrame) -> pd.DataFrame:
+    """Games with a final score."""
+    return games[games['home_points'].notna() & games['away_points'].notna()]
+
+
+def week_snapshot(
+    season_games: pd.DataFrame,
+    season: int,
+    week: int,
+    season_type: str = "regular",
+    cache_dir: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Team features as of kickoff of ``week``: only games of earlier weeks count.
+
+    Args:
+        season_games: All games of one season
+        season: Season year (used for the cache path)
+        week: Week being scored
+        season_type: 'regular' or 'postseason'
+        cache_dir: Directory for cached snapshots (None disables caching)
+
+    Returns:
+        DataFrame with one row per team that has played (``team`` + features)
+    """
+    prior = completed_games(season_games)
+    prior = prior.loc[prior['week'] < week, _RESULT_COLUMNS]
+
+    path = None
+    if cache_dir:
+        digest = hash_frame(prior.sort_values(_RESULT_COLUMNS).reset_index(drop=True))[:16]
+        path = os.path.join(cache_dir, f"{season}_{season_type}", f"week_{int(week):02d}_{digest}")
+        if os.path.exists(f"{path}.csv"):
+            return pd.read_csv(f"{path}.csv")
+
+    if prior.empty:
+        snapshot = pd.DataFrame(columns=['team'] + FEATURE_COLUMNS)
+    else:
+        snapshot = aggregate_team_games(prior)[['team'] + FEATURE_COLUMNS]
+
+    if path:
+        write_frame(snapshot, path, 'csv')
+    return snapshot
+
+
+def static_team_signals(summary: pd.DataFrame) -> pd.DataFrame:
+    """Season-level team signals from a team summary, keyed by upper-case name."""
+    metrics = compute_metrics(standardize_summary(summary))
+    columns = ['TeamKey', 'OffenseMetric', 'CoverageMetric']
+    if 'mismatch_score' in metrics.columns:
+        columns.append('mismatch_score')
+    return metrics[columns].drop_duplicates('TeamKey').set_index('TeamKey')
+
+
+def score_season(
+    games: pd.DataFrame,
+    season: int,
+    season_type: str = "regular",
+    cache_dir: Optional[str] = None,
+    summary: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    Score every game of a season with point-in-time features.
+
+    Args:
+        games: Games of the season (CFBD columns, with ``week``)
+        season: Season year
+        season_type: 'regular' or 'postseason'
+        cache_dir: Directory for cached weekly snapshots
+        summary: Optional team summary for the static signals
+
+    Returns:
+        One row per game with home/away features, signal edges and the result
+    """
+    if games is None or games.empty or 'week' not in games.columns:
+        return pd.DataFrame()
+
+    scored_weeks = []
+    for week, week_games in games.groupby('week', sort=True):
+        snapshot = week_snapshot(games, season, week, season_type, cache_dir).set_index('team')
+        week_games = week_games.copy()
+        for side in ('home', 'away'):
+            features = snapshot.reindex(week_games[f'{side}_team'].to_numpy())
+            for col in FEATURE_COLUMNS:
+                week_games[f'{side}_{col}'] = features[col].to_numpy(dtype=float)
+        scored_weeks.append(week_games)
+
+    scored = pd.concat(scored_weeks, ignore_index=True)
+    scored['season'] = season
+    scored['point_differential_edge'] = scored['home_point_differential'] - scored['away_point_differential']
+    scored['win_pct_edge'] = scored['home_win_pct'] - scored['away_win_pct']
+
+    if summary is not None and not summary.empty:
+        scored = add_static_signals(scored, static_team_signals(summary))
+
+    margin = scored['home_points'] - scored['away_points']
+    scored['home_margin'] = margin
+    scored['home_win'] = np.where(margin > 0, 1.0, np.where(margin < 0, 0.0, np.nan))
+    return scored
+
+
+def add_static_signals(scored: pd.DataFrame, static: pd.DataFrame) -> pd.DataFrame:
+    """Add the summary edges (from ``static_team_signals``) to scored games."""
+    if scored.empty:
+        return scored
+    scored = scored.copy()
+    home = static.reindex(team_key(scored['home_team']).to_numpy())
+    away = static.reindex(team_key(scored['away_team']).to_numpy())
+    home_tilt = home['OffenseMetric'].to_numpy() - away['CoverageMetric'].to_numpy()
+    away_tilt = away['OffenseMetric'].to_numpy() - home['CoverageMetric'].to_numpy()
+    scored['pass_tilt_edge'] = home_tilt - away_tilt
+    if 'mismatch_score' in static.columns:
+        scored['mismatch_score_edge'] = (
+            home['mismatch_score'].to_numpy() - away['mismatch_score'].to_numpy()
+        )
+    return scored
+
+
+def add_season_signals(scored: pd.DataFrame, summaries: Dict[int, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Add the static signals of every season from that season's own summary.
+
+    Seasons without a summary get no static signal (NaN), so one season's
+    team profiles never stand in for another's.
+    """
+    if scored.empty or not summaries:
+        return scored
+    frames = []
+    for season, season_games in scored.groupby('season', sort=False):
+        if season in summaries:
+            season_games = add_static_signals(season_games, static_team_signals(summaries[season]))
+        frames.append(season_games)
+    return pd.concat(frames).loc[scored.index]
+
+
+def _backtest_season(args: Tuple) -> pd.DataFrame:
+    season, season_type, data_dir, cache_dir, signals = args
+    games = load_cfbd_games(season, season_type, data_dir)
+    scored = score_season(games, season, season_type, cache_dir)
+    if signals is not None:
+        scored = add_static_signals(scored, attach(signals))
+    return scored
+
+
+def run_backtest(
+    data_dir: str = "data/cfbd",
+    season_type: str = "regular",
+    seasons: Optional[Iterable[int]] = None,
+    cache_dir: Optional[str] = None,
+    summary: Optional[pd.DataFrame] = None,
+    n_jobs: int = 1,
+    share_backend: str = 'shm',
+    ratings: Optional[pd.DataFrame] = None,
+    form: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    Score every game of every season in the local game store.
+
+    Args:
+        data_dir: CFBD data directory holding ``{season}_{type}_games`` files
+        season_type: 'regular' or 'postseason'
+        seasons: Seasons to backtest (default: all in the store)
+        cache_dir: Directory for cached weekly snapshots (None disables)
+        summary: Optional team summary for the static signals
+        n_jobs: Processes used to score seasons in parallel
+        share_backend: How workers attach to the summary signals ('shm' or 'memmap')
+        ratings: Optional Elo history (``EloRatings.history``) for the ``elo_edge`` signal
+        form: Optional team form history (``TeamForm.history``) for the margin form signals
+
+    Returns:
+        Scored games of all seasons
+    """
+    seasons = list(seasons) if seasons is not None else list_cfbd_seasons(data_dir, season_type)
+    if not seasons:
+        return pd.DataFrame()
+    signals = static_team_signals(summary) if summary is not None and not summary.empty else None
+
+    if n_jobs and n_jobs > 1 and len(seasons) > 1:
+        with ExitStack() as stack:
+            if signals is not None:
+                signals = stack.enter_context(share_frame(signals, share_backend)).ref
+            tasks = [(season, season_type, data_dir, cache_dir, signals) for season in seasons]
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+                frames = list(pool.map(_backtest_season, tasks))
+    else:
+        frames = [_backtest_season((season, season_type, data_dir, cache_dir, signals)) for season in seasons]
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    scored = pd.concat(frames, ignore_index=True)
+    if ratings is not None and not ratings.empty:
+        scored = add_elo_signal(scored, ratings, season_type)
+    if form is not None and not form.empty:
+        scored = add_form_signal(scored, form, season_type)
+    return scored
+
+
+def add_upcoming_signals(
+    scored: pd.DataFrame,
+    ratings: Optional[EloRatings] = None,
+    form: Optional[TeamForm] = None,
+    season_type: str = "regular"
+) -> pd.DataFrame:
+    """
+    Fill the Elo and form signals of games without a final score.
+
+    ``add_elo_signal`` and ``add_form_signal`` leave upcoming games NaN; these
+    get both teams' ratings and form before the game's week instead.
+    """
+    if scored.empty:
+        return scored
+    upcoming = ~scored.index.isin(completed_games(scored).index)
+    if not upcoming.any():
+        return scored
+    frames = [scored[~upcoming]]
+    for season, season_games in scored[upcoming].groupby('season', sort=False):
+        if ratings is not None:
+            season_games = add_matchup_elo(season_games, ratings, int(season), season_type)
+        if form is not None:
+            season_games = add_matchup_form(season_games, form, int(season), season_type)
+        frames.append(season_games)
+    return pd.concat(frames).loc[scored.index]
+
+
+def fit_logistic(x: np.ndarray, y: np.ndarray, iterations: int = 50) -> Tuple[float, float]:
+    """
+    Fit ``P(y=1) = sigmoid(intercept + slope * x)`` by Newton's method.
+
+    A tiny ridge penalty keeps the fit finite when the signal separates the
+    outcomes perfectly.
+
+    Returns:
+        Tuple of (intercept, slope)
+    """
+    scale = x.std() or 1.0
+    X = np.column_stack([np.ones_like(x), (x - x.mean()) / scale])
+    beta = np.zeros(2)
+    ridge = 1e-6 * len(x)
+    for _ in range(iterations):
+        p = 1 / (1 + np.exp(-X @ beta))
+        gradient = X.T @ (y - p) - ridge * beta
+        hessian = (X * (p * (1 - p))[:, None]).T @ X + ridge * np.eye(2)
+        step = np.linalg.solve(hessian, gradient)
+        beta += step
+        if np.abs(step).max() < 1e-10:
+            break
+    slope = beta[1] / scale
+    return float(beta[0] - slope * x.mean()), float(slope)
+
+
+def evaluate_signal(scored: pd.DataFrame, signal: str, bins: int = 10) -> Tuple[Dict, pd.DataFrame]:
+    """
+    Evaluate one signal against the results.
+
+    Args:
+        scored: Output of ``run_backtest``
+        signal: Edge column to evaluate
+        bins: Number of calibration bins
+
+    Returns:
+        Tuple of (metrics dict, calibration table)
+    """
+    games = scored[scored[signal].notna() & scored['home_win'].notna()]
+    metrics = {'signal': signal, 'games': len(games)}
+    if len(games) < 2:
+        return metrics, pd.DataFrame()
+
+    x = games[signal].to_numpy(dtype=float)
+    y = games['home_win'].to_numpy(dtype=float)
+    margin = games['home_margin'].to_numpy(dtype=float)
+
+    picks = x != 0
+    metrics['hit_rate'] = float(((x > 0) == (y == 1))[picks].mean()) if picks.any() else np.nan
+    strong = np.abs(x) >= np.quantile(np.abs(x), 0.8)
+    strong &= picks
+    metrics['top_quintile_hit_rate'] = float(((x > 0) == (y == 1))[strong].mean()) if strong.any() else np.nan
+    metrics['margin_corr'] = float(np.corrcoef(x, margin)[0, 1]) if x.std() > 0 else np.nan
+
+    intercept, slope = fit_logistic(x, y)
+    p = 1 / (1 + np.exp(-(intercept + slope * x)))
+    p = np.clip(p, 1e-12, 1 - 1e-12)
+    metrics.update({
+        'intercept': intercept,
+        'slope': slope,
+        'brier': float(np.mean((p - y) ** 2)),
+        'base_rate_brier': float(np.mean((y.mean() - y) ** 2)),
+        'log_loss': float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))),
+    })
+
+    edges = np.unique(np.quantile(p, np.linspace(0, 1, bins + 1)))
+    labels = np.clip(np.searchsorted(edges, p, side='right') - 1, 0, max(len(edges) - 2, 0))
+    calibration = (
+        pd.DataFrame({'bin': labels, 'predicted': p, 'observed': y})
+        .groupby('bin')
+        .agg(games=('observed', 'size'), mean_predicted=('predicted', 'mean'), observed_win_rate=('observed', 'mean'))
+        .reset_index()
+    )
+    calibration.insert(0, 'signal', signal)
+    return metrics, calibration
+
+
+def evaluate_backtest(
+    scored: pd.DataFrame,
+    signals: Optional[List[str]] = None,
+    bins: int = 10
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Evaluate every signal present in the scored games.
+
+    Returns:
+        Tuple of (metrics per signal, calibration table)
+    """
+    if signals is None:
+        signals = [s for s in POINT_IN_TIME_SIGNALS + STATIC_SIGNALS if s in scored.columns]
+
+    rows, tables = [], []
+    for signal in signals:
+        metrics, calibration = evaluate_signal(scored, signal, bins)
+        rows.append(metrics)
+        if not calibration.empty:
+            tables.append(calibration)
+    calibration = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+    return pd.DataFrame(rows), calibration
@@ -0,0 +1,394 @@
+"""
+Bootstrap confidence intervals for the team summary metrics.
+
+Team metrics built from a handful of players are noisy. Each replicate
+resamples the players within every team (with replacement, same team size)
+and recomputes the weighted team means, then rescores ``mismatch_score`` and
+the tiers. All replicates of a chunk are drawn at once as a (replicates x
+players) index matrix over the team-sorted player rows, so a chunk costs a few
+array gathers and ``np.add.reduceat`` calls; chunks can run in a process pool
+for large replicate counts. Pool workers attach to the player arrays through
+shared memory (see ``shared``) instead of receiving a pickled copy per chunk.
+
+Replicates are scored like the run itself: the declared metrics the weights
+use are resampled too, and all replicates are stacked into one ``TeamMatrix``
+whose rows are ranked within (replicate, normalization group) labels, or
+against the percentile reference, by the same ``weighted_scores`` and tier
+functions that produced the reported score and tier.
+
+Adds ``{metric}_ci_low``/``{metric}_ci_high`` columns for every summary metric
+and ``mismatch_score``, plus ``mismatch_tier_agreement`` (the share of
+replicates that put a team in its reported tier).
+"""
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.adapters.aggregation import POSITION_COL, TEAM_COL, WEIGHT_COL, position_group_map
+from cfb_mismatch.main import METRIC_MAP, POSITION_GROUP_SIDES, scoring_weights
+from cfb_mismatch.matrix import (
+    DEFAULT_REGISTRY,
+    MISMATCH_TIERS,
+    SUMMARY_METRICS,
+    MetricRegistry,
+    MetricSpec,
+    TeamMatrix,
+    assign_tiers
+)
+from cfb_mismatch.mismatches import team_key
+from cfb_mismatch.shared import attach, share_array
+
+# Replicates drawn per vectorized chunk (bounds the index matrix size)
+CHUNK_REPLICATES = 250
+
+
+@dataclass
+class TeamBlocks:
+    """Player rows of one metric source, sorted so each team is contiguous."""
+
+    teams: np.ndarray
+    starts: np.ndarray
+    sizes: np.ndarray
+    weights: np.ndarray
+    values: np.ndarray
+    columns: List[str]
+
+
+def team_blocks(df: pd.DataFrame, metrics: Mapping[str, str]) -> Optional[TeamBlocks]:
+    """
+    Prepare player rows for resampling.
+
+    Args:
+        df: Player-level stats
+        metrics: Source column -> summary column
+
+    Returns:
+        TeamBlocks, or None if no metric column or team is present
+    """
+    metrics = {src: name for src, name in metrics.items() if src in df.columns}
+    df = df[df[TEAM_COL].notna()]
+    if not metrics or df.empty:
+        return None
+
+    teams = df[TEAM_COL].astype(str).to_numpy()
+    order = np.argsort(teams, kind='stable')
+    teams = teams[order]
+    unique, starts, sizes = np.unique(teams, return_index=True, return_counts=True)
+
+    weights = df[WEIGHT_COL].to_numpy(dtype=float, na_value=np.nan)[order]
+    values = np.column_stack([
+        df[src].to_numpy(dtype=float, na_value=np.nan)[order] for src in metrics
+    ])
+    return TeamBlocks(
+        teams=unique,
+        starts=starts,
+        sizes=sizes,
+        weights=np.nan_to_num(weights, nan=0.0),
+        values=values,
+        columns=list(metrics.values()),
+    )
+
+
+def replicate_means(blocks: TeamBlocks, replicates: int, seed) -> np.ndarray:
+    """
+    Weighted team means of ``replicates`` within-team resamples.
+
+    Returns:
+        Array of shape (replicates, teams, metrics)
+    """
+    rng = np.random.default_rng(seed)
+    row_team = np.repeat(np.arange(len(blocks.teams)), blocks.sizes)
+    offsets = rng.random((replicates, len(row_team))) * blocks.sizes[row_team]
+    index = blocks.starts[row_team] + offsets.astype(np.int64)
+
+    weights = blocks.weights[index]
+    out = np.empty((replicates, len(blocks.teams), len(blocks.columns)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for j in range(len(blocks.columns)):
+            values = blocks.values[:, j][index]
+            present = ~np.isnan(values)
+            filled = np.where(present, values, 0.0)
+            wsum = np.add.reduceat(filled * weights, blocks.starts, axis=1)
+            wts = np.add.reduceat(present * weights, blocks.starts, axis=1)
+            count = np.add.reduceat(present, blocks.starts, axis=1)
+            total = np.add.reduceat(filled, blocks.starts, axis=1)
+            mean = np.where(wts > 0, wsum / wts, total / count)
+            out[:, :, j] = np.where(count > 0, mean, np.nan)
+    return out
+
+
+def _run_chunk(args: Tuple[List[TeamBlocks], int, np.random.SeedSequence]) -> List[np.ndarray]:
+    sources, replicates, seed = args
+    return [
+        replicate_means(replace(blocks, weights=attach(blocks.weights), values=attach(blocks.values)),
+                        replicates, child)
+        for blocks, child in zip(sources, seed.spawn(len(sources)))
+    ]
+
+
+def declared_columns(registry: Optional[MetricRegistry], weights: Optional[Dict]) -> List[MetricSpec]:
+    """Declared column metrics the run reads (formula metrics are derived from them)."""
+    registry = registry or DEFAULT_REGISTRY
+    specs = []
+    for name in registry.requested(weights, METRIC_MAP):
+        for dep in registry.dependencies(name):
+            spec = registry.get(dep)
+            if spec.formula is None and DEFAULT_REGISTRY.get(dep) is None and spec not in specs:
+                specs.append(spec)
+    return specs
+
+
+def metric_sources(
+    player_stats: Mapping[str, pd.DataFrame],
+    position_groups: Optional[Dict] = None,
+    extra: Iterable[MetricSpec] = ()
+) -> List[TeamBlocks]:
+    """
+    Build the resampling blocks for every summary metric (and position group).
+
+    ``extra`` adds declared column metrics (see ``declared_columns``) to the
+    blocks of their category.
+    """
+    extra = list(extra)
+    sources = []
+    for category, df in player_stats.items():
+        metrics = SUMMARY_METRICS.get(category)
+        if df is None or not metrics:
+            continue
+        declared = {spec.source: spec.name for spec in extra
+                    if spec.category == category and spec.group is None}
+        blocks = team_blocks(df, {**declared, **metrics})
+        if blocks is not None:
+            sources.append(blocks)
+
+        groups = (position_groups or {}).get(POSITION_GROUP_SIDES.get(category))
+        if groups and POSITION_COL in df.columns:
+            labels = df[POSITION_COL].astype(object).map(position_group_map(groups))
+            for group in groups:
+                declared = {spec.source: spec.name if spec.group else f"{group}_{spec.name}" for spec in extra
+                            if spec.category == category and spec.group in (None, group)}
+                blocks = team_blocks(
+                    df[(labels == group).to_numpy(dtype=bool)],
+                    {**declared, **{src: f"{group}_{name}" for src, name in metrics.items()}}
+                )
+                if blocks is not None:
+                    sources.append(blocks)
+    return sources
+
+
+def bootstrap_metrics(
+    sources: List[TeamBlocks],
+    teams: List[str],
+    replicates: int = 1000,
+    seed: int = 0,
+    n_jobs: int = 1,
+    share_backend: str = 'shm'
+) -> Dict[str, np.ndarray]:
+    """
+    Bootstrap every metric of ``sources``.
+
+    Chunk seeds are derived from ``seed`` independently of ``n_jobs``, so the
+    results are the same serially and in a process pool. With ``n_jobs > 1``
+    the player arrays are shared with the workers via ``share_backend``
+    ('shm' or 'memmap').
+
+    Returns:
+        Summary column -> array of shape (replicates, len(teams)); teams
+        without players in a source are NaN
+    """
+    chunks = []
+    remaining = replicates
+    while remaining > 0:
+        chunks.append(min(CHUNK_REPLICATES, remaining))
+        remaining -= chunks[-1]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    if n_jobs and n_jobs > 1 and len(chunks) > 1:
+        with ExitStack() as stack:
+            shared = [
+                replace(
+                    blocks,
+                    weights=stack.enter_context(share_array(blocks.weights, share_backend)).ref,
+                    values=stack.enter_context(share_array(blocks.values, share_backend)).ref,
+                )
+                for blocks in sources
+            ]
+            tasks = [(shared, size, child) for size, child in zip(chunks, seeds)]
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                results = list(pool.map(_run_chunk, tasks))
+    else:
+        results = [_run_chunk((sources, size, child)) for size, child in zip(chunks, seeds)]
+
+    position = {team: i for i, team in enumerate(teams)}
+    matrices = {}
+    for s, blocks in enumerate(sources):
+        means = np.concatenate([result[s] for result in results], axis=0)
+        known = np.array([team in position for team in blocks.teams], dtype=bool)
+        cols = np.array([position[team] for team in blocks.teams[known]], dtype=np.int64)
+        for j, name in enumerate(blocks.columns):
+            matrix = np.full((replicates, len(teams)), np.nan)
+            matrix[:, cols] = means[:, known, j]
+            matrices[name] = matrix
+    return matrices
+
+
+def replicate_matrix(
+    matrices: Mapping[str, np.ndarray],
+    teams: Sequence[str],
+    registry: Optional[MetricRegistry] = None
+) -> TeamMatrix:
+    """
+    Stack the bootstrapped metrics of every replicate into one ``TeamMatrix``.
+
+    Rows are replicate-major: row ``r * len(teams) + t`` is team ``t`` in
+    replicate ``r``.
+    """
+    registry = registry or DEFAULT_REGISTRY
+    names = [name for name in matrices if registry.get(name) is not None]
+    replicates = len(next(iter(matrices.values()))) if matrices else 0
+    values = np.column_stack([matrices[name].reshape(-1) for name in names]) if names \
+        else np.empty((replicates * len(teams), 0))
+    return TeamMatrix(np.tile(np.asarray(teams, dtype=object), replicates),
+                      [registry.get(name) for name in names], values, registry)
+
+
+def replicate_labels(replicates: int, labels: Sequence) -> np.ndarray:
+    """Group of every stacked row: its replicate crossed with the team's normalization group."""
+    codes, uniques = pd.factorize(pd.Series(labels, dtype=object), use_na_sentinel=False)
+    return (np.arange(replicates)[:, None] * max(len(uniques), 1) + codes[None, :]).ravel()
+
+
+def replicate_scores(
+    matrix: TeamMatrix,
+    replicates: int,
+    weights: Optional[Dict],
+    labels: Optional[Sequence] = None,
+    reference=None
+) -> Optional[np.ndarray]:
+    """
+    Score every replicate like ``_compute_weighted_scores``.
+
+    Args:
+        matrix: Stacked replicates (``replicate_matrix``)
+        replicates: Number of replicates in ``matrix``
+        weights: Feature weights dictionary
+        labels: Normalization group of every team (None: all teams together)
+        reference: Optional percentile reference to rank against instead
+
+    Returns:
+        Array of shape (replicates, teams), or None if no weight applies
+    """
+    metric_weights = scoring_weights(weights, matrix)
+    if not metric_weights:
+        return None
+    if reference is not None and all(name in reference for name in metric_weights):
+        score = matrix.weighted_scores(metric_weights, reference=reference)[0]
+    elif reference is not None:
+        # Metrics missing from the reference are ranked within each replicate's teams
+        rows = np.arange(len(matrix)).reshape(replicates, -1)
+        score = np.concatenate([
+            TeamMatrix(matrix.teams[r], matrix.metrics, matrix.values[r], matrix.registry)
+            .weighted_scores(metric_weights, reference=reference)[0]
+            for r in rows
+        ])
+    else:
+        teams = len(matrix) // replicates
+        groups = replicate_labels(replicates, [None] * teams if labels is None else labels)
+        score = matrix.weighted_scores(metric_weights, groups)[0]
+    return score.reshape(replicates, -1)
+
+
+def replicate_tiers(scores: np.ndarray, labels: Optional[Sequence] = None, reference=None) -> np.ndarray:
+    """Tier index (0 = lowest, -1 without a score) of every team in every replicate."""
+    flat = pd.Series(scores.reshape(-1))
+    if reference is not None and 'mismatch_score' in reference:
+        tiers = reference.tiers(flat)
+    else:
+        replicates, teams = scores.shape
+        tiers = assign_tiers(flat, replicate_labels(replicates, [None] * teams if labels is None else labels))
+    return tiers.cat.codes.to_numpy().reshape(scores.shape)
+
+
+def add_confidence_intervals(
+    summary: pd.DataFrame,
+    player_stats: Mapping[str, pd.DataFrame],
+    weights: Optional[Dict] = None,
+    replicates: int = 1000,
+    confidence: float = 0.9,
+    seed: int = 0,
+    n_jobs: int = 1,
+    position_groups: Optional[Dict] = None,
+    share_backend: str = 'shm',
+    registry: Optional[MetricRegistry] = None,
+    groups: Optional[Dict[str, str]] = None,
+    reference=None
+) -> pd.DataFrame:
+    """
+    Add bootstrap confidence intervals to a team summary.
+
+    Args:
+        summary: Summary from ``generate_summary_report``
+        player_stats: Player-level frames per team_stats category
+        weights: Feature weights dictionary (for mismatch_score intervals)
+        replicates: Number of bootstrap replicates
+        confidence: Interval coverage, e.g. 0.9 for the 5th-95th percentiles
+        seed: Random seed
+        n_jobs: Processes used for the replicate chunks (1 runs in-process)
+        position_groups: ``position_groups`` config (bootstraps group columns too)
+        share_backend: How pool workers attach to the player arrays ('shm' or 'memmap')
+        registry: Metric registry the summary was scored with (declared metrics)
+        groups: Normalization groups the summary was scored with (see ``team_groups``)
+        reference: Percentile reference the summary was scored against
+
+    Returns:
+        Copy of ``summary`` with the interval columns added
+    """
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be between 0 and 1, got {confidence}")
+
+    summary = summary.copy()
+    if summary.empty or replicates <= 0:
+        return summary
+
+    registry = registry or DEFAULT_REGISTRY
+    teams = summary['team_name'].astype(str).tolist()
+    sources = metric_sources(player_stats, position_groups, declared_columns(registry, weights))
+    matrices = bootstrap_metrics(sources, teams, replicates, seed, n_jobs, share_backend)
+    matrix = replicate_matrix(matrices, teams, registry)
+    for name in registry.outputs:
+        if name not in matrices and name in matrix:
+            matrices[name] = matrix.column(name).reshape(replicates, -1)
+
+    labels = None
+    if groups and reference is None:
+        labels = team_key(summary['team_name']).map(groups).to_numpy(dtype=object)
+    scores = replicate_scores(matrix, replicates, weights, labels, reference)
+    if scores is not None and 'mismatch_score' in summary.columns:
+        matrices['mismatch_score'] = scores
+
+    tail = (1 - confidence) / 2 * 100
+    with warnings.catch_warnings():
+        # Teams without any player for a metric have all-NaN replicates
+        warnings.simplefilter('ignore', RuntimeWarning)
+        for name, matrix in matrices.items():
+            if name not in summary.columns:
+                continue
+            low, high = np.nanpercentile(matrix, [tail, 100 - tail], axis=0)
+            summary[f"{name}_ci_low"] = low
+            summary[f"{name}_ci_high"] = high
+
+    if 'mismatch_score' in matrices and 'mismatch_tier' in summary.columns:
+        point = summary['mismatch_tier'].astype(object).map(
+            {tier: i for i, tier in enumerate(MISMATCH_TIERS)}
+        ).to_numpy(dtype=float)
+        tiers = replicate_tiers(matrices['mismatch_score'], labels, reference)
+        agreement = (tiers == point[None, :]).mean(axis=0)
+        summary['mismatch_tier_agreement'] = agreement
+
+    return summary
@@ -3,19 +3,38 @@ Command-line interface for CFB Mismatch Model.
 """
 
 import argparse
+import dataclasses
 import sys
 import os
-from cfb_mismatch.main import (
-    load_config,
-    load_weights,
-    load_all_stats,
-    load_cfbd_data,
-    compute_team_stats,
-    save_team_stats,
-    generate_summary_report,
-    generate_integrated_report
+import yaml
+import pandas as pd
+from cfb_mismatch.main import STATS_SOURCES, load_config, load_weights
+from cfb_mismatch.manifest import build_fingerprint, explain_changes, load_manifest, manifest_path
+from cfb_mismatch.adapters.cfbd_data import (
+    aggregate_team_games,
+    list_cfbd_seasons,
+    load_cfbd_game_store,
+    load_cfbd_games
 )
-from cfb_mismatch.adapters.cfbd_data import fetch_and_save_cfbd_data
+from cfb_mismatch.adapters.cfbd_data import fetch_and_save_cfbd_data, fetch_and_save_cfbd_lines, load_cfbd_lines
+from cfb_mismatch.backtest import add_season_signals, add_upcoming_signals, evaluate_backtest, run_backtest
+from cfb_mismatch.clustering import add_cluster_labels, cluster_splits, clusters_from_config
+from cfb_mismatch.fitting import fit_weights, fitted_weights_config
+from cfb_mismatch.mismatches import load_summary
+from cfb_mismatch.output import OUTPUT_FORMATS, report_writes, write_bytes_atomic, write_frames
+from cfb_mismatch.matrix import SUMMARY_METRICS, MetricRegistry
+from cfb_mismatch.percentiles import PercentileIndex, score_frame
+from cfb_mismatch.player_matchups import MatchupSettings, player_matchups
+from cfb_mismatch.pipeline import analyze_stage, publish_stage, run_pipeline
+from cfb_mismatch.ratings import EloSettings, ratings_from_config, update_ratings
+from cfb_mismatch.rolling import FormSettings, update_form
+from cfb_mismatch.schedule import strength_of_schedule, summary_profile
+from cfb_mismatch.similarity import SimilarityIndex
+from cfb_mismatch.simulation import simulate_season
+from cfb_mismatch.value import LineModel, find_value, value_summary
+from cfb_mismatch.watch import StatsWatcher
+from cfb_mismatch.weekly import load_game_store
+from cfb_mismatch.whatif import load_roster_whatif
 
 
 def analyze_stats(args):
@@ -26,49 +45,32 @@ def analyze_stats(args):
     print("Loading configuration...")
     config = load_config(args.config)
     weights = load_weights(args.weights)
-    
-    # Load stats files
-    print("\nLoading stats files...")
-    defense_df, receiving_concept_df, receiving_scheme_df = load_all_stats(config)
-    
-    # Compute team-level stats
-    print("\nComputing team-level statistics...")
-    team_stats = compute_team_stats(defense_df, receiving_concept_df, receiving_scheme_df)
-    
-    # Optionally load CFBD data if season is specified
-    cfbd_team_stats = None
-    if hasattr(args, 'season') and args.season:
-        print(f"\nLoading CFBD data for season {args.season}...")
-        season_type = getattr(args, 'season_type', 'regular')
-        cfbd_data_dir = config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
-        fetch_from_api = getattr(args, 'fetch_cfbd', False)
-        api_key = os.getenv("CFBD_API_KEY") if fetch_from_api else None
-        _, _, cfbd_team_stats = load_cfbd_data(
-            args.season, 
-            season_type, 
-            cfbd_data_dir, 
-            fetch_from_api=fetch_from_api,
-            api_key=api_key
-        )
-    
-    # Save team stats
+
+    if getattr(args, 'watch', False):
+        watch_stats(args, config, weights)
+        return
+
     output_dir = args.output_dir or config.get('output_dir', 'data/out')
-    print(f"\nSaving team statistics to {output_dir}...")
-    save_team_stats(team_stats, output_dir)
-    
-    # Generate summary report
-    print("\nGenerating summary report...")
-    if cfbd_team_stats is not None:
-        summary = generate_integrated_report(team_stats, cfbd_team_stats, weights=weights)
-        print("✓ Generated integrated report with CFBD data")
-    else:
-        summary = generate_summary_report(team_stats, weights=weights)
-        print("✓ Generated summary report (user stats only)")
-    
-    summary_path = f"{output_dir}/team_summary.csv"
-    summary.to_csv(summary_path, index=False)
-    print(f"✓ Saved {summary_path}")
-    
+    formats = args.formats or config.get('output_formats') or ['csv']
+    fetch_from_api = getattr(args, 'fetch_cfbd', False)
+    result = analyze_stage(
+        config,
+        weights,
+        season=getattr(args, 'season', None),
+        season_type=getattr(args, 'season_type', 'regular'),
+        fetch_from_api=fetch_from_api,
+        api_key=os.getenv("CFBD_API_KEY") if fetch_from_api else None,
+        output_dir=output_dir,
+        force=args.force,
+        run_options={'command': 'analyze', 'formats': formats}
+    )
+
+    publish_stage(result, output_dir, formats)
+    _print_analysis_report(result.summary, output_dir)
+
+
+def _print_analysis_report(summary, output_dir):
+    """Print the completion banner and the top teams by key metrics."""
     print("\n=== Analysis Complete ===\n")
     print(f"Total teams analyzed: {len(summary)}")
     print(f"Output directory: {output_dir}")
@@ -97,6 +99,619 @@ def analyze_stats(args):
             print(top_wins.to_string(index=False))
 
 
+def watch_stats(args, config, weights):
+    """Keep outputs fresh by recomputing whenever an input file changes."""
+    if getattr(args, 'fetch_cfbd', False):
+        print("⚠ --fetch-cfbd is ignored in watch mode; watching local CFBD files instead")
+
+    if args.formats:
+        config['output_formats'] = args.formats
+
+    output_dir = args.output_dir or config.get('output_dir', 'data/out')
+    watcher = StatsWatcher(
+        config,
+        weights,
+        output_dir,
+        season=getattr(args, 'season', None),
+        season_type=getattr(args, 'season_type', 'regular')
+    )
+    print(f"Watching inputs, writing to {output_dir} (Ctrl+C to stop)...\n")
+    watcher.run(poll_interval=args.poll_interval)
+
+
+def run_full_pipeline(args):
+    """Run fetch, analyze, top mismatches and publishing in one process."""
+    print("\n=== CFB Mismatch Model - Full Pipeline ===\n")
+
+    result = run_pipeline(
+        config_path=args.config,
+        weights_path=args.weights,
+        output_dir=args.output_dir,
+        season=args.season,
+        season_type=args.season_type,
+        fetch_cfbd=args.fetch_cfbd,
+        top_n=args.top_n,
+        publish_notion=args.publish_notion,
+        formats=args.formats,
+        force=args.force,
+        max_ci_width=args.max_ci_width
+    )
+
+    output_dir = args.output_dir or result.config.get('output_dir', 'data/out')
+    _print_analysis_report(result.summary, output_dir)
+
+    if result.top_mismatches is not None and not result.top_mismatches.empty:
+        print(f"\n--- Top {len(result.top_mismatches)} Passing Mismatches ---")
+        print(result.top_mismatches[['matchup', 'week', 'tilt']].to_string(index=False))
+
+
+def show_manifest(args):
+    """Show the run manifest of an output directory and why it would rerun."""
+    config = load_config(args.config)
+    output_dir = args.output_dir or config.get('output_dir', 'data/out')
+    manifest = load_manifest(output_dir)
+
+    if manifest is None:
+        print(f"No run manifest found at {manifest_path(output_dir)}")
+        return
+
+    print(f"Manifest: {manifest_path(output_dir)}")
+    print(f"Created: {manifest.get('created_at')}  Version: {manifest.get('version')}")
+    print(f"Options: {manifest.get('options')}")
+    print("\nInputs:")
+    for key, info in manifest.get('inputs', {}).items():
+        print(f"  {key}: {info.get('path')} ({str(info.get('sha256'))[:12]})")
+    for key, digest in manifest.get('cfbd', {}).items():
+        print(f"  cfbd {key}: {str(digest)[:12]}")
+    print("\nOutputs:")
+    for path, digest in manifest.get('outputs', {}).items():
+        print(f"  {path} ({str(digest)[:12]})")
+
+    reasons = manifest.get('rerun_reasons') or []
+    print("\nLast run was triggered by:")
+    for reason in reasons or ["(not recorded)"]:
+        print(f"  - {reason}")
+
+    if args.explain:
+        # Compare against local inputs, keeping the options of the recorded run
+        options = dict(manifest.get('options', {}))
+        season = args.season if args.season is not None else options.get('season')
+        season_type = args.season_type or options.get('season_type') or 'regular'
+        options.update({'season': season, 'season_type': season_type})
+        games_df = None
+        if season:
+            data_dir = config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+            games_df = load_cfbd_games(season, season_type, data_dir)
+        fingerprint = build_fingerprint(config, load_weights(args.weights), {'games': games_df}, options)
+        reasons = explain_changes(manifest, fingerprint, output_dir)
+        if reasons:
+            print("\nA rerun now would be triggered by:")
+        else:
+            print("\nOutputs are up to date; a rerun would be skipped.")
+        for reason in reasons:
+            print(f"  - {reason}")
+
+
+def _parse_reweights(values):
+    """Parse repeated ``PLAYER=FACTOR`` options into a dict."""
+    reweight = {}
+    for value in values or []:
+        player, sep, factor = value.rpartition('=')
+        if not sep or not player:
+            raise ValueError(f"--reweight expects PLAYER=FACTOR, got '{value}'")
+        reweight[player] = float(factor)
+    return reweight
+
+
+def what_if(args):
+    """Rescore teams with players removed or reweighted."""
+    print("\n=== CFB Mismatch Model - What-If ===\n")
+    config = load_config(args.config)
+    weights = load_weights(args.weights)
+
+    exclude = args.exclude_player or []
+    include_only = args.include_only or []
+    reweight = _parse_reweights(args.reweight)
+    if not (exclude or include_only or reweight):
+        raise ValueError("Give at least one of --exclude-player, --include-only or --reweight")
+
+    cfbd_team_stats = None
+    if args.season:
+        data_dir = config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+        games_df = load_cfbd_games(args.season, args.season_type, data_dir)
+        if games_df is not None:
+            cfbd_team_stats = aggregate_team_games(games_df)
+
+    scenarios = load_roster_whatif(config, weights, cfbd_team_stats)
+    result = scenarios.run(exclude=exclude, include_only=include_only, reweight=reweight)
+
+    print(f"Players changed: {len(result.players)}")
+    if not result.players.empty:
+        cols = [col for col in ('category', 'player', 'player_id', 'team_name', 'action') if col in result.players]
+        print(result.players[cols].to_string(index=False))
+
+    print(f"\n--- Affected teams ({len(result.affected_teams)}) ---")
+    if not result.comparison.empty:
+        print(result.comparison.T.to_string(header=False))
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        report_writes(write_frames({
+            os.path.join(args.output_dir, "whatif_comparison"): result.comparison,
+            os.path.join(args.output_dir, "whatif_summary"): result.summary,
+        }))
+
+
+def backtest(args):
+    """Score every past game with point-in-time features and evaluate the signals."""
+    print("\n=== CFB Mismatch Model - Backtest ===\n")
+    config = load_config(args.config)
+    settings = config.get('backtest', {}) or {}
+    data_dir = args.data_dir or config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+    cache_dir = None if args.no_cache else (args.cache_dir or settings.get('cache_dir'))
+    n_jobs = args.jobs or settings.get('n_jobs', 1)
+
+    seasons = list_cfbd_seasons(data_dir, args.season_type)
+    if args.start_season is not None:
+        seasons = [s for s in seasons if s >= args.start_season]
+    if args.end_season is not None:
+        seasons = [s for s in seasons if s <= args.end_season]
+    if not seasons:
+        raise ValueError(f"No {args.season_type} games files found in {data_dir}")
+
+    summaries = {season: load_summary(path) for season, path in _parse_summaries(args.summary).items()}
+    if summaries:
+        print("⚠ Summary signals are season-level and not point-in-time (they include lookahead)")
+        unused = sorted(set(summaries) - set(seasons))
+        if unused:
+            print(f"⚠ No backtested games for --summary season(s) {', '.join(map(str, unused))}")
+
+    ratings = None
+    if not args.no_elo:
+        store_path = (config.get('ratings') or {}).get('store_path')
+        ratings = update_ratings(load_game_store(data_dir), store_path, EloSettings.from_config(config)).history
+
+    form = None
+    if not args.no_form:
+        store_path = (config.get('rolling') or {}).get('store_path')
+        form = update_form(load_game_store(data_dir), store_path, FormSettings.from_config(config)).history
+
+    print(f"Backtesting seasons {seasons[0]}-{seasons[-1]} ({len(seasons)}) with {n_jobs} job(s)...")
+    scored = run_backtest(
+        data_dir, args.season_type, seasons, cache_dir, None, n_jobs,
+        share_backend=config.get('shared_memory', 'shm'), ratings=ratings, form=form
+    )
+    if scored.empty:
+        raise ValueError("No games to backtest")
+    # Each season only gets the signals of its own summary
+    scored = add_season_signals(scored, summaries)
+
+    metrics, calibration = evaluate_backtest(scored, bins=args.bins)
+    print(f"\nGames scored: {len(scored)}")
+    print("\n--- Signal Evaluation ---")
+    print(metrics.to_string(index=False))
+
+    output_dir = args.output_dir or os.path.join(config.get('output_dir', 'data/out'), 'backtest')
+    os.makedirs(output_dir, exist_ok=True)
+    report_writes(write_frames({
+        os.path.join(output_dir, "backtest_games"): scored,
+        os.path.join(output_dir, "backtest_metrics"): metrics,
+        os.path.join(output_dir, "backtest_calibration"): calibration,
+    }))
+
+
+def rate_teams(args):
+    """Bring the Elo ratings up to date with the local game store."""
+    print("\n=== CFB Mismatch Model - Elo Ratings ===\n")
+    config = load_config(args.config)
+    data_dir = args.data_dir or config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+    store_path = args.store or (config.get('ratings') or {}).get('store_path')
+    if args.rebuild and store_path and os.path.exists(store_path):
+        os.remove(store_path)
+
+    games = load_game_store(data_dir)
+    if games.empty:
+        raise ValueError(f"No games files found in {data_dir}")
+    ratings = update_ratings(games, store_path, EloSettings.from_config(config))
+
+    if args.season is not None:
+        table = ratings.as_of(args.season, args.week, args.season_type)
+        label = f"{args.season} {args.season_type}" + (f" before week {args.week}" if args.week else "")
+    else:
+        table = ratings.current()
+        label = "latest"
+    print(f"\n--- Top {args.top} Elo Ratings ({label}) ---")
+    print(table.head(args.top).to_string(index=False, float_format='{:.1f}'.format))
+
+    if args.output:
+        report_writes(write_frames({args.output: table}))
+
+
+def team_form(args):
+    """Bring the rolling team form up to date and show it as of a week."""
+    print("\n=== CFB Mismatch Model - Team Form ===\n")
+    config = load_config(args.config)
+    data_dir = args.data_dir or config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+    store_path = args.store or (config.get('rolling') or {}).get('store_path')
+    if args.rebuild and store_path and os.path.exists(store_path):
+        os.remove(store_path)
+
+    games = load_game_store(data_dir)
+    if games.empty:
+        raise ValueError(f"No games files found in {data_dir}")
+    form = update_form(games, store_path, FormSettings.from_config(config))
+
+    table = form.as_of(args.season, args.week, args.season_type)
+    label = f"{args.season} {args.season_type}" + (f" before week {args.week}" if args.week else "")
+    print(f"\n--- Top {args.top} Teams by Recent Margin ({label}) ---")
+    print(table.head(args.top).to_string(index=False, float_format='{:.1f}'.format))
+
+    if args.output:
+        report_writes(write_frames({args.output: table}))
+
+
+def schedule_strength(args):
+    """Compute the past and remaining strength of schedule of every team and season."""
+    print("\n=== CFB Mismatch Model - Strength of Schedule ===\n")
+    config = load_config(args.config)
+    data_dir = args.data_dir or config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+
+    games = load_cfbd_game_store(data_dir, args.season_type, args.season)
+    if games.empty:
+        raise ValueError(f"No {args.season_type} games files found in {data_dir}")
+    seasons = sorted(games['season'].unique())
+
+    values = []
+    if not args.no_elo:
+        ratings = ratings_from_config(config, data_dir)
+        values.append(pd.concat([
+            ratings.as_of(int(season), None, args.season_type).assign(season=int(season)) for season in seasons
+        ], ignore_index=True))
+    table = values[0] if values else None
+    if args.summary:
+        # The summary profile is season-level; it applies to every season given
+        profile = summary_profile(load_summary(args.summary), team_col='Team')
+        table = profile if table is None else table.merge(profile, on='team', how='outer')
+
+    sos = strength_of_schedule(games, table)
+    print(f"✓ Strength of schedule for {len(sos)} team-seasons ({seasons[0]}-{seasons[-1]})")
+    latest = sos[sos['season'] == seasons[-1]]
+    sort = 'sos_elo_rating' if 'sos_elo_rating' in sos.columns else 'sos_win_pct'
+    print(f"\n--- Toughest {args.top} Schedules ({seasons[-1]}) ---")
+    print(latest.nlargest(args.top, sort).to_string(index=False, float_format='{:.3f}'.format))
+
+    output_dir = args.output_dir or os.path.join(config.get('output_dir', 'data/out'), 'schedule')
+    os.makedirs(output_dir, exist_ok=True)
+    report_writes(write_frames({os.path.join(output_dir, "strength_of_schedule"): sos}))
+
+
+def percentile_index(args):
+    """Index a season's team summary as the percentile reference, or score teams against it."""
+    print("\n=== CFB Mismatch Model - Percentile Index ===\n")
+    config = load_config(args.config)
+    path = args.index or (config.get('percentiles') or {}).get('path', 'data/cache/percentiles.npz')
+    index = PercentileIndex.load(path)
+
+    if args.score:
+        if args.season not in index:
+            raise ValueError(f"Season {args.season} is not in the percentile index {path}; build it first")
+        weights = load_weights(args.weights)
+        scored = score_frame(pd.read_csv(args.score), index.season(args.season), weights)
+        columns = [c for c in ('team_name', 'mismatch_score', 'mismatch_tier') if c in scored.columns]
+        print(f"--- {len(scored)} teams scored against the {args.season} index ---")
+        print(scored[columns].to_string(index=False, float_format='{:.3f}'.format))
+        if args.output:
+            report_writes(write_frames({os.path.splitext(args.output)[0]: scored}))
+        return
+
+    summary_path = args.summary or os.path.join(config.get('output_dir', 'data/out'), 'team_summary.csv')
+    summary = pd.read_csv(summary_path)
+    index.add_summary(args.season, summary, MetricRegistry.from_config(config))
+    index.save(path)
+    reference = index.season(args.season)
+    print(f"✓ Indexed {len(reference.names)} metrics of {len(summary)} teams as the {args.season} reference")
+    print(f"✓ Saved {path} (seasons: {', '.join(str(s) for s in sorted(index.seasons))})")
+
+
+def _parse_assignments(values, option):
+    """Parse repeated ``NAME=NUMBER`` options into a dict."""
+    parsed = {}
+    for value in values or []:
+        name, sep, number = value.rpartition('=')
+        if not sep or not name:
+            raise ValueError(f"{option} expects NAME=NUMBER, got '{value}'")
+        parsed[name] = float(number)
+    return parsed
+
+
+def similar_teams(args):
+    """Find the team-seasons whose metric profile is closest to a team or a given profile."""
+    print("\n=== CFB Mismatch Model - Similar Teams ===\n")
+    config = load_config(args.config)
+    profile = _parse_assignments(args.profile, '--profile')
+    if bool(args.team) == bool(profile):
+        raise ValueError("Give either --team or --profile METRIC=VALUE")
+
+    summaries = _parse_summaries(args.summary)
+    if not summaries:
+        if args.season is None:
+            raise ValueError("Give --summary SEASON=PATH (repeat per season) or --season")
+        summaries = {args.season: os.path.join(config.get('output_dir', 'data/out'), 'team_summary.csv')}
+    frames = {season: pd.read_csv(path) for season, path in sorted(summaries.items())}
+
+    index = SimilarityIndex.from_summaries(
+        frames, args.metrics, _parse_assignments(args.weight, '--weight'),
+        MetricRegistry.from_config(config), args.category
+    )
+    seasons = sorted(frames)
+    print(f"✓ Indexed {len(index)} team-seasons on {len(index.names)} metrics ({seasons[0]}-{seasons[-1]})")
+
+    if args.team:
+        neighbours = index.nearest(args.team, args.season, args.k, args.same_season)
+        title = neighbours['query'].iloc[0]
+    else:
+        neighbours = index.query(pd.DataFrame([profile], index=['profile']), args.k)
+        title = ', '.join(f"{name}={value:g}" for name, value in profile.items())
+    print(f"\n--- {len(neighbours)} Most Similar to {title} ---")
+    print(neighbours.drop(columns='query').to_string(index=False, float_format='{:.3f}'.format))
+
+    if args.output:
+        report_writes(write_frames({os.path.splitext(args.output)[0]: neighbours}))
+
+
+def scheme_clusters(args):
+    """Cluster defenses and offenses by scheme profile and show how offenses fare against each defense."""
+    print("\n=== CFB Mismatch Model - Scheme Clusters ===\n")
+    config = load_config(args.config)
+    section = dict(config.get('clustering') or {})
+    if args.k_defense or args.k_offense:
+        section['k'] = dict(section.get('k') or {})
+        section['k'].update({side: k for side, k in (('defense', args.k_defense), ('offense', args.k_offense)) if k})
+    if args.jobs:
+        section['n_jobs'] = args.jobs
+    config = {**config, 'clustering': section}
+
+    summary_path = args.summary or os.path.join(config.get('output_dir', 'data/out'), 'team_summary.csv')
+    summary = pd.read_csv(summary_path)
+    clusters = clusters_from_config(config, summary, refit=args.refit)
+    if not clusters:
+        raise ValueError(f"No coverage or receiving metrics to cluster in {summary_path}")
+    labeled = add_cluster_labels(summary, clusters)
+
+    profiles = pd.concat([result.profiles() for result in clusters.values()], ignore_index=True)
+    for side, result in clusters.items():
+        print(f"\n--- {side.title()} clusters ---")
+        print(result.profiles().drop(columns='side').to_string(index=False, float_format='{:.2f}'.format))
+
+    frames = {'team_clusters': labeled[['team_name'] + [f'{side}_cluster' for side in clusters]],
+              'cluster_profiles': profiles}
+    if args.season is not None and 'defense' in clusters:
+        data_dir = args.data_dir or config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+        games = load_cfbd_games(args.season, args.season_type, data_dir)
+        if games is None or games.empty:
+            raise ValueError(f"No CFBD games found for {args.season} {args.season_type} season in {data_dir}")
+        splits = cluster_splits(games, labeled)
+        frames['cluster_splits'] = splits
+        print(f"\n--- Points per game vs each defense cluster ({args.season}) ---")
+        print(splits.pivot(index='team', columns='defense_cluster', values='points_vs_avg')
+              .head(args.top).to_string(float_format='{:+.1f}'.format))
+
+    output_dir = args.output_dir or os.path.join(config.get('output_dir', 'data/out'), 'clusters')
+    os.makedirs(output_dir, exist_ok=True)
+    report_writes(write_frames({os.path.join(output_dir, name): df for name, df in frames.items()}))
+
+
+def receiver_matchups(args):
+    """Score receiver-vs-defender mismatches for a week's games from the player stats files."""
+    print("\n=== CFB Mismatch Model - Player Matchups ===\n")
+    config = load_config(args.config)
+    settings = MatchupSettings.from_config(config)
+    if args.top_k is not None:
+        settings = dataclasses.replace(settings, top_k=args.top_k)
+    data_dir = args.data_dir or config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+
+    stats_paths = config.get('stats_paths', {})
+    float_dtype = config.get('stats_float_dtype', 'float64')
+    players = {}
+    for key in ('receiving_scheme', 'receiving_concept', 'defense_coverage_scheme'):
+        if key in stats_paths:
+            players[key] = STATS_SOURCES[key][1](stats_paths[key], float_dtype)
+    missing = [key for key in ('receiving_scheme', 'defense_coverage_scheme') if key not in players]
+    if missing:
+        raise ValueError(f"Player matchups need stats_paths for: {', '.join(missing)}")
+
+    games = load_cfbd_games(args.season, args.season_type, data_dir)
+    if games is None or games.empty:
+        raise ValueError(f"No CFBD games found for {args.season} {args.season_type} season in {data_dir}")
+    week = args.week
+    if week is None and not args.all_weeks:
+        unplayed = games[games['home_points'].isna() | games['away_points'].isna()]
+        week = int(unplayed['week'].min()) if not unplayed.empty else int(games['week'].max())
+    if week is not None:
+        games = games[games['week'] == week]
+    label = f"week {week}" if week is not None else "all weeks"
+
+    matchups = player_matchups(
+        games.reset_index(drop=True), players['receiving_scheme'], players['defense_coverage_scheme'],
+        players.get('receiving_concept'), settings
+    )
+    print(f"✓ Scored {len(games)} games ({label}), kept {len(matchups)} receiver-defender matchups")
+    columns = ['offense', 'defense', 'receiver', 'receiver_position', 'defender', 'defender_position', 'score']
+    print(f"\n--- Top {args.top} Player Mismatches ({args.season} {label}) ---")
+    print(matchups.nlargest(args.top, 'score')[columns].to_string(index=False, float_format='{:.2f}'.format))
+
+    output_dir = args.output_dir or os.path.join(config.get('output_dir', 'data/out'), 'player_matchups')
+    os.makedirs(output_dir, exist_ok=True)
+    suffix = f"week_{week}" if week is not None else "all_weeks"
+    report_writes(write_frames({os.path.join(output_dir, f"{args.season}_player_matchups_{suffix}"): matchups}))
+
+
+def simulate(args):
+    """Simulate the rest of a season from the current Elo ratings."""
+    print("\n=== CFB Mismatch Model - Season Simulation ===\n")
+    config = load_config(args.config)
+    settings = config.get('simulation', {}) or {}
+    data_dir = args.data_dir or config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+
+    games = load_cfbd_games(args.season, args.season_type, data_dir)
+    if games is None or games.empty:
+        raise ValueError(f"No CFBD games found for {args.season} {args.season_type} season in {data_dir}")
+    unplayed = games[games['home_points'].isna() | games['away_points'].isna()]
+    next_week = int(unplayed['week'].min()) if not unplayed.empty else None
+
+    ratings = ratings_from_config(config, data_dir)
+    table = ratings.as_of(args.season, next_week, args.season_type)
+    sims = args.sims or settings.get('n_sims', 100000)
+    n_jobs = args.jobs or settings.get('n_jobs', 1)
+    label = f"from week {next_week}" if next_week is not None else "(no games left)"
+    print(f"Simulating {len(unplayed)} remaining games {label} {sims} times with {n_jobs} job(s)...")
+    result = simulate_season(
+        games,
+        dict(zip(table['team'], table['elo_rating'])),
+        ratings.settings,
+        sims=sims,
+        chunk_size=settings.get('chunk_size', 10000),
+        n_jobs=n_jobs,
+        seed=args.seed if args.seed is not None else settings.get('seed', 0),
+        rating_sd=args.rating_sd if args.rating_sd is not None else settings.get('rating_sd', 0.0),
+        bowl_wins=settings.get('bowl_wins', 6),
+    )
+
+    print(f"\n--- Top {args.top} Conference Title Odds ---")
+    columns = ['team', 'conference', 'wins', 'losses', 'expected_wins', 'p_bowl_eligible', 'p_conference_title']
+    print(result.teams[columns].head(args.top).to_string(index=False, float_format='{:.3f}'.format))
+
+    output_dir = args.output_dir or os.path.join(config.get('output_dir', 'data/out'), 'simulation')
+    os.makedirs(output_dir, exist_ok=True)
+    report_writes(write_frames({
+        os.path.join(output_dir, f"{args.season}_season_simulation"): result.teams,
+        os.path.join(output_dir, f"{args.season}_win_distribution"): result.win_distribution,
+    }))
+
+
+def find_line_value(args):
+    """Compare model-implied margins and totals with a season's betting lines."""
+    print("\n=== CFB Mismatch Model - Line Value ===\n")
+    config = load_config(args.config)
+    settings = config.get('value', {}) or {}
+    data_dir = args.data_dir or config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+    backtest_settings = config.get('backtest', {}) or {}
+
+    lines = load_cfbd_lines(args.season, args.season_type, data_dir)
+    if lines is None or lines.empty:
+        raise ValueError(f"No betting lines for {args.season} {args.season_type} in {data_dir} "
+                         f"(fetch them with: cfb-mismatch fetch-cfbd --season {args.season} --lines)")
+    print(f"✓ Loaded {len(lines)} lines from {lines['provider'].nunique()} provider(s)")
+
+    games = load_game_store(data_dir)
+    store_path = (config.get('ratings') or {}).get('store_path')
+    ratings = update_ratings(games, store_path, EloSettings.from_config(config))
+    store_path = (config.get('rolling') or {}).get('store_path')
+    form = update_form(games, store_path, FormSettings.from_config(config))
+    summaries = {season: load_summary(path) for season, path in _parse_summaries(args.summary).items()}
+
+    train_seasons = [s for s in list_cfbd_seasons(data_dir, args.season_type) if s < args.season]
+    if args.train_seasons:
+        train_seasons = train_seasons[-args.train_seasons:]
+    if not train_seasons:
+        raise ValueError(f"No seasons before {args.season} in {data_dir} to fit the line model on")
+    scored = run_backtest(
+        data_dir, args.season_type, train_seasons + [args.season], backtest_settings.get('cache_dir'),
+        None, backtest_settings.get('n_jobs', 1),
+        share_backend=config.get('shared_memory', 'shm'), ratings=ratings.history, form=form.history
+    )
+    scored = add_upcoming_signals(scored, ratings, form, args.season_type)
+    # A season's summary only describes that season: without one for every
+    # season the static signals would pair games with another season's profiles
+    missing = [season for season in train_seasons + [args.season] if season not in summaries]
+    if summaries and missing:
+        print(f"⚠ No --summary for season(s) {', '.join(map(str, missing))}; "
+              f"fitting without the mismatch_score and pass tilt signals")
+    elif summaries:
+        scored = add_season_signals(scored, summaries)
+    model = LineModel.fit(scored[scored['season'] < args.season])
+    print(f"✓ Fitted line model on {model.games} games of {train_seasons[0]}-{train_seasons[-1]} "
+          f"(margin R² {model.margin.r2:.3f}, total R² {model.total.r2:.3f})")
+
+    value = find_value(
+        lines,
+        model.predict(scored[scored['season'] == args.season]),
+        spread_threshold=(args.spread_threshold if args.spread_threshold is not None
+                          else settings.get('spread_threshold', 3.0)),
+        total_threshold=(args.total_threshold if args.total_threshold is not None
+                         else settings.get('total_threshold', 4.0)),
+        providers=args.providers or settings.get('providers') or None,
+    )
+    if args.week is not None:
+        value = value[value['week'] == args.week]
+    summary_table = value_summary(value)
+    print("\n--- Flagged Lines ---")
+    print(summary_table.to_string(index=False))
+
+    flagged = value[value['spread_value'] | value['total_value']]
+    columns = ['week', 'home_team', 'away_team', 'provider', 'spread', 'model_margin', 'spread_edge',
+               'over_under', 'model_total', 'total_edge']
+    if not flagged.empty:
+        top = flagged.reindex(flagged['spread_edge'].abs().sort_values(ascending=False).index)
+        print(top[columns].head(args.top).to_string(index=False, float_format='{:.1f}'.format))
+
+    output_dir = args.output_dir or os.path.join(config.get('output_dir', 'data/out'), 'value')
+    os.makedirs(output_dir, exist_ok=True)
+    report_writes(write_frames({
+        os.path.join(output_dir, f"{args.season}_line_value"): value,
+        os.path.join(output_dir, f"{args.season}_line_value_summary"): summary_table,
+    }))
+
+
+def _parse_summaries(values):
+    """Parse repeated ``SEASON=PATH`` options into a dict."""
+    summaries = {}
+    for value in values or []:
+        season, sep, path = value.partition('=')
+        if not sep or not season.isdigit() or not path:
+            raise ValueError(f"--summary expects SEASON=PATH, got '{value}'")
+        summaries[int(season)] = path
+    return summaries
+
+
+def fit_stats_weights(args):
+    """Fit stats_weights to past game margins with cross-validation by season."""
+    print("\n=== CFB Mismatch Model - Fit Weights ===\n")
+    config = load_config(args.config)
+    weights = load_weights(args.weights)
+    data_dir = args.data_dir or config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+
+    summaries = _parse_summaries(args.summary)
+    if not summaries:
+        if args.season is None:
+            raise ValueError("Give --summary SEASON=PATH (repeat per season) or --season")
+        output_dir = config.get('output_dir', 'data/out')
+        summaries = {args.season: os.path.join(output_dir, 'team_summary.csv')}
+
+    seasons = {}
+    for season, path in sorted(summaries.items()):
+        games_df = load_cfbd_games(season, args.season_type, data_dir)
+        if games_df is None:
+            raise ValueError(f"No {args.season_type} games found for {season} in {data_dir}")
+        seasons[season] = (load_summary(path), games_df)
+
+    result = fit_weights(seasons, keys=args.features, candidates=args.candidates, seed=args.seed)
+
+    print(f"Games: {result.games}  R^2 of margin: {result.r2:.3f}  Hit rate: {result.hit_rate:.3f}")
+    print("\n--- Fitted stats_weights ---")
+    for key, value in sorted(result.weights.items(), key=lambda item: -item[1]):
+        print(f"  {key}: {value:.4f}")
+    if not result.folds.empty:
+        print("\n--- Cross-validation ---")
+        fold_cols = [col for col in result.folds.columns if col not in result.weights]
+        print(result.folds[fold_cols].to_string(index=False))
+
+    if args.output:
+        fitted = fitted_weights_config(weights, result.weights)
+        write_bytes_atomic(args.output, yaml.safe_dump(fitted, sort_keys=False).encode('utf-8'), skip_unchanged=False)
+        print(f"\n✓ Saved {args.output}")
+
+
 def fetch_cfbd(args):
     """Fetch CFBD data from API."""
     print("\n=== CFB Mismatch Model - Fetch CFBD Data ===\n")
@@ -131,6 +746,13 @@ def fetch_cfbd(args):
     
     if team_info_df is not None:
         print(f"✓ Successfully fetched {len(team_info_df)} teams")
+
+    if args.lines:
+        lines_df = fetch_and_save_cfbd_lines(args.season, args.season_type, data_dir, api_key)
+        if lines_df is not None:
+            print(f"✓ Successfully fetched {len(lines_df)} lines")
+        else:
+            print("⚠ Failed to fetch betting lines", file=sys.stderr)
     
     print("\n=== Fetch Complete ===\n")
 
@@ -163,6 +785,18 @@ def main():
         '--output-dir',
         help='Output directory for results (overrides config)'
     )
+    analyze_parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Recompute even if the run manifest shows no input changed'
+    )
+    analyze_parser.add_argument(
+        '--format',
+        dest='formats',
+        action='append',
+        choices=sorted(OUTPUT_FORMATS),
+        help='Output format; repeat for several (default: output_formats in config, else csv)'
+    )
     analyze_parser.add_argument(
         '--season',
         type=int,
@@ -179,8 +813,801 @@ def main():
         action='store_true',
         help='Fetch CFBD data from API instead of loading from files'
     )
+    analyze_parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and recompute outputs whenever stats or CFBD files change'
+    )
+    analyze_parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=0.5,
+        help='Seconds between input checks in watch mode (default: 0.5)'
+    )
     analyze_parser.set_defaults(func=analyze_stats)
     
+    # Full pipeline command
+    run_parser = subparsers.add_parser(
+        'run',
+        help='Fetch, analyze, score top mismatches and publish in one process'
+    )
+    run_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    run_parser.add_argument(
+        '--weights',
+        default='configs/weights.yaml',
+        help='Path to weights file (default: configs/weights.yaml)'
+    )
+    run_parser.add_argument(
+        '--output-dir',
+        help='Output directory for results (overrides config)'
+    )
+    run_parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Recompute even if the run manifest shows no input changed'
+    )
+    run_parser.add_argument(
+        '--format',
+        dest='formats',
+        action='append',
+        choices=sorted(OUTPUT_FORMATS),
+        help='Output format; repeat for several (default: output_formats in config, else csv)'
+    )
+    run_parser.add_argument(
+        '--season',
+        type=int,
+        help='Season year to integrate CFBD data and score matchups for (e.g., 2025)'
+    )
+    run_parser.add_argument(
+        '--season-type',
+        default='regular',
+        choices=['regular', 'postseason'],
+        help='Type of season for CFBD data (default: regular)'
+    )
+    run_parser.add_argument(
+        '--fetch-cfbd',
+        action='store_true',
+        help='Fetch fresh CFBD data from the API (and cache it to the CFBD data dir)'
+    )
+    run_parser.add_argument(
+        '--top-n',
+        type=int,
+        default=10,
+        help='Number of top passing mismatches to report (default: 10)'
+    )
+    run_parser.add_argument(
+        '--max-ci-width',
+        type=float,
+        help='Only report matchups whose teams\' mismatch_score bootstrap intervals '
+             'are at most this wide (needs bootstrap.replicates in the config)'
+    )
+    run_parser.add_argument(
+        '--publish-notion',
+        action='store_true',
+        help='Push the top mismatches to Notion (needs NOTION_TOKEN and NOTION_DATABASE_ID)'
+    )
+    run_parser.set_defaults(func=run_full_pipeline)
+
+    # Manifest command
+    manifest_parser = subparsers.add_parser(
+        'manifest',
+        help='Show the run manifest of an output directory and explain reruns'
+    )
+    manifest_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    manifest_parser.add_argument(
+        '--weights',
+        default='configs/weights.yaml',
+        help='Path to weights file (default: configs/weights.yaml)'
+    )
+    manifest_parser.add_argument(
+        '--output-dir',
+        help='Output directory holding the manifest (overrides config)'
+    )
+    manifest_parser.add_argument(
+        '--explain',
+        action='store_true',
+        help='Compare against the current local inputs and list what changed'
+    )
+    manifest_parser.add_argument(
+        '--season',
+        type=int,
+        help='Season to check CFBD data for (default: the recorded run\'s season)'
+    )
+    manifest_parser.add_argument(
+        '--season-type',
+        choices=['regular', 'postseason'],
+        help='Season type to check (default: the recorded run\'s season type)'
+    )
+    manifest_parser.set_defaults(func=show_manifest)
+
+    # What-if command
+    whatif_parser = subparsers.add_parser(
+        'whatif',
+        help='Rescore teams with players removed or reweighted (e.g. injuries)'
+    )
+    whatif_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    whatif_parser.add_argument(
+        '--weights',
+        default='configs/weights.yaml',
+        help='Path to weights file (default: configs/weights.yaml)'
+    )
+    whatif_parser.add_argument(
+        '--exclude-player',
+        action='append',
+        metavar='PLAYER',
+        help='Player name or player_id to remove; repeat for several'
+    )
+    whatif_parser.add_argument(
+        '--include-only',
+        action='append',
+        metavar='PLAYER',
+        help='Keep only these players on their teams; repeat for several'
+    )
+    whatif_parser.add_argument(
+        '--reweight',
+        action='append',
+        metavar='PLAYER=FACTOR',
+        help='Scale a player\'s game-count weight (e.g. "John Smith=0.5"); repeat for several'
+    )
+    whatif_parser.add_argument(
+        '--season',
+        type=int,
+        help='Season to merge local CFBD data for (optional)'
+    )
+    whatif_parser.add_argument(
+        '--season-type',
+        default='regular',
+        choices=['regular', 'postseason'],
+        help='Type of season for CFBD data (default: regular)'
+    )
+    whatif_parser.add_argument(
+        '--output-dir',
+        help='Also save the comparison and rescored summary here'
+    )
+    whatif_parser.set_defaults(func=what_if)
+
+    # Backtest command
+    backtest_parser = subparsers.add_parser(
+        'backtest',
+        help='Score every game in the local CFBD game store with point-in-time features'
+    )
+    backtest_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    backtest_parser.add_argument(
+        '--data-dir',
+        help='CFBD data directory holding the games files (overrides config)'
+    )
+    backtest_parser.add_argument(
+        '--season-type',
+        default='regular',
+        choices=['regular', 'postseason'],
+        help='Type of season to backtest (default: regular)'
+    )
+    backtest_parser.add_argument(
+        '--start-season',
+        type=int,
+        help='First season to backtest (default: earliest in the store)'
+    )
+    backtest_parser.add_argument(
+        '--end-season',
+        type=int,
+        help='Last season to backtest (default: latest in the store)'
+    )
+    backtest_parser.add_argument(
+        '--summary',
+        action='append',
+        metavar='SEASON=PATH',
+        help='Team summary of a season whose mismatch_score and pass tilt are added to that '
+             "season's games as static (not point-in-time) signals; repeat for several seasons"
+    )
+    backtest_parser.add_argument(
+        '--jobs',
+        type=int,
+        help='Processes used to score seasons in parallel (default: backtest.n_jobs in config)'
+    )
+    backtest_parser.add_argument(
+        '--cache-dir',
+        help='Directory for cached weekly feature snapshots (default: backtest.cache_dir in config)'
+    )
+    backtest_parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Rebuild every weekly snapshot without reading or writing the cache'
+    )
+    backtest_parser.add_argument(
+        '--no-elo',
+        action='store_true',
+        help='Skip the Elo rating signal'
+    )
+    backtest_parser.add_argument(
+        '--no-form',
+        action='store_true',
+        help='Skip the rolling and exponentially weighted margin signals'
+    )
+    backtest_parser.add_argument(
+        '--bins',
+        type=int,
+        default=10,
+        help='Number of calibration bins (default: 10)'
+    )
+    backtest_parser.add_argument(
+        '--output-dir',
+        help='Directory for the backtest outputs (default: {output_dir}/backtest)'
+    )
+    backtest_parser.set_defaults(func=backtest)
+
+    # Ratings command
+    ratings_parser = subparsers.add_parser(
+        'ratings',
+        help='Update Elo team ratings from the local CFBD game store'
+    )
+    ratings_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    ratings_parser.add_argument(
+        '--data-dir',
+        help='CFBD data directory holding the games files (overrides config)'
+    )
+    ratings_parser.add_argument(
+        '--store',
+        help='Pickled ratings store (default: ratings.store_path in config)'
+    )
+    ratings_parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='Replay every game instead of updating the stored ratings'
+    )
+    ratings_parser.add_argument(
+        '--season',
+        type=int,
+        help='Show the ratings as they stood in this season (default: latest)'
+    )
+    ratings_parser.add_argument(
+        '--week',
+        type=int,
+        help='With --season: show the ratings before this week'
+    )
+    ratings_parser.add_argument(
+        '--season-type',
+        default='regular',
+        choices=['regular', 'postseason'],
+        help='Type of season for --season/--week (default: regular)'
+    )
+    ratings_parser.add_argument(
+        '--top',
+        type=int,
+        default=25,
+        help='Number of teams to print (default: 25)'
+    )
+    ratings_parser.add_argument(
+        '--output',
+        help='Write the ratings table here (path without extension)'
+    )
+    ratings_parser.set_defaults(func=rate_teams)
+
+    # Form command
+    form_parser = subparsers.add_parser(
+        'form',
+        help='Update rolling and exponentially weighted team form from the local CFBD game store'
+    )
+    form_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    form_parser.add_argument(
+        '--data-dir',
+        help='CFBD data directory holding the games files (overrides config)'
+    )
+    form_parser.add_argument(
+        '--store',
+        help='Pickled form store (default: rolling.store_path in config)'
+    )
+    form_parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='Replay every game instead of updating the stored form'
+    )
+    form_parser.add_argument(
+        '--season',
+        type=int,
+        required=True,
+        help='Season to show the form for'
+    )
+    form_parser.add_argument(
+        '--week',
+        type=int,
+        help='Show the form before this week (default: after the last week played)'
+    )
+    form_parser.add_argument(
+        '--season-type',
+        default='regular',
+        choices=['regular', 'postseason'],
+        help='Type of season (default: regular)'
+    )
+    form_parser.add_argument(
+        '--top',
+        type=int,
+        default=25,
+        help='Number of teams to print (default: 25)'
+    )
+    form_parser.add_argument(
+        '--output',
+        help='Write the form table here (path without extension)'
+    )
+    form_parser.set_defaults(func=team_form)
+
+    # Strength of schedule command
+    sos_parser = subparsers.add_parser(
+        'sos',
+        help='Compute past and remaining strength of schedule from the local CFBD game store'
+    )
+    sos_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    sos_parser.add_argument(
+        '--data-dir',
+        help='CFBD data directory holding the games files (overrides config)'
+    )
+    sos_parser.add_argument(
+        '--season',
+        type=int,
+        action='append',
+        help='Season to include (repeatable; default: every season in the store)'
+    )
+    sos_parser.add_argument(
+        '--season-type',
+        default='regular',
+        choices=['regular', 'postseason'],
+        help='Type of season (default: regular)'
+    )
+    sos_parser.add_argument(
+        '--summary',
+        help='Team summary CSV for the opposing coverage/offense profile'
+    )
+    sos_parser.add_argument(
+        '--no-elo',
+        action='store_true',
+        help='Skip the average opponent Elo rating'
+    )
+    sos_parser.add_argument(
+        '--top',
+        type=int,
+        default=25,
+        help='Number of teams to print (default: 25)'
+    )
+    sos_parser.add_argument(
+        '--output-dir',
+        help='Directory for the output (default: {output_dir}/schedule)'
+    )
+    sos_parser.set_defaults(func=schedule_strength)
+
+    # Percentile index command
+    percentiles_parser = subparsers.add_parser(
+        'percentiles',
+        help='Freeze a season\'s team summary as the percentile reference, or score teams against it'
+    )
+    percentiles_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    percentiles_parser.add_argument(
+        '--season',
+        type=int,
+        required=True,
+        help='Season of the reference'
+    )
+    percentiles_parser.add_argument(
+        '--summary',
+        help='Team summary CSV to index (default: {output_dir}/team_summary.csv)'
+    )
+    percentiles_parser.add_argument(
+        '--index',
+        help='Percentile index file (overrides percentiles.path in config)'
+    )
+    percentiles_parser.add_argument(
+        '--score',
+        help='Score the teams of this summary-style CSV against the index instead of rebuilding it'
+    )
+    percentiles_parser.add_argument(
+        '--weights',
+        default='configs/weights.yaml',
+        help='Path to weights file used with --score (default: configs/weights.yaml)'
+    )
+    percentiles_parser.add_argument(
+        '--output',
+        help='Write the --score results to this CSV'
+    )
+    percentiles_parser.set_defaults(func=percentile_index)
+
+    # Similar teams command
+    similar_parser = subparsers.add_parser(
+        'similar',
+        help='Find the most similar team-seasons by metric profile'
+    )
+    similar_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    similar_parser.add_argument(
+        '--summary',
+        action='append',
+        metavar='SEASON=PATH',
+        help='Team summary CSV of a season; repeat to search several seasons'
+    )
+    similar_parser.add_argument(
+        '--team',
+        help='Team to find neighbours of'
+    )
+    similar_parser.add_argument(
+        '--season',
+        type=int,
+        help='Season of --team (default: its latest), or of the team_summary.csv in output_dir'
+    )
+    similar_parser.add_argument(
+        '--profile',
+        action='append',
+        metavar='METRIC=VALUE',
+        help='Search by a raw metric profile instead of a team; repeat per metric'
+    )
+    similar_parser.add_argument(
+        '--metric',
+        dest='metrics',
+        action='append',
+        help='Summary column to compare on; repeat for several (default: all registered metrics)'
+    )
+    similar_parser.add_argument(
+        '--category',
+        choices=sorted(SUMMARY_METRICS),
+        help='Only compare the metrics of one stats category, e.g. defense_coverage'
+    )
+    similar_parser.add_argument(
+        '--weight',
+        action='append',
+        metavar='METRIC=WEIGHT',
+        help='Weight of a metric in the distance (default: 1 each; 0 ignores it)'
+    )
+    similar_parser.add_argument(
+        '-k', '--k',
+        type=int,
+        default=10,
+        help='Number of neighbours (default: 10)'
+    )
+    similar_parser.add_argument(
+        '--same-season',
+        action='store_true',
+        help="Only search the team's own season"
+    )
+    similar_parser.add_argument(
+        '--output',
+        help='Write the neighbours to this CSV'
+    )
+    similar_parser.set_defaults(func=similar_teams)
+
+    # Scheme clusters command
+    clusters_parser = subparsers.add_parser(
+        'clusters',
+        help='Cluster defenses by coverage profile and offenses by receiving profile'
+    )
+    clusters_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    clusters_parser.add_argument(
+        '--summary',
+        help='Team summary CSV to cluster (default: {output_dir}/team_summary.csv)'
+    )
+    clusters_parser.add_argument(
+        '--k-defense',
+        type=int,
+        help='Number of defense clusters (overrides clustering.k.defense)'
+    )
+    clusters_parser.add_argument(
+        '--k-offense',
+        type=int,
+        help='Number of offense clusters (overrides clustering.k.offense)'
+    )
+    clusters_parser.add_argument(
+        '--jobs',
+        type=int,
+        help='Processes for the k-means restarts (overrides clustering.n_jobs)'
+    )
+    clusters_parser.add_argument(
+        '--refit',
+        action='store_true',
+        help='Ignore the stored centers and refit with all restarts'
+    )
+    clusters_parser.add_argument(
+        '--season',
+        type=int,
+        help="Also split each offense's scoring by the opposing defense's cluster in this season"
+    )
+    clusters_parser.add_argument(
+        '--season-type',
+        default='regular',
+        choices=['regular', 'postseason'],
+        help='Type of season (default: regular)'
+    )
+    clusters_parser.add_argument(
+        '--data-dir',
+        help='CFBD data directory holding the games files (overrides config)'
+    )
+    clusters_parser.add_argument(
+        '--top',
+        type=int,
+        default=25,
+        help='Number of teams to print the splits of (default: 25)'
+    )
+    clusters_parser.add_argument(
+        '--output-dir',
+        help='Directory for the outputs (default: {output_dir}/clusters)'
+    )
+    clusters_parser.set_defaults(func=scheme_clusters)
+
+    # Player matchups command
+    players_parser = subparsers.add_parser(
+        'player-matchups',
+        help='Score receiver-vs-defender mismatches for a week of games from the player stats files'
+    )
+    players_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    players_parser.add_argument(
+        '--season',
+        type=int,
+        required=True,
+        help='Season of the games'
+    )
+    players_parser.add_argument(
+        '--season-type',
+        default='regular',
+        choices=['regular', 'postseason'],
+        help='Type of season (default: regular)'
+    )
+    players_parser.add_argument(
+        '--week',
+        type=int,
+        help='Week to score (default: the first week with unplayed games)'
+    )
+    players_parser.add_argument(
+        '--all-weeks',
+        action='store_true',
+        help='Score every game of the season'
+    )
+    players_parser.add_argument(
+        '--data-dir',
+        help='CFBD data directory holding the games files (overrides config)'
+    )
+    players_parser.add_argument(
+        '--top-k',
+        type=int,
+        help='Matchups kept per game (overrides player_matchups.top_k)'
+    )
+    players_parser.add_argument(
+        '--top',
+        type=int,
+        default=15,
+        help='Number of matchups to print (default: 15)'
+    )
+    players_parser.add_argument(
+        '--output-dir',
+        help='Directory for the output (default: {output_dir}/player_matchups)'
+    )
+    players_parser.set_defaults(func=receiver_matchups)
+
+    # Simulate command
+    simulate_parser = subparsers.add_parser(
+        'simulate',
+        help='Simulate the rest of a season: win totals, bowl eligibility and conference title odds'
+    )
+    simulate_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    simulate_parser.add_argument(
+        '--season',
+        type=int,
+        required=True,
+        help='Season to simulate'
+    )
+    simulate_parser.add_argument(
+        '--season-type',
+        default='regular',
+        choices=['regular', 'postseason'],
+        help='Type of season to simulate (default: regular)'
+    )
+    simulate_parser.add_argument(
+        '--data-dir',
+        help='CFBD data directory holding the games files (overrides config)'
+    )
+    simulate_parser.add_argument(
+        '--sims',
+        type=int,
+        help='Number of simulated seasons (default: simulation.n_sims in config)'
+    )
+    simulate_parser.add_argument(
+        '--jobs',
+        type=int,
+        help='Processes used to run simulation chunks (default: simulation.n_jobs in config)'
+    )
+    simulate_parser.add_argument(
+        '--seed',
+        type=int,
+        help='Random seed (default: simulation.seed in config)'
+    )
+    simulate_parser.add_argument(
+        '--rating-sd',
+        type=float,
+        help='Per-simulation rating noise in Elo points (default: simulation.rating_sd in config)'
+    )
+    simulate_parser.add_argument(
+        '--top',
+        type=int,
+        default=25,
+        help='Number of teams to print (default: 25)'
+    )
+    simulate_parser.add_argument(
+        '--output-dir',
+        help='Directory for the simulation outputs (default: {output_dir}/simulation)'
+    )
+    simulate_parser.set_defaults(func=simulate)
+
+    # Value command
+    value_parser = subparsers.add_parser(
+        'value',
+        help='Flag betting lines that differ from the model-implied margin or total'
+    )
+    value_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    value_parser.add_argument(
+        '--season',
+        type=int,
+        required=True,
+        help='Season whose lines are compared'
+    )
+    value_parser.add_argument(
+        '--season-type',
+        default='regular',
+        choices=['regular', 'postseason'],
+        help='Type of season (default: regular)'
+    )
+    value_parser.add_argument(
+        '--week',
+        type=int,
+        help='Only report this week (default: all weeks)'
+    )
+    value_parser.add_argument(
+        '--data-dir',
+        help='CFBD data directory holding the games and lines files (overrides config)'
+    )
+    value_parser.add_argument(
+        '--summary',
+        action='append',
+        metavar='SEASON=PATH',
+        help='Team summary of a season whose mismatch_score and pass tilt feed the implied margin '
+             '(repeat for the target and every training season)'
+    )
+    value_parser.add_argument(
+        '--train-seasons',
+        type=int,
+        help='Fit the line model on this many seasons before --season (default: all)'
+    )
+    value_parser.add_argument(
+        '--spread-threshold',
+        type=float,
+        help='Minimum spread edge in points to flag (default: value.spread_threshold in config)'
+    )
+    value_parser.add_argument(
+        '--total-threshold',
+        type=float,
+        help='Minimum total edge in points to flag (default: value.total_threshold in config)'
+    )
+    value_parser.add_argument(
+        '--provider',
+        dest='providers',
+        action='append',
+        help='Only compare lines from this provider; repeat for several (default: all)'
+    )
+    value_parser.add_argument(
+        '--top',
+        type=int,
+        default=25,
+        help='Number of flagged lines to print (default: 25)'
+    )
+    value_parser.add_argument(
+        '--output-dir',
+        help='Directory for the value outputs (default: {output_dir}/value)'
+    )
+    value_parser.set_defaults(func=find_line_value)
+
+    # Fit weights command
+    fit_parser = subparsers.add_parser(
+        'fit-weights',
+        help='Fit stats_weights to historical game margins (non-negative, summing to one)'
+    )
+    fit_parser.add_argument(
+        '--config',
+        default='configs/settings.yaml',
+        help='Path to configuration file (default: configs/settings.yaml)'
+    )
+    fit_parser.add_argument(
+        '--weights',
+        default='configs/weights.yaml',
+        help='Path to weights file the fitted stats_weights replace (default: configs/weights.yaml)'
+    )
+    fit_parser.add_argument(
+        '--summary',
+        action='append',
+        metavar='SEASON=PATH',
+        help='Team summary CSV of a season; repeat per season to cross-validate by season'
+    )
+    fit_parser.add_argument(
+        '--season',
+        type=int,
+        help='Fit one season against the team_summary.csv in output_dir (folds by week)'
+    )
+    fit_parser.add_argument(
+        '--season-type',
+        default='regular',
+        choices=['regular', 'postseason'],
+        help='Type of season for CFBD games (default: regular)'
+    )
+    fit_parser.add_argument(
+        '--data-dir',
+        help='CFBD data directory holding the games files (overrides config)'
+    )
+    fit_parser.add_argument(
+        '--feature',
+        dest='features',
+        action='append',
+        help='stats_weights key to fit; repeat for several (default: all available)'
+    )
+    fit_parser.add_argument(
+        '--candidates',
+        type=int,
+        default=5000,
+        help='Random candidate weightings scored per fit (default: 5000)'
+    )
+    fit_parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed (default: 0)'
+    )
+    fit_parser.add_argument(
+        '--output',
+        help='Write a copy of the weights file with the fitted stats_weights here'
+    )
+    fit_parser.set_defaults(func=fit_stats_weights)
+
     # Fetch CFBD data command
     fetch_parser = subparsers.add_parser(
         'fetch-cfbd',
@@ -211,6 +1638,11 @@ def main():
         '--api-key',
         help='CFBD API key (or set CFBD_API_KEY environment variable)'
     )
+    fetch_parser.add_argument(
+        '--lines',
+        action='store_true',
+        help='Also fetch the betting lines ({season}_{season_type}_lines)'
+    )
     fetch_parser.set_defaults(func=fetch_cfbd)
     
     # Parse arguments
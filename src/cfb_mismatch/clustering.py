@@ -0,0 +1,380 @@
+"""
+Scheme clusters: k-means groups of defenses and offenses by metric profile.
+
+Defenses are clustered on their coverage profile (man/zone coverage grades
+and QB rating against), offenses on their receiving profile (man, zone,
+screen and slot YPRR). Metrics are standardized over the teams; a team
+missing a metric sits at the mean for it.
+
+k-means runs Lloyd iterations on the whole team matrix at once (distances
+via ``|x|^2 + |c|^2 - 2 x.c``, centers via ``np.bincount`` sums), from
+k-means++ seeds. Restarts get seeds from one ``SeedSequence`` and the lowest
+inertia wins, so the result does not depend on ``n_jobs``; with
+``n_jobs > 1`` chunks of restarts run in a process pool.
+
+The cluster centers (in raw metric units) are stored, so the next run
+warm-starts from them: one Lloyd run from last week's centers instead of all
+the restarts, which also keeps the cluster numbers stable from week to week.
+A cold fit numbers the clusters by size, largest first.
+
+Cluster labels feed matchup scoring: ``cluster_splits`` measures how each
+offense has scored against every defensive cluster (points per game relative
+to its own average), and ``add_matchup_clusters`` adds, per game, each
+offense's split against the opposing defense's cluster.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.matrix import COVERAGE_METRICS, OFFENSE_METRICS, MetricRegistry, TeamMatrix
+from cfb_mismatch.mismatches import team_key
+from cfb_mismatch.output import write_bytes_atomic
+
+# Metrics clustered per side
+PROFILES = {
+    'defense': COVERAGE_METRICS + ['man_qb_rating_against', 'zone_qb_rating_against'],
+    'offense': OFFENSE_METRICS,
+}
+
+# Bump when the store layout changes; older stores are ignored
+STORE_VERSION = 1
+
+
+@dataclass
+class KMeansResult:
+    """Labels per row, centers (k x metrics) and inertia of one k-means fit."""
+
+    labels: np.ndarray
+    centers: np.ndarray
+    inertia: float
+
+
+def _sq_distances(x: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    d2 = np.einsum('ij,ij->i', x, x)[:, None] + np.einsum('ij,ij->i', centers, centers)[None, :] - 2.0 * x @ centers.T
+    return np.maximum(d2, 0.0)
+
+
+def _kmeans_plus_plus(x: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means++ seeding: each new center drawn proportionally to the squared distance."""
+    centers = np.empty((k, x.shape[1]))
+    centers[0] = x[rng.integers(len(x))]
+    closest = _sq_distances(x, centers[:1])[:, 0]
+    for j in range(1, k):
+        total = closest.sum()
+        pick = rng.choice(len(x), p=closest / total) if total > 0 else rng.integers(len(x))
+        centers[j] = x[pick]
+        closest = np.minimum(closest, _sq_distances(x, centers[j:j + 1])[:, 0])
+    return centers
+
+
+def _lloyd(x: np.ndarray, centers: np.ndarray, max_iter: int, tol: float) -> KMeansResult:
+    """Lloyd iterations from ``centers``; an empty cluster takes the farthest point."""
+    k = len(centers)
+    centers = centers.copy()
+    for _ in range(max_iter):
+        d2 = _sq_distances(x, centers)
+        labels = d2.argmin(axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, x[:, j], minlength=k) for j in range(x.shape[1])], axis=1)
+        updated = centers.copy()
+        filled = counts > 0
+        updated[filled] = sums[filled] / counts[filled, None]
+        if not filled.all():
+            farthest = np.argsort(d2[np.arange(len(x)), labels])[::-1]
+            updated[~filled] = x[farthest[:(~filled).sum()]]
+        shift = np.abs(updated - centers).max()
+        centers = updated
+        if shift <= tol:
+            break
+    d2 = _sq_distances(x, centers)
+    labels = d2.argmin(axis=1)
+    return KMeansResult(labels, centers, float(d2[np.arange(len(x)), labels].sum()))
+
+
+def _run_restarts(args: Tuple) -> KMeansResult:
+    """Run a chunk of restarts and return the best (the earliest on ties)."""
+    x, k, seeds, max_iter, tol = args
+    best = None
+    for seed in seeds:
+        result = _lloyd(x, _kmeans_plus_plus(x, k, np.random.default_rng(seed)), max_iter, tol)
+        if best is None or result.inertia < best.inertia:
+            best = result
+    return best
+
+
+def kmeans(
+    x: np.ndarray,
+    k: int,
+    restarts: int = 10,
+    seed: int = 0,
+    n_jobs: int = 1,
+    init: Optional[np.ndarray] = None,
+    max_iter: int = 100,
+    tol: float = 1e-6
+) -> KMeansResult:
+    """
+    k-means of the rows of ``x``.
+
+    Args:
+        x: Rows x features (no NaN)
+        k: Number of clusters
+        restarts: k-means++ restarts; the lowest inertia is kept
+        seed: Random seed
+        n_jobs: Processes the restarts are spread over
+        init: Initial centers (k x features); runs once from them, no restarts
+        max_iter: Lloyd iterations per run
+        tol: Stop once no center moves more than this
+
+    Returns:
+        KMeansResult of the best run
+    """
+    if not 1 <= k <= len(x):
+        raise ValueError(f"k must be between 1 and the number of rows ({len(x)}), got {k}")
+    if init is not None:
+        return _lloyd(x, np.asarray(init, dtype=float), max_iter, tol)
+    seeds = np.random.SeedSequence(seed).spawn(max(restarts, 1))
+    n_chunks = max(1, min(n_jobs or 1, len(seeds)))
+    tasks = [(x, k, list(chunk), max_iter, tol) for chunk in np.array_split(np.array(seeds, dtype=object), n_chunks)]
+    if n_chunks > 1:
+        with ProcessPoolExecutor(max_workers=n_chunks) as pool:
+            results = list(pool.map(_run_restarts, tasks))
+    else:
+        results = [_run_restarts(task) for task in tasks]
+    # Chunks are in seed order, so ties go to the earliest restart whatever n_jobs is
+    return min(results, key=lambda result: result.inertia)
+
+
+@dataclass
+class SchemeClusters:
+    """
+    Clusters of one side (``defense`` or ``offense``).
+
+    ``labels`` maps each team to its cluster (-1 if it has none of the
+    metrics); ``centers`` are in raw metric units. ``warm_start`` is set when
+    the fit started from stored centers.
+    """
+
+    side: str
+    names: List[str]
+    centers: np.ndarray
+    labels: pd.Series
+    inertia: float
+    warm_start: bool = False
+
+    def profiles(self) -> pd.DataFrame:
+        """Center and team count of every cluster."""
+        profiles = pd.DataFrame(self.centers, columns=self.names)
+        profiles.insert(0, 'cluster', np.arange(len(self.centers)))
+        profiles.insert(0, 'side', self.side)
+        profiles['teams'] = np.bincount(self.labels[self.labels >= 0], minlength=len(self.centers))
+        return profiles
+
+
+def cluster_teams(
+    matrix: TeamMatrix,
+    side: str,
+    k: int,
+    restarts: int = 10,
+    seed: int = 0,
+    n_jobs: int = 1,
+    previous: Optional[Dict] = None
+) -> Optional[SchemeClusters]:
+    """
+    Cluster the teams of a matrix on one side's profile.
+
+    Args:
+        matrix: Team metric matrix (e.g. ``TeamMatrix.from_frame(summary)``)
+        side: 'defense' or 'offense'
+        k: Number of clusters
+        restarts: k-means++ restarts of a cold fit
+        seed: Random seed
+        n_jobs: Processes for the restarts
+        previous: Stored ``{'names', 'centers'}`` of an earlier fit; used as
+            the warm start when the metrics and k match
+
+    Returns:
+        SchemeClusters, or None if the matrix has none of the side's metrics
+        or fewer usable teams than ``k``
+    """
+    names = [name for name in PROFILES[side] if name in matrix]
+    if not names:
+        return None
+    raw = matrix.columns(names)
+    usable = ~np.isnan(raw).all(axis=1)
+    if usable.sum() < k:
+        print(f"⚠ Skipping {side} clusters ({usable.sum()} teams with a profile, k={k})")
+        return None
+
+    with np.errstate(invalid='ignore'):
+        center = np.nan_to_num(np.nanmean(raw[usable], axis=0))
+        scale = np.nanstd(raw[usable], axis=0)
+    scale = np.where(np.isnan(scale) | (scale == 0), 1.0, scale)
+    x = np.nan_to_num((raw[usable] - center) / scale, nan=0.0)
+
+    warm = previous is not None and previous.get('names') == names and len(previous.get('centers', [])) == k
+    if warm:
+        result = kmeans(x, k, init=(np.asarray(previous['centers'], dtype=float) - center) / scale)
+    else:
+        result = kmeans(x, k, restarts=restarts, seed=seed, n_jobs=n_jobs)
+        # Number clusters by size (largest first) so a cold fit is deterministic to read
+        order = np.lexsort((np.arange(k), -np.bincount(result.labels, minlength=k)))
+        remap = np.empty(k, dtype=np.int64)
+        remap[order] = np.arange(k)
+        result = KMeansResult(remap[result.labels], result.centers[order], result.inertia)
+
+    labels = np.full(len(matrix), -1, dtype=np.int64)
+    labels[usable] = result.labels
+    return SchemeClusters(
+        side=side,
+        names=names,
+        centers=result.centers * scale + center,
+        labels=pd.Series(labels, index=matrix.teams.to_numpy()),
+        inertia=result.inertia,
+        warm_start=warm,
+    )
+
+
+def load_cluster_store(path: str) -> Dict[str, Dict]:
+    """Stored centers per side (empty if missing, unreadable or from an older layout)."""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            store = json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠ Ignoring unreadable cluster store {path}")
+        return {}
+    if store.get('version') != STORE_VERSION:
+        return {}
+    return store.get('sides', {})
+
+
+def save_cluster_store(path: str, clusters: Dict[str, SchemeClusters]):
+    """Write the centers of every side atomically."""
+    store = {
+        'version': STORE_VERSION,
+        'sides': {
+            side: {'names': result.names, 'centers': result.centers.tolist()}
+            for side, result in clusters.items()
+        },
+    }
+    write_bytes_atomic(path, json.dumps(store, indent=2).encode('utf-8'))
+
+
+def clusters_from_config(
+    config: Dict,
+    summary: pd.DataFrame,
+    refit: bool = False,
+    team_col: str = 'team_name'
+) -> Dict[str, SchemeClusters]:
+    """
+    Cluster the summary's teams per the ``clustering`` config section.
+
+    Warm-starts from the stored centers (unless ``refit``) and stores the new ones.
+    """
+    section = config.get('clustering') or {}
+    k = section.get('k') or {}
+    matrix = TeamMatrix.from_frame(summary, team_col=team_col, registry=MetricRegistry.from_config(config))
+    path = section.get('store_path')
+    previous = {} if refit else load_cluster_store(path)
+
+    clusters = {}
+    for side in PROFILES:
+        result = cluster_teams(
+            matrix, side, int(k.get(side, 4)),
+            restarts=int(section.get('restarts', 10)),
+            seed=section.get('seed', 0),
+            n_jobs=int(section.get('n_jobs', 1)),
+            previous=previous.get(side),
+        )
+        if result is not None:
+            clusters[side] = result
+            how = "warm start" if result.warm_start else "fit"
+            print(f"✓ Clustered {(result.labels >= 0).sum()} {side}s into {len(result.centers)} schemes ({how})")
+    if path and clusters:
+        save_cluster_store(path, clusters)
+    return clusters
+
+
+def add_cluster_labels(
+    summary: pd.DataFrame,
+    clusters: Dict[str, SchemeClusters],
+    team_col: str = 'team_name'
+) -> pd.DataFrame:
+    """Add ``defense_cluster``/``offense_cluster`` (-1 for teams without a profile)."""
+    summary = summary.copy()
+    for side, result in clusters.items():
+        summary[f'{side}_cluster'] = summary[team_col].map(result.labels).fillna(-1).astype(int).to_numpy()
+    return summary
+
+
+def _defense_clusters(summary: pd.DataFrame, team_col: str) -> pd.Series:
+    """Upper-case team name -> defense cluster."""
+    teams = team_key(summary[team_col])
+    clusters = pd.Series(summary['defense_cluster'].to_numpy(), index=teams.to_numpy())
+    return clusters[~clusters.index.duplicated()]
+
+
+def cluster_splits(games: pd.DataFrame, summary: pd.DataFrame, team_col: str = 'team_name') -> pd.DataFrame:
+    """
+    Scoring of every offense against each defensive cluster it has faced.
+
+    Args:
+        games: CFBD games (only played ones count)
+        summary: Team summary with ``defense_cluster``
+
+    Returns:
+        One row per team and opposing ``defense_cluster``: ``games``,
+        ``points_per_game`` and ``points_vs_avg`` (relative to the team's
+        points per game over all its played games)
+    """
+    played = games.dropna(subset=['home_points', 'away_points'])
+    clusters = _defense_clusters(summary, team_col)
+    sides = pd.DataFrame({
+        'team': np.concatenate([played['home_team'].astype(str), played['away_team'].astype(str)]),
+        'opponent': np.concatenate([played['away_team'].astype(str), played['home_team'].astype(str)]),
+        'points': np.concatenate([played['home_points'].to_numpy(float), played['away_points'].to_numpy(float)]),
+    })
+    sides['team'] = team_key(sides['team'])
+    sides['defense_cluster'] = team_key(sides['opponent']).map(clusters).fillna(-1).astype(int)
+    average = sides.groupby('team')['points'].mean()
+    splits = sides[sides['defense_cluster'] >= 0].groupby(['team', 'defense_cluster'])['points'].agg(
+        games='size', points_per_game='mean'
+    ).reset_index()
+    splits['points_vs_avg'] = splits['points_per_game'] - splits['team'].map(average).to_numpy()
+    return splits
+
+
+def add_matchup_clusters(
+    top: pd.DataFrame,
+    games: pd.DataFrame,
+    summary: pd.DataFrame,
+    team_col: str = 'team_name'
+) -> pd.DataFrame:
+    """
+    Add each offense's scoring split against the opposing defense's cluster.
+
+    Adds ``home_defense_cluster``/``away_defense_cluster``,
+    ``home_vs_cluster``/``away_vs_cluster`` (points per game above the
+    offense's average against that cluster; NaN if it hasn't faced it) and
+    ``cluster_edge`` (home minus away).
+    """
+    if 'defense_cluster' not in summary.columns or top.empty:
+        return top
+    splits = cluster_splits(games, summary, team_col).set_index(['team', 'defense_cluster'])['points_vs_avg']
+    clusters = _defense_clusters(summary, team_col)
+    top = top.copy()
+    home = team_key(top['home_team'])
+    away = team_key(top['away_team'])
+    top['home_defense_cluster'] = home.map(clusters).fillna(-1).astype(int).to_numpy()
+    top['away_defense_cluster'] = away.map(clusters).fillna(-1).astype(int).to_numpy()
+    top['home_vs_cluster'] = splits.reindex(pd.MultiIndex.from_arrays([home, top['away_defense_cluster']])).to_numpy()
+    top['away_vs_cluster'] = splits.reindex(pd.MultiIndex.from_arrays([away, top['home_defense_cluster']])).to_numpy()
+    top['cluster_edge'] = top['home_vs_cluster'] - top['away_vs_cluster']
+    return top
@@ -0,0 +1,267 @@
+"""
+Fit ``stats_weights`` to historical game outcomes.
+
+``mismatch_score`` is a weighted mean of percentile-normalized team features
+(see ``main._compute_weighted_scores``). For a game, the home-minus-away score
+edge is therefore ``D @ w`` where ``D`` holds the normalized feature
+differences of the two teams. Weights are fitted so that this edge explains
+as much of the home margin as possible: the objective is the R^2 of the
+margin on the edge (zero when the edge points the wrong way), subject to
+non-negative weights that sum to one.
+
+The objective only depends on ``c = Dc' y / n`` and ``S = Dc' Dc / n``
+(centered), so once these are precomputed any number of candidate weightings
+is scored with a few small matrix products, independent of the number of
+games. Fitting scores a batch of random candidates on the simplex and refines
+the best ones by projected gradient ascent. Folds hold out one season at a
+time (one week at a time when only one season is given).
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.main import METRIC_MAP
+from cfb_mismatch.matrix import TeamMatrix
+from cfb_mismatch.mismatches import standardize_summary, team_key
+
+
+@dataclass
+class FitResult:
+    """Fitted weights with their in-sample and cross-validated fit."""
+
+    weights: Dict[str, float]
+    r2: float
+    hit_rate: float
+    games: int
+    folds: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+
+def feature_keys(summaries: Iterable[pd.DataFrame], keys: Optional[Iterable[str]] = None) -> List[str]:
+    """``stats_weights`` keys whose summary column is present in every summary."""
+    summaries = [standardize_summary(summary) for summary in summaries]
+    candidates = list(keys) if keys is not None else list(METRIC_MAP)
+    unknown = [key for key in candidates if key not in METRIC_MAP]
+    if unknown:
+        raise ValueError(f"Unknown stats_weights keys: {', '.join(unknown)}")
+    return [
+        key for key in candidates
+        if all(METRIC_MAP[key][0] in summary.columns for summary in summaries)
+    ]
+
+
+def team_features(summary: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    Normalized team features exactly as ``_compute_weighted_scores`` sees them.
+
+    Returns:
+        DataFrame indexed by upper-case team name with one column per key
+    """
+    summary = standardize_summary(summary)
+    matrix = TeamMatrix.from_frame(summary, team_col='Team')
+    features = pd.DataFrame(
+        matrix.normalized([METRIC_MAP[key][0] for key in keys]),
+        index=team_key(summary['Team']),
+        columns=keys,
+    )
+    return features[~features.index.duplicated()]
+
+
+def game_design(
+    games: pd.DataFrame,
+    summary: pd.DataFrame,
+    keys: List[str]
+) -> Tuple[np.ndarray, np.ndarray, pd.DataFrame]:
+    """
+    Home-minus-away feature differences of the completed games.
+
+    Games with a team missing from the summary are dropped.
+
+    Returns:
+        Tuple of (D: games x features, home margin, the games kept)
+    """
+    features = team_features(summary, keys)
+    played = games[games['home_points'].notna() & games['away_points'].notna()]
+    home = team_key(played['home_team'])
+    away = team_key(played['away_team'])
+    known = (home.isin(features.index) & away.isin(features.index)).to_numpy()
+    played = played[known]
+
+    design = (
+        features.loc[home[known]].to_numpy(dtype=float)
+        - features.loc[away[known]].to_numpy(dtype=float)
+    )
+    margin = (played['home_points'] - played['away_points']).to_numpy(dtype=float)
+    return design, margin, played
+
+
+@dataclass
+class MomentStats:
+    """Centered second moments of a design and its target."""
+
+    c: np.ndarray
+    S: np.ndarray
+    var_y: float
+    n: int
+
+    @classmethod
+    def from_design(cls, design: np.ndarray, y: np.ndarray) -> 'MomentStats':
+        Dc = design - design.mean(axis=0)
+        yc = y - y.mean()
+        n = max(len(y), 1)
+        return cls(c=Dc.T @ yc / n, S=Dc.T @ Dc / n, var_y=float(yc @ yc / n), n=len(y))
+
+    def r2(self, W: np.ndarray) -> np.ndarray:
+        """R^2 of the target on ``D @ w`` for every row ``w`` of ``W`` (0 if the edge points the wrong way)."""
+        W = np.atleast_2d(W)
+        cw = W @ self.c
+        wsw = np.einsum('mk,kl,ml->m', W, self.S, W)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r2 = np.where((cw > 0) & (wsw > 0), cw ** 2 / (wsw * self.var_y), 0.0)
+        return np.nan_to_num(r2)
+
+    def gradient(self, w: np.ndarray) -> np.ndarray:
+        cw = w @ self.c
+        Sw = self.S @ w
+        wsw = w @ Sw
+        if cw <= 0 or wsw <= 0:
+            return self.c / max(self.var_y, 1e-12)
+        return (2 * cw * self.c / wsw - 2 * cw ** 2 * Sw / wsw ** 2) / self.var_y
+
+
+def project_simplex(v: np.ndarray) -> np.ndarray:
+    """Euclidean projection of each row of ``v`` onto {w >= 0, sum(w) = 1}."""
+    v = np.atleast_2d(v)
+    u = -np.sort(-v, axis=1)
+    cumulative = np.cumsum(u, axis=1) - 1
+    index = np.arange(1, v.shape[1] + 1)
+    rho = (u - cumulative / index > 0).sum(axis=1)
+    theta = cumulative[np.arange(len(v)), rho - 1] / rho
+    return np.maximum(v - theta[:, None], 0.0)
+
+
+def fit_simplex_weights(
+    stats: MomentStats,
+    candidates: int = 5000,
+    refine: int = 10,
+    iterations: int = 300,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    Maximize ``stats.r2`` over the simplex.
+
+    Args:
+        stats: Moments of the training games
+        candidates: Random simplex points scored in one vectorized pass
+        refine: Best candidates (plus the uniform weighting) refined by
+            projected gradient ascent
+        iterations: Gradient steps per refined candidate
+        seed: Random seed for the candidates
+
+    Returns:
+        Weight vector (non-negative, sums to one)
+    """
+    k = len(stats.c)
+    rng = np.random.default_rng(seed)
+    pool = np.vstack([np.full(k, 1.0 / k), np.eye(k), rng.dirichlet(np.ones(k), size=candidates)])
+    scores = stats.r2(pool)
+    starts = pool[np.argsort(-scores)[:refine]]
+
+    best, best_score = starts[0], scores.max()
+    for w in starts:
+        score = stats.r2(w)[0]
+        step = 1.0
+        for _ in range(iterations):
+            trial = project_simplex(w + step * stats.gradient(w))[0]
+            trial_score = stats.r2(trial)[0]
+            if trial_score > score + 1e-12:
+                w, score = trial, trial_score
+                step *= 1.5
+            else:
+                step *= 0.5
+                if step < 1e-8:
+                    break
+        if score > best_score:
+            best, best_score = w, score
+    return best
+
+
+def hit_rate(design: np.ndarray, margin: np.ndarray, w: np.ndarray) -> float:
+    """Share of decided games whose winner has the larger weighted score."""
+    edge = design @ w
+    decided = (edge != 0) & (margin != 0)
+    if not decided.any():
+        return float('nan')
+    return float((np.sign(edge[decided]) == np.sign(margin[decided])).mean())
+
+
+def fit_weights(
+    seasons: Mapping[int, Tuple[pd.DataFrame, pd.DataFrame]],
+    keys: Optional[Iterable[str]] = None,
+    candidates: int = 5000,
+    seed: int = 0
+) -> FitResult:
+    """
+    Fit ``stats_weights`` with cross-validation by season.
+
+    Args:
+        seasons: Season -> (team summary of that season, CFBD games)
+        keys: ``stats_weights`` keys to fit (default: every key whose column
+            is in all summaries)
+        candidates: Random candidate weightings scored per fit
+        seed: Random seed
+
+    Returns:
+        FitResult with the weights fitted on all games and one row per fold
+    """
+    keys = feature_keys([summary for summary, _ in seasons.values()], keys)
+    if not keys:
+        raise ValueError("None of the stats_weights features are in the summaries")
+
+    designs, margins, groups = [], [], []
+    for season, (summary, games) in seasons.items():
+        design, margin, played = game_design(games, summary, keys)
+        designs.append(design)
+        margins.append(margin)
+        groups.append(np.full(len(margin), season) if len(seasons) > 1 else played['week'].to_numpy())
+    design = np.vstack(designs)
+    margin = np.concatenate(margins)
+    groups = np.concatenate(groups)
+    if len(margin) < 2:
+        raise ValueError("Need at least two completed games with both teams in the summary")
+
+    w = fit_simplex_weights(MomentStats.from_design(design, margin), candidates, seed=seed)
+
+    folds = []
+    fold_label = 'season' if len(seasons) > 1 else 'week'
+    for group in np.unique(groups):
+        test = groups == group
+        if test.all() or test.sum() < 2:
+            continue
+        train_stats = MomentStats.from_design(design[~test], margin[~test])
+        fold_w = fit_simplex_weights(train_stats, candidates, seed=seed)
+        folds.append({
+            fold_label: group,
+            'games': int(test.sum()),
+            'train_r2': float(train_stats.r2(fold_w)[0]),
+            'test_r2': float(MomentStats.from_design(design[test], margin[test]).r2(fold_w)[0]),
+            'test_hit_rate': hit_rate(design[test], margin[test], fold_w),
+            **{key: float(value) for key, value in zip(keys, fold_w)},
+        })
+
+    return FitResult(
+        weights={key: float(value) for key, value in zip(keys, w)},
+        r2=float(MomentStats.from_design(design, margin).r2(w)[0]),
+        hit_rate=hit_rate(design, margin, w),
+        games=len(margin),
+        folds=pd.DataFrame(folds),
+    )
+
+
+def fitted_weights_config(weights: Optional[Dict], fitted: Mapping[str, float], digits: int = 4) -> Dict:
+    """Return a copy of a weights config with ``stats_weights`` replaced by the fit."""
+    config = dict(weights or {})
+    config['stats_weights'] = {key: round(float(value), digits) for key, value in fitted.items()}
+    return config
@@ -5,7 +5,7 @@ Main module for computing team-level stats and mismatch analysis.
 import os
 import pandas as pd
 import yaml
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from cfb_mismatch.adapters.defense_coverage import (
     load_defense_coverage_scheme,
@@ -19,10 +19,71 @@ from cfb_mismatch.adapters.receiving_scheme import (
     load_receiving_scheme,
     aggregate_receiving_scheme_by_team
 )
+from cfb_mismatch.adapters.aggregation import TeamAccumulator, stream_accumulate_file
+from cfb_mismatch.adapters.incremental import update_store
 from cfb_mismatch.adapters.cfbd_data import (
     load_and_aggregate_cfbd_data,
+    load_cfbd_team_info,
     merge_with_user_stats
 )
+from cfb_mismatch.matrix import MetricRegistry, TeamMatrix, assign_tiers
+from cfb_mismatch.output import write_frames, report_writes
+from cfb_mismatch.schedule import add_strength_of_schedule
+
+
+# Maps each ``stats_paths`` key to the team_stats category it feeds and the
+# loader/aggregator pair that produces it.
+STATS_SOURCES = {
+    'defense_coverage_scheme': (
+        'defense_coverage', load_defense_coverage_scheme, aggregate_defense_by_team
+    ),
+    'receiving_concept': (
+        'receiving_concept', load_receiving_concept, aggregate_receiving_concept_by_team
+    ),
+    'receiving_scheme': (
+        'receiving_scheme', load_receiving_scheme, aggregate_receiving_scheme_by_team
+    ),
+}
+
+
+# Which ``position_groups`` side applies to each team_stats category
+POSITION_GROUP_SIDES = {
+    'defense_coverage': 'defense',
+    'receiving_concept': 'receiving',
+    'receiving_scheme': 'receiving',
+}
+
+# Scoring features: stats_weights key -> (summary column, higher_is_better)
+METRIC_MAP = {
+    'man_coverage_defense': ('man_coverage_grade', True),
+    'zone_coverage_defense': ('zone_coverage_grade', True),
+    'man_qb_rating_against': ('man_qb_rating_against', False),
+    'zone_qb_rating_against': ('zone_qb_rating_against', False),
+    'screen_efficiency': ('screen_yprr', True),
+    'slot_efficiency': ('slot_yprr', True),
+    'man_receiving_efficiency': ('man_yprr', True),
+    'zone_receiving_efficiency': ('zone_yprr', True),
+    # Position-group features (see ``position_groups`` in settings.yaml)
+    'cb_man_coverage_defense': ('cb_man_coverage_grade', True),
+    'cb_zone_coverage_defense': ('cb_zone_coverage_grade', True),
+    's_man_coverage_defense': ('s_man_coverage_grade', True),
+    's_zone_coverage_defense': ('s_zone_coverage_grade', True),
+    'lb_man_coverage_defense': ('lb_man_coverage_grade', True),
+    'lb_zone_coverage_defense': ('lb_zone_coverage_grade', True),
+    'wr_man_receiving_efficiency': ('wr_man_yprr', True),
+    'wr_zone_receiving_efficiency': ('wr_zone_yprr', True),
+    'te_man_receiving_efficiency': ('te_man_yprr', True),
+    'te_zone_receiving_efficiency': ('te_zone_yprr', True),
+    'wr_slot_efficiency': ('wr_slot_yprr', True),
+    'rb_screen_efficiency': ('rb_screen_yprr', True),
+}
+
+# Summary columns holding each category's player count and games tracked
+SUMMARY_COUNT_PREFIXES = {
+    'defense_coverage': 'defense',
+    'receiving_concept': 'receiving_concept',
+    'receiving_scheme': 'receiving_scheme',
+}
 
 
 def load_config(config_path: str = "configs/settings.yaml") -> Dict:
@@ -43,6 +104,42 @@ def load_weights(weights_path: str = "configs/weights.yaml") -> Dict:
         return yaml.safe_load(f)
 
 
+def team_groups(config: Dict, team_info: Optional[pd.DataFrame] = None) -> Optional[Dict[str, str]]:
+    """
+    Normalization group of every team (the ``normalization`` config section).
+
+    ``group_by`` is null (rank every team against all teams), ``custom`` (the
+    ``groups`` lists) or a CFBD ``team_info`` column such as ``conference``
+    or ``classification``. Team info is loaded from the CFBD data directory
+    when not given.
+
+    Returns:
+        Upper-case team name -> group label, or None for global normalization
+
+    Raises:
+        ValueError: If the team info needed for ``group_by`` is missing
+    """
+    section = config.get('normalization') or {}
+    group_by = section.get('group_by')
+    if not group_by:
+        return None
+    if group_by == 'custom':
+        return {
+            str(team).upper().strip(): str(group)
+            for group, teams in (section.get('groups') or {}).items()
+            for team in teams or []
+        }
+
+    if team_info is None:
+        team_info = load_cfbd_team_info(config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd'))
+    if team_info is None or team_info.empty:
+        raise ValueError(f"normalization.group_by '{group_by}' needs CFBD team info (team_info.csv)")
+    if group_by not in team_info.columns or 'school' not in team_info.columns:
+        raise ValueError(f"CFBD team info has no '{group_by}' column to group teams by")
+    info = team_info.dropna(subset=['school', group_by])
+    return dict(zip(info['school'].astype(str).str.upper().str.strip(), info[group_by].astype(str)))
+
+
 def load_all_stats(config: Dict) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Load all stats files based on configuration.
@@ -54,6 +151,7 @@ def load_all_stats(config: Dict) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFra
         Tuple of (defense_coverage_df, receiving_concept_df, receiving_scheme_df)
     """
     stats_paths = config.get('stats_paths', {})
+    float_dtype = config.get('stats_float_dtype', 'float64')
     
     defense_df = None
     receiving_concept_df = None
@@ -64,7 +162,7 @@ def load_all_stats(config: Dict) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFra
         if 'defense_coverage_scheme' in stats_paths:
             path = stats_paths['defense_coverage_scheme']
             try:
-                defense_df = load_defense_coverage_scheme(path)
+                defense_df = load_defense_coverage_scheme(path, float_dtype)
                 print(f"✓ Loaded {len(defense_df)} defensive player records")
             except Exception as e:
                 print(f"✗ Failed to load defense coverage: {e}")
@@ -73,7 +171,7 @@ def load_all_stats(config: Dict) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFra
         if 'receiving_concept' in stats_paths:
             path = stats_paths['receiving_concept']
             try:
-                receiving_concept_df = load_receiving_concept(path)
+                receiving_concept_df = load_receiving_concept(path, float_dtype)
                 print(f"✓ Loaded {len(receiving_concept_df)} receiving concept records")
             except Exception as e:
                 print(f"✗ Failed to load receiving concept: {e}")
@@ -82,7 +180,7 @@ def load_all_stats(config: Dict) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFra
         if 'receiving_scheme' in stats_paths:
             path = stats_paths['receiving_scheme']
             try:
-                receiving_scheme_df = load_receiving_scheme(path)
+                receiving_scheme_df = load_receiving_scheme(path, float_dtype)
                 print(f"✓ Loaded {len(receiving_scheme_df)} receiving scheme records")
             except Exception as e:
                 print(f"✗ Failed to load receiving scheme: {e}")
@@ -90,6 +188,87 @@ def load_all_stats(config: Dict) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFra
     return defense_df, receiving_concept_df, receiving_scheme_df
 
 
+def category_frames(
+    category: str,
+    accumulator: TeamAccumulator,
+    position_groups: Optional[Dict] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Finalize an accumulator into the team_stats frames of one category.
+
+    Args:
+        category: team_stats category (e.g. 'receiving_scheme')
+        accumulator: Accumulator holding the category's player rows
+        position_groups: ``position_groups`` config ({side: {group: [positions]}})
+
+    Returns:
+        ``{category: team aggregates}`` plus ``{category}_by_position`` with
+        the per position group aggregates when groups are configured
+    """
+    frames = {category: accumulator.finalize()}
+    groups = (position_groups or {}).get(POSITION_GROUP_SIDES.get(category))
+    if groups:
+        frames[f"{category}_by_position"] = accumulator.finalize_groups(groups)
+    return frames
+
+
+def aggregate_stats_file(key: str, path: str, config: Dict) -> Dict[str, pd.DataFrame]:
+    """
+    Load one ``stats_paths`` file and aggregate it to team level.
+
+    With ``stats_store_dir`` set the persisted per-player store is updated with
+    the file's changed rows; otherwise, with ``stats_chunksize`` set, the file
+    is streamed in chunks so peak memory is bounded by the chunk size. The
+    aggregates are the same either way.
+
+    Args:
+        key: ``stats_paths`` key (one of ``STATS_SOURCES``)
+        path: Path to the player stats CSV
+        config: Configuration dictionary from settings.yaml
+
+    Returns:
+        team_stats frames for the file's category (see ``category_frames``)
+    """
+    category, loader, _ = STATS_SOURCES[key]
+    float_dtype = config.get('stats_float_dtype', 'float64')
+    chunksize = config.get('stats_chunksize')
+    store_dir = config.get('stats_store_dir')
+    if store_dir:
+        accumulator = update_store(loader(path, float_dtype), key, store_dir).accumulator
+    elif chunksize:
+        accumulator = stream_accumulate_file(path, key, int(chunksize), float_dtype)
+    else:
+        accumulator = TeamAccumulator().add(loader(path, float_dtype))
+    return category_frames(category, accumulator, config.get('position_groups'))
+
+
+def stream_team_stats(config: Dict) -> Dict[str, pd.DataFrame]:
+    """
+    Aggregate every configured stats file in chunks (see ``stats_chunksize``).
+
+    Args:
+        config: Configuration dictionary from settings.yaml
+
+    Returns:
+        Dictionary with team-level stats for each category
+    """
+    team_stats = {}
+    if not config.get('use_stats_files', False):
+        return team_stats
+
+    for key, path in config.get('stats_paths', {}).items():
+        if key not in STATS_SOURCES:
+            continue
+        category = STATS_SOURCES[key][0]
+        try:
+            team_stats.update(aggregate_stats_file(key, path, config))
+            print(f"✓ Streamed {key} into {len(team_stats[category])} team aggregates")
+        except Exception as e:
+            print(f"✗ Failed to aggregate {key}: {e}")
+
+    return team_stats
+
+
 def load_cfbd_data(
     season: Optional[int] = None,
     season_type: str = "regular",
@@ -145,7 +324,9 @@ def load_cfbd_data(
 def compute_team_stats(
     defense_df: Optional[pd.DataFrame],
     receiving_concept_df: Optional[pd.DataFrame],
-    receiving_scheme_df: Optional[pd.DataFrame]
+    receiving_scheme_df: Optional[pd.DataFrame],
+    store_dir: Optional[str] = None,
+    position_groups: Optional[Dict] = None
 ) -> Dict[str, pd.DataFrame]:
     """
     Compute team-level aggregated statistics.
@@ -154,41 +335,68 @@ def compute_team_stats(
         defense_df: Defense coverage scheme DataFrame
         receiving_concept_df: Receiving concept DataFrame
         receiving_scheme_df: Receiving scheme DataFrame
+        store_dir: If given, update the persisted per-player stores there
+            (see ``stats_store_dir``) so only changed players are re-aggregated
+        position_groups: ``position_groups`` config; adds a
+            ``{category}_by_position`` frame per category from the same pass
         
     Returns:
         Dictionary with team-level stats for each category
     """
     team_stats = {}
+    frames = {
+        'defense_coverage_scheme': defense_df,
+        'receiving_concept': receiving_concept_df,
+        'receiving_scheme': receiving_scheme_df,
+    }
+    labels = {
+        'defense_coverage_scheme': 'defense',
+        'receiving_concept': 'receiving concept',
+        'receiving_scheme': 'receiving scheme',
+    }
     
-    if defense_df is not None:
-        team_stats['defense_coverage'] = aggregate_defense_by_team(defense_df)
-        print(f"✓ Aggregated defense stats for {len(team_stats['defense_coverage'])} teams")
-    
-    if receiving_concept_df is not None:
-        team_stats['receiving_concept'] = aggregate_receiving_concept_by_team(receiving_concept_df)
-        print(f"✓ Aggregated receiving concept stats for {len(team_stats['receiving_concept'])} teams")
-    
-    if receiving_scheme_df is not None:
-        team_stats['receiving_scheme'] = aggregate_receiving_scheme_by_team(receiving_scheme_df)
-        print(f"✓ Aggregated receiving scheme stats for {len(team_stats['receiving_scheme'])} teams")
+    for key, df in frames.items():
+        if df is None:
+            continue
+        category, _, aggregator = STATS_SOURCES[key]
+        if store_dir:
+            accumulator = update_store(df, key, store_dir).accumulator
+            team_stats.update(category_frames(category, accumulator, position_groups))
+        elif position_groups:
+            team_stats.update(category_frames(category, TeamAccumulator().add(df), position_groups))
+        else:
+            team_stats[category] = aggregator(df)
+        print(f"✓ Aggregated {labels[key]} stats for {len(team_stats[category])} teams")
     
     return team_stats
 
 
-def save_team_stats(team_stats: Dict[str, pd.DataFrame], output_dir: str = "data/out"):
+def save_team_stats(
+    team_stats: Dict[str, pd.DataFrame],
+    output_dir: str = "data/out",
+    formats: Optional[Iterable[str]] = None
+) -> List[str]:
     """
-    Save team-level statistics to CSV files.
-    
+    Save team-level statistics, one file per category and format.
+
+    Files are written concurrently and atomically; files whose content is
+    unchanged are left untouched.
+
     Args:
         team_stats: Dictionary of team statistics DataFrames
         output_dir: Directory to save output files
+        formats: Output formats (see ``cfb_mismatch.output.OUTPUT_FORMATS``; default CSV)
+
+    Returns:
+        List of paths that were (re)written
     """
     os.makedirs(output_dir, exist_ok=True)
-    
-    for category, df in team_stats.items():
-        output_path = os.path.join(output_dir, f"team_{category}.csv")
-        df.to_csv(output_path, index=False)
-        print(f"✓ Saved {output_path}")
+
+    frames = {
+        os.path.join(output_dir, f"team_{category}"): df
+        for category, df in team_stats.items()
+    }
+    return report_writes(write_frames(frames, formats))
 
 
 def _normalize_metric(series: pd.Series, higher_is_better: bool = True) -> pd.Series:
@@ -212,8 +420,48 @@ def _normalize_metric(series: pd.Series, higher_is_better: bool = True) -> pd.Se
     return scaled.fillna(0.0)
 
 
-def _compute_weighted_scores(summary: pd.DataFrame, weights: Optional[Dict]) -> pd.DataFrame:
-    """Apply feature weights to compute a mismatch score for each team."""
+def scoring_weights(weights: Optional[Dict], matrix: TeamMatrix) -> Dict[str, float]:
+    """
+    Metric name -> weight of the ``stats_weights`` that apply to ``matrix``.
+
+    ``stats_weights`` keys are ``METRIC_MAP`` features or, for metrics
+    declared in the ``metrics`` config, the metric name itself.
+    """
+    metric_weights = {}
+    for weight_key, weight_value in ((weights or {}).get('stats_weights') or {}).items():
+        metric = METRIC_MAP.get(weight_key)
+        column = metric[0] if metric is not None else weight_key
+        if column in matrix:
+            metric_weights[column] = weight_value
+    return metric_weights
+
+
+def _compute_weighted_scores(
+    summary: pd.DataFrame,
+    weights: Optional[Dict],
+    matrix: Optional[TeamMatrix] = None,
+    groups: Optional[Dict[str, str]] = None,
+    reference=None
+) -> pd.DataFrame:
+    """
+    Apply feature weights to compute a mismatch score for each team.
+
+    Args:
+        summary: Team summary, one row per team
+        weights: Feature weights dictionary from weights.yaml
+        matrix: Team metric matrix aligned with the summary rows (built from
+            the summary columns if not given)
+        groups: Optional upper-case team name -> group (see ``team_groups``);
+            scores and tiers are then ranked within each group and the
+            all-teams versions kept as ``mismatch_score_global`` and
+            ``mismatch_tier_global``
+        reference: Optional ``percentiles.SeasonPercentiles``; metrics are
+            then ranked against the indexed population (and tiers cut at its
+            score quintiles) instead of the teams in ``summary``, and
+            ``groups`` is ignored
+
+    The weights are matched to metrics by ``scoring_weights``.
+    """
 
     if weights is None:
         return summary
@@ -222,112 +470,92 @@ def _compute_weighted_scores(summary: pd.DataFrame, weights: Optional[Dict]) ->
     if not stats_weights:
         return summary
 
-    metric_map = {
-        'man_coverage_defense': ('man_coverage_grade', True),
-        'zone_coverage_defense': ('zone_coverage_grade', True),
-        'man_qb_rating_against': ('man_qb_rating_against', False),
-        'zone_qb_rating_against': ('zone_qb_rating_against', False),
-        'screen_efficiency': ('screen_yprr', True),
-        'slot_efficiency': ('slot_yprr', True),
-        'man_receiving_efficiency': ('man_yprr', True),
-        'zone_receiving_efficiency': ('zone_yprr', True),
-    }
-
-    score = pd.Series(0.0, index=summary.index)
-    weight_total = 0.0
+    if matrix is None:
+        matrix = TeamMatrix.from_frame(summary)
 
-    for weight_key, weight_value in stats_weights.items():
-        metric = metric_map.get(weight_key)
-        if metric is None:
-            continue
+    metric_weights = scoring_weights(weights, matrix)
 
-        column, higher_is_better = metric
-        if column not in summary.columns:
-            continue
+    if reference is not None:
+        score, contributions, names = matrix.weighted_scores(metric_weights, reference=reference)
+        for j, column in enumerate(names):
+            summary[f"{column}_score"] = contributions[:, j]
+        summary['mismatch_score'] = score
+        if 'mismatch_score' in reference:
+            summary['mismatch_tier'] = reference.tiers(summary['mismatch_score'])
+        else:
+            summary['mismatch_tier'] = assign_tiers(summary['mismatch_score'])
+        return summary
 
-        column_values = pd.to_numeric(summary[column], errors='coerce')
-        normalized = _normalize_metric(column_values, higher_is_better)
-        score += normalized * weight_value
-        summary[f"{column}_score"] = normalized * weight_value
-        weight_total += weight_value
+    labels = None
+    if groups:
+        labels = summary['team_name'].astype(str).str.upper().str.strip().map(groups).to_numpy(dtype=object)
 
-    if weight_total > 0:
-        summary['mismatch_score'] = score / weight_total
-    else:
-        summary['mismatch_score'] = 0.0
-
-    try:
-        summary['mismatch_tier'] = pd.qcut(
-            summary['mismatch_score'],
-            q=5,
-            labels=['Very Low', 'Low', 'Moderate', 'High', 'Elite']
-        )
-    except ValueError:
-        summary['mismatch_tier'] = 'Moderate'
+    score, contributions, names = matrix.weighted_scores(metric_weights, labels)
+    for j, column in enumerate(names):
+        summary[f"{column}_score"] = contributions[:, j]
+    summary['mismatch_score'] = score
+    summary['mismatch_tier'] = assign_tiers(summary['mismatch_score'], labels)
+    if labels is not None:
+        summary['mismatch_group'] = labels
+        summary['mismatch_score_global'] = matrix.weighted_scores(metric_weights)[0]
+        summary['mismatch_tier_global'] = assign_tiers(summary['mismatch_score_global'])
 
     return summary
 
 
-def generate_summary_report(team_stats: Dict[str, pd.DataFrame], weights: Optional[Dict] = None) -> pd.DataFrame:
+def generate_summary_report(
+    team_stats: Dict[str, pd.DataFrame],
+    weights: Optional[Dict] = None,
+    registry: Optional[MetricRegistry] = None,
+    groups: Optional[Dict[str, str]] = None,
+    reference=None
+) -> pd.DataFrame:
     """
     Generate a summary report combining key metrics from all categories.
     
     Args:
         team_stats: Dictionary of team statistics DataFrames
+        weights: Feature weights dictionary from weights.yaml
+        registry: Metric registry with the declared metrics (see
+            ``MetricRegistry.from_config``); only the ones weighted or listed
+            in ``summary_metrics`` are computed
+        groups: Optional normalization groups (see ``team_groups``)
+        reference: Optional percentile reference to score against (see
+            ``percentiles.percentile_reference``)
         
     Returns:
         Combined summary DataFrame
     """
-    summary_data = []
-    
-    # Get all unique teams across all stats
-    all_teams = set()
-    for df in team_stats.values():
-        if df is not None:
-            all_teams.update(df['team_name'].unique())
-    
-    for team in sorted(all_teams):
-        team_row = {'team_name': team}
-        
-        # Add key defensive metrics
-        if 'defense_coverage' in team_stats:
-            defense = team_stats['defense_coverage']
-            team_defense = defense[defense['team_name'] == team]
-            if not team_defense.empty:
-                team_row['man_coverage_grade'] = team_defense['man_grades_coverage_defense'].values[0]
-                team_row['zone_coverage_grade'] = team_defense['zone_grades_coverage_defense'].values[0]
-                team_row['man_qb_rating_against'] = team_defense['man_qb_rating_against'].values[0]
-                team_row['zone_qb_rating_against'] = team_defense['zone_qb_rating_against'].values[0]
-                team_row['defense_player_count'] = int(team_defense['player_count'].values[0])
-                team_row['defense_games_tracked'] = float(team_defense['player_game_count_total'].values[0])
-
-        # Add key receiving concept metrics
-        if 'receiving_concept' in team_stats:
-            concept = team_stats['receiving_concept']
-            team_concept = concept[concept['team_name'] == team]
-            if not team_concept.empty:
-                team_row['screen_yprr'] = team_concept['screen_yprr'].values[0]
-                team_row['slot_yprr'] = team_concept['slot_yprr'].values[0]
-                team_row['receiving_concept_player_count'] = int(team_concept['player_count'].values[0])
-                team_row['receiving_concept_games_tracked'] = float(team_concept['player_game_count_total'].values[0])
-
-        # Add key receiving scheme metrics
-        if 'receiving_scheme' in team_stats:
-            scheme = team_stats['receiving_scheme']
-            team_scheme = scheme[scheme['team_name'] == team]
-            if not team_scheme.empty:
-                team_row['man_yprr'] = team_scheme['man_yprr'].values[0]
-                team_row['zone_yprr'] = team_scheme['zone_yprr'].values[0]
-                team_row['receiving_scheme_player_count'] = int(team_scheme['player_count'].values[0])
-                team_row['receiving_scheme_games_tracked'] = float(team_scheme['player_game_count_total'].values[0])
-        
-        summary_data.append(team_row)
-    
-    summary_df = pd.DataFrame(summary_data)
-    if summary_df.empty:
-        return summary_df
-
-    summary_df = _compute_weighted_scores(summary_df, weights)
+    registry = registry or MetricRegistry()
+    requested = registry.requested(weights, METRIC_MAP)
+    matrix = TeamMatrix.from_team_stats(team_stats, registry, requested)
+    if matrix.empty:
+        return pd.DataFrame()
+
+    columns = {'team_name': matrix.teams.to_numpy()}
+    for category, prefix in SUMMARY_COUNT_PREFIXES.items():
+        df = team_stats.get(category)
+        if df is None:
+            continue
+        for spec in matrix.metrics:
+            if spec.category == category and spec.group is None:
+                columns[spec.name] = matrix.column(spec.name)
+        counts = df.drop_duplicates('team_name').set_index('team_name').reindex(matrix.teams)
+        player_count = counts['player_count']
+        columns[f'{prefix}_player_count'] = (
+            player_count.astype(int) if player_count.notna().all() else player_count.astype(float)
+        ).to_numpy()
+        columns[f'{prefix}_games_tracked'] = counts['player_game_count_total'].to_numpy(dtype=float)
+
+    for spec in matrix.metrics:
+        if spec.group is not None:
+            columns[spec.name] = matrix.column(spec.name)
+
+    for name in requested:
+        if name not in columns and name in matrix:
+            columns[name] = matrix.column(name)
+
+    summary_df = _compute_weighted_scores(pd.DataFrame(columns), weights, matrix, groups, reference)
 
     if 'mismatch_score' in summary_df.columns:
         summary_df = summary_df.sort_values('mismatch_score', ascending=False).reset_index(drop=True)
@@ -338,7 +566,11 @@ def generate_summary_report(team_stats: Dict[str, pd.DataFrame], weights: Option
 def generate_integrated_report(
     team_stats: Dict[str, pd.DataFrame],
     cfbd_team_stats: Optional[pd.DataFrame] = None,
-    weights: Optional[Dict] = None
+    weights: Optional[Dict] = None,
+    registry: Optional[MetricRegistry] = None,
+    games: Optional[pd.DataFrame] = None,
+    groups: Optional[Dict[str, str]] = None,
+    reference=None
 ) -> pd.DataFrame:
     """
     Generate an integrated report combining user stats and CFBD data.
@@ -346,15 +578,23 @@ def generate_integrated_report(
     Args:
         team_stats: Dictionary of user team statistics DataFrames
         cfbd_team_stats: Optional CFBD aggregated team statistics
+        weights: Feature weights dictionary from weights.yaml
+        registry: Metric registry with the declared metrics
+        games: Optional CFBD games (played and unplayed) for the
+            strength-of-schedule columns (see ``schedule``)
+        groups: Optional normalization groups (see ``team_groups``)
+        reference: Optional percentile reference to score against
         
     Returns:
         Combined summary DataFrame with both user and CFBD metrics
     """
     # Start with user stats summary
-    summary = generate_summary_report(team_stats, weights)
+    summary = generate_summary_report(team_stats, weights, registry, groups, reference)
     
     # If CFBD data is available, merge it
     if cfbd_team_stats is not None and not cfbd_team_stats.empty:
+        if games is not None and not games.empty:
+            cfbd_team_stats = add_strength_of_schedule(cfbd_team_stats, games, summary)
         summary = merge_with_user_stats(summary, cfbd_team_stats, 'team_name')
         print(f"✓ Integrated CFBD data for {len(summary)} teams")
     
@@ -0,0 +1,180 @@
+"""
+Run manifest: fingerprint a run's inputs and outputs to skip unchanged reruns.
+
+The manifest is a small JSON file written alongside the outputs. It records
+content hashes of the stats files, the CFBD data, the config and weights, the
+package version and run options, plus the hashes of every output written.
+On the next run the current fingerprint is compared with the stored one; if
+nothing differs and the outputs are intact the run can reuse them as-is.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from cfb_mismatch import __version__
+from cfb_mismatch.output import file_digest, write_bytes_atomic
+
+MANIFEST_NAME = "run_manifest.json"
+
+# Config keys that never affect outputs (and should not be hashed)
+_IGNORED_CONFIG_KEYS = {'cfbd_api_key'}
+
+
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_object(obj) -> str:
+    """Hash a YAML/JSON-like object independent of key order."""
+    return _hash_bytes(json.dumps(obj, sort_keys=True, default=str).encode('utf-8'))
+
+
+def hash_frame(df: Optional[pd.DataFrame]) -> Optional[str]:
+    """Hash a DataFrame's content (None for missing frames)."""
+    if df is None:
+        return None
+    return _hash_bytes(df.to_csv(index=False).encode('utf-8'))
+
+
+def build_fingerprint(
+    config: Dict,
+    weights: Optional[Dict],
+    cfbd_frames: Optional[Dict[str, Optional[pd.DataFrame]]] = None,
+    options: Optional[Dict] = None
+) -> Dict:
+    """
+    Fingerprint everything that determines a run's outputs.
+
+    Args:
+        config: Configuration dictionary from settings.yaml
+        weights: Feature weights dictionary from weights.yaml
+        cfbd_frames: CFBD DataFrames used by the run (hashed by content, so
+            data fetched from the API is covered too)
+        options: Run options such as season and season type
+
+    Returns:
+        Fingerprint dictionary
+    """
+    inputs = {}
+    if config.get('use_stats_files', False):
+        for key, path in sorted(config.get('stats_paths', {}).items()):
+            inputs[key] = {'path': path, 'sha256': file_digest(path)}
+
+    return {
+        'version': __version__,
+        'config': hash_object({k: v for k, v in config.items() if k not in _IGNORED_CONFIG_KEYS}),
+        'weights': hash_object(weights),
+        'inputs': inputs,
+        'cfbd': {name: hash_frame(df) for name, df in sorted((cfbd_frames or {}).items())},
+        'options': options or {},
+    }
+
+
+def manifest_path(output_dir: str) -> str:
+    return os.path.join(output_dir, MANIFEST_NAME)
+
+
+def load_manifest(output_dir: str) -> Optional[Dict]:
+    """Load the manifest stored in ``output_dir``, or None if there isn't one."""
+    path = manifest_path(output_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠ Ignoring unreadable manifest {path}: {e}")
+        return None
+
+
+def explain_changes(
+    previous: Optional[Dict],
+    fingerprint: Dict,
+    output_dir: str
+) -> List[str]:
+    """
+    Explain why the outputs in ``output_dir`` can't be reused.
+
+    Args:
+        previous: Manifest from the last run (None if there wasn't one)
+        fingerprint: Fingerprint of the current run from ``build_fingerprint``
+        output_dir: Directory holding the previous outputs
+
+    Returns:
+        Human-readable reasons; an empty list means the outputs can be reused
+    """
+    if previous is None:
+        return ["no previous run manifest"]
+
+    reasons = []
+    if previous.get('version') != fingerprint['version']:
+        reasons.append(f"package version changed ({previous.get('version')} -> {fingerprint['version']})")
+    if previous.get('config') != fingerprint['config']:
+        reasons.append("config changed")
+    if previous.get('weights') != fingerprint['weights']:
+        reasons.append("weights changed")
+
+    for section, label in (('inputs', 'stats file'), ('cfbd', 'CFBD data')):
+        old, new = previous.get(section, {}), fingerprint[section]
+        for name in sorted(set(old) | set(new)):
+            if name not in old:
+                reasons.append(f"{label} '{name}' added")
+            elif name not in new:
+                reasons.append(f"{label} '{name}' removed")
+            elif old[name] != new[name]:
+                reasons.append(f"{label} '{name}' changed")
+
+    old_options, new_options = previous.get('options', {}), fingerprint['options']
+    for name in sorted(set(old_options) | set(new_options)):
+        if old_options.get(name) != new_options.get(name):
+            reasons.append(f"option '{name}' changed ({old_options.get(name)} -> {new_options.get(name)})")
+
+    outputs = previous.get('outputs', {})
+    if not outputs:
+        reasons.append("previous run recorded no outputs")
+    for rel_path, digest in sorted(outputs.items()):
+        current = file_digest(os.path.join(output_dir, rel_path))
+        if current is None:
+            reasons.append(f"output '{rel_path}' missing")
+        elif current != digest:
+            reasons.append(f"output '{rel_path}' modified since last run")
+
+    return reasons
+
+
+def write_manifest(
+    output_dir: str,
+    fingerprint: Dict,
+    outputs: List[str],
+    reasons: Optional[List[str]] = None
+) -> str:
+    """
+    Write the manifest for a completed run.
+
+    Args:
+        output_dir: Directory the outputs were written to
+        fingerprint: Fingerprint from ``build_fingerprint``
+        outputs: Output file paths produced by the run
+        reasons: Why the run was triggered (from ``explain_changes``)
+
+    Returns:
+        Path of the manifest file
+    """
+    manifest = dict(fingerprint)
+    manifest['created_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    manifest['rerun_reasons'] = reasons or []
+    manifest['outputs'] = {
+        os.path.relpath(path, output_dir): file_digest(path)
+        for path in sorted(set(outputs))
+        if os.path.exists(path)
+    }
+
+    path = manifest_path(output_dir)
+    data = json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')
+    write_bytes_atomic(path, data, skip_unchanged=False)
+    return path
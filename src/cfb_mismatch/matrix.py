@@ -0,0 +1,554 @@
+"""
+Dense team x metric matrix shared by scoring, normalization, tiers and
+matchup metrics.
+
+``TeamMatrix`` holds one contiguous float64 array (teams x metrics) with a
+team index and a ``MetricSpec`` per column (name, category, direction and
+position group). It is built once from the aggregated team stats (or from a
+summary CSV) and consumed as whole-array operations: percentile normalization
+of every weighted metric is a single rank pass, and the mismatch score is a
+matrix-vector product. Given a group label per team (conference,
+classification or a custom list), normalization and tiers rank each team
+within its group instead, still in one grouped rank pass over all metrics.
+
+Besides the built-in summary metrics, ``MetricRegistry`` holds metrics
+declared in the ``metrics`` section of settings.yaml: a column of one stats
+category's team aggregates, or a formula over other metrics. Declared metrics
+are only pulled into the matrix when weights.yaml weights them or
+``summary_metrics`` asks for them, and formulas are evaluated on first access
+and appended to the matrix, so each is computed at most once per run.
+"""
+
+import ast
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Per category: source column -> summary column of the team metrics that make
+# up the summary. The same metrics are broken out per position group (as
+# ``{group}_{name}``, e.g. wr_man_yprr).
+SUMMARY_METRICS = {
+    'defense_coverage': {
+        'man_grades_coverage_defense': 'man_coverage_grade',
+        'zone_grades_coverage_defense': 'zone_coverage_grade',
+        'man_qb_rating_against': 'man_qb_rating_against',
+        'zone_qb_rating_against': 'zone_qb_rating_against',
+    },
+    'receiving_concept': {
+        'screen_yprr': 'screen_yprr',
+        'slot_yprr': 'slot_yprr',
+    },
+    'receiving_scheme': {
+        'man_yprr': 'man_yprr',
+        'zone_yprr': 'zone_yprr',
+    },
+}
+
+# Metrics where a lower value is better for the team
+LOWER_IS_BETTER = {'man_qb_rating_against', 'zone_qb_rating_against'}
+
+# Team-level metrics behind the matchup pass tilt
+OFFENSE_METRICS = ['screen_yprr', 'slot_yprr', 'man_yprr', 'zone_yprr']
+COVERAGE_METRICS = ['man_coverage_grade', 'zone_coverage_grade']
+
+# Mismatch tiers, lowest to highest quintile of mismatch_score
+MISMATCH_TIERS = ['Very Low', 'Low', 'Moderate', 'High', 'Elite']
+
+
+@dataclass(frozen=True)
+class MetricSpec:
+    """One column of a ``TeamMatrix``."""
+
+    name: str
+    category: str
+    higher_is_better: bool = True
+    source: Optional[str] = None
+    group: Optional[str] = None
+    formula: Optional[str] = None
+
+    def for_group(self, group: str) -> 'MetricSpec':
+        """The same metric restricted to a position group (``{group}_{name}``)."""
+        return MetricSpec(f"{group}_{self.name}", self.category, self.higher_is_better, self.source, group)
+
+
+# Registry of the all-positions team metrics, by summary column
+METRIC_SPECS: Dict[str, MetricSpec] = {
+    name: MetricSpec(name, category, name not in LOWER_IS_BETTER, source)
+    for category, metrics in SUMMARY_METRICS.items()
+    for source, name in metrics.items()
+}
+
+
+# Functions available in derived metric formulas (NaN-tolerant where it matters)
+FORMULA_FUNCTIONS = {
+    'abs': np.abs,
+    'log': np.log,
+    'sqrt': np.sqrt,
+    'minimum': np.fmin,
+    'maximum': np.fmax,
+}
+
+_FORMULA_OPERATORS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+    ast.Pow: np.power,
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+}
+
+
+_FORMULA_NODES = (ast.BinOp, ast.UnaryOp, ast.Name, ast.Constant, ast.Call, ast.Load) + tuple(_FORMULA_OPERATORS)
+
+
+def _parse_formula(formula: str) -> ast.expr:
+    """Parse a formula, rejecting anything but arithmetic on names and numbers."""
+    try:
+        tree = ast.parse(formula, mode='eval').body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid metric formula '{formula}': {e.msg}") from None
+    for node in ast.walk(tree):
+        allowed = isinstance(node, _FORMULA_NODES)
+        if isinstance(node, ast.Call):
+            allowed = isinstance(node.func, ast.Name) and node.func.id in FORMULA_FUNCTIONS and not node.keywords
+        if isinstance(node, ast.Constant):
+            allowed = isinstance(node.value, (int, float)) and not isinstance(node.value, bool)
+        if not allowed:
+            raise ValueError(f"Unsupported expression in metric formula '{formula}': {ast.dump(node)}")
+    return tree
+
+
+def formula_names(formula: str) -> List[str]:
+    """Metric names a formula reads, in order of first use."""
+    names = []
+    for node in ast.walk(_parse_formula(formula)):
+        if isinstance(node, ast.Name) and node.id not in FORMULA_FUNCTIONS and node.id not in names:
+            names.append(node.id)
+    return names
+
+
+def evaluate_formula(formula: str, columns: Mapping[str, np.ndarray]) -> np.ndarray:
+    """
+    Evaluate an arithmetic formula over metric columns.
+
+    Only numbers, metric names, ``+ - * / **`` and ``FORMULA_FUNCTIONS`` are
+    allowed (checked when parsing); division by zero gives NaN.
+    """
+    def visit(node):
+        if isinstance(node, ast.Constant):
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            return columns[node.id]
+        if isinstance(node, ast.BinOp):
+            return _FORMULA_OPERATORS[type(node.op)](visit(node.left), visit(node.right))
+        if isinstance(node, ast.UnaryOp):
+            return _FORMULA_OPERATORS[type(node.op)](visit(node.operand))
+        return FORMULA_FUNCTIONS[node.func.id](*[visit(arg) for arg in node.args])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.asarray(visit(_parse_formula(formula)), dtype=float)
+    if values.ndim == 0 and columns:
+        values = np.full(len(next(iter(columns.values()))), float(values))
+    return np.where(np.isinf(values), np.nan, values)
+
+
+class MetricRegistry:
+    """
+    Built-in metrics plus metrics declared in the ``metrics`` config.
+
+    Args:
+        specs: Declared metrics by name (added to / overriding ``METRIC_SPECS``)
+        outputs: Metric names always added to the summary (``summary_metrics``)
+    """
+
+    def __init__(self, specs: Optional[Mapping[str, MetricSpec]] = None, outputs: Iterable[str] = ()):
+        self.specs: Dict[str, MetricSpec] = dict(METRIC_SPECS)
+        self.specs.update(specs or {})
+        self.declared = [name for name in (specs or {})]
+        self.outputs = list(outputs)
+        for name in self.outputs:
+            if self.get(name) is None:
+                raise ValueError(f"summary_metrics lists unknown metric '{name}'")
+        for name in self.declared:
+            self.dependencies(name)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'MetricRegistry':
+        """
+        Build the registry from settings.yaml.
+
+        Each ``metrics`` entry is either a column metric
+        (``{category: receiving_scheme, column: man_targets_percent}``) or a
+        derived metric (``{formula: "man_yprr - zone_yprr"}``), with an
+        optional ``higher_is_better`` (default true).
+        """
+        config = config or {}
+        specs = {}
+        for name, entry in (config.get('metrics') or {}).items():
+            entry = entry or {}
+            higher = bool(entry.get('higher_is_better', True))
+            if entry.get('formula'):
+                formula_names(entry['formula'])
+                specs[name] = MetricSpec(name, entry.get('category', 'derived'), higher, formula=str(entry['formula']))
+            elif entry.get('category') in SUMMARY_METRICS and entry.get('column'):
+                specs[name] = MetricSpec(name, entry['category'], higher, source=entry['column'])
+            else:
+                raise ValueError(
+                    f"Metric '{name}' needs a formula, or a category ({', '.join(SUMMARY_METRICS)}) and a column"
+                )
+        return cls(specs, config.get('summary_metrics') or ())
+
+    def get(self, name: str) -> Optional[MetricSpec]:
+        """Spec of a metric, or of a ``{group}_{metric}`` breakout of a column metric."""
+        if name in self.specs:
+            return self.specs[name]
+        group, sep, base = name.partition('_')
+        spec = self.specs.get(base) if sep and group else None
+        if spec is not None and spec.formula is None:
+            return spec.for_group(group)
+        return None
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def dependencies(self, name: str, _seen: Optional[List[str]] = None) -> List[str]:
+        """
+        Every metric ``name`` needs, dependencies first, ending with ``name``.
+
+        Raises:
+            ValueError: on unknown metrics or circular formulas
+        """
+        seen = list(_seen or [])
+        if name in seen:
+            raise ValueError(f"Circular metric formula: {' -> '.join(seen + [name])}")
+        spec = self.get(name)
+        if spec is None:
+            raise ValueError(f"Unknown metric '{name}'" + (f" (used by '{seen[-1]}')" if seen else ""))
+        order = []
+        for dep in formula_names(spec.formula) if spec.formula else []:
+            for item in self.dependencies(dep, seen + [name]):
+                if item not in order:
+                    order.append(item)
+        order.append(name)
+        return order
+
+    def requested(self, weights: Optional[Dict] = None, metric_map: Optional[Mapping] = None) -> List[str]:
+        """
+        Declared metrics the run needs: ``summary_metrics`` plus weighted ones.
+
+        Args:
+            weights: Feature weights; ``stats_weights`` keys that are not in
+                ``metric_map`` are taken as metric names
+            metric_map: Built-in weight keys (``main.METRIC_MAP``)
+        """
+        names = list(self.outputs)
+        for key in ((weights or {}).get('stats_weights') or {}):
+            if key not in (metric_map or {}) and key in self and key not in names:
+                names.append(key)
+        return names
+
+
+DEFAULT_REGISTRY = MetricRegistry()
+
+
+def lookup_spec(name: str) -> Optional[MetricSpec]:
+    """Spec of a summary column: a team metric or a ``{group}_{metric}`` breakout."""
+    return DEFAULT_REGISTRY.get(name)
+
+
+def _group_codes(groups: Sequence) -> np.ndarray:
+    """Integer code per team; teams without a group share one group."""
+    codes, _ = pd.factorize(pd.Series(groups, dtype=object), use_na_sentinel=False)
+    return codes
+
+
+def normalize_columns(
+    values: np.ndarray,
+    higher_is_better: Sequence[bool],
+    groups: Optional[Sequence] = None
+) -> np.ndarray:
+    """
+    Column-wise version of ``main._normalize_metric``: percentile ranks scaled
+    to [-1, 1], flipped where lower is better; missing values and constant
+    columns map to 0.
+
+    With ``groups`` (one label per row) every team is ranked within its group,
+    and a column that is constant within a group maps to 0 for that group.
+    """
+    if values.size == 0:
+        return np.zeros_like(values, dtype=float)
+    frame = pd.DataFrame(values)
+    if groups is None:
+        ranked = frame.rank(pct=True, na_option='keep').to_numpy(dtype=float, copy=True)
+        constant = np.broadcast_to(frame.nunique().to_numpy() <= 1, values.shape)
+    else:
+        grouped = frame.groupby(_group_codes(groups), sort=False)
+        ranked = grouped.rank(pct=True, na_option='keep').to_numpy(dtype=float, copy=True)
+        constant = grouped.transform('nunique').to_numpy() <= 1
+    flip = ~np.asarray(higher_is_better, dtype=bool)
+    ranked[:, flip] = 1 - ranked[:, flip]
+    scaled = np.nan_to_num((ranked - 0.5) * 2, nan=0.0)
+    scaled[constant] = 0.0
+    return scaled
+
+
+def assign_tiers(scores: pd.Series, groups: Optional[Sequence] = None) -> pd.Series:
+    """
+    Quintile tiers of ``mismatch_score`` ('Moderate' if they can't be cut).
+
+    With ``groups`` the quintile edges are taken within each group in one
+    grouped quantile pass; a group whose edges can't be cut is 'Moderate'.
+    """
+    if groups is None:
+        try:
+            return pd.qcut(scores, q=len(MISMATCH_TIERS), labels=MISMATCH_TIERS)
+        except ValueError:
+            return pd.Series('Moderate', index=scores.index)
+    codes = _group_codes(groups)
+    quantiles = np.linspace(0, 1, len(MISMATCH_TIERS) + 1)
+    edges = scores.groupby(codes).quantile(quantiles).unstack().reindex(np.arange(codes.max() + 1))
+    edges = edges.to_numpy(dtype=float)
+    values = scores.to_numpy(dtype=float)
+    tier = (values[:, None] > edges[codes, 1:-1]).sum(axis=1)
+    uncut = (np.diff(edges, axis=1) <= 0).any(axis=1) | np.isnan(edges).any(axis=1)
+    tier = np.where(uncut[codes], MISMATCH_TIERS.index('Moderate'), tier)
+    tier = np.where(np.isnan(values), -1, tier)
+    return pd.Series(pd.Categorical.from_codes(tier, MISMATCH_TIERS, ordered=True), index=scores.index)
+
+
+def _team_column(
+    team_stats: Mapping[str, Optional[pd.DataFrame]],
+    spec: MetricSpec,
+    teams: pd.Index
+) -> Optional[np.ndarray]:
+    """Values of a column metric for ``teams`` (None if the column is missing)."""
+    if spec.group is None:
+        df = team_stats.get(spec.category)
+        if df is None or spec.source not in df.columns:
+            return None
+        frame = df.drop_duplicates('team_name').set_index('team_name')
+        return frame[spec.source].reindex(teams).to_numpy(dtype=float, na_value=np.nan)
+
+    df = team_stats.get(f"{spec.category}_by_position")
+    if df is None or spec.source not in df.columns:
+        return None
+    rows = df[df['position_group'].astype(str) == spec.group].drop_duplicates('team_name')
+    return rows.set_index('team_name')[spec.source].reindex(teams).to_numpy(dtype=float, na_value=np.nan)
+
+
+class TeamMatrix:
+    """
+    Contiguous teams x metrics float array with its team index and metric specs.
+
+    Args:
+        teams: Team names, one per row
+        metrics: Spec of every column
+        values: Array of shape (len(teams), len(metrics))
+        registry: Registry used to derive formula metrics on first access
+    """
+
+    def __init__(
+        self,
+        teams: Iterable,
+        metrics: Iterable[MetricSpec],
+        values: np.ndarray,
+        registry: Optional[MetricRegistry] = None
+    ):
+        self.registry = registry or DEFAULT_REGISTRY
+        self.teams = pd.Index(list(teams), name='team_name')
+        self.metrics: List[MetricSpec] = list(metrics)
+        self.values = np.ascontiguousarray(values, dtype=np.float64).reshape(len(self.teams), len(self.metrics))
+        self._columns = {spec.name: j for j, spec in enumerate(self.metrics)}
+
+    @property
+    def names(self) -> List[str]:
+        return [spec.name for spec in self.metrics]
+
+    @property
+    def empty(self) -> bool:
+        return len(self.teams) == 0
+
+    def __contains__(self, name: str) -> bool:
+        """Whether the metric is in the matrix or can be derived from it."""
+        if name in self._columns:
+            return True
+        spec = self.registry.get(name)
+        if spec is None or spec.formula is None:
+            return False
+        return all(dep in self for dep in formula_names(spec.formula))
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    def _index(self, name: str) -> int:
+        if name not in self._columns:
+            self._derive(name)
+        return self._columns[name]
+
+    def _derive(self, name: str):
+        """Evaluate a formula metric and append it as a new column (cached)."""
+        spec = self.registry.get(name)
+        if spec is None or spec.formula is None:
+            raise KeyError(f"Metric '{name}' is not in the team matrix")
+        deps = formula_names(spec.formula)
+        values = evaluate_formula(spec.formula, {dep: self.column(dep) for dep in deps})
+        self.values = np.ascontiguousarray(np.column_stack([self.values, values]))
+        self.metrics.append(spec)
+        self._columns[name] = len(self.metrics) - 1
+
+    def spec(self, name: str) -> MetricSpec:
+        return self.metrics[self._index(name)]
+
+    def column(self, name: str) -> np.ndarray:
+        """View of one metric column (derived metrics are computed on first use)."""
+        index = self._index(name)
+        return self.values[:, index]
+
+    def columns(self, names: Iterable[str]) -> np.ndarray:
+        """Copy of several metric columns (teams x len(names))."""
+        index = [self._index(name) for name in names]
+        return self.values[:, index]
+
+    @classmethod
+    def from_team_stats(
+        cls,
+        team_stats: Mapping[str, Optional[pd.DataFrame]],
+        registry: Optional[MetricRegistry] = None,
+        extra: Iterable[str] = ()
+    ) -> 'TeamMatrix':
+        """
+        Build the matrix from aggregated team stats.
+
+        Args:
+            team_stats: Category frames (and ``{category}_by_position`` frames)
+                as returned by ``compute_team_stats``
+            registry: Metric registry (default: built-in metrics only)
+            extra: Declared metrics to pull in as well; column metrics are
+                read now, formula metrics are derived on first access
+
+        Returns:
+            TeamMatrix with the team metrics of every category, followed by
+            the per position group metrics and the extra column metrics
+        """
+        registry = registry or DEFAULT_REGISTRY
+        teams = set()
+        for df in team_stats.values():
+            if df is not None:
+                teams.update(df['team_name'].unique())
+        teams = pd.Index(sorted(teams))
+
+        specs, blocks = [], []
+        for category, metrics in SUMMARY_METRICS.items():
+            df = team_stats.get(category)
+            if df is None:
+                continue
+            present = [src for src in metrics if src in df.columns]
+            frame = df.drop_duplicates('team_name').set_index('team_name').reindex(teams)
+            blocks.append(frame[present].to_numpy(dtype=float, na_value=np.nan))
+            specs.extend(METRIC_SPECS[metrics[src]] for src in present)
+
+        for category, metrics in SUMMARY_METRICS.items():
+            by_position = team_stats.get(f"{category}_by_position")
+            if by_position is None or by_position.empty:
+                continue
+            groups = sorted(by_position['position_group'].astype(str).unique())
+            for src in (src for src in metrics if src in by_position.columns):
+                wide = by_position.pivot(index='team_name', columns='position_group', values=src)
+                wide.columns = wide.columns.astype(str)
+                blocks.append(wide.reindex(index=teams, columns=groups).to_numpy(dtype=float, na_value=np.nan))
+                specs.extend(METRIC_SPECS[metrics[src]].for_group(group) for group in groups)
+
+        present = {spec.name for spec in specs}
+        for name in (dep for name in extra for dep in registry.dependencies(name)):
+            spec = registry.get(name)
+            if name in present or spec.formula is not None:
+                continue
+            column = _team_column(team_stats, spec, teams)
+            if column is None:
+                print(f"⚠ Metric '{name}' skipped: no '{spec.source}' column in the {spec.category} stats")
+                continue
+            blocks.append(column[:, None])
+            specs.append(spec)
+            present.add(name)
+
+        values = np.hstack(blocks) if blocks else np.empty((len(teams), 0))
+        return cls(teams, specs, values, registry)
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        team_col: str = 'team_name',
+        registry: Optional[MetricRegistry] = None
+    ) -> 'TeamMatrix':
+        """
+        Build the matrix from a team summary (e.g. a team_summary.csv).
+
+        Only registered metric columns (and their position group breakouts)
+        are taken; score, interval and CFBD columns are ignored.
+        """
+        registry = registry or DEFAULT_REGISTRY
+        names = [col for col in df.columns if col != team_col and registry.get(str(col)) is not None]
+        values = np.column_stack([
+            pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            for name in names
+        ]) if names else np.empty((len(df), 0))
+        return cls(df[team_col].to_numpy(), [registry.get(name) for name in names], values, registry)
+
+    def to_frame(self) -> pd.DataFrame:
+        """The matrix as a DataFrame with a ``team_name`` column."""
+        frame = pd.DataFrame(self.values, columns=self.names)
+        frame.insert(0, 'team_name', self.teams.to_numpy())
+        return frame
+
+    def normalized(
+        self,
+        names: Optional[Iterable[str]] = None,
+        groups: Optional[Sequence] = None,
+        reference=None
+    ) -> np.ndarray:
+        """
+        Percentile-normalized columns in [-1, 1], oriented so higher is better.
+
+        Teams are ranked within ``groups`` or, with a ``reference``
+        (``percentiles.SeasonPercentiles``), against its frozen population.
+        """
+        names = self.names if names is None else list(names)
+        directions = [self.spec(name).higher_is_better for name in names]
+        if reference is not None:
+            return reference.normalize(self.columns(names), names, directions)
+        return normalize_columns(self.columns(names), directions, groups)
+
+    def weighted_scores(self, weights: Mapping[str, float], groups: Optional[Sequence] = None, reference=None):
+        """
+        Weighted mean of the normalized metrics.
+
+        Args:
+            weights: Metric name -> weight (names not in the matrix are skipped)
+            groups: Optional group label per team to normalize within
+            reference: Optional percentile reference to rank against instead
+
+        Returns:
+            Tuple of (score per team, weighted contributions teams x metrics,
+            metric names used); the score is 0 when no weight applies
+        """
+        names = [name for name in weights if name in self]
+        w = np.array([weights[name] for name in names], dtype=float)
+        contributions = self.normalized(names, groups, reference) * w
+        total = w.sum()
+        score = contributions.sum(axis=1) / total if total > 0 else np.zeros(len(self))
+        return score, contributions, names
+
+    def row_mean(self, names: Iterable[str]) -> np.ndarray:
+        """Per-team mean of the given metrics, skipping missing values (NaN if none)."""
+        names = [name for name in names if name in self]
+        if not names:
+            return np.full(len(self), np.nan)
+        block = self.columns(names)
+        present = ~np.isnan(block)
+        count = present.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, np.where(present, block, 0.0).sum(axis=1) / count, np.nan)
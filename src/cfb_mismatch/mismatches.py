@@ -0,0 +1,215 @@
+"""
+Game-level passing mismatches built from the team summary and CFBD games.
+
+For each matchup a simple passing-tilt metric is computed: each offense's
+receiving efficiency (YPRR) minus the opposing defense's coverage grade,
+summed for both sides. The team metrics come from the summary's
+``TeamMatrix`` (``OFFENSE_METRICS``/``COVERAGE_METRICS``), so score, interval
+and position group columns never leak into them. The top matchups can be
+written to CSV and Markdown, with both teams' recent margin form and their
+scoring against the opposing defense's scheme cluster when the pipeline adds
+them (see ``rolling`` and ``clustering``).
+"""
+
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.matrix import COVERAGE_METRICS, OFFENSE_METRICS, TeamMatrix
+from cfb_mismatch.output import write_bytes_atomic, write_frame
+
+
+def standardize_summary(summary: pd.DataFrame) -> pd.DataFrame:
+    """Rename the team name column of a summary to ``Team``."""
+    possible_team_cols = [
+        col
+        for col in summary.columns
+        if col.lower() in {"team", "team_name", "school", "school_name"}
+    ]
+    team_col = possible_team_cols[0] if possible_team_cols else summary.columns[0]
+    return summary.rename(columns={team_col: "Team"})
+
+
+def team_key(names) -> pd.Series:
+    """Upper-case, stripped team names: the key summaries, games and player stats are joined on."""
+    return pd.Series(names).astype(str).str.upper().str.strip()
+
+
+def load_summary(summary_path: str) -> pd.DataFrame:
+    """Load the team summary CSV produced by cfb-mismatch."""
+    return standardize_summary(pd.read_csv(summary_path))
+
+
+def load_games(season: int, season_type: str, cfbd_dir: str) -> pd.DataFrame:
+    """Load CFBD games CSV for the given season and type."""
+    file_name = f"{season}_{season_type}_games.csv"
+    path = os.path.join(cfbd_dir, file_name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Missing CFBD games file: {path}")
+    return pd.read_csv(path)
+
+
+def compute_metrics(summary: pd.DataFrame) -> pd.DataFrame:
+    """Compute offensive and defensive metrics based on available columns."""
+    summary = summary.copy()
+    matrix = TeamMatrix.from_frame(summary, team_col="Team")
+
+    # Offensive metric: average yards per route run (YPRR) across available facets
+    summary["OffenseMetric"] = matrix.row_mean(OFFENSE_METRICS)
+
+    # Defensive coverage metric: average of man/zone coverage grades
+    summary["CoverageMetric"] = matrix.row_mean(COVERAGE_METRICS)
+
+    # Add a key for joining
+    summary["TeamKey"] = team_key(summary["Team"])
+    return summary
+
+
+def merge_and_score(games: pd.DataFrame, summary: pd.DataFrame) -> pd.DataFrame:
+    """Merge team metrics into games and compute pass tilt for each matchup."""
+    games = games.copy()
+    games["home_team"] = games["home_team"].astype(str)
+    games["away_team"] = games["away_team"].astype(str)
+    games["home_team_key"] = team_key(games["home_team"])
+    games["away_team_key"] = team_key(games["away_team"])
+
+    # Merge home and away teams
+    merged = games.merge(
+        summary[["TeamKey", "OffenseMetric", "CoverageMetric", "Team"]],
+        left_on="home_team_key",
+        right_on="TeamKey",
+        how="left",
+    ).rename(
+        columns={
+            "OffenseMetric": "HomeOffense",
+            "CoverageMetric": "HomeCoverage",
+            "Team": "HomeTeamName",
+        }
+    )
+    merged = merged.merge(
+        summary[["TeamKey", "OffenseMetric", "CoverageMetric", "Team"]],
+        left_on="away_team_key",
+        right_on="TeamKey",
+        how="left",
+    ).rename(
+        columns={
+            "OffenseMetric": "AwayOffense",
+            "CoverageMetric": "AwayCoverage",
+            "Team": "AwayTeamName",
+        }
+    )
+
+    # Compute pass tilt: offense minus opponent coverage, summed for both sides
+    merged["home_pass_tilt"] = merged["HomeOffense"] - merged["AwayCoverage"]
+    merged["away_pass_tilt"] = merged["AwayOffense"] - merged["HomeCoverage"]
+    merged["tilt"] = merged["home_pass_tilt"] + merged["away_pass_tilt"]
+
+    # Determine week number if present; if not, default to NaN
+    if "week" not in merged.columns:
+        merged["week"] = merged["Week"] if "Week" in merged.columns else np.nan
+
+    merged["matchup"] = merged["home_team"] + " vs " + merged["away_team"]
+    return merged
+
+
+def top_mismatches(
+    games: pd.DataFrame,
+    summary: pd.DataFrame,
+    n: int = 10,
+    max_ci_width: Optional[float] = None
+) -> pd.DataFrame:
+    """
+    Score every matchup and return the ``n`` games with the largest tilt.
+
+    Args:
+        games: CFBD games DataFrame with ``home_team``/``away_team`` columns
+        summary: Team summary (as produced by ``generate_summary_report``)
+        n: Number of matchups to keep
+        max_ci_width: Keep only matchups where both teams' mismatch_score
+            bootstrap interval is at most this wide (needs the ``_ci_`` columns)
+
+    Returns:
+        DataFrame of the top matchups sorted by overall tilt
+    """
+    metrics = compute_metrics(standardize_summary(summary))
+    merged = merge_and_score(games, metrics)
+
+    if max_ci_width is not None:
+        if "mismatch_score_ci_low" not in metrics.columns:
+            raise ValueError(
+                "max_ci_width needs bootstrap intervals in the summary "
+                "(set bootstrap.replicates in settings.yaml)"
+            )
+        width = (metrics["mismatch_score_ci_high"] - metrics["mismatch_score_ci_low"])
+        width = width.set_axis(metrics["TeamKey"])
+        confident = (
+            (merged["home_team_key"].map(width) <= max_ci_width)
+            & (merged["away_team_key"].map(width) <= max_ci_width)
+        )
+        merged = merged[confident]
+
+    return merged.nlargest(n, "tilt").reset_index(drop=True)
+
+
+def report_week(top: pd.DataFrame) -> Optional[int]:
+    """Return the week of the first matchup with a valid week, if any."""
+    weeks = top["week"].dropna() if "week" in top.columns else pd.Series(dtype=float)
+    if weeks.empty:
+        return None
+    try:
+        return int(weeks.iloc[0])
+    except (TypeError, ValueError):
+        return None
+
+
+def write_mismatch_outputs(top: pd.DataFrame, outdir: str, week: Optional[int] = None) -> List[str]:
+    """
+    Write CSV and Markdown summaries of the top mismatches.
+
+    Args:
+        top: DataFrame from ``top_mismatches``
+        outdir: Output directory
+        week: Week used in the output file names (derived from ``top`` if None)
+
+    Returns:
+        List of written file paths
+    """
+    os.makedirs(outdir, exist_ok=True)
+    if week is None:
+        week = report_week(top)
+    week_str = str(int(week)) if week is not None else "unknown"
+    base_path = os.path.join(outdir, f"top_mismatches_week_{week_str}")
+    md_path = f"{base_path}.md"
+
+    top_fields = ["matchup", "week", "home_pass_tilt", "away_pass_tilt", "tilt"]
+    form_fields = ["home_margin_ewm", "away_margin_ewm", "margin_ewm_edge"]
+    if all(col in top.columns for col in form_fields):
+        top_fields += form_fields
+    cluster_fields = ["home_vs_cluster", "away_vs_cluster", "cluster_edge"]
+    if all(col in top.columns for col in cluster_fields):
+        top_fields += cluster_fields
+    csv_path, = write_frame(top[top_fields], base_path, 'csv')
+
+    # Generate Markdown overview
+    md_lines = [f"# Top {len(top)} Passing Mismatches", ""]
+    for _, row in top.iterrows():
+        wk = int(row["week"]) if pd.notna(row["week"]) else week_str
+        md_lines.append(f"## {row['matchup']} (Week {wk})")
+        md_lines.append(f"- Home pass tilt: {row['home_pass_tilt']:.2f}")
+        md_lines.append(f"- Away pass tilt: {row['away_pass_tilt']:.2f}")
+        md_lines.append(f"- Overall tilt: **{row['tilt']:.2f}**")
+        if "margin_ewm_edge" in top.columns and pd.notna(row["margin_ewm_edge"]):
+            md_lines.append(
+                f"- Recent margin (EWM): {row['home_margin_ewm']:+.1f} vs {row['away_margin_ewm']:+.1f}"
+            )
+        if "cluster_edge" in top.columns and pd.notna(row["cluster_edge"]):
+            md_lines.append(
+                f"- Points vs this defense scheme: {row['home_vs_cluster']:+.1f} vs {row['away_vs_cluster']:+.1f}"
+            )
+        md_lines.append("")
+    write_bytes_atomic(md_path, "\n".join(md_lines).encode("utf-8"))
+    print(f"✓ Wrote {csv_path} and {md_path}")
+
+    return [csv_path, md_path]
@@ -0,0 +1,96 @@
+"""
+Publish mismatch summaries to a Notion database.
+
+Each matchup row becomes a page in the configured database. Rows are taken
+straight from the top-mismatches DataFrame so the pipeline can publish without
+re-reading the CSV it just wrote.
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+import requests
+
+NOTION_PAGES_URL = "https://api.notion.com/v1/pages"
+NOTION_VERSION = "2022-06-28"
+
+
+def get_notion_creds(
+    token: Optional[str] = None,
+    database_id: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    Resolve the Notion token and database ID from arguments or environment.
+
+    Raises:
+        ValueError: If either value is missing
+    """
+    token = token or os.getenv("NOTION_TOKEN")
+    database_id = database_id or os.getenv("NOTION_DATABASE_ID")
+    if not token:
+        raise ValueError(
+            "Missing Notion token. Set NOTION_TOKEN env var or use --token."
+        )
+    if not database_id:
+        raise ValueError(
+            "Missing Notion database ID. Set NOTION_DATABASE_ID env var or use --database-id."
+        )
+    return token, database_id
+
+
+def page_payload(
+    row: Dict[str, Any], season: int, week: int, database_id: str
+) -> Dict[str, Any]:
+    """Construct the JSON payload for a Notion page representing a matchup."""
+    return {
+        "parent": {"database_id": database_id},
+        "properties": {
+            "Matchup": {
+                "title": [{"text": {"content": str(row.get("matchup"))}}]
+            },
+            "Week": {"number": week},
+            "Season": {"number": season},
+            "HomePassTilt": {
+                "number": float(row.get("home_pass_tilt", 0))
+            },
+            "AwayPassTilt": {
+                "number": float(row.get("away_pass_tilt", 0))
+            },
+            "Tilt": {"number": float(row.get("tilt", 0))},
+        },
+    }
+
+
+def push_mismatches_to_notion(
+    mismatches: pd.DataFrame, season: int, week: int, token: str, database_id: str
+) -> int:
+    """
+    Create one Notion page per matchup row.
+
+    Args:
+        mismatches: DataFrame with matchup, home_pass_tilt, away_pass_tilt and tilt columns
+        season: Season year for the page properties
+        week: Week number for the page properties
+        token: Notion integration token
+        database_id: Target Notion database ID
+
+    Returns:
+        Number of pages created
+    """
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Notion-Version": NOTION_VERSION,
+        "Content-Type": "application/json",
+    }
+    created = 0
+    for _, row in mismatches.iterrows():
+        payload = page_payload(row, season, week, database_id)
+        resp = requests.post(NOTION_PAGES_URL, headers=headers, json=payload)
+        if resp.status_code != 200:
+            raise RuntimeError(
+                f"Failed to create Notion page for {row.get('matchup')}: {resp.text}"
+            )
+        print(f"Created Notion page for {row.get('matchup')}")
+        created += 1
+    return created
@@ -0,0 +1,176 @@
+"""
+Output writer: multi-format, concurrent, atomic and change-aware.
+
+Every frame is serialized in memory, compared against the file already on
+disk by content hash, and only rewritten when it changed. Writes go to a temp
+file in the target directory followed by an atomic rename, so readers such as
+the report publishing workflow never see a half-written file. Multiple files
+are written concurrently.
+"""
+
+import gzip
+import hashlib
+import io
+import os
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# Supported output formats and their file extensions
+OUTPUT_FORMATS = {
+    'csv': '.csv',
+    'csv.gz': '.csv.gz',
+    'parquet': '.parquet',
+    'feather': '.feather',
+}
+
+DEFAULT_FORMATS = ('csv',)
+
+
+def serialize_frame(df: pd.DataFrame, fmt: str = 'csv') -> bytes:
+    """
+    Serialize a DataFrame to bytes in the requested format.
+
+    Args:
+        df: DataFrame to serialize
+        fmt: One of ``OUTPUT_FORMATS``
+
+    Returns:
+        Serialized file content
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format '{fmt}'. Choose from {sorted(OUTPUT_FORMATS)}")
+
+    if fmt in ('csv', 'csv.gz'):
+        data = df.to_csv(index=False).encode('utf-8')
+        # mtime=0 keeps the gzip header, and therefore the content hash, stable
+        return gzip.compress(data, mtime=0) if fmt == 'csv.gz' else data
+
+    buffer = io.BytesIO()
+    try:
+        if fmt == 'parquet':
+            df.to_parquet(buffer, index=False)
+        else:
+            df.reset_index(drop=True).to_feather(buffer)
+    except ImportError as e:
+        raise ImportError(f"Writing {fmt} output requires pyarrow (pip install pyarrow): {e}") from e
+    return buffer.getvalue()
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path: str) -> Optional[str]:
+    """Return the SHA-256 of a file's content, or None if it doesn't exist."""
+    if not os.path.exists(path):
+        return None
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def write_bytes_atomic(path: str, data: bytes, skip_unchanged: bool = True) -> bool:
+    """
+    Write bytes to ``path`` via a temp file and atomic rename.
+
+    Args:
+        path: Destination file path
+        data: File content
+        skip_unchanged: Leave the file untouched if its content hash already matches
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    if skip_unchanged and file_digest(path) == _digest(data):
+        return False
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates 0600 files; keep the existing mode or use a readable default
+        mode = stat.S_IMODE(os.stat(path).st_mode) if os.path.exists(path) else 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def write_frame(
+    df: pd.DataFrame,
+    base_path: str,
+    fmt: str = 'csv',
+    skip_unchanged: bool = True
+) -> Dict[str, bool]:
+    """
+    Write a single DataFrame in one format.
+
+    Args:
+        df: DataFrame to write
+        base_path: Destination path without extension
+        fmt: One of ``OUTPUT_FORMATS``
+        skip_unchanged: Skip the write if the existing file has identical content
+
+    Returns:
+        Mapping of the output path to whether it was (re)written
+    """
+    data = serialize_frame(df, fmt)
+    path = base_path + OUTPUT_FORMATS[fmt]
+    return {path: write_bytes_atomic(path, data, skip_unchanged)}
+
+
+def write_frames(
+    frames: Dict[str, pd.DataFrame],
+    formats: Optional[Iterable[str]] = None,
+    max_workers: Optional[int] = None,
+    skip_unchanged: bool = True
+) -> Dict[str, bool]:
+    """
+    Write several DataFrames in every requested format concurrently.
+
+    Args:
+        frames: Mapping of destination path (without extension) to DataFrame
+        formats: Output formats (defaults to CSV only)
+        max_workers: Thread pool size (defaults to one per file, capped at 8)
+        skip_unchanged: Skip writes whose content hash is unchanged
+
+    Returns:
+        Mapping of each output path to whether it was (re)written
+    """
+    formats = list(formats or DEFAULT_FORMATS)
+    unknown = [fmt for fmt in formats if fmt not in OUTPUT_FORMATS]
+    if unknown:
+        raise ValueError(f"Unsupported output format(s) {unknown}. Choose from {sorted(OUTPUT_FORMATS)}")
+
+    jobs = [(base_path, df, fmt) for base_path, df in frames.items() for fmt in formats]
+    if not jobs:
+        return {}
+
+    results: Dict[str, bool] = {}
+    workers = max_workers or min(8, len(jobs))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(write_frame, df, base_path, fmt, skip_unchanged)
+            for base_path, df, fmt in jobs
+        ]
+        for future in futures:
+            results.update(future.result())
+    return results
+
+
+def report_writes(results: Dict[str, bool]) -> List[str]:
+    """Print one line per output and return the paths that were rewritten."""
+    for path, written in results.items():
+        print(f"✓ Saved {path}" if written else f"✓ Unchanged {path}")
+    return [path for path, written in results.items() if written]
@@ -0,0 +1,205 @@
+"""
+Percentile index: score teams against a frozen reference population.
+
+Normalization ranks every metric over the teams of the current run, so a
+team's score moves whenever any other team's stats change, and a new or
+hypothetical team can only be scored by re-ranking everyone. A
+``PercentileIndex`` stores, per season, the sorted values of every metric of
+a reference summary. A raw value maps to its percentile with two binary
+searches:
+
+    percentile = (searchsorted(left) + searchsorted(right) + 1) / (2 * n)
+
+which is pandas' average-rank ``rank(pct=True)`` for values in the reference
+(so scoring the reference teams reproduces the run that built it) and the
+mid-point between neighbours for any other value (capped at 1 above the
+reference maximum). Tiers are cut at the
+quintiles of the reference ``mismatch_score``, so scores and tiers stay
+comparable from week to week.
+
+The index is saved as a single ``.npz`` file and reused across runs.
+"""
+
+import io
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.main import _compute_weighted_scores
+from cfb_mismatch.matrix import MISMATCH_TIERS, MetricRegistry, TeamMatrix, normalize_columns
+from cfb_mismatch.output import write_bytes_atomic
+
+# Bump when the file layout changes; older indexes are ignored
+INDEX_VERSION = 1
+
+SCORE_KEY = 'mismatch_score'
+
+
+class SeasonPercentiles:
+    """
+    Sorted reference values of every metric of one season.
+
+    Args:
+        values: Metric name -> sorted reference values (no NaN)
+    """
+
+    def __init__(self, values: Dict[str, np.ndarray]):
+        self.values = values
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.values
+
+    @property
+    def names(self) -> List[str]:
+        return [name for name in self.values if name != SCORE_KEY]
+
+    def percentile(self, name: str, values: np.ndarray) -> np.ndarray:
+        """Percentile (0-1] of raw ``values`` of a metric; NaN stays NaN."""
+        reference = self.values[name]
+        x = np.asarray(values, dtype=float)
+        left = np.searchsorted(reference, x, side='left')
+        right = np.searchsorted(reference, x, side='right')
+        if len(reference) == 0:
+            return np.full(x.shape, np.nan)
+        pct = np.minimum((left + right + 1) / (2.0 * len(reference)), 1.0)
+        return np.where(np.isnan(x), np.nan, pct)
+
+    def normalize(self, values: np.ndarray, names: Sequence[str], higher_is_better: Sequence[bool]) -> np.ndarray:
+        """
+        Like ``matrix.normalize_columns`` but ranked against the reference.
+
+        Metrics missing from the reference are ranked within ``values``.
+        """
+        scaled = np.zeros_like(values, dtype=float)
+        local = [j for j, name in enumerate(names) if name not in self.values]
+        for j, (name, higher) in enumerate(zip(names, higher_is_better)):
+            if name not in self.values:
+                continue
+            reference = self.values[name]
+            if len(reference) == 0 or reference[0] == reference[-1]:
+                continue
+            pct = self.percentile(name, values[:, j])
+            if not higher:
+                pct = 1 - pct
+            scaled[:, j] = np.nan_to_num((pct - 0.5) * 2, nan=0.0)
+        if local:
+            scaled[:, local] = normalize_columns(values[:, local], [higher_is_better[j] for j in local])
+        return scaled
+
+    def tiers(self, scores: pd.Series) -> pd.Series:
+        """Tiers cut at the quintiles of the reference ``mismatch_score``."""
+        if SCORE_KEY not in self.values or len(self.values[SCORE_KEY]) == 0:
+            raise KeyError("The percentile index has no reference mismatch_score")
+        inner = np.linspace(0, 1, len(MISMATCH_TIERS) + 1)[1:-1]
+        edges = np.quantile(self.values[SCORE_KEY], inner)
+        x = scores.to_numpy(dtype=float)
+        codes = np.where(np.isnan(x), -1, (x[:, None] > edges[None, :]).sum(axis=1))
+        return pd.Series(pd.Categorical.from_codes(codes, MISMATCH_TIERS, ordered=True), index=scores.index)
+
+
+class PercentileIndex:
+    """Reference percentiles of several seasons, persisted as one ``.npz`` file."""
+
+    def __init__(self):
+        self.seasons: Dict[int, SeasonPercentiles] = {}
+
+    def __contains__(self, season: int) -> bool:
+        return int(season) in self.seasons
+
+    def season(self, season: int) -> SeasonPercentiles:
+        """Reference of one season (KeyError if not indexed)."""
+        if int(season) not in self.seasons:
+            raise KeyError(f"Season {season} is not in the percentile index")
+        return self.seasons[int(season)]
+
+    def add_summary(
+        self,
+        season: int,
+        summary: pd.DataFrame,
+        registry: Optional[MetricRegistry] = None,
+        team_col: str = 'team_name'
+    ):
+        """
+        Index every metric (and the ``mismatch_score``) of a summary as ``season``'s reference.
+
+        Replaces any reference already indexed for the season.
+        """
+        matrix = TeamMatrix.from_frame(summary, team_col=team_col, registry=registry)
+        values = {}
+        for j, name in enumerate(matrix.names):
+            column = matrix.values[:, j]
+            values[name] = np.sort(column[~np.isnan(column)])
+        if SCORE_KEY in summary.columns:
+            scores = summary[SCORE_KEY].to_numpy(dtype=float, na_value=np.nan)
+            values[SCORE_KEY] = np.sort(scores[~np.isnan(scores)])
+        self.seasons[int(season)] = SeasonPercentiles(values)
+
+    def save(self, path: str):
+        """Write the index atomically."""
+        arrays = {}
+        layout = {'version': INDEX_VERSION, 'seasons': {}}
+        for season, reference in self.seasons.items():
+            names = list(reference.values)
+            layout['seasons'][str(season)] = names
+            for k, name in enumerate(names):
+                arrays[f's{season}_{k}'] = reference.values[name]
+        buffer = io.BytesIO()
+        np.savez(buffer, _layout=np.array(json.dumps(layout)), **arrays)
+        write_bytes_atomic(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path: str) -> 'PercentileIndex':
+        """Load the index from ``path`` (empty if missing or from an older layout)."""
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        with np.load(path, allow_pickle=False) as data:
+            layout = json.loads(str(data['_layout']))
+            if layout.get('version') != INDEX_VERSION:
+                print(f"⚠ Ignoring percentile index {path} with an older layout")
+                return index
+            for season, names in layout['seasons'].items():
+                index.seasons[int(season)] = SeasonPercentiles({
+                    name: data[f's{season}_{k}'] for k, name in enumerate(names)
+                })
+        return index
+
+
+def percentile_reference(config: Dict, season: Optional[int]) -> Optional[SeasonPercentiles]:
+    """
+    The reference configured under ``percentiles`` for ``season``.
+
+    Returns None (rank within the run) when no index is configured or built
+    yet, or the season isn't indexed (build it with ``cfb-mismatch
+    percentiles``). ``percentiles.season`` pins the reference season.
+    """
+    section = config.get('percentiles') or {}
+    path = section.get('path')
+    season = section.get('season') or season
+    if not path or season is None or not os.path.exists(path):
+        return None
+    index = PercentileIndex.load(path)
+    if season not in index:
+        print(f"⚠ Season {season} is not in the percentile index {path}; ranking against this run's teams")
+        return None
+    print(f"✓ Scoring against the {season} percentile index")
+    return index.season(season)
+
+
+def score_frame(frame: pd.DataFrame, reference: SeasonPercentiles, weights: Dict) -> pd.DataFrame:
+    """
+    Score raw team metrics (e.g. new or hypothetical teams) against a reference.
+
+    Args:
+        frame: Summary-style rows (``team_name`` plus raw metric columns)
+        reference: Season reference from a ``PercentileIndex``
+        weights: Feature weights dictionary from weights.yaml
+
+    Returns:
+        ``frame`` with the ``*_score`` contributions, ``mismatch_score`` and
+        ``mismatch_tier``; only its own rows are ranked, O(log n) per value
+    """
+    return _compute_weighted_scores(frame.copy(), weights, reference=reference)
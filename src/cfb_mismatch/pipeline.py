@@ -0,0 +1,440 @@
+"""
+In-process pipeline API: fetch, analyze, top mismatches and publishing.
+
+Each stage takes and returns DataFrames in memory so a scheduled run needs a
+single interpreter and never re-reads the CSVs it just wrote. The CLI,
+``run_model.py`` and the helper scripts are thin wrappers around these
+functions.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from cfb_mismatch.adapters.cfbd_data import (
+    aggregate_team_games,
+    fetch_and_save_cfbd_data,
+    fetch_cfbd_games_from_api,
+    fetch_cfbd_team_info_from_api,
+    game_store_digests,
+    load_cfbd_games,
+    load_cfbd_team_info
+)
+from cfb_mismatch.bootstrap import add_confidence_intervals
+from cfb_mismatch.clustering import SchemeClusters, add_cluster_labels, add_matchup_clusters, clusters_from_config
+from cfb_mismatch.main import (
+    load_config,
+    load_weights,
+    load_all_stats,
+    compute_team_stats,
+    stream_team_stats,
+    generate_summary_report,
+    generate_integrated_report,
+    team_groups
+)
+from cfb_mismatch.manifest import (
+    build_fingerprint,
+    explain_changes,
+    hash_object,
+    load_manifest,
+    write_manifest
+)
+from cfb_mismatch.matrix import MetricRegistry
+from cfb_mismatch.mismatches import report_week, top_mismatches, write_mismatch_outputs
+from cfb_mismatch.notion import get_notion_creds, push_mismatches_to_notion
+from cfb_mismatch.output import file_digest, write_frames, report_writes
+from cfb_mismatch.percentiles import percentile_reference
+from cfb_mismatch.ratings import add_team_ratings, ratings_from_config
+from cfb_mismatch.rolling import TeamForm, add_matchup_form, add_team_form, form_from_config
+
+
+@dataclass
+class PipelineResult:
+    """Everything produced by a pipeline run, kept in memory."""
+
+    config: Dict
+    weights: Optional[Dict]
+    team_stats: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    games: Optional[pd.DataFrame] = None
+    team_info: Optional[pd.DataFrame] = None
+    cfbd_team_stats: Optional[pd.DataFrame] = None
+    form: Optional[TeamForm] = None
+    clusters: Dict[str, SchemeClusters] = field(default_factory=dict)
+    season: Optional[int] = None
+    season_type: str = "regular"
+    summary: pd.DataFrame = field(default_factory=pd.DataFrame)
+    top_mismatches: Optional[pd.DataFrame] = None
+    written: List[str] = field(default_factory=list)
+    fingerprint: Optional[Dict] = None
+    rerun_reasons: List[str] = field(default_factory=list)
+    reused: bool = False
+
+
+def fetch_stage(
+    season: int,
+    season_type: str = "regular",
+    data_dir: str = "data/cfbd",
+    api_key: Optional[str] = None,
+    save: bool = True
+) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+    """
+    Fetch CFBD games and team info from the API.
+
+    Args:
+        season: Season year to fetch
+        season_type: 'regular' or 'postseason'
+        data_dir: Directory the fetched data is cached to when ``save`` is True
+        api_key: CFBD API key (defaults to CFBD_API_KEY)
+        save: Also write the fetched data to ``data_dir``
+
+    Returns:
+        Tuple of (games_df, team_info_df)
+    """
+    if save:
+        return fetch_and_save_cfbd_data(season, season_type, data_dir, api_key)
+    return (
+        fetch_cfbd_games_from_api(season, season_type, api_key),
+        fetch_cfbd_team_info_from_api(api_key)
+    )
+
+
+def _load_recorded_summary(output_dir: str, manifest: Dict) -> pd.DataFrame:
+    """Load the summary written by a previous run, in whichever format it recorded."""
+    readers = {
+        'team_summary.csv': pd.read_csv,
+        'team_summary.csv.gz': pd.read_csv,
+        'team_summary.parquet': pd.read_parquet,
+        'team_summary.feather': pd.read_feather,
+    }
+    for name, reader in readers.items():
+        if name in manifest.get('outputs', {}):
+            return reader(os.path.join(output_dir, name))
+    return pd.DataFrame()
+
+
+def analyze_stage(
+    config: Dict,
+    weights: Optional[Dict],
+    season: Optional[int] = None,
+    season_type: str = "regular",
+    games_df: Optional[pd.DataFrame] = None,
+    team_info_df: Optional[pd.DataFrame] = None,
+    fetch_from_api: bool = False,
+    api_key: Optional[str] = None,
+    output_dir: Optional[str] = None,
+    force: bool = False,
+    run_options: Optional[Dict] = None
+) -> PipelineResult:
+    """
+    Load the stats files, aggregate them per team and build the summary.
+
+    CFBD games are taken from ``games_df`` when given; otherwise, if a season
+    is given, they are fetched from the API or loaded from the CFBD data dir.
+
+    When ``output_dir`` is given the run is fingerprinted and compared with the
+    manifest of the previous run there. If nothing changed the stats files are
+    not parsed at all: the result is marked ``reused`` and the existing outputs
+    are kept.
+
+    Args:
+        config: Configuration dictionary from settings.yaml
+        weights: Feature weights dictionary from weights.yaml
+        season: Season to integrate CFBD data for
+        season_type: 'regular' or 'postseason'
+        games_df: Already loaded CFBD games (e.g. from ``fetch_stage``)
+        team_info_df: Already loaded CFBD team info
+        fetch_from_api: Fetch CFBD data from the API instead of local files
+        api_key: CFBD API key (only used if fetch_from_api=True)
+        output_dir: Directory holding the previous run's outputs and manifest
+        force: Recompute even if the manifest says nothing changed
+        run_options: Extra options that affect outputs (recorded in the manifest)
+
+    Returns:
+        PipelineResult with team stats, CFBD data and summary populated
+    """
+    result = PipelineResult(config=config, weights=weights, season=season, season_type=season_type)
+
+    if games_df is None and season:
+        print(f"\nLoading CFBD data for season {season}...")
+        data_dir = config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+        if fetch_from_api:
+            games_df, team_info_df = fetch_stage(season, season_type, data_dir, api_key, save=False)
+        else:
+            games_df = load_cfbd_games(season, season_type, data_dir)
+            team_info_df = load_cfbd_team_info(data_dir)
+
+        if games_df is not None:
+            print(f"✓ Loaded {len(games_df)} CFBD games for {season} {season_type} season")
+        else:
+            print(f"⚠ No CFBD games data found for {season} {season_type} season")
+
+    result.games = games_df
+    result.team_info = team_info_df
+
+    if output_dir is not None:
+        options = {'season': season, 'season_type': season_type}
+        options.update(run_options or {})
+        index_path = (config.get('percentiles') or {}).get('path')
+        if index_path:
+            options['percentile_index'] = file_digest(index_path)
+        if (config.get('ratings') or config.get('rolling')) and season is not None:
+            # Ratings and form are built from every season in the game store, not just games_df
+            store_dir = config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+            options['game_store'] = hash_object(game_store_digests(store_dir))
+        cfbd_frames = {'games': games_df}
+        if (config.get('normalization') or {}).get('group_by'):
+            # Grouped scores and tiers depend on the teams' conferences/classifications
+            if team_info_df is None:
+                team_info_df = load_cfbd_team_info(config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd'))
+                result.team_info = team_info_df
+            cfbd_frames['team_info'] = team_info_df
+        result.fingerprint = build_fingerprint(config, weights, cfbd_frames, options)
+        previous = load_manifest(output_dir)
+        result.rerun_reasons = explain_changes(previous, result.fingerprint, output_dir)
+        if force:
+            result.rerun_reasons.insert(0, "forced rerun")
+
+        if not result.rerun_reasons:
+            print(f"\n✓ Inputs unchanged since last run; reusing outputs in {output_dir}")
+            result.summary = _load_recorded_summary(output_dir, previous)
+            result.reused = True
+            return result
+        print(f"\nRerun triggered: {'; '.join(result.rerun_reasons)}")
+
+    player_stats = None
+    if config.get('stats_chunksize') and not config.get('stats_store_dir'):
+        print(f"\nStreaming stats files in chunks of {config['stats_chunksize']} rows...")
+        result.team_stats = stream_team_stats(config)
+    else:
+        print("\nLoading stats files...")
+        defense_df, receiving_concept_df, receiving_scheme_df = load_all_stats(config)
+        player_stats = {
+            'defense_coverage': defense_df,
+            'receiving_concept': receiving_concept_df,
+            'receiving_scheme': receiving_scheme_df,
+        }
+
+        print("\nComputing team-level statistics...")
+        result.team_stats = compute_team_stats(
+            defense_df, receiving_concept_df, receiving_scheme_df,
+            store_dir=config.get('stats_store_dir'),
+            position_groups=config.get('position_groups')
+        )
+
+    if games_df is not None:
+        result.cfbd_team_stats = aggregate_team_games(games_df)
+        print(f"✓ Aggregated CFBD stats for {len(result.cfbd_team_stats)} teams")
+        if config.get('ratings') and season is not None:
+            ratings = ratings_from_config(config)
+            result.cfbd_team_stats = add_team_ratings(result.cfbd_team_stats, ratings, season, season_type)
+        if config.get('rolling') and season is not None:
+            result.form = form_from_config(config)
+            result.cfbd_team_stats = add_team_form(result.cfbd_team_stats, result.form, season, None, season_type)
+
+    print("\nGenerating summary report...")
+    registry = MetricRegistry.from_config(config)
+    groups = team_groups(config, team_info_df)
+    reference = percentile_reference(config, season)
+    if result.cfbd_team_stats is not None:
+        result.summary = generate_integrated_report(
+            result.team_stats, result.cfbd_team_stats, weights=weights, registry=registry, games=games_df,
+            groups=groups, reference=reference
+        )
+        print("✓ Generated integrated report with CFBD data")
+    else:
+        result.summary = generate_summary_report(
+            result.team_stats, weights=weights, registry=registry, groups=groups, reference=reference
+        )
+        print("✓ Generated summary report (user stats only)")
+
+    if config.get('clustering') and not result.summary.empty:
+        result.clusters = clusters_from_config(config, result.summary)
+        result.summary = add_cluster_labels(result.summary, result.clusters)
+
+    bootstrap = config.get('bootstrap') or {}
+    if bootstrap.get('replicates'):
+        if player_stats is None:
+            print("⚠ Skipping bootstrap intervals (needs player rows; unset stats_chunksize)")
+        else:
+            replicates = int(bootstrap['replicates'])
+            print(f"\nBootstrapping {replicates} replicates for confidence intervals...")
+            result.summary = add_confidence_intervals(
+                result.summary,
+                player_stats,
+                weights,
+                replicates=replicates,
+                confidence=float(bootstrap.get('confidence', 0.9)),
+                seed=int(bootstrap.get('seed', 0)),
+                n_jobs=int(bootstrap.get('n_jobs', 1)),
+                position_groups=config.get('position_groups'),
+                share_backend=config.get('shared_memory', 'shm'),
+                registry=registry,
+                groups=groups,
+                reference=reference
+            )
+            print("✓ Added bootstrap confidence intervals to the summary")
+
+    return result
+
+
+def mismatches_stage(
+    result: PipelineResult,
+    top_n: int = 10,
+    max_ci_width: Optional[float] = None
+) -> Optional[pd.DataFrame]:
+    """
+    Compute the top passing mismatches from the in-memory games and summary.
+
+    ``max_ci_width`` (default: ``bootstrap.max_ci_width`` from the config)
+    drops matchups where either team's mismatch_score interval is wider.
+    With team form (the ``rolling`` config section), each matchup gets both
+    teams' margin form before its week; with scheme clusters (``clustering``),
+    each offense's scoring against the opposing defense's cluster.
+    """
+    if result.reused:
+        return None
+    if result.games is None or result.games.empty or result.summary.empty:
+        print("⚠ Skipping top mismatches (needs CFBD games and a team summary)")
+        return None
+
+    if max_ci_width is None:
+        max_ci_width = (result.config.get('bootstrap') or {}).get('max_ci_width')
+    result.top_mismatches = top_mismatches(
+        result.games, result.summary, n=top_n, max_ci_width=max_ci_width
+    )
+    if result.form is not None and result.season is not None:
+        result.top_mismatches = add_matchup_form(
+            result.top_mismatches, result.form, result.season, result.season_type
+        )
+    if result.clusters:
+        result.top_mismatches = add_matchup_clusters(result.top_mismatches, result.games, result.summary)
+    print(f"✓ Scored {len(result.games)} matchups, kept top {len(result.top_mismatches)}")
+    return result.top_mismatches
+
+
+def publish_stage(
+    result: PipelineResult,
+    output_dir: str,
+    formats: Optional[Iterable[str]] = None
+) -> List[str]:
+    """
+    Write the team stats, summary and top mismatches to ``output_dir``.
+
+    Team stats and the summary are written concurrently and atomically in
+    every requested format (default: ``output_formats`` from the config, or CSV).
+
+    If the run was fingerprinted, a manifest of the inputs and outputs is
+    written alongside them. Reused runs write nothing.
+
+    Returns:
+        List of output file paths (including ones whose content was unchanged)
+    """
+    if result.reused:
+        previous = load_manifest(output_dir) or {}
+        return [os.path.join(output_dir, path) for path in previous.get('outputs', {})]
+
+    if formats is None:
+        formats = result.config.get('output_formats') or ['csv']
+
+    print(f"\nSaving team statistics to {output_dir}...")
+    os.makedirs(output_dir, exist_ok=True)
+    frames = {
+        os.path.join(output_dir, f"team_{category}"): df
+        for category, df in result.team_stats.items()
+    }
+    frames[os.path.join(output_dir, "team_summary")] = result.summary
+    results = write_frames(frames, formats)
+    report_writes(results)
+    written = list(results)
+
+    if result.top_mismatches is not None:
+        written.extend(write_mismatch_outputs(result.top_mismatches, output_dir))
+
+    if result.fingerprint is not None:
+        path = write_manifest(output_dir, result.fingerprint, written, result.rerun_reasons)
+        print(f"✓ Saved {path}")
+
+    result.written.extend(written)
+    return written
+
+
+def notion_stage(
+    result: PipelineResult,
+    season: int,
+    token: Optional[str] = None,
+    database_id: Optional[str] = None
+) -> int:
+    """Push the in-memory top mismatches to Notion. Returns pages created."""
+    if result.top_mismatches is None or result.top_mismatches.empty:
+        print("⚠ No mismatches to publish to Notion")
+        return 0
+
+    token, database_id = get_notion_creds(token, database_id)
+    week = report_week(result.top_mismatches)
+    return push_mismatches_to_notion(result.top_mismatches, season, week, token, database_id)
+
+
+def run_pipeline(
+    config_path: str = "configs/settings.yaml",
+    weights_path: str = "configs/weights.yaml",
+    output_dir: Optional[str] = None,
+    season: Optional[int] = None,
+    season_type: str = "regular",
+    fetch_cfbd: bool = False,
+    api_key: Optional[str] = None,
+    top_n: int = 10,
+    publish_notion: bool = False,
+    formats: Optional[Iterable[str]] = None,
+    force: bool = False,
+    max_ci_width: Optional[float] = None
+) -> PipelineResult:
+    """
+    Run fetch, analyze, top mismatches and publishing in one process.
+
+    Args:
+        config_path: Path to settings.yaml
+        weights_path: Path to weights.yaml
+        output_dir: Output directory (defaults to the config ``output_dir``)
+        season: Season to integrate CFBD data for (None analyzes stats files only)
+        season_type: 'regular' or 'postseason'
+        fetch_cfbd: Fetch fresh CFBD data from the API (and cache it locally)
+        api_key: CFBD API key (defaults to CFBD_API_KEY)
+        top_n: Number of top mismatches to report
+        publish_notion: Also push the top mismatches to Notion
+        formats: Output formats (defaults to ``output_formats`` in the config)
+        force: Rerun even if the run manifest shows nothing changed
+        max_ci_width: Only report matchups whose teams' mismatch_score
+            bootstrap intervals are at most this wide
+
+    Returns:
+        PipelineResult with all intermediate DataFrames
+    """
+    config = load_config(config_path)
+    weights = load_weights(weights_path)
+    output_dir = output_dir or config.get('output_dir', 'data/out')
+
+    games_df = team_info_df = None
+    if season and fetch_cfbd:
+        print(f"\nFetching CFBD data for season {season}...")
+        data_dir = config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+        games_df, team_info_df = fetch_stage(
+            season, season_type, data_dir, api_key or os.getenv("CFBD_API_KEY")
+        )
+
+    formats = list(formats or config.get('output_formats') or ['csv'])
+    result = analyze_stage(
+        config, weights, season, season_type,
+        games_df=games_df, team_info_df=team_info_df,
+        output_dir=output_dir, force=force,
+        run_options={'command': 'run', 'formats': formats, 'top_n': top_n,
+                     'max_ci_width': max_ci_width}
+    )
+    mismatches_stage(result, top_n, max_ci_width)
+    publish_stage(result, output_dir, formats)
+
+    if publish_notion and season and not result.reused:
+        notion_stage(result, season)
+
+    return result
@@ -0,0 +1,305 @@
+"""
+Player-level receiver-vs-defender matchups for scheduled games.
+
+Each team's receivers (``receiving_scheme``, with the slot share from
+``receiving_concept``) are paired with the opposing coverage defenders
+(``defense_coverage_scheme``) whose position the ``pairings`` config allows
+for the receiver's position or alignment (e.g. WR vs CB, slot WR vs CB/S,
+TE vs LB/S). A pair's score is the receiver's edge in man and in zone
+coverage, weighted by how often the defense plays man:
+
+    score = man_rate * (z(rec man_yprr) - z(def man grade))
+            + (1 - man_rate) * (z(rec zone_yprr) - z(def zone grade))
+
+with z-scores over the qualifying players (missing values score average).
+
+Players are packed into padded (team x slot x feature) arrays, so a block of
+games gathers its offenses and defenses with one fancy index each and scores
+every pair of both directions as a (games x receivers x defenders)
+broadcast; ``np.argpartition`` then keeps the top ``k`` pairs per game. Blocks
+bound memory, and no pandas cross merge is ever built.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.mismatches import team_key
+
+# Receiver position or alignment -> defender positions it is matched against
+DEFAULT_PAIRINGS = {
+    'WR': ['CB'],
+    'SLOT': ['CB', 'S'],
+    'TE': ['LB', 'S'],
+    'HB': ['LB'],
+}
+
+# (man, zone) feature columns per side
+RECEIVER_FEATURES = ['man_yprr', 'zone_yprr']
+DEFENDER_FEATURES = ['man_grades_coverage_defense', 'zone_grades_coverage_defense']
+
+
+@dataclass
+class MatchupSettings:
+    """Pairings, qualifying volume, players kept per team, top pairs per game and games per block."""
+
+    pairings: Dict[str, List[str]]
+    min_routes: int = 50
+    min_coverage_snaps: int = 50
+    slot_share: float = 0.5
+    max_players: int = 12
+    top_k: int = 3
+    block_size: int = 256
+
+    def __post_init__(self):
+        if self.top_k < 1:
+            raise ValueError(f"player_matchups.top_k must be at least 1, got {self.top_k}")
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'MatchupSettings':
+        """
+        Settings from the ``player_matchups`` config section.
+
+        Raises:
+            ValueError: If ``top_k`` is below 1
+        """
+        section = dict((config or {}).get('player_matchups') or {})
+        pairings = section.pop('pairings', None) or DEFAULT_PAIRINGS
+        return cls(pairings={str(k).upper(): [str(p).upper() for p in v] for k, v in pairings.items()}, **section)
+
+
+@dataclass
+class PlayerBlock:
+    """
+    Players of one side packed per team.
+
+    ``rows`` (teams x slots) points into ``players`` (-1 for padding);
+    ``z`` holds the (man, zone) z-scores and ``group`` the pairing code.
+    """
+
+    teams: pd.Index
+    players: pd.DataFrame
+    rows: np.ndarray
+    z: np.ndarray
+    group: np.ndarray
+
+
+def _zscores(frame: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    values = frame[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    with np.errstate(invalid='ignore'):
+        center = np.nanmean(values, axis=0) if len(values) else np.zeros(len(columns))
+        scale = np.nanstd(values, axis=0) if len(values) else np.ones(len(columns))
+    scale = np.where(np.isnan(scale) | (scale == 0), 1.0, scale)
+    return np.nan_to_num((values - center) / scale, nan=0.0)
+
+
+def _pack(players: pd.DataFrame, volume: str, z: np.ndarray, group: np.ndarray, max_players: int) -> PlayerBlock:
+    """Pack players into team x slot arrays, keeping each team's ``max_players`` busiest."""
+    players = players.assign(_z_man=z[:, 0], _z_zone=z[:, 1], _group=group)
+    players = players.sort_values(['_team', volume], ascending=[True, False], kind='stable')
+    players['_slot'] = players.groupby('_team', sort=False).cumcount()
+    players = players[players['_slot'] < max_players].reset_index(drop=True)
+
+    teams = pd.Index(players['_team'].unique())
+    team_codes = teams.get_indexer(players['_team'])
+    width = int(players['_slot'].max()) + 1 if len(players) else 1
+    rows = np.full((len(teams), width), -1, dtype=np.int64)
+    rows[team_codes, players['_slot'].to_numpy()] = np.arange(len(players))
+    return PlayerBlock(
+        teams=teams,
+        players=players,
+        rows=rows,
+        z=players[['_z_man', '_z_zone']].to_numpy(dtype=float),
+        group=players['_group'].to_numpy(dtype=np.int64),
+    )
+
+
+def _volume(frame: pd.DataFrame, columns: List[str]) -> pd.Series:
+    present = [c for c in columns if c in frame.columns]
+    if not present:
+        return pd.Series(0.0, index=frame.index)
+    return frame[present].apply(pd.to_numeric, errors='coerce').fillna(0.0).sum(axis=1)
+
+
+def receiver_block(
+    receiving_scheme: pd.DataFrame,
+    receiving_concept: Optional[pd.DataFrame],
+    settings: MatchupSettings,
+    groups: pd.Index
+) -> PlayerBlock:
+    """Qualifying receivers, with ``alignment`` SLOT for WRs above the slot share."""
+    receivers = receiving_scheme.copy()
+    receivers['position'] = receivers['position'].astype(str).str.upper()
+    receivers['routes'] = _volume(receivers, ['man_routes', 'zone_routes'])
+    receivers = receivers[receivers['routes'] >= settings.min_routes]
+    receivers['alignment'] = receivers['position']
+    if receiving_concept is not None and 'slot_routes' in receiving_concept.columns:
+        slot = receiving_concept.drop_duplicates('player_id').set_index('player_id')['slot_routes']
+        share = pd.to_numeric(receivers['player_id'].map(slot), errors='coerce') / receivers['routes']
+        receivers.loc[(receivers['position'] == 'WR') & (share >= settings.slot_share), 'alignment'] = 'SLOT'
+    group = groups.get_indexer(receivers['alignment'])
+    receivers = receivers[group >= 0].assign(_team=lambda df: team_key(df['team_name']))
+    return _pack(receivers, 'routes', _zscores(receivers, RECEIVER_FEATURES), group[group >= 0], settings.max_players)
+
+
+def defender_block(
+    defense_coverage: pd.DataFrame,
+    settings: MatchupSettings,
+    positions: pd.Index
+) -> PlayerBlock:
+    """Qualifying coverage defenders of the paired positions."""
+    defenders = defense_coverage.copy()
+    defenders['position'] = defenders['position'].astype(str).str.upper()
+    defenders['coverage_snaps'] = _volume(defenders, ['man_snap_counts_coverage', 'zone_snap_counts_coverage'])
+    position = positions.get_indexer(defenders['position'])
+    keep = (defenders['coverage_snaps'] >= settings.min_coverage_snaps).to_numpy() & (position >= 0)
+    defenders = defenders[keep].assign(_team=lambda df: team_key(df['team_name']))
+    z = _zscores(defenders, DEFENDER_FEATURES)
+    return _pack(defenders, 'coverage_snaps', z, position[keep], settings.max_players)
+
+
+def man_rates(defense_coverage: pd.DataFrame) -> pd.Series:
+    """Share of each defense's coverage snaps in man (upper-case team -> rate)."""
+    man = _volume(defense_coverage, ['man_snap_counts_coverage'])
+    total = man + _volume(defense_coverage, ['zone_snap_counts_coverage'])
+    teams = team_key(defense_coverage['team_name'])
+    sums = pd.DataFrame({'man': man.to_numpy(), 'total': total.to_numpy(), 'team': teams.to_numpy()})
+    sums = sums.groupby('team').sum()
+    return (sums['man'] / sums['total'].where(sums['total'] > 0)).rename('man_rate')
+
+
+def player_matchups(
+    games: pd.DataFrame,
+    receiving_scheme: pd.DataFrame,
+    defense_coverage: pd.DataFrame,
+    receiving_concept: Optional[pd.DataFrame] = None,
+    settings: Optional[MatchupSettings] = None
+) -> pd.DataFrame:
+    """
+    Top receiver-vs-defender mismatches of every game.
+
+    Args:
+        games: CFBD games (``home_team``/``away_team``; ``id``, ``season`` and
+            ``week`` are carried over when present)
+        receiving_scheme: Player rows of the receiving_scheme file
+        defense_coverage: Player rows of the defense_coverage_scheme file
+        receiving_concept: Optional player rows of the receiving_concept file
+            (for the slot alignment)
+        settings: Pairings and limits (default ``MatchupSettings.from_config(None)``)
+
+    Returns:
+        Up to ``top_k`` rows per game, best first: the offense and defense,
+        receiver and defender with their positions, the defense's
+        ``man_rate``, the raw man/zone stats of both players and ``score``
+    """
+    settings = settings or MatchupSettings.from_config(None)
+    groups = pd.Index(list(settings.pairings))
+    positions = pd.Index(sorted({p for allowed in settings.pairings.values() for p in allowed}))
+    receivers = receiver_block(receiving_scheme, receiving_concept, settings, groups)
+    defenders = defender_block(defense_coverage, settings, positions)
+    rates = man_rates(defense_coverage)
+
+    # Pairing lookup with a trailing all-False row/column for padding (-1)
+    allowed = np.zeros((len(groups) + 1, len(positions) + 1), dtype=bool)
+    for g, group in enumerate(groups):
+        allowed[g, positions.get_indexer(settings.pairings[group])] = True
+
+    # Padding slot gets -1 so it indexes the False row/column; z rows get a zero row
+    rec_rows = np.vstack([receivers.rows, np.full((1, receivers.rows.shape[1]), -1)])
+    def_rows = np.vstack([defenders.rows, np.full((1, defenders.rows.shape[1]), -1)])
+    rec_z = np.vstack([receivers.z, np.zeros((1, 2))])
+    def_z = np.vstack([defenders.z, np.zeros((1, 2))])
+    rec_group = np.append(receivers.group, -1)
+    def_group = np.append(defenders.group, -1)
+
+    home = team_key(games['home_team'])
+    away = team_key(games['away_team'])
+    # Unknown teams map to the all-padding row
+    home_rec = np.where(receivers.teams.get_indexer(home) >= 0, receivers.teams.get_indexer(home), len(receivers.teams))
+    away_rec = np.where(receivers.teams.get_indexer(away) >= 0, receivers.teams.get_indexer(away), len(receivers.teams))
+    home_def = np.where(defenders.teams.get_indexer(home) >= 0, defenders.teams.get_indexer(home), len(defenders.teams))
+    away_def = np.where(defenders.teams.get_indexer(away) >= 0, defenders.teams.get_indexer(away), len(defenders.teams))
+    home_rate = home.map(rates).fillna(0.5).to_numpy(dtype=float)
+    away_rate = away.map(rates).fillna(0.5).to_numpy(dtype=float)
+
+    n_rec, n_def = rec_rows.shape[1], def_rows.shape[1]
+    pairs = n_rec * n_def
+    k = min(settings.top_k, 2 * pairs)
+    picks = []
+    for start in range(0, len(games), settings.block_size):
+        block = slice(start, start + settings.block_size)
+        # Direction 0: home offense vs away defense; 1: away offense vs home defense
+        offense = np.stack([home_rec[block], away_rec[block]], axis=1)         # B x 2
+        defense = np.stack([away_def[block], home_def[block]], axis=1)
+        rate = np.stack([away_rate[block], home_rate[block]], axis=1)
+        r = rec_rows[offense]                                                  # B x 2 x R
+        d = def_rows[defense]                                                  # B x 2 x D
+        rz, dz = rec_z[r], def_z[d]                                            # B x 2 x R|D x 2
+        man = rz[..., :, None, 0] - dz[..., None, :, 0]
+        zone = rz[..., :, None, 1] - dz[..., None, :, 1]
+        score = rate[..., None, None] * man + (1.0 - rate[..., None, None]) * zone
+        ok = allowed[rec_group[r][..., :, None], def_group[d][..., None, :]]
+        score = np.where(ok, score, -np.inf).reshape(len(offense), 2 * pairs)
+
+        top = np.argpartition(-score, k - 1, axis=1)[:, :k]
+        top_score = np.take_along_axis(score, top, axis=1)
+        order = np.argsort(-top_score, axis=1, kind='stable')
+        top, top_score = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_score, order, axis=1)
+        game, rank = np.nonzero(np.isfinite(top_score))
+        flat = top[game, rank]
+        direction, rest = flat // pairs, flat % pairs
+        picks.append(pd.DataFrame({
+            '_game': start + game,
+            'rank': rank + 1,
+            '_direction': direction,
+            '_receiver': r[game, direction, rest // n_def],
+            '_defender': d[game, direction, rest % n_def],
+            'man_rate': rate[game, direction],
+            'score': top_score[game, rank],
+        }))
+
+    if not picks:
+        # No games: an empty pick of every column still gives the output columns
+        picks = [pd.DataFrame({
+            '_game': np.empty(0, dtype=np.int64),
+            'rank': np.empty(0, dtype=np.int64),
+            '_direction': np.empty(0, dtype=np.int64),
+            '_receiver': np.empty(0, dtype=np.int64),
+            '_defender': np.empty(0, dtype=np.int64),
+            'man_rate': np.empty(0),
+            'score': np.empty(0),
+        })]
+    picks = pd.concat(picks, ignore_index=True)
+    return _matchup_frame(games, picks, receivers, defenders)
+
+
+def _matchup_frame(
+    games: pd.DataFrame,
+    picks: pd.DataFrame,
+    receivers: PlayerBlock,
+    defenders: PlayerBlock
+) -> pd.DataFrame:
+    game_cols = [c for c in ('id', 'season', 'week', 'home_team', 'away_team') if c in games.columns]
+    out = games[game_cols].iloc[picks['_game'].to_numpy()].reset_index(drop=True)
+    home = out['home_team'].to_numpy(dtype=object)
+    away = out['away_team'].to_numpy(dtype=object)
+    home_offense = picks['_direction'].to_numpy() == 0
+    out['rank'] = picks['rank'].to_numpy()
+    out['offense'] = np.where(home_offense, home, away)
+    out['defense'] = np.where(home_offense, away, home)
+
+    rec = receivers.players.iloc[picks['_receiver'].to_numpy()].reset_index(drop=True)
+    dfn = defenders.players.iloc[picks['_defender'].to_numpy()].reset_index(drop=True)
+    out['receiver'] = rec['player'].to_numpy()
+    out['receiver_position'] = rec['alignment'].to_numpy()
+    out['defender'] = dfn['player'].to_numpy()
+    out['defender_position'] = dfn['position'].to_numpy()
+    out['man_rate'] = picks['man_rate'].to_numpy()
+    for column in RECEIVER_FEATURES:
+        out[f'receiver_{column}'] = pd.to_numeric(rec[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    for column, name in zip(DEFENDER_FEATURES, ('defender_man_grade', 'defender_zone_grade')):
+        out[name] = pd.to_numeric(dfn[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    out['score'] = picks['score'].to_numpy()
+    return out
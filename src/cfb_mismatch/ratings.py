@@ -0,0 +1,270 @@
+"""
+Elo team ratings over the local CFBD game store.
+
+Completed games are processed in chronological order (season, regular season
+before postseason, week). Each game moves the two ratings by
+
+    K * mov * (result - expected)
+
+where ``expected`` is the home team's win probability from the rating
+difference plus home-field advantage (none at neutral sites) and ``mov`` is
+the margin-of-victory multiplier ``ln(|margin| + 1) * 2.2 / (0.001 *
+winner_edge + 2.2)``, which damps the updates of favourites that win big.
+At the start of each season ratings regress toward the mean.
+
+A team plays at most once in almost every week, so a week is applied as one
+vectorized update; the rare team that plays twice in a week splits the week
+into rounds that keep each team's games in order. ``EloRatings`` keeps one
+row per game with both teams' pre- and post-game ratings (the point-in-time
+features) and updates incrementally from the game store (see ``weekly``).
+"""
+
+from dataclasses import dataclass, fields
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.weekly import WeeklyGameState, before_week, load_game_store, split_rounds, update_state
+
+# Columns of EloRatings.history (one row per completed game)
+HISTORY_COLUMNS = [
+    'season', 'season_type', 'week', 'home_team', 'away_team', 'neutral_site',
+    'home_rating_pre', 'away_rating_pre', 'elo_edge', 'home_win_prob',
+    'home_rating_post', 'away_rating_post',
+]
+
+
+@dataclass(frozen=True)
+class EloSettings:
+    """Elo parameters (the ``ratings`` section of settings.yaml)."""
+
+    initial: float = 1500.0
+    k: float = 20.0
+    home_field: float = 55.0
+    season_regression: float = 1 / 3
+    margin_of_victory: bool = True
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'EloSettings':
+        section = (config or {}).get('ratings') or {}
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in section.items() if key in names})
+
+
+def win_probability(edge: np.ndarray) -> np.ndarray:
+    """Win probability of the side with an Elo ``edge`` (rating points incl. home field)."""
+    return 1.0 / (1.0 + 10.0 ** (-np.asarray(edge, dtype=float) / 400.0))
+
+
+def mov_multiplier(margin: np.ndarray, winner_edge: np.ndarray) -> np.ndarray:
+    """Margin-of-victory multiplier, damped when the winner was the favourite."""
+    return np.log(np.abs(margin) + 1.0) * 2.2 / (0.001 * winner_edge + 2.2)
+
+
+class EloRatings(WeeklyGameState):
+    """
+    Persistent Elo ratings that update week by week.
+
+    Args:
+        settings: Elo parameters
+    """
+
+    SETTINGS = EloSettings
+    VERSION = 1
+    LABEL = 'Elo ratings'
+    HISTORY_COLUMNS = HISTORY_COLUMNS
+
+    def __init__(self, settings: Optional[EloSettings] = None):
+        super().__init__(settings)
+        self.ratings = np.zeros(0)
+
+    def _add_teams(self, count: int):
+        self.ratings = np.concatenate([self.ratings, np.full(count, self.settings.initial)])
+
+    def _apply_week(self, week_games: pd.DataFrame) -> pd.DataFrame:
+        s = self.settings
+        season = int(week_games['season'].iloc[0])
+        if self.season is not None and season != self.season:
+            self.ratings = s.initial + (self.ratings - s.initial) * (1 - s.season_regression)
+
+        home = self._indices(week_games['home_team'].astype(str).to_numpy())
+        away = self._indices(week_games['away_team'].astype(str).to_numpy())
+        margin = (week_games['home_points'] - week_games['away_points']).to_numpy(dtype=float)
+        home_field = np.where(week_games['neutral_site'].to_numpy(dtype=bool), 0.0, s.home_field)
+        result = np.where(margin > 0, 1.0, np.where(margin < 0, 0.0, 0.5))
+
+        n = len(week_games)
+        pre = np.empty((n, 2))
+        post = np.empty((n, 2))
+        edge = np.empty(n)
+        rounds = split_rounds(home, away)
+        for r in np.unique(rounds):
+            g = rounds == r
+            h, a = home[g], away[g]
+            pre[g, 0], pre[g, 1] = self.ratings[h], self.ratings[a]
+            edge[g] = pre[g, 0] - pre[g, 1] + home_field[g]
+            delta = s.k * (result[g] - win_probability(edge[g]))
+            if s.margin_of_victory:
+                delta *= mov_multiplier(margin[g], np.where(margin[g] > 0, edge[g], -edge[g]))
+            self.ratings[h] += delta
+            self.ratings[a] -= delta
+            post[g, 0], post[g, 1] = self.ratings[h], self.ratings[a]
+
+        return pd.DataFrame({
+            'season': week_games['season'].to_numpy(dtype=np.int64),
+            'season_type': week_games['season_type'].to_numpy(dtype=object),
+            'week': week_games['week'].to_numpy(dtype=np.int64),
+            'home_team': week_games['home_team'].to_numpy(dtype=object),
+            'away_team': week_games['away_team'].to_numpy(dtype=object),
+            'neutral_site': week_games['neutral_site'].to_numpy(dtype=bool),
+            'home_rating_pre': pre[:, 0],
+            'away_rating_pre': pre[:, 1],
+            'elo_edge': edge,
+            'home_win_prob': win_probability(edge),
+            'home_rating_post': post[:, 0],
+            'away_rating_post': post[:, 1],
+        })
+
+    def current(self) -> pd.DataFrame:
+        """Latest rating of every team, best first."""
+        teams = list(self.team_index)
+        return (
+            pd.DataFrame({'team': teams, 'elo_rating': self.ratings[[self.team_index[t] for t in teams]]})
+            .sort_values('elo_rating', ascending=False)
+            .reset_index(drop=True)
+        )
+
+    def as_of(self, season: int, week: Optional[int] = None, season_type: str = 'regular') -> pd.DataFrame:
+        """
+        Ratings as they stood before ``week`` (point-in-time).
+
+        Args:
+            season: Season year
+            week: Week about to be played (None: after the whole season type)
+            season_type: 'regular' or 'postseason'
+
+        Returns:
+            DataFrame of ``team`` and ``elo_rating`` for every team seen so far;
+            teams last seen in an earlier season are regressed once
+        """
+        history = self.history
+        if history.empty:
+            return pd.DataFrame(columns=['team', 'elo_rating'])
+        prior = history[before_week(history, season, week, season_type)]
+        games = pd.concat([
+            pd.DataFrame({
+                'team': prior[f'{side}_team'],
+                'season': prior['season'],
+                'elo_rating': prior[f'{side}_rating_post'],
+            })
+            for side in ('home', 'away')
+        ]).sort_index(kind='stable')
+        latest = games.groupby('team', sort=True).tail(1)
+        s = self.settings
+        stale = latest['season'].to_numpy() < season
+        ratings = latest['elo_rating'].to_numpy(dtype=float)
+        ratings = np.where(stale, s.initial + (ratings - s.initial) * (1 - s.season_regression), ratings)
+        return (
+            pd.DataFrame({'team': latest['team'].to_numpy(), 'elo_rating': ratings})
+            .sort_values('elo_rating', ascending=False)
+            .reset_index(drop=True)
+        )
+
+
+def update_ratings(
+    games: pd.DataFrame,
+    path: Optional[str] = None,
+    settings: Optional[EloSettings] = None
+) -> EloRatings:
+    """
+    Bring the ratings up to date with ``games``.
+
+    Args:
+        games: CFBD games with ``season``, ``week`` and scores
+        path: Pickled ratings store (None keeps the ratings in memory only)
+        settings: Elo parameters; a store built with other settings is rebuilt
+
+    Returns:
+        The updated ratings
+    """
+    return update_state(EloRatings, games, path, settings)
+
+
+def ratings_from_config(config: Dict, data_dir: Optional[str] = None) -> EloRatings:
+    """Update the ratings configured in settings.yaml from the local game store."""
+    data_dir = data_dir or config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+    section = config.get('ratings') or {}
+    return update_ratings(load_game_store(data_dir), section.get('store_path'), EloSettings.from_config(config))
+
+
+def add_team_ratings(
+    team_stats: pd.DataFrame,
+    ratings: EloRatings,
+    season: int,
+    season_type: str = 'regular'
+) -> pd.DataFrame:
+    """Add an ``elo_rating`` column (as of the end of ``season_type``) to CFBD team stats."""
+    table = ratings.as_of(season, None, season_type)
+    if team_stats is None or team_stats.empty or table.empty:
+        return team_stats
+    team_stats = team_stats.drop(columns=['elo_rating'], errors='ignore')
+    return team_stats.merge(table, on='team', how='left')
+
+
+def add_elo_signal(scored: pd.DataFrame, history: pd.DataFrame, season_type: str = 'regular') -> pd.DataFrame:
+    """
+    Add the pre-game Elo features of ``history`` to scored games.
+
+    Adds ``home_elo``, ``away_elo``, ``elo_edge`` (home-minus-away rating
+    plus home field) and ``elo_home_win_prob``; games missing from the
+    history get NaN.
+    """
+    if scored.empty:
+        return scored
+    keys = ['season', 'week', 'home_team', 'away_team']
+    features = history[history['season_type'] == season_type][keys + [
+        'home_rating_pre', 'away_rating_pre', 'elo_edge', 'home_win_prob'
+    ]].drop_duplicates(keys).rename(columns={
+        'home_rating_pre': 'home_elo',
+        'away_rating_pre': 'away_elo',
+        'home_win_prob': 'elo_home_win_prob',
+    })
+    scored = scored.drop(columns=[c for c in features.columns if c not in keys and c in scored.columns])
+    types = {'season': 'int64', 'week': 'int64', 'home_team': str, 'away_team': str}
+    return scored.astype(types).merge(features.astype(types), on=keys, how='left')
+
+
+def add_matchup_elo(
+    games: pd.DataFrame,
+    ratings: EloRatings,
+    season: int,
+    season_type: str = 'regular'
+) -> pd.DataFrame:
+    """
+    Add both teams' Elo ratings before each game's week to (played or upcoming) games.
+
+    Adds the ``add_elo_signal`` columns; a team without a rating yet starts
+    at the initial rating, as it would in its first game.
+    """
+    if games is None or games.empty or 'week' not in games.columns:
+        return games
+    s = ratings.settings
+    games = games.drop(columns=[c for c in ('home_elo', 'away_elo', 'elo_edge', 'elo_home_win_prob')
+                                if c in games.columns])
+    weeks = []
+    for week, week_games in games.groupby('week', sort=False, dropna=False):
+        table = ratings.as_of(season, None if pd.isna(week) else int(week), season_type).set_index('team')
+        week_games = week_games.copy()
+        for side in ('home', 'away'):
+            side_elo = table['elo_rating'].reindex(week_games[f'{side}_team'].astype(str).to_numpy())
+            week_games[f'{side}_elo'] = side_elo.fillna(s.initial).to_numpy(dtype=float)
+        weeks.append(week_games)
+    games = pd.concat(weeks).sort_index()
+    neutral = (
+        games['neutral_site'].fillna(False).to_numpy(dtype=bool)
+        if 'neutral_site' in games.columns else np.zeros(len(games), dtype=bool)
+    )
+    games['elo_edge'] = games['home_elo'] - games['away_elo'] + np.where(neutral, 0.0, s.home_field)
+    games['elo_home_win_prob'] = win_probability(games['elo_edge'])
+    return games
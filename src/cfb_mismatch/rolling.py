@@ -0,0 +1,324 @@
+"""
+Rolling and exponentially weighted in-season team form.
+
+``aggregate_team_games`` averages a whole season, so by week 10 a team's
+week-1 game still counts as much as last week's. ``TeamForm`` tracks, per
+team and game, the mean of the last ``window`` games and an exponentially
+weighted mean with a half-life of ``halflife`` games of:
+
+    {metric}_for / {metric}_against   every metric in ``metrics``
+    margin                            points for minus points against
+
+A metric other than ``points`` is read from the ``home_{metric}`` and
+``away_{metric}`` game columns (missing values are skipped by the rolling
+mean and leave the weighted mean unchanged).
+
+The state is a ring buffer of each team's last ``window`` games and the
+running weighted sums, so a week is added in one vectorized step per round
+(see ``weekly.split_rounds``) and the store updates incrementally like the
+Elo ratings. With ``reset_each_season`` every team starts each season afresh.
+
+``TeamForm.history`` has one row per team and game with the form before
+kickoff (``{stat}_rolling``, ``{stat}_ewm``) and after the game (``_post``
+suffix), which makes it a point-in-time feature: ``as_of`` returns every
+team's form before a given week.
+"""
+
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.weekly import WeeklyGameState, before_week, load_game_store, split_rounds, update_state
+
+_SIDE_COLUMNS = ['season', 'season_type', 'week', 'team', 'opponent', 'home', 'games']
+
+
+@dataclass(frozen=True)
+class FormSettings:
+    """Team form parameters (the ``rolling`` section of settings.yaml)."""
+
+    window: int = 4
+    halflife: float = 3.0
+    metrics: Tuple[str, ...] = ('points',)
+    reset_each_season: bool = True
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'FormSettings':
+        section = dict((config or {}).get('rolling') or {})
+        if 'metrics' in section:
+            section['metrics'] = tuple(section['metrics'] or ())
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in section.items() if key in names})
+
+    @property
+    def stats(self) -> List[str]:
+        """Per-game team stats tracked (``margin`` last)."""
+        return [f'{metric}_{side}' for metric in self.metrics for side in ('for', 'against')] + ['margin']
+
+    @property
+    def alpha(self) -> float:
+        """Weight of the newest game in the exponentially weighted mean."""
+        return 1.0 - 0.5 ** (1.0 / self.halflife)
+
+
+def form_columns(settings: FormSettings) -> List[str]:
+    """Form features of every stat, in ``as_of`` column order."""
+    return [f'{stat}_{kind}' for stat in settings.stats for kind in ('rolling', 'ewm')]
+
+
+class TeamForm(WeeklyGameState):
+    """
+    Persistent rolling and exponentially weighted team form.
+
+    Args:
+        settings: Form parameters
+    """
+
+    SETTINGS = FormSettings
+    VERSION = 1
+    LABEL = 'team form'
+
+    def __init__(self, settings: Optional[FormSettings] = None):
+        super().__init__(settings)
+        S = len(self.settings.stats)
+        self.recent = np.zeros((0, self.settings.window, S))
+        self.count = np.zeros(0, dtype=np.int64)
+        self.ewm_sum = np.zeros((0, S))
+        self.ewm_weight = np.zeros((0, S))
+
+    @property
+    def HISTORY_COLUMNS(self) -> List[str]:
+        features = form_columns(self.settings)
+        return _SIDE_COLUMNS + self.settings.stats + features + [f'{c}_post' for c in features]
+
+    def extra_columns(self) -> List[str]:
+        return [f'{side}_{metric}' for metric in self.settings.metrics if metric != 'points'
+                for side in ('home', 'away')]
+
+    def _add_teams(self, count: int):
+        S = len(self.settings.stats)
+        self.recent = np.concatenate([self.recent, np.full((count, self.settings.window, S), np.nan)])
+        self.count = np.concatenate([self.count, np.zeros(count, dtype=np.int64)])
+        self.ewm_sum = np.concatenate([self.ewm_sum, np.zeros((count, S))])
+        self.ewm_weight = np.concatenate([self.ewm_weight, np.zeros((count, S))])
+
+    def _form(self, teams: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Current (rolling, ewm) means of ``teams`` (NaN before a team's first game)."""
+        recent = self.recent[teams]
+        seen = ~np.isnan(recent)
+        n = seen.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rolling = np.where(n > 0, np.where(seen, recent, 0.0).sum(axis=1) / n, np.nan)
+            ewm = np.where(self.ewm_weight[teams] > 0, self.ewm_sum[teams] / self.ewm_weight[teams], np.nan)
+        return rolling, ewm
+
+    def _stat_values(self, week_games: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-game stats of the home and away sides (games x stats)."""
+        home, away = [], []
+        for metric in self.settings.metrics:
+            h = week_games[f'home_{metric}'].to_numpy(dtype=float, na_value=np.nan)
+            a = week_games[f'away_{metric}'].to_numpy(dtype=float, na_value=np.nan)
+            home += [h, a]
+            away += [a, h]
+        margin = (week_games['home_points'] - week_games['away_points']).to_numpy(dtype=float)
+        return np.column_stack(home + [margin]), np.column_stack(away + [-margin])
+
+    def _apply_week(self, week_games: pd.DataFrame) -> pd.DataFrame:
+        s = self.settings
+        season = int(week_games['season'].iloc[0])
+        if s.reset_each_season and self.season is not None and season != self.season:
+            self.recent[:] = np.nan
+            self.count[:] = 0
+            self.ewm_sum[:] = 0.0
+            self.ewm_weight[:] = 0.0
+
+        home = self._indices(week_games['home_team'].astype(str).to_numpy())
+        away = self._indices(week_games['away_team'].astype(str).to_numpy())
+        home_values, away_values = self._stat_values(week_games)
+
+        # Both sides of every game, interleaved (home, away) so each team's rows stay in game order
+        n = len(week_games)
+        teams = np.column_stack([home, away]).ravel()
+        values = np.stack([home_values, away_values], axis=1).reshape(2 * n, -1)
+        rounds = np.repeat(split_rounds(home, away), 2)
+        S = len(s.stats)
+        games = np.empty(2 * n, dtype=np.int64)
+        pre = np.empty((2 * n, 2 * S))
+        post = np.empty((2 * n, 2 * S))
+        decay = 1.0 - s.alpha
+        for r in np.unique(rounds):
+            g = np.flatnonzero(rounds == r)
+            t = teams[g]
+            games[g] = self.count[t]
+            pre[g, 0::2], pre[g, 1::2] = self._form(t)
+            self.recent[t, self.count[t] % s.window] = values[g]
+            self.count[t] += 1
+            x = values[g]
+            self.ewm_sum[t] = decay * self.ewm_sum[t] + np.nan_to_num(x)
+            self.ewm_weight[t] = decay * self.ewm_weight[t] + ~np.isnan(x)
+            post[g, 0::2], post[g, 1::2] = self._form(t)
+
+        features = form_columns(s)
+        names = np.column_stack([
+            week_games['home_team'].astype(str).to_numpy(dtype=object),
+            week_games['away_team'].astype(str).to_numpy(dtype=object),
+        ])
+        week = pd.DataFrame({
+            'season': np.repeat(week_games['season'].to_numpy(dtype=np.int64), 2),
+            'season_type': np.repeat(week_games['season_type'].to_numpy(dtype=object), 2),
+            'week': np.repeat(week_games['week'].to_numpy(dtype=np.int64), 2),
+            'team': names.ravel(),
+            'opponent': names[:, ::-1].ravel(),
+            'home': np.tile([True, False], n),
+            'games': games,
+        })
+        stats = pd.DataFrame(values, columns=s.stats)
+        return pd.concat([
+            week,
+            stats,
+            pd.DataFrame(pre, columns=features),
+            pd.DataFrame(post, columns=[f'{c}_post' for c in features]),
+        ], axis=1)
+
+    def as_of(self, season: int, week: Optional[int] = None, season_type: str = 'regular') -> pd.DataFrame:
+        """
+        Team form as it stood before ``week`` (point-in-time).
+
+        Args:
+            season: Season year
+            week: Week about to be played (None: after the whole season type)
+            season_type: 'regular' or 'postseason'
+
+        Returns:
+            DataFrame of ``team``, ``games`` and the form features of every
+            team that has played (this season only with ``reset_each_season``)
+        """
+        features = form_columns(self.settings)
+        history = self.history
+        if history.empty:
+            return pd.DataFrame(columns=['team', 'games'] + features)
+        before = before_week(history, season, week, season_type)
+        if self.settings.reset_each_season:
+            before &= history['season'].to_numpy() == season
+        latest = history[before].groupby('team', sort=True).tail(1)
+        table = latest[['team'] + [f'{c}_post' for c in features]].rename(
+            columns={f'{c}_post': c for c in features}
+        )
+        table.insert(1, 'games', latest['games'].to_numpy() + 1)
+        sort = 'margin_ewm' if 'margin_ewm' in table.columns else 'team'
+        return table.sort_values(sort, ascending=False).reset_index(drop=True)
+
+
+def update_form(
+    games: pd.DataFrame,
+    path: Optional[str] = None,
+    settings: Optional[FormSettings] = None
+) -> TeamForm:
+    """
+    Bring the team form up to date with ``games``.
+
+    Args:
+        games: CFBD games with ``season``, ``week`` and scores
+        path: Pickled form store (None keeps the form in memory only)
+        settings: Form parameters; a store built with other settings is rebuilt
+
+    Returns:
+        The updated form
+    """
+    return update_state(TeamForm, games, path, settings)
+
+
+def form_from_config(config: Dict, data_dir: Optional[str] = None) -> TeamForm:
+    """Update the team form configured in settings.yaml from the local game store."""
+    data_dir = data_dir or config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+    section = config.get('rolling') or {}
+    return update_form(load_game_store(data_dir), section.get('store_path'), FormSettings.from_config(config))
+
+
+def add_team_form(
+    team_stats: pd.DataFrame,
+    form: TeamForm,
+    season: int,
+    week: Optional[int] = None,
+    season_type: str = 'regular'
+) -> pd.DataFrame:
+    """Add the form features (before ``week``; None: latest) to CFBD team stats."""
+    table = form.as_of(season, week, season_type).drop(columns='games')
+    if team_stats is None or team_stats.empty or table.empty:
+        return team_stats
+    team_stats = team_stats.drop(columns=[c for c in table.columns if c != 'team'], errors='ignore')
+    return team_stats.merge(table, on='team', how='left')
+
+
+def add_form_signal(
+    scored: pd.DataFrame,
+    history: pd.DataFrame,
+    season_type: str = 'regular',
+    features: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Add the pre-game form of both teams of ``history`` to scored games.
+
+    Adds ``home_{feature}``/``away_{feature}`` for every feature (default:
+    the margin form) and the home-minus-away ``{feature}_edge``; games
+    missing from the history get NaN.
+    """
+    if scored.empty:
+        return scored
+    features = features or ['margin_rolling', 'margin_ewm']
+    keys = ['season', 'week', 'home_team', 'away_team']
+    rows = history[history['season_type'] == season_type]
+    sides = []
+    for side, is_home in (('home', True), ('away', False)):
+        other = 'away' if is_home else 'home'
+        sides.append(
+            rows[rows['home'] == is_home][['season', 'week', 'team', 'opponent'] + features]
+            .rename(columns={'team': f'{side}_team', 'opponent': f'{other}_team',
+                             **{f: f'{side}_{f}' for f in features}})
+            .drop_duplicates(keys)
+        )
+    added = [f'{side}_{f}' for side in ('home', 'away') for f in features] + [f'{f}_edge' for f in features]
+    scored = scored.drop(columns=[c for c in added if c in scored.columns])
+    types = {'season': 'int64', 'week': 'int64', 'home_team': str, 'away_team': str}
+    scored = scored.astype(types)
+    for frame in sides:
+        scored = scored.merge(frame.astype(types), on=keys, how='left')
+    for f in features:
+        scored[f'{f}_edge'] = scored[f'home_{f}'] - scored[f'away_{f}']
+    return scored
+
+
+def add_matchup_form(
+    games: pd.DataFrame,
+    form: TeamForm,
+    season: int,
+    season_type: str = 'regular',
+    features: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Add both teams' form before each game's week to (played or upcoming) games.
+
+    Adds ``home_{feature}``/``away_{feature}`` and ``{feature}_edge`` for
+    every feature (default: the margin form).
+    """
+    features = features or ['margin_rolling', 'margin_ewm']
+    if games is None or games.empty or 'week' not in games.columns:
+        return games
+    games = games.drop(columns=[c for c in games.columns
+                                if c in {f'{s}_{f}' for s in ('home', 'away') for f in features}
+                                or c in {f'{f}_edge' for f in features}])
+    weeks = []
+    for week, week_games in games.groupby('week', sort=False, dropna=False):
+        table = form.as_of(season, None if pd.isna(week) else int(week), season_type).set_index('team')
+        week_games = week_games.copy()
+        for side in ('home', 'away'):
+            side_form = table.reindex(week_games[f'{side}_team'].astype(str).to_numpy())
+            for f in features:
+                week_games[f'{side}_{f}'] = side_form[f].to_numpy(dtype=float)
+        weeks.append(week_games)
+    games = pd.concat(weeks).sort_index()
+    for f in features:
+        games[f'{f}_edge'] = games[f'home_{f}'] - games[f'away_{f}']
+    return games
@@ -0,0 +1,206 @@
+"""
+Strength of schedule from the game store.
+
+Every game puts two entries in a sparse (season, team) x (season, opponent)
+matrix, stored as coordinate arrays (row, column, played). An SOS variant is
+the row mean of a per-team vector over the opponents, i.e. a sparse
+matrix-vector product (``np.bincount`` over the entries) divided by the
+number of opponents with a value. Splitting the entries by ``played`` gives
+the past and the remaining schedule, and one product covers every team of
+every season in the games at once.
+
+Variants (``sos_{name}`` for the games played, ``sos_{name}_remaining`` for
+the games left):
+
+    win_pct       opponents' win percentage
+    opp_win_pct   opponents' opponents' win percentage (played games only)
+    {column}      any per-team value, e.g. ``elo_rating`` or the opposing
+                  ``coverage``/``offense`` profile of the team summary
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.matrix import COVERAGE_METRICS, OFFENSE_METRICS, TeamMatrix
+from cfb_mismatch.mismatches import team_key
+
+
+@dataclass
+class ScheduleMatrix:
+    """
+    Sparse (season, team) x (season, opponent) schedule matrix.
+
+    ``keys`` holds the season and team of every row/column; entry ``i``
+    links row ``rows[i]`` to column ``cols[i]`` with the team's ``result``
+    (1 win, 0.5 tie, 0 loss, NaN unplayed).
+    """
+
+    keys: pd.DataFrame
+    rows: np.ndarray
+    cols: np.ndarray
+    result: np.ndarray
+
+    @property
+    def played(self) -> np.ndarray:
+        return ~np.isnan(self.result)
+
+    @classmethod
+    def from_games(cls, games: pd.DataFrame) -> 'ScheduleMatrix':
+        """Build the matrix from CFBD games (played and unplayed) of one or more seasons."""
+        season = games['season'] if 'season' in games.columns else pd.Series(0, index=games.index)
+        season = season.to_numpy(dtype=np.int64)
+        home = games['home_team'].astype(str).to_numpy(dtype=object)
+        away = games['away_team'].astype(str).to_numpy(dtype=object)
+        keys = pd.MultiIndex.from_arrays([np.concatenate([season, season]), np.concatenate([home, away])])
+        codes, unique = pd.factorize(keys, sort=True)
+        n = len(games)
+        margin = (games['home_points'] - games['away_points']).to_numpy(dtype=float, na_value=np.nan)
+        home_result = np.where(margin > 0, 1.0, np.where(margin < 0, 0.0, np.where(margin == 0, 0.5, np.nan)))
+        return cls(
+            keys=pd.DataFrame({'season': unique.get_level_values(0), 'team': unique.get_level_values(1)}),
+            rows=codes,
+            cols=np.concatenate([codes[n:], codes[:n]]),
+            result=np.concatenate([home_result, 1.0 - home_result]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def count(self, played: Optional[bool] = None) -> np.ndarray:
+        """Games per row (all, played or remaining)."""
+        mask = self._mask(played)
+        return np.bincount(self.rows[mask], minlength=len(self))
+
+    def _mask(self, played: Optional[bool]) -> np.ndarray:
+        if played is None:
+            return np.ones(len(self.rows), dtype=bool)
+        return self.played if played else ~self.played
+
+    def opponent_mean(self, values: np.ndarray, played: Optional[bool] = None) -> np.ndarray:
+        """
+        Mean of ``values`` (one per row) over each row's opponents.
+
+        Opponents without a value are skipped; rows without any get NaN.
+        """
+        mask = self._mask(played)
+        rows = self.rows[mask]
+        x = np.asarray(values, dtype=float)[self.cols[mask]]
+        known = ~np.isnan(x)
+        total = np.bincount(rows, np.where(known, x, 0.0), minlength=len(self))
+        count = np.bincount(rows, known.astype(float), minlength=len(self))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, total / count, np.nan)
+
+    def win_pct(self) -> np.ndarray:
+        """Win percentage of every row over its played games (ties count half)."""
+        played = self.played
+        wins = np.bincount(self.rows[played], self.result[played], minlength=len(self))
+        games = self.count(played=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(games > 0, wins / games, np.nan)
+
+    def lookup(self, values: pd.DataFrame, column: str) -> np.ndarray:
+        """
+        One value per row from a per-team table.
+
+        ``values`` has a ``team`` column (matched case-insensitively) and,
+        when it varies by season, a ``season`` column; otherwise the same
+        value is used for every season.
+        """
+        on = ['season', '_key'] if 'season' in values.columns else ['_key']
+        table = values.assign(_key=team_key(values['team'])).drop_duplicates(on, keep='last')
+        keys = self.keys.assign(_key=team_key(self.keys['team']))
+        if 'season' in on:
+            table = table.astype({'season': 'int64'})
+        matched = keys[on].merge(table[on + [column]], on=on, how='left')
+        return matched[column].to_numpy(dtype=float, na_value=np.nan)
+
+
+def summary_profile(summary: pd.DataFrame, team_col: str = 'team_name') -> pd.DataFrame:
+    """Per-team ``coverage`` grade and ``offense`` YPRR of a team summary (the pass tilt metrics)."""
+    matrix = TeamMatrix.from_frame(summary, team_col=team_col)
+    return pd.DataFrame({
+        'team': matrix.teams.astype(str),
+        'coverage': matrix.row_mean(COVERAGE_METRICS),
+        'offense': matrix.row_mean(OFFENSE_METRICS),
+    })
+
+
+def strength_of_schedule(
+    games: pd.DataFrame,
+    values: Optional[pd.DataFrame] = None,
+    columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Strength of the past and remaining schedule of every team and season.
+
+    Args:
+        games: CFBD games (played and unplayed) with ``season``, teams and scores
+        values: Optional per-team table (``team``, optionally ``season``)
+            whose columns are averaged over the opponents
+        columns: Columns of ``values`` to use (default: all numeric ones)
+
+    Returns:
+        One row per season and team: ``games_played``, ``games_remaining``,
+        ``sos_win_pct``, ``sos_opp_win_pct``, ``sos_win_pct_remaining`` and
+        ``sos_{column}``/``sos_{column}_remaining`` per value column
+    """
+    if games is None or games.empty:
+        return pd.DataFrame(columns=['season', 'team', 'games_played', 'games_remaining'])
+    matrix = ScheduleMatrix.from_games(games)
+    win_pct = matrix.win_pct()
+    past_win_pct = matrix.opponent_mean(win_pct, played=True)
+
+    sos = matrix.keys.copy()
+    sos['games_played'] = matrix.count(played=True)
+    sos['games_remaining'] = matrix.count(played=False)
+    sos['sos_win_pct'] = past_win_pct
+    sos['sos_opp_win_pct'] = matrix.opponent_mean(past_win_pct, played=True)
+    sos['sos_win_pct_remaining'] = matrix.opponent_mean(win_pct, played=False)
+
+    if values is not None and not values.empty:
+        if columns is None:
+            columns = [c for c in values.select_dtypes('number').columns if c not in ('season', 'team')]
+        for column in columns:
+            x = matrix.lookup(values, column)
+            sos[f'sos_{column}'] = matrix.opponent_mean(x, played=True)
+            sos[f'sos_{column}_remaining'] = matrix.opponent_mean(x, played=False)
+    return sos
+
+
+def add_strength_of_schedule(
+    team_stats: pd.DataFrame,
+    games: pd.DataFrame,
+    summary: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    Add the schedule strength of the latest season in ``games`` to CFBD team stats.
+
+    Opponent ratings are taken from the ``elo_rating`` column of
+    ``team_stats`` when present, and the opposing coverage/offense profile
+    from ``summary`` when given.
+    """
+    if team_stats is None or team_stats.empty or games is None or games.empty:
+        return team_stats
+    if 'season' in games.columns:
+        games = games[games['season'] == games['season'].max()]
+    values = []
+    if 'elo_rating' in team_stats.columns:
+        values.append(team_stats[['team', 'elo_rating']])
+    if summary is not None and not summary.empty:
+        values.append(summary_profile(summary))
+    table = None
+    for frame in values:
+        frame = frame.assign(_key=team_key(frame['team'])).drop(columns='team')
+        table = frame if table is None else table.merge(frame, on='_key', how='outer')
+    if table is not None:
+        table = table.rename(columns={'_key': 'team'})
+
+    sos = strength_of_schedule(games, table).drop(columns=['season', 'games_played'])
+    sos = sos.assign(_key=team_key(sos['team'])).drop(columns='team')
+    team_stats = team_stats.drop(columns=[c for c in sos.columns if c in team_stats.columns])
+    merged = team_stats.assign(_key=team_key(team_stats['team'])).merge(sos, on='_key', how='left')
+    return merged.drop(columns='_key')
@@ -0,0 +1,164 @@
+"""
+Share numeric arrays and frames with worker processes without pickling them.
+
+The owner copies an array once into a ``multiprocessing.shared_memory`` block
+(``'shm'``) or a memory-mapped ``.npy`` file (``'memmap'``, for hosts with a
+small ``/dev/shm`` such as default Docker containers). Tasks carry only a small
+picklable reference (backend, name, shape, dtype); workers attach to the same
+buffer read-only, so per-worker memory stays flat however many processes run.
+A worker attaches each block once and reuses it for later tasks.
+
+The owner must outlive the workers; use it as a context manager::
+
+    with share_frame(summary) as shared:
+        pool.map(task, [(shared.ref, i) for i in range(n)])
+"""
+
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Hashable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+SHARED_BACKENDS = ('shm', 'memmap')
+
+# Blocks attached in this process (keeps the buffers alive between tasks)
+_ATTACHED: Dict[str, Union[shared_memory.SharedMemory, np.ndarray]] = {}
+
+
+@dataclass(frozen=True)
+class SharedArrayRef:
+    """Picklable reference to a shared array."""
+
+    backend: str
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+    def attach(self) -> np.ndarray:
+        """Return a read-only view of the shared array (no copy)."""
+        if self.backend == 'memmap':
+            if self.name not in _ATTACHED:
+                _ATTACHED[self.name] = np.load(self.name, mmap_mode='r')
+            return _ATTACHED[self.name]
+
+        if self.name not in _ATTACHED:
+            _ATTACHED[self.name] = shared_memory.SharedMemory(name=self.name)
+        array = np.ndarray(self.shape, dtype=self.dtype, buffer=_ATTACHED[self.name].buf)
+        array.flags.writeable = False
+        return array
+
+
+class SharedArray:
+    """
+    Owner of a shared copy of a numeric array.
+
+    Args:
+        array: Array to share (copied once)
+        backend: 'shm' (shared memory) or 'memmap' (memory-mapped file)
+        directory: Directory for memmap files (default: the temp directory)
+    """
+
+    def __init__(self, array: np.ndarray, backend: str = 'shm', directory: Optional[str] = None):
+        if backend not in SHARED_BACKENDS:
+            raise ValueError(f"Unsupported shared backend '{backend}'. Choose from {list(SHARED_BACKENDS)}")
+        array = np.ascontiguousarray(array)
+        self._shm = None
+
+        if backend == 'shm':
+            self._shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            name = self._shm.name
+            np.ndarray(array.shape, dtype=array.dtype, buffer=self._shm.buf)[...] = array
+        else:
+            name = os.path.join(directory or tempfile.gettempdir(), f"cfb_shared_{uuid.uuid4().hex}.npy")
+            out = np.lib.format.open_memmap(name, mode='w+', dtype=array.dtype, shape=array.shape)
+            out[...] = array
+            out.flush()
+            del out
+
+        self.ref = SharedArrayRef(backend, name, tuple(array.shape), array.dtype.str)
+
+    def close(self):
+        """Release the shared copy (workers must be done with it)."""
+        _ATTACHED.pop(self.ref.name, None)
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        elif os.path.exists(self.ref.name):
+            os.remove(self.ref.name)
+
+    def __enter__(self) -> 'SharedArray':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@dataclass(frozen=True)
+class SharedFrameRef:
+    """Picklable reference to a numeric frame: shared values plus its labels."""
+
+    values: SharedArrayRef
+    index: Tuple[Hashable, ...]
+    columns: Tuple[Hashable, ...]
+    index_name: Optional[Hashable] = None
+
+    def attach(self) -> pd.DataFrame:
+        """Return the frame backed by the shared buffer (read-only, no copy)."""
+        frame = pd.DataFrame(
+            self.values.attach(),
+            index=pd.Index(self.index, name=self.index_name),
+            columns=list(self.columns),
+            copy=False,
+        )
+        return frame
+
+
+class SharedFrame:
+    """Owner of a shared copy of a frame's numeric columns (as one float matrix)."""
+
+    def __init__(self, df: pd.DataFrame, backend: str = 'shm', directory: Optional[str] = None):
+        numeric = df.select_dtypes('number')
+        values = numeric.to_numpy(dtype=float, na_value=np.nan)
+        self._array = SharedArray(values, backend, directory)
+        self.ref = SharedFrameRef(
+            values=self._array.ref,
+            index=tuple(numeric.index),
+            columns=tuple(numeric.columns),
+            index_name=numeric.index.name,
+        )
+
+    def close(self):
+        self._array.close()
+
+    def __enter__(self) -> 'SharedFrame':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def share_array(array: np.ndarray, backend: str = 'shm', directory: Optional[str] = None) -> SharedArray:
+    """Copy ``array`` into shared memory (or a memmap file) and return its owner."""
+    return SharedArray(array, backend, directory)
+
+
+def share_frame(df: pd.DataFrame, backend: str = 'shm', directory: Optional[str] = None) -> SharedFrame:
+    """
+    Share the numeric columns of ``df`` (e.g. the team summary indexed by team).
+
+    Non-numeric columns are dropped; set them as the index to keep them.
+    """
+    return SharedFrame(df, backend, directory)
+
+
+def attach(obj):
+    """Resolve shared references to arrays/frames; pass anything else through."""
+    if isinstance(obj, (SharedArrayRef, SharedFrameRef)):
+        return obj.attach()
+    return obj
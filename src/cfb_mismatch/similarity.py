@@ -0,0 +1,220 @@
+"""
+Team similarity search over summary metric profiles.
+
+Every team-season of the given summaries becomes one row of a standardized
+metric matrix (z-scores over all team-seasons, missing values at the mean),
+scaled by the square root of the per-metric weights so that Euclidean
+distance is the weighted distance. A query is one matrix product against the
+whole index,
+
+    |q - x|^2 = |q|^2 + |x|^2 - 2 q.x
+
+followed by ``np.argpartition`` for the k nearest rows, so a query (or a
+batch of queries) over a decade of team-seasons returns in milliseconds.
+Queries by vector may give only some metrics; distances are then taken over
+those metrics alone.
+"""
+
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.matrix import MetricRegistry, TeamMatrix
+from cfb_mismatch.mismatches import team_key
+
+# Query rows per distance block (bounds the queries x index distance matrix)
+QUERY_CHUNK = 1024
+
+
+class SimilarityIndex:
+    """
+    Nearest-neighbour index over team-season metric vectors.
+
+    Args:
+        keys: ``season`` and ``team`` of every row
+        names: Metric names (columns of ``values``)
+        values: Raw metric values, rows x metrics (NaN for missing)
+        weights: Optional metric name -> weight (default 1; 0 drops a metric)
+    """
+
+    def __init__(
+        self,
+        keys: pd.DataFrame,
+        names: Sequence[str],
+        values: np.ndarray,
+        weights: Optional[Mapping[str, float]] = None
+    ):
+        if len(names) == 0:
+            raise ValueError("No metrics to index")
+        self.keys = keys.reset_index(drop=True)
+        self.names = list(names)
+        self.values = np.asarray(values, dtype=float)
+        weights = weights or {}
+        unknown = sorted(set(weights) - set(self.names))
+        if unknown:
+            raise ValueError(f"Weights for metrics not in the index: {', '.join(unknown)}")
+        w = np.array([float(weights.get(name, 1.0)) for name in self.names])
+        if (w < 0).any():
+            raise ValueError("Metric weights must be non-negative")
+
+        with np.errstate(invalid='ignore'):
+            self.center = np.nanmean(self.values, axis=0) if len(self.values) else np.zeros(len(self.names))
+            scale = np.nanstd(self.values, axis=0) if len(self.values) else np.ones(len(self.names))
+        self.center = np.nan_to_num(self.center)
+        # A zero weight gives an infinite scale, i.e. a z-score of 0 for every team
+        with np.errstate(divide='ignore'):
+            self.scale = np.where(np.isnan(scale) | (scale == 0), 1.0, scale) / np.sqrt(w)
+        self.vectors = self.standardize(self.values)
+        self.norms = np.einsum('ij,ij->i', self.vectors, self.vectors)
+        # Upper-case team name -> index rows (one per season)
+        self._rows: Dict[str, np.ndarray] = pd.Series(np.arange(len(self.keys))).groupby(
+            team_key(self.keys['team']).to_numpy(dtype=object)
+        ).indices
+
+    @classmethod
+    def from_summaries(
+        cls,
+        summaries: Mapping[int, pd.DataFrame],
+        metrics: Optional[Sequence[str]] = None,
+        weights: Optional[Mapping[str, float]] = None,
+        registry: Optional[MetricRegistry] = None,
+        category: Optional[str] = None,
+        team_col: str = 'team_name'
+    ) -> 'SimilarityIndex':
+        """
+        Index the teams of one summary per season.
+
+        ``metrics`` defaults to every registered metric column found in the
+        summaries (only those of a stats ``category`` such as
+        ``defense_coverage`` if given); listed metrics may also be any other
+        numeric column (e.g. ``elo_rating``).
+        """
+        frames = []
+        for season, summary in summaries.items():
+            if metrics is None:
+                matrix = TeamMatrix.from_frame(summary, team_col=team_col, registry=registry)
+                names = [spec.name for spec in matrix.metrics if category is None or spec.category == category]
+                frame = matrix.to_frame()[['team_name', *names]]
+            else:
+                missing = [name for name in metrics if name not in summary.columns]
+                if missing:
+                    raise ValueError(f"Summary for {season} has no column(s): {', '.join(missing)}")
+                frame = summary[[team_col, *metrics]].rename(columns={team_col: 'team_name'})
+            frames.append(frame.assign(season=int(season)))
+        table = pd.concat(frames, ignore_index=True)
+        names = [c for c in table.columns if c not in ('season', 'team_name')] if metrics is None else list(metrics)
+        values = np.column_stack([
+            pd.to_numeric(table[name], errors='coerce').to_numpy(dtype=float, na_value=np.nan) for name in names
+        ]) if names else np.empty((len(table), 0))
+        keys = pd.DataFrame({'season': table['season'].to_numpy(), 'team': table['team_name'].astype(str).to_numpy()})
+        return cls(keys, names, values, weights)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def standardize(self, values: np.ndarray) -> np.ndarray:
+        """Weighted z-scores of raw metric rows; missing values map to 0 (the mean)."""
+        z = (np.asarray(values, dtype=float) - self.center) / self.scale
+        return np.nan_to_num(z, nan=0.0)
+
+    def row(self, team: str, season: Optional[int] = None) -> int:
+        """Index row of a team (case-insensitive); the latest season if none is given."""
+        rows = self._rows.get(team_key([team]).iloc[0], np.empty(0, dtype=np.int64))
+        seasons = self.keys['season'].to_numpy()[rows]
+        if season is not None:
+            rows, seasons = rows[seasons == int(season)], seasons[seasons == int(season)]
+        if len(rows) == 0:
+            label = f"{team} ({season})" if season is not None else team
+            raise ValueError(f"Team {label} is not in the similarity index")
+        return int(rows[np.argmax(seasons)])
+
+    def _nearest(self, queries: np.ndarray, k: int, mask: np.ndarray, exclude: Optional[np.ndarray], candidates):
+        """Rows and distances of the k nearest candidates of every query row."""
+        vectors = self.vectors[:, mask]
+        norms = self.norms if mask.all() else np.einsum('ij,ij->i', vectors, vectors)
+        pool = np.arange(len(self)) if candidates is None else np.flatnonzero(candidates)
+        k = min(k, len(pool) - (1 if exclude is not None else 0))
+        rows = np.empty((len(queries), max(k, 0)), dtype=np.int64)
+        dists = np.empty((len(queries), max(k, 0)))
+        if k <= 0:
+            return rows, dists
+        for start in range(0, len(queries), QUERY_CHUNK):
+            q = queries[start:start + QUERY_CHUNK][:, mask]
+            d2 = np.einsum('ij,ij->i', q, q)[:, None] + norms[pool][None, :] - 2.0 * q @ vectors[pool].T
+            if exclude is not None:
+                d2[pool[None, :] == exclude[start:start + QUERY_CHUNK, None]] = np.inf
+            top = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            top_d2 = np.take_along_axis(d2, top, axis=1)
+            order = np.argsort(top_d2, axis=1, kind='stable')
+            rows[start:start + len(q)] = pool[np.take_along_axis(top, order, axis=1)]
+            dists[start:start + len(q)] = np.sqrt(np.maximum(np.take_along_axis(top_d2, order, axis=1), 0.0))
+        return rows, dists
+
+    def _frame(self, rows: np.ndarray, dists: np.ndarray, query_labels: List[str]) -> pd.DataFrame:
+        k = rows.shape[1]
+        flat = rows.ravel()
+        result = pd.DataFrame({
+            'query': np.repeat(np.asarray(query_labels, dtype=object), k),
+            'rank': np.tile(np.arange(1, k + 1), len(query_labels)),
+            'season': self.keys['season'].to_numpy()[flat],
+            'team': self.keys['team'].to_numpy()[flat],
+            'distance': dists.ravel(),
+        })
+        raw = pd.DataFrame(self.values[flat], columns=self.names)
+        return pd.concat([result, raw], axis=1)
+
+    def nearest(
+        self,
+        team: str,
+        season: Optional[int] = None,
+        k: int = 10,
+        same_season: bool = False
+    ) -> pd.DataFrame:
+        """
+        The k team-seasons most similar to a team (itself excluded).
+
+        Args:
+            team: Team name (case-insensitive)
+            season: Season of the team (default: its latest)
+            k: Number of neighbours
+            same_season: Only search the team's own season
+
+        Returns:
+            One row per neighbour: ``query``, ``rank``, ``season``, ``team``,
+            ``distance`` and the neighbour's raw metric values
+        """
+        row = self.row(team, season)
+        candidates = (self.keys['season'] == self.keys['season'].iloc[row]).to_numpy() if same_season else None
+        mask = np.isfinite(self.scale)
+        rows, dists = self._nearest(self.vectors[[row]], k, mask, np.array([row]), candidates)
+        label = f"{self.keys['team'].iloc[row]} ({self.keys['season'].iloc[row]})"
+        return self._frame(rows, dists, [label])
+
+    def query(
+        self,
+        profiles: pd.DataFrame,
+        k: int = 10,
+        seasons: Optional[Sequence[int]] = None
+    ) -> pd.DataFrame:
+        """
+        The k nearest team-seasons of arbitrary metric profiles.
+
+        Args:
+            profiles: One row per query with raw values of some or all of the
+                indexed metrics; metrics missing from ``profiles`` are left
+                out of the distance (NaN cells count as the mean)
+            k: Number of neighbours per query
+            seasons: Optional seasons to search
+
+        Returns:
+            Same layout as ``nearest``; ``query`` is the profile's index label
+        """
+        given = [name for name in self.names if name in profiles.columns]
+        if not given:
+            raise ValueError(f"Profiles share no metric with the index ({', '.join(self.names)})")
+        raw = profiles.reindex(columns=self.names).to_numpy(dtype=float, na_value=np.nan)
+        mask = np.isin(self.names, given) & np.isfinite(self.scale)
+        candidates = self.keys['season'].isin(list(seasons)).to_numpy() if seasons is not None else None
+        rows, dists = self._nearest(self.standardize(raw), k, mask, None, candidates)
+        return self._frame(rows, dists, [str(label) for label in profiles.index])
@@ -0,0 +1,287 @@
+"""
+Monte Carlo simulation of the rest of a season.
+
+Every unplayed game of the schedule is decided by its Elo win probability
+(see ``ratings``), many times over. A chunk of simulations is drawn at once as
+a (games x sims) matrix of home wins. The games are split into rounds in
+which each team plays at most once (a week, almost always), so a round adds
+its rows to the winners' win counts in one fancy-indexed step; a chunk costs a
+random draw and a handful of row additions per round. ``rating_sd`` adds
+per-simulation noise to the team ratings, which correlates a team's results
+within a simulated season.
+
+Per team the simulation reports the expected win total and its distribution,
+the chance of reaching bowl eligibility and the chance of finishing first in
+its conference (best conference record; ties go to more total wins, then at
+random). Conference championship games that are not yet scheduled are not
+simulated.
+
+Chunks bound memory; their seeds come from one ``SeedSequence``, so results
+do not depend on ``n_jobs``. With ``n_jobs > 1`` chunks run in a process pool
+(the schedule arrays are small, so each task carries its own copy).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.ratings import EloSettings, win_probability
+from cfb_mismatch.weekly import split_rounds
+
+# Simulations drawn per vectorized chunk (bounds the sims x games matrices)
+CHUNK_SIMS = 10000
+
+# FBS teams need six wins to be bowl eligible
+BOWL_WINS = 6
+
+_INDEPENDENT = {'', 'FBS Independents', 'Independent', 'nan', 'None'}
+
+
+@dataclass
+class GameRounds:
+    """
+    A set of games split into rounds in which every team plays at most once.
+
+    ``rows`` are the games' rows in the (games x sims) outcome matrix, in
+    round order; round ``r`` spans ``rows[bounds[r]:bounds[r + 1]]``.
+    """
+
+    home: np.ndarray
+    away: np.ndarray
+    rows: np.ndarray
+    bounds: np.ndarray
+
+    @classmethod
+    def build(cls, home: np.ndarray, away: np.ndarray, rows: np.ndarray) -> 'GameRounds':
+        rounds = split_rounds(home[rows], away[rows])
+        order = np.argsort(rounds, kind='stable')
+        bounds = np.searchsorted(rounds[order], np.arange(rounds.max() + 2 if len(rows) else 1))
+        rows = rows[order]
+        return cls(home=home[rows], away=away[rows], rows=rows, bounds=bounds)
+
+    def wins(self, home_wins: np.ndarray, base: np.ndarray) -> np.ndarray:
+        """Wins per team (teams x sims) from a (games x sims) matrix of home wins."""
+        wins = np.repeat(base.astype(np.int16)[:, None], home_wins.shape[1], axis=1)
+        outcomes = home_wins.view(np.int8)
+        for start, stop in zip(self.bounds[:-1], self.bounds[1:]):
+            won = outcomes[self.rows[start:stop]]
+            wins[self.home[start:stop]] += won
+            wins[self.away[start:stop]] += 1 - won
+        return wins
+
+
+@dataclass
+class SeasonSchedule:
+    """Results so far and the remaining games of one season."""
+
+    teams: np.ndarray
+    team_conference: np.ndarray
+    conferences: Dict[str, np.ndarray]
+    wins: np.ndarray
+    losses: np.ndarray
+    conference_wins: np.ndarray
+    home: np.ndarray
+    away: np.ndarray
+    edge: np.ndarray
+    rounds: GameRounds
+    conference_rounds: GameRounds
+    max_games: int
+
+
+@dataclass
+class SimulationResult:
+    """Per-team season odds and the win total distribution."""
+
+    teams: pd.DataFrame
+    win_distribution: pd.DataFrame
+    sims: int
+
+
+def _team_conferences(games: pd.DataFrame, teams: np.ndarray) -> np.ndarray:
+    """Most common conference of every team (None without conference columns)."""
+    if 'home_conference' not in games.columns or 'away_conference' not in games.columns:
+        return np.full(len(teams), None, dtype=object)
+    sides = pd.concat([
+        pd.DataFrame({'team': games['home_team'].astype(str), 'conference': games['home_conference']}),
+        pd.DataFrame({'team': games['away_team'].astype(str), 'conference': games['away_conference']}),
+    ]).dropna()
+    if sides.empty:
+        return np.full(len(teams), None, dtype=object)
+    mode = sides.groupby('team')['conference'].agg(lambda c: c.value_counts().index[0]).reindex(teams)
+    return np.array([c if isinstance(c, str) else None for c in mode], dtype=object)
+
+
+def build_schedule(
+    games: pd.DataFrame,
+    ratings: Mapping[str, float],
+    settings: Optional[EloSettings] = None
+) -> SeasonSchedule:
+    """
+    Split a season's games into results so far and games left to simulate.
+
+    Args:
+        games: CFBD games of one season (played and unplayed)
+        ratings: Team -> Elo rating used for the unplayed games (teams
+            missing get ``settings.initial``)
+        settings: Elo parameters (home field)
+
+    Returns:
+        SeasonSchedule
+    """
+    settings = settings or EloSettings()
+    teams = np.array(sorted(set(games['home_team'].astype(str)) | set(games['away_team'].astype(str))), dtype=object)
+    index = {team: i for i, team in enumerate(teams)}
+    home = games['home_team'].astype(str).map(index).to_numpy(dtype=np.int64)
+    away = games['away_team'].astype(str).map(index).to_numpy(dtype=np.int64)
+    T = len(teams)
+
+    team_conference = _team_conferences(games, teams)
+    conferences = {
+        conference: np.flatnonzero(team_conference == conference)
+        for conference in sorted({c for c in team_conference if c is not None and c not in _INDEPENDENT})
+    }
+    conference_game = np.array([
+        c in conferences and c == team_conference[a] for c, a in zip(team_conference[home], away)
+    ], dtype=bool)
+
+    played = (games['home_points'].notna() & games['away_points'].notna()).to_numpy()
+    margin = (games['home_points'] - games['away_points']).to_numpy(dtype=float)
+    home_won, away_won = played & (margin > 0), played & (margin < 0)
+    conf_home, conf_away = home_won & conference_game, away_won & conference_game
+
+    left = np.flatnonzero(~played)
+    rating = np.array([float(ratings.get(team, settings.initial)) for team in teams])
+    neutral = (
+        games['neutral_site'].fillna(False).to_numpy(dtype=bool)
+        if 'neutral_site' in games.columns else np.zeros(len(games), dtype=bool)
+    )[left]
+    edge = rating[home[left]] - rating[away[left]] + np.where(neutral, 0.0, settings.home_field)
+    positions = np.arange(len(left))
+
+    return SeasonSchedule(
+        teams=teams,
+        team_conference=team_conference,
+        conferences=conferences,
+        wins=np.bincount(home[home_won], minlength=T) + np.bincount(away[away_won], minlength=T),
+        losses=np.bincount(home[away_won], minlength=T) + np.bincount(away[home_won], minlength=T),
+        conference_wins=np.bincount(home[conf_home], minlength=T) + np.bincount(away[conf_away], minlength=T),
+        home=home[left],
+        away=away[left],
+        edge=edge,
+        rounds=GameRounds.build(home[left], away[left], positions),
+        conference_rounds=GameRounds.build(home[left], away[left], positions[conference_game[left]]),
+        max_games=int((np.bincount(home, minlength=T) + np.bincount(away, minlength=T)).max()) if T else 0,
+    )
+
+
+def _run_chunk(args: Tuple) -> Dict[str, np.ndarray]:
+    """Simulate one chunk; returns summed counts so chunks combine by addition."""
+    schedule, sims, seed, rating_sd, bowl_wins = args
+    rng = np.random.default_rng(seed)
+    T = len(schedule.teams)
+
+    # Laid out games x sims so every per-team gather and sum runs over rows
+    if rating_sd:
+        noise = rng.normal(0.0, rating_sd, size=(T, sims))
+        p = win_probability(schedule.edge[:, None] + noise[schedule.home] - noise[schedule.away])
+    else:
+        p = win_probability(schedule.edge)[:, None]
+    home_wins = rng.random((len(schedule.edge), sims)) < p
+
+    wins = schedule.rounds.wins(home_wins, schedule.wins)
+    conference_wins = schedule.conference_rounds.wins(home_wins, schedule.conference_wins)
+
+    bins = schedule.max_games + 1
+    cells = (np.arange(T)[:, None] * bins + wins.astype(np.int64)).ravel()
+    distribution = np.bincount(cells, minlength=T * bins).reshape(T, bins)
+
+    titles = np.zeros(T)
+    for members in schedule.conferences.values():
+        standing = conference_wins[members] + wins[members] * 1e-3 + rng.random((len(members), sims)) * 1e-6
+        titles += np.bincount(members[standing.argmax(axis=0)], minlength=T)
+
+    return {
+        'wins': wins.sum(axis=1, dtype=float),
+        'wins_sq': (wins.astype(float) ** 2).sum(axis=1),
+        'conference_wins': conference_wins.sum(axis=1, dtype=float),
+        'bowl': (wins >= bowl_wins).sum(axis=1, dtype=float),
+        'titles': titles,
+        'distribution': distribution,
+    }
+
+
+def simulate_season(
+    games: pd.DataFrame,
+    ratings: Mapping[str, float],
+    settings: Optional[EloSettings] = None,
+    sims: int = 100000,
+    chunk_size: int = CHUNK_SIMS,
+    n_jobs: int = 1,
+    seed: int = 0,
+    rating_sd: float = 0.0,
+    bowl_wins: int = BOWL_WINS
+) -> SimulationResult:
+    """
+    Simulate the unplayed games of a season.
+
+    Args:
+        games: CFBD games of one season (played and unplayed)
+        ratings: Team -> Elo rating before the first unplayed game
+        settings: Elo parameters (home field)
+        sims: Number of simulated seasons
+        chunk_size: Simulations drawn per vectorized chunk
+        n_jobs: Processes used to run chunks in parallel
+        seed: Random seed
+        rating_sd: Standard deviation of per-simulation rating noise (Elo points)
+        bowl_wins: Wins needed for bowl eligibility
+
+    Returns:
+        SimulationResult with one row per team (best title odds first)
+    """
+    if sims < 1:
+        raise ValueError("sims must be at least 1")
+    schedule = build_schedule(games, ratings, settings)
+    chunks: List[int] = []
+    remaining = sims
+    while remaining > 0:
+        chunks.append(min(chunk_size, remaining))
+        remaining -= chunks[-1]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    tasks = [(schedule, size, child, rating_sd, bowl_wins) for size, child in zip(chunks, seeds)]
+    if n_jobs and n_jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+            results = list(pool.map(_run_chunk, tasks))
+    else:
+        results = [_run_chunk(task) for task in tasks]
+
+    total = {key: sum(result[key] for result in results) for key in results[0]}
+    expected = total['wins'] / sims
+    T = len(schedule.teams)
+    remaining_games = np.bincount(schedule.home, minlength=T) + np.bincount(schedule.away, minlength=T)
+    in_conference = np.array([c in schedule.conferences for c in schedule.team_conference], dtype=bool)
+
+    teams = pd.DataFrame({
+        'team': schedule.teams,
+        'conference': schedule.team_conference,
+        'wins': schedule.wins,
+        'losses': schedule.losses,
+        'remaining_games': remaining_games,
+        'expected_wins': expected,
+        'wins_sd': np.sqrt(np.maximum(total['wins_sq'] / sims - expected ** 2, 0.0)),
+        'expected_conference_wins': total['conference_wins'] / sims,
+        'p_bowl_eligible': total['bowl'] / sims,
+        'p_conference_title': np.where(in_conference, total['titles'] / sims, np.nan),
+    }).sort_values(['p_conference_title', 'expected_wins'], ascending=False, na_position='last')
+
+    distribution = total['distribution'] / sims
+    team_idx, wins = np.nonzero(distribution)
+    win_distribution = pd.DataFrame({
+        'team': schedule.teams[team_idx],
+        'wins': wins,
+        'probability': distribution[team_idx, wins],
+    })
+    return SimulationResult(teams=teams.reset_index(drop=True), win_distribution=win_distribution, sims=sims)
@@ -0,0 +1,188 @@
+"""
+Compare model-implied margins and totals with the betting market.
+
+``LineModel`` maps the point-in-time game features of the backtest (see
+``backtest.score_season``: Elo edge, recent margin edge, point differential
+edge, the static mismatch signals when a summary is given, and the teams'
+scoring averages) to a home margin and a game total with least squares
+fitted on completed games, typically of earlier seasons.
+
+``find_value`` joins a whole season of lines from every provider to the
+implied numbers in one merge and computes all edges column-wise. CFBD
+spreads are from the home side, so the market's home margin is ``-spread``:
+
+    spread_edge = model_margin + spread   (> 0: take the home side)
+    total_edge  = model_total - over_under (> 0: take the over)
+
+Lines whose absolute edge reaches the threshold are flagged; for completed
+games the flagged side is graded (1 win, 0 loss, NaN push).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Candidate features, in order of preference (used when present in the games)
+MARGIN_FEATURES = [
+    'elo_edge', 'margin_ewm_edge', 'point_differential_edge', 'mismatch_score_edge', 'pass_tilt_edge'
+]
+TOTAL_FEATURES = ['points_scored_sum', 'points_allowed_sum']
+
+_KEYS = ['season', 'week', 'home_team', 'away_team']
+
+
+def add_total_features(games: pd.DataFrame) -> pd.DataFrame:
+    """Add the scoring-average sums that drive the implied total."""
+    games = games.copy()
+    if {'home_avg_points_scored', 'away_avg_points_scored'} <= set(games.columns):
+        games['points_scored_sum'] = games['home_avg_points_scored'] + games['away_avg_points_scored']
+    if {'home_avg_points_allowed', 'away_avg_points_allowed'} <= set(games.columns):
+        games['points_allowed_sum'] = games['home_avg_points_allowed'] + games['away_avg_points_allowed']
+    return games
+
+
+@dataclass
+class LinearFit:
+    """Least-squares fit of one target; missing features are filled with their training mean."""
+
+    features: List[str]
+    intercept: float
+    coef: np.ndarray
+    fill: np.ndarray
+    r2: float = float('nan')
+
+    @classmethod
+    def fit(cls, games: pd.DataFrame, target: np.ndarray, features: List[str]) -> 'LinearFit':
+        features = [f for f in features if f in games.columns and games[f].notna().sum() > 1]
+        X = games[features].to_numpy(dtype=float, na_value=np.nan)
+        fill = np.nanmean(X, axis=0) if features else np.zeros(0)
+        X = np.where(np.isnan(X), fill, X)
+        design = np.column_stack([np.ones(len(X)), X])
+        beta = np.linalg.lstsq(design, target, rcond=None)[0]
+        residual = target - design @ beta
+        total = ((target - target.mean()) ** 2).sum()
+        r2 = 1 - (residual ** 2).sum() / total if total > 0 else float('nan')
+        return cls(features=features, intercept=float(beta[0]), coef=beta[1:], fill=fill, r2=float(r2))
+
+    def predict(self, games: pd.DataFrame) -> np.ndarray:
+        X = np.column_stack([
+            games[f].to_numpy(dtype=float, na_value=np.nan) if f in games.columns else np.full(len(games), np.nan)
+            for f in self.features
+        ]) if self.features else np.zeros((len(games), 0))
+        X = np.where(np.isnan(X), self.fill, X)
+        return self.intercept + X @ self.coef
+
+    def describe(self) -> Dict[str, float]:
+        return {'intercept': self.intercept, **dict(zip(self.features, self.coef.tolist())), 'r2': self.r2}
+
+
+@dataclass
+class LineModel:
+    """Implied home margin and game total from scored games."""
+
+    margin: LinearFit
+    total: LinearFit
+    games: int = 0
+
+    @classmethod
+    def fit(
+        cls,
+        scored: pd.DataFrame,
+        margin_features: Optional[List[str]] = None,
+        total_features: Optional[List[str]] = None
+    ) -> 'LineModel':
+        """
+        Fit on completed games (e.g. ``run_backtest`` output of earlier seasons).
+
+        Raises:
+            ValueError: If fewer than two games are completed
+        """
+        games = add_total_features(scored)
+        games = games[games['home_points'].notna() & games['away_points'].notna()]
+        if len(games) < 2:
+            raise ValueError("Need at least two completed games to fit the line model")
+        home, away = games['home_points'].to_numpy(dtype=float), games['away_points'].to_numpy(dtype=float)
+        return cls(
+            margin=LinearFit.fit(games, home - away, margin_features or MARGIN_FEATURES),
+            total=LinearFit.fit(games, home + away, total_features or TOTAL_FEATURES),
+            games=len(games),
+        )
+
+    def predict(self, scored: pd.DataFrame) -> pd.DataFrame:
+        """Add ``model_margin`` (home minus away) and ``model_total`` to scored games."""
+        games = add_total_features(scored)
+        games['model_margin'] = self.margin.predict(games)
+        games['model_total'] = self.total.predict(games)
+        return games
+
+
+def find_value(
+    lines: pd.DataFrame,
+    implied: pd.DataFrame,
+    spread_threshold: float = 3.0,
+    total_threshold: float = 4.0,
+    providers: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Compare every provider's line with the model in one vectorized pass.
+
+    Args:
+        lines: Flattened lines (``flatten_cfbd_lines``/``load_cfbd_lines``)
+        implied: Games with ``model_margin``/``model_total`` (``LineModel.predict``)
+        spread_threshold: Minimum absolute spread edge (points) to flag
+        total_threshold: Minimum absolute total edge (points) to flag
+        providers: Only keep these providers (default: all)
+
+    Returns:
+        One row per (game, provider) line with the model numbers, edges,
+        picks, flags and, for completed games, the graded picks
+    """
+    if providers:
+        lines = lines[lines['provider'].isin(providers)]
+    model = implied[_KEYS + ['model_margin', 'model_total']].drop_duplicates(_KEYS)
+    types = {'season': 'int64', 'week': 'int64', 'home_team': str, 'away_team': str}
+    value = lines.astype(types).merge(model.astype(types), on=_KEYS, how='inner')
+
+    spread = value['spread'].to_numpy(dtype=float, na_value=np.nan)
+    over_under = value['over_under'].to_numpy(dtype=float, na_value=np.nan)
+    spread_edge = value['model_margin'].to_numpy(dtype=float) + spread
+    total_edge = value['model_total'].to_numpy(dtype=float) - over_under
+    value['spread_edge'] = spread_edge
+    value['total_edge'] = total_edge
+    value['spread_pick'] = np.where(np.isnan(spread_edge), None, np.where(spread_edge > 0, 'home', 'away'))
+    value['total_pick'] = np.where(np.isnan(total_edge), None, np.where(total_edge > 0, 'over', 'under'))
+    value['spread_value'] = np.abs(spread_edge) >= spread_threshold
+    value['total_value'] = np.abs(total_edge) >= total_threshold
+
+    # Grade completed games: home covers when margin + spread > 0
+    home_points = value['home_points'].to_numpy(dtype=float, na_value=np.nan)
+    away_points = value['away_points'].to_numpy(dtype=float, na_value=np.nan)
+    cover = (home_points - away_points) + spread
+    over = (home_points + away_points) - over_under
+    value['spread_result'] = np.where(
+        np.isnan(cover) | (cover == 0) | np.isnan(spread_edge), np.nan,
+        ((cover > 0) == (spread_edge > 0)).astype(float)
+    )
+    value['total_result'] = np.where(
+        np.isnan(over) | (over == 0) | np.isnan(total_edge), np.nan,
+        ((over > 0) == (total_edge > 0)).astype(float)
+    )
+    return value.sort_values(['week', 'home_team', 'provider'], kind='stable').reset_index(drop=True)
+
+
+def value_summary(value: pd.DataFrame) -> pd.DataFrame:
+    """Flag counts and graded record of the flagged picks, per market."""
+    rows = []
+    for market in ('spread', 'total'):
+        flagged = value[value[f'{market}_value']]
+        graded = flagged[f'{market}_result'].dropna()
+        rows.append({
+            'market': market,
+            'lines': int(value[f'{market}_edge'].notna().sum()),
+            'flagged': len(flagged),
+            'graded': len(graded),
+            'hit_rate': float(graded.mean()) if len(graded) else np.nan,
+        })
+    return pd.DataFrame(rows)
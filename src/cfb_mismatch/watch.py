@@ -0,0 +1,222 @@
+"""
+Watch mode: poll the configured inputs and recompute only what changed.
+
+The watcher keeps the per-category team aggregates in memory. When one of the
+``stats_paths`` files changes only that category is reloaded and re-aggregated;
+when the CFBD games file changes only the CFBD team stats are reloaded. The
+summary and scores are then rebuilt from the cached aggregates, and an output
+file is rewritten only if its content actually changed.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from cfb_mismatch.adapters.cfbd_data import load_cfbd_games, aggregate_team_games
+from cfb_mismatch.main import (
+    STATS_SOURCES,
+    aggregate_stats_file,
+    save_team_stats,
+    generate_summary_report,
+    generate_integrated_report,
+    team_groups
+)
+from cfb_mismatch.clustering import add_cluster_labels, clusters_from_config
+from cfb_mismatch.matrix import MetricRegistry
+from cfb_mismatch.output import write_frames, report_writes
+from cfb_mismatch.percentiles import percentile_reference
+
+CFBD_GAMES_KEY = 'cfbd_games'
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """Return a cheap change signature (mtime in ns, size) or None if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _frames_equal(left: Optional[pd.DataFrame], right: Optional[pd.DataFrame]) -> bool:
+    if left is None or right is None:
+        return left is right
+    return left.shape == right.shape and left.equals(right)
+
+
+class StatsWatcher:
+    """
+    Incrementally recompute analysis outputs as input files change.
+
+    Args:
+        config: Configuration dictionary from settings.yaml
+        weights: Feature weights dictionary from weights.yaml
+        output_dir: Directory the outputs are written to
+        season: Optional season whose CFBD games file is watched
+        season_type: 'regular' or 'postseason'
+    """
+
+    def __init__(
+        self,
+        config: Dict,
+        weights: Optional[Dict],
+        output_dir: str,
+        season: Optional[int] = None,
+        season_type: str = "regular"
+    ):
+        self.config = config
+        self.weights = weights
+        self.output_dir = output_dir
+        self.season = season
+        self.season_type = season_type
+        self.cfbd_data_dir = config.get('cfbd_paths', {}).get('data_dir', 'data/cfbd')
+
+        self.team_stats: Dict[str, pd.DataFrame] = {}
+        self.cfbd_team_stats: Optional[pd.DataFrame] = None
+        self.games: Optional[pd.DataFrame] = None
+        self.summary: Optional[pd.DataFrame] = None
+
+        self._signatures: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._written: Dict[str, pd.DataFrame] = {}
+
+    def watched_paths(self) -> Dict[str, List[str]]:
+        """Return the files watched for each input key."""
+        paths = {}
+        if self.config.get('use_stats_files', False):
+            for key, path in self.config.get('stats_paths', {}).items():
+                if key in STATS_SOURCES:
+                    paths[key] = [path]
+
+        if self.season is not None:
+            prefix = os.path.join(self.cfbd_data_dir, f"{self.season}_{self.season_type}_games")
+            paths[CFBD_GAMES_KEY] = [f"{prefix}.csv", f"{prefix}.parquet"]
+
+        return paths
+
+    def _signature(self, key: str) -> Optional[Tuple]:
+        signatures = tuple(_file_signature(path) for path in self.watched_paths()[key])
+        return signatures if any(sig is not None for sig in signatures) else None
+
+    def detect_changes(self) -> List[str]:
+        """Return the input keys whose files changed since they were last loaded."""
+        return [
+            key for key in self.watched_paths()
+            if self._signature(key) != self._signatures.get(key, ())
+        ]
+
+    def _reload(self, key: str) -> bool:
+        """Reload a single input. Returns False if the file could not be read yet."""
+        signature = self._signature(key)
+
+        try:
+            if key == CFBD_GAMES_KEY:
+                games_df = load_cfbd_games(self.season, self.season_type, self.cfbd_data_dir)
+                self.games = games_df
+                self.cfbd_team_stats = aggregate_team_games(games_df) if games_df is not None else None
+            else:
+                category = STATS_SOURCES[key][0]
+                if signature is None:
+                    self.team_stats.pop(category, None)
+                    self.team_stats.pop(f"{category}_by_position", None)
+                else:
+                    path = self.config['stats_paths'][key]
+                    self.team_stats.update(aggregate_stats_file(key, path, self.config))
+        except Exception as e:
+            # Most likely a file that is still being written; retry on the next poll
+            print(f"⚠ Could not reload {key}: {e}")
+            return False
+
+        self._signatures[key] = signature
+        return True
+
+    def _write_if_changed(self, name: str, df: pd.DataFrame) -> List[str]:
+        if _frames_equal(self._written.get(name), df):
+            return []
+
+        formats = self.config.get('output_formats')
+        if name == 'summary':
+            base_path = os.path.join(self.output_dir, "team_summary")
+            written = report_writes(write_frames({base_path: df}, formats))
+        else:
+            written = save_team_stats({name: df}, self.output_dir, formats)
+
+        self._written[name] = df
+        return written
+
+    def refresh(self, changed: Optional[List[str]] = None) -> List[str]:
+        """
+        Reload the changed inputs and rewrite any outputs whose content changed.
+
+        Args:
+            changed: Input keys to reload; defaults to every watched input
+
+        Returns:
+            List of output paths that were rewritten
+        """
+        if changed is None:
+            changed = list(self.watched_paths())
+
+        reloaded = [key for key in changed if self._reload(key)]
+        if not reloaded and self.summary is not None:
+            return []
+
+        written = []
+        for category, df in self.team_stats.items():
+            written.extend(self._write_if_changed(category, df))
+
+        registry = MetricRegistry.from_config(self.config)
+        groups = team_groups(self.config)
+        reference = percentile_reference(self.config, self.season)
+        if self.cfbd_team_stats is not None:
+            summary = generate_integrated_report(
+                self.team_stats, self.cfbd_team_stats, weights=self.weights, registry=registry,
+                games=self.games, groups=groups, reference=reference
+            )
+        else:
+            summary = generate_summary_report(
+                self.team_stats, weights=self.weights, registry=registry, groups=groups, reference=reference
+            )
+        if self.config.get('clustering') and not summary.empty:
+            # Warm-starts from the stored centers, so a changed week costs one Lloyd run
+            summary = add_cluster_labels(summary, clusters_from_config(self.config, summary))
+        self.summary = summary
+
+        written.extend(self._write_if_changed('summary', summary))
+        return written
+
+    def poll(self) -> List[str]:
+        """Check the watched files once and recompute if any changed."""
+        changed = self.detect_changes()
+        if not changed:
+            return []
+        print(f"\nDetected changes in: {', '.join(changed)}")
+        return self.refresh(changed)
+
+    def run(self, poll_interval: float = 0.5, max_polls: Optional[int] = None):
+        """
+        Run an initial full computation, then poll until interrupted.
+
+        Args:
+            poll_interval: Seconds to sleep between polls
+            max_polls: Stop after this many polls (None polls forever)
+        """
+        self.refresh()
+        for paths in self.watched_paths().values():
+            for path in paths:
+                if os.path.exists(path):
+                    print(f"Watching {path}")
+
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                time.sleep(poll_interval)
+                started = time.perf_counter()
+                written = self.poll()
+                if written:
+                    elapsed = time.perf_counter() - started
+                    print(f"✓ Refreshed {len(written)} output(s) in {elapsed:.2f}s")
+                polls += 1
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
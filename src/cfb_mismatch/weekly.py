@@ -0,0 +1,251 @@
+"""
+Team state built from the game store one week at a time.
+
+``WeeklyGameState`` is the base of the Elo ratings (``ratings``) and the
+rolling team form (``rolling``). Completed games are processed in
+chronological order (season, regular season before postseason, week); a
+subclass applies one week in ``_apply_week`` and appends that week's rows to
+the history. The state is pickled after an update, and ingesting the store
+again only processes the weeks after the last one seen. A content hash of
+every processed week is kept, so a week that changed afterwards (a corrected
+score, a backfilled game) replays the state from scratch.
+"""
+
+import os
+import pickle
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.adapters.cfbd_data import load_cfbd_game_store
+from cfb_mismatch.output import write_bytes_atomic
+
+SEASON_TYPE_ORDER = {'regular': 0, 'postseason': 1}
+
+GAME_COLUMNS = ['season', 'season_type', 'week', 'home_team', 'away_team', 'home_points', 'away_points']
+
+WeekKey = Tuple[int, int, int]
+
+
+def prepare_games(games: pd.DataFrame, extra_columns: List[str] = ()) -> pd.DataFrame:
+    """
+    Completed games in processing order, with a ``season_type`` column.
+
+    Args:
+        games: CFBD games with ``season`` and ``week`` (e.g. from ``load_game_store``)
+        extra_columns: Other game columns to keep (NaN when missing)
+
+    Returns:
+        The games sorted by (season, season type, week, start date)
+    """
+    columns = GAME_COLUMNS + ['neutral_site'] + list(extra_columns)
+    if games is None or games.empty:
+        return pd.DataFrame(columns=columns + ['_type_order'])
+    games = games[games['home_points'].notna() & games['away_points'].notna()].copy()
+    if 'season_type' not in games.columns:
+        games['season_type'] = 'regular'
+    games['season_type'] = games['season_type'].fillna('regular').astype(str)
+    neutral = games['neutral_site'] if 'neutral_site' in games.columns else pd.Series(False, index=games.index)
+    games['neutral_site'] = neutral.fillna(False).astype(bool)
+    for col in extra_columns:
+        games[col] = pd.to_numeric(games[col], errors='coerce') if col in games.columns else np.nan
+    games['_type_order'] = games['season_type'].map(SEASON_TYPE_ORDER).fillna(len(SEASON_TYPE_ORDER))
+    order = ['season', '_type_order', 'week'] + (['start_date'] if 'start_date' in games.columns else [])
+    games = games.sort_values(order, kind='stable')
+    return games[columns + ['_type_order']].reset_index(drop=True)
+
+
+def _week_keys(games: pd.DataFrame) -> List[pd.Series]:
+    keys = games[['season', '_type_order', 'week']].astype(int)
+    return [keys['season'], keys['_type_order'], keys['week']]
+
+
+def _week_digests(games: pd.DataFrame) -> Dict[WeekKey, int]:
+    """Order-independent content hash of every week's games."""
+    hashes = pd.util.hash_pandas_object(games.drop(columns='_type_order'), index=False)
+    sums = hashes.groupby(_week_keys(games)).sum()
+    return {tuple(int(v) for v in key): int(value) for key, value in sums.items()}
+
+
+def split_rounds(home: np.ndarray, away: np.ndarray) -> np.ndarray:
+    """Split a week's games into rounds in which every team plays at most once."""
+    rounds = np.zeros(len(home), dtype=np.int64)
+    if len(np.unique(np.concatenate([home, away]))) == 2 * len(home):
+        return rounds
+    next_free: Dict[int, int] = {}
+    for i, (h, a) in enumerate(zip(home, away)):
+        rounds[i] = max(next_free.get(h, 0), next_free.get(a, 0))
+        next_free[h] = next_free[a] = rounds[i] + 1
+    return rounds
+
+
+def before_week(history: pd.DataFrame, season: int, week: Optional[int], season_type: str = 'regular') -> np.ndarray:
+    """
+    Mask of the history rows played before ``week`` of ``season``.
+
+    ``week=None`` keeps every row up to the end of ``season_type``.
+    """
+    order = history['season_type'].map(SEASON_TYPE_ORDER).fillna(len(SEASON_TYPE_ORDER)).to_numpy()
+    type_order = SEASON_TYPE_ORDER.get(season_type, len(SEASON_TYPE_ORDER))
+    seasons = history['season'].to_numpy()
+    weeks = history['week'].to_numpy()
+    limit = np.inf if week is None else week
+    return (seasons < season) | (
+        (seasons == season) & ((order < type_order) | ((order == type_order) & (weeks < limit)))
+    )
+
+
+class WeeklyGameState:
+    """
+    Persistent state that updates week by week from the game store.
+
+    Subclasses set ``SETTINGS``, ``VERSION``, ``LABEL`` and
+    ``HISTORY_COLUMNS``, grow their per-team arrays in ``_add_teams`` and
+    implement ``_apply_week``, which returns the week's history rows.
+
+    Args:
+        settings: Parameters (a frozen ``SETTINGS`` dataclass, defaults if
+            None); a stored state built with other settings is rebuilt
+    """
+
+    SETTINGS: type = None
+    # Bump when the pickled layout changes; older stores are rebuilt
+    VERSION = 1
+    LABEL = 'team state'
+    HISTORY_COLUMNS: List[str] = []
+
+    def __init__(self, settings=None):
+        self.settings = settings if settings is not None else self.SETTINGS()
+        self.version = self.VERSION
+        self.team_index: Dict[str, int] = {}
+        self.season: Optional[int] = None
+        self.last_week: Optional[WeekKey] = None
+        self.digests: Dict[WeekKey, int] = {}
+        self._weeks: List[pd.DataFrame] = []
+        self._history: Optional[pd.DataFrame] = None
+
+    def extra_columns(self) -> List[str]:
+        """Game columns ``_apply_week`` needs beyond ``GAME_COLUMNS``."""
+        return []
+
+    def _indices(self, teams: np.ndarray) -> np.ndarray:
+        """Team positions, registering new teams."""
+        new = [team for team in pd.unique(teams) if team not in self.team_index]
+        if new:
+            for team in new:
+                self.team_index[team] = len(self.team_index)
+            self._add_teams(len(new))
+        return np.array([self.team_index[team] for team in teams], dtype=np.int64)
+
+    def _add_teams(self, count: int):
+        raise NotImplementedError
+
+    def _apply_week(self, week_games: pd.DataFrame) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def reset(self):
+        """Forget every processed game."""
+        self.__init__(self.settings)
+
+    def update(self, games: pd.DataFrame) -> int:
+        """
+        Process the weeks of ``games`` after the last week already processed.
+
+        Weeks already processed are skipped when unchanged; if one of them
+        changed, the state is replayed from scratch over ``games``.
+
+        Args:
+            games: CFBD games with ``season``, ``week`` and scores
+
+        Returns:
+            Number of weeks processed
+        """
+        games = prepare_games(games, self.extra_columns())
+        if games.empty:
+            return 0
+        digests = _week_digests(games)
+        seen = [key for key in digests if self.last_week is not None and key <= self.last_week]
+        if any(self.digests.get(key) != digests[key] for key in seen):
+            print(f"⚠ Processed games changed; replaying {self.LABEL} from scratch")
+            self.reset()
+            seen = []
+
+        seen = set(seen)
+        processed = 0
+        for key, week_games in games.groupby(_week_keys(games), sort=True):
+            key = tuple(int(v) for v in key)
+            if key in seen:
+                continue
+            season = int(week_games['season'].iloc[0])
+            self._weeks.append(self._apply_week(week_games))
+            self._history = None
+            self.season = season
+            self.digests[key] = digests[key]
+            self.last_week = key
+            processed += 1
+        return processed
+
+    @property
+    def history(self) -> pd.DataFrame:
+        """Rows appended by every processed week (``HISTORY_COLUMNS``)."""
+        if self._history is None:
+            if self._weeks:
+                self._weeks = [pd.concat(self._weeks, ignore_index=True)]
+                self._history = self._weeks[0]
+            else:
+                self._history = pd.DataFrame(columns=self.HISTORY_COLUMNS)
+        return self._history
+
+    def save(self, path: str):
+        """Persist the state atomically."""
+        _ = self.history  # store the concatenated history
+        write_bytes_atomic(path, pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL), skip_unchanged=False)
+
+    @classmethod
+    def load(cls, path: str, settings=None) -> 'WeeklyGameState':
+        """Load the state from ``path``, or return an empty one if missing, stale or built with other settings."""
+        settings = settings if settings is not None else cls.SETTINGS()
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    state = pickle.load(f)
+                if isinstance(state, cls) and state.version == cls.VERSION and state.settings == settings:
+                    return state
+            except (OSError, pickle.UnpicklingError, AttributeError, EOFError) as e:
+                print(f"⚠ Rebuilding unreadable {cls.LABEL} store {path}: {e}")
+        return cls(settings)
+
+
+def load_game_store(data_dir: str = "data/cfbd") -> pd.DataFrame:
+    """Regular season and postseason games of every season in the local game store."""
+    frames = []
+    for season_type in SEASON_TYPE_ORDER:
+        games = load_cfbd_game_store(data_dir, season_type)
+        if not games.empty:
+            frames.append(games.assign(season_type=season_type))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def update_state(state_cls, games: pd.DataFrame, path: Optional[str] = None, settings=None) -> WeeklyGameState:
+    """
+    Bring a stored state up to date with ``games``.
+
+    Args:
+        state_cls: ``WeeklyGameState`` subclass
+        games: CFBD games with ``season``, ``week`` and scores
+        path: Pickled store (None keeps the state in memory only)
+        settings: Parameters; a store built with other settings is rebuilt
+
+    Returns:
+        The updated state
+    """
+    state = state_cls.load(path, settings) if path else state_cls(settings)
+    processed = state.update(games)
+    if path and processed:
+        state.save(path)
+    print(f"✓ {state.LABEL[0].upper()}{state.LABEL[1:]}: {processed} new weeks processed, "
+          f"{len(state.team_index)} teams")
+    return state
@@ -0,0 +1,255 @@
+"""
+What-if roster scenarios on team aggregates.
+
+Team aggregates are weighted means built from per-team sufficient statistics
+(see ``adapters.aggregation``), so removing or reweighting a player only means
+subtracting that player's contribution from their team's sums. A scenario
+copies the baseline sums (teams x columns), applies the affected players'
+deltas and rescores the summary; the player files are never re-filtered or
+re-aggregated.
+
+Players are selected by ``player_id`` or by (case-insensitive) name.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import pandas as pd
+
+from cfb_mismatch.adapters.aggregation import TEAM_COL, WEIGHT_COL, TeamAccumulator
+from cfb_mismatch.main import (
+    STATS_SOURCES,
+    category_frames,
+    generate_integrated_report,
+    generate_summary_report,
+    team_groups
+)
+from cfb_mismatch.matrix import MetricRegistry
+from cfb_mismatch.percentiles import percentile_reference
+
+# Summary columns compared between baseline and scenario
+COMPARE_COLUMNS = [
+    'man_coverage_grade', 'zone_coverage_grade',
+    'man_qb_rating_against', 'zone_qb_rating_against',
+    'screen_yprr', 'slot_yprr', 'man_yprr', 'zone_yprr',
+    'mismatch_score',
+]
+
+
+@dataclass
+class WhatIfResult:
+    """Team stats, summary and a before/after comparison for one scenario."""
+
+    team_stats: Dict[str, pd.DataFrame]
+    summary: pd.DataFrame
+    players: pd.DataFrame
+    affected_teams: List[str] = field(default_factory=list)
+    comparison: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+
+class RosterWhatIf:
+    """
+    Evaluate roster scenarios against a fixed baseline.
+
+    Args:
+        player_stats: Player-level frames per team_stats category
+            (e.g. ``{'receiving_scheme': df}``)
+        weights: Feature weights dictionary from weights.yaml
+        cfbd_team_stats: Optional CFBD team stats merged into the summary
+        position_groups: ``position_groups`` config for the per-group columns
+        registry: Metric registry with the declared metrics
+        groups: Optional normalization groups (see ``main.team_groups``)
+        reference: Optional percentile reference to score against; with one,
+            a scenario only moves the scores of the teams it touches
+    """
+
+    def __init__(
+        self,
+        player_stats: Mapping[str, Optional[pd.DataFrame]],
+        weights: Optional[Dict] = None,
+        cfbd_team_stats: Optional[pd.DataFrame] = None,
+        position_groups: Optional[Dict] = None,
+        registry: Optional[MetricRegistry] = None,
+        groups: Optional[Dict[str, str]] = None,
+        reference=None
+    ):
+        self.weights = weights
+        self.registry = registry
+        self.groups = groups
+        self.reference = reference
+        self.cfbd_team_stats = cfbd_team_stats
+        self.position_groups = position_groups
+        self.players = {
+            category: df.reset_index(drop=True)
+            for category, df in player_stats.items()
+            if df is not None
+        }
+        self.accumulators = {
+            category: TeamAccumulator().add(df) for category, df in self.players.items()
+        }
+        self.baseline_team_stats = {}
+        for category, acc in self.accumulators.items():
+            self.baseline_team_stats.update(category_frames(category, acc, position_groups))
+        self.baseline = self._summarize(self.baseline_team_stats)
+
+    def _summarize(self, team_stats: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        if self.cfbd_team_stats is not None:
+            return generate_integrated_report(
+                team_stats, self.cfbd_team_stats, weights=self.weights, registry=self.registry,
+                groups=self.groups, reference=self.reference
+            )
+        return generate_summary_report(
+            team_stats, weights=self.weights, registry=self.registry, groups=self.groups, reference=self.reference
+        )
+
+    def match_players(self, selector: str) -> Dict[str, pd.Index]:
+        """
+        Find the rows of a player in every category.
+
+        Args:
+            selector: A ``player_id`` or a player name (case-insensitive)
+
+        Returns:
+            Row labels per category (categories without a match are omitted)
+        """
+        selector = str(selector).strip()
+        matches = {}
+        for category, df in self.players.items():
+            if selector.isdigit() and 'player_id' in df.columns:
+                mask = df['player_id'] == int(selector)
+            elif 'player' in df.columns:
+                mask = df['player'].astype(str).str.casefold() == selector.casefold()
+            else:
+                continue
+            # Rows without a player_id (nullable Int32) never match
+            mask = mask.to_numpy(dtype=bool, na_value=False)
+            if mask.any():
+                matches[category] = df.index[mask]
+        return matches
+
+    def _resolve(self, selectors: Iterable[str]) -> Dict[str, pd.Index]:
+        resolved: Dict[str, pd.Index] = {}
+        unknown = []
+        for selector in selectors:
+            matches = self.match_players(selector)
+            if not matches:
+                unknown.append(selector)
+            for category, rows in matches.items():
+                resolved[category] = resolved.get(category, pd.Index([])).union(rows)
+        if unknown:
+            raise ValueError(f"No player matches: {', '.join(map(str, unknown))}")
+        return resolved
+
+    def run(
+        self,
+        exclude: Iterable[str] = (),
+        include_only: Iterable[str] = (),
+        reweight: Optional[Mapping[str, float]] = None
+    ) -> WhatIfResult:
+        """
+        Evaluate a scenario.
+
+        Args:
+            exclude: Players removed from their team
+            include_only: Players kept on their teams; every other player of
+                those teams is removed, in the categories the players appear in
+            reweight: Player -> factor applied to their player-game count
+                weight (0.5 halves a player's influence on the weighted means)
+
+        Returns:
+            WhatIfResult with updated team stats, rescored summary and a
+            comparison of the affected teams against the baseline
+        """
+        removed = self._resolve(exclude)
+
+        for category, keep in self._resolve(include_only).items():
+            df = self.players[category]
+            teams = df.loc[keep, TEAM_COL].unique()
+            others = df.index[df[TEAM_COL].isin(teams).to_numpy(dtype=bool)].difference(keep)
+            removed[category] = removed.get(category, pd.Index([])).union(others)
+
+        factors: Dict[str, Dict[int, float]] = {}
+        for selector, factor in (reweight or {}).items():
+            for category, rows in self._resolve([selector]).items():
+                for row in rows:
+                    factors.setdefault(category, {})[row] = float(factor)
+
+        team_stats = dict(self.baseline_team_stats)
+        touched = []
+        for category in set(removed) | set(factors):
+            df = self.players[category]
+            acc = self.accumulators[category].copy()
+
+            gone = removed.get(category, pd.Index([]))
+            scaled = pd.Index(list(factors.get(category, {}))).difference(gone)
+            changed = gone.union(scaled)
+            acc.subtract(df.loc[changed])
+            if len(scaled):
+                new_rows = df.loc[scaled].copy()
+                weights = new_rows[WEIGHT_COL].astype(float)
+                new_rows[WEIGHT_COL] = weights * pd.Series(factors[category]).loc[scaled]
+                acc.add(new_rows)
+
+            team_stats.update(category_frames(category, acc, self.position_groups))
+            touched.append(df.loc[changed].assign(
+                category=category,
+                action=['reweight' if row in scaled else 'exclude' for row in changed]
+            ))
+
+        players = pd.concat(touched, ignore_index=True) if touched else pd.DataFrame()
+        affected = sorted(players[TEAM_COL].astype(str).unique()) if not players.empty else []
+        summary = self._summarize(team_stats)
+
+        return WhatIfResult(
+            team_stats=team_stats,
+            summary=summary,
+            players=players,
+            affected_teams=affected,
+            comparison=self.compare(summary, affected),
+        )
+
+    def compare(self, summary: pd.DataFrame, teams: Iterable[str]) -> pd.DataFrame:
+        """Return before/after/change columns for the given teams."""
+        teams = list(teams)
+        before = self.baseline.set_index('team_name')
+        after = summary.set_index('team_name')
+        columns = [col for col in COMPARE_COLUMNS if col in before.columns and col in after.columns]
+
+        comparison = pd.DataFrame(index=pd.Index(teams, name='team_name'))
+        for col in columns:
+            comparison[f"{col}_before"] = before[col].reindex(teams)
+            comparison[f"{col}_after"] = after[col].reindex(teams)
+            comparison[f"{col}_change"] = comparison[f"{col}_after"] - comparison[f"{col}_before"]
+        if 'mismatch_tier' in before.columns and 'mismatch_tier' in after.columns:
+            comparison['mismatch_tier_before'] = before['mismatch_tier'].reindex(teams).astype(object)
+            comparison['mismatch_tier_after'] = after['mismatch_tier'].reindex(teams).astype(object)
+        return comparison.reset_index()
+
+
+def load_roster_whatif(
+    config: Dict,
+    weights: Optional[Dict] = None,
+    cfbd_team_stats: Optional[pd.DataFrame] = None
+) -> RosterWhatIf:
+    """
+    Load the configured player stats files into a ``RosterWhatIf``.
+
+    Args:
+        config: Configuration dictionary from settings.yaml
+        weights: Feature weights dictionary from weights.yaml
+        cfbd_team_stats: Optional CFBD team stats merged into the summary
+
+    Returns:
+        RosterWhatIf with the baseline computed
+    """
+    float_dtype = config.get('stats_float_dtype', 'float64')
+    player_stats = {}
+    if config.get('use_stats_files', False):
+        for key, path in config.get('stats_paths', {}).items():
+            if key in STATS_SOURCES:
+                category, loader, _ = STATS_SOURCES[key]
+                player_stats[category] = loader(path, float_dtype)
+    return RosterWhatIf(
+        player_stats, weights, cfbd_team_stats, config.get('position_groups'),
+        MetricRegistry.from_config(config), team_groups(config), percentile_reference(config, None)
+    )
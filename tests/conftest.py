@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def game_schedule():
+    """
+    Build random weekly pairings of ``Team 0`` … ``Team {n_teams - 1}``.
+
+    Each game's home margin is ``strength[home] - strength[away] + home_field``
+    plus normal noise, split around 28 points (yards follow the margin). Only
+    the last season stops after ``played_weeks``; later games have NaN points.
+    """
+    def build(seasons=(2024,), n_teams=12, weeks=8, played_weeks=None, strength=None,
+              home_field=3.0, noise=10.0, seed=0):
+        rng = np.random.default_rng(seed)
+        teams = [f"Team {i}" for i in range(n_teams)]
+        strength = np.linspace(-14, 14, n_teams) if strength is None else np.asarray(strength, dtype=float)
+        rows = []
+        for season in seasons:
+            for week in range(1, weeks + 1):
+                order = rng.permutation(n_teams)
+                played = played_weeks is None or season < max(seasons) or week <= played_weeks
+                for home, away in zip(order[::2], order[1::2]):
+                    margin = strength[home] - strength[away] + home_field + rng.normal(0, noise)
+                    rows.append({
+                        'game_id': season * 1000 + len(rows),
+                        'season': season,
+                        'week': week,
+                        'home_team': teams[home],
+                        'away_team': teams[away],
+                        'home_points': 28 + round(margin / 2) if played else np.nan,
+                        'away_points': 28 - round(margin / 2) if played else np.nan,
+                        'home_yards': 400 + 5 * margin if played else np.nan,
+                        'away_yards': 400 - 5 * margin if played else np.nan,
+                    })
+        return pd.DataFrame(rows)
+
+    return build
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.adapters.aggregation import (
+    aggregate_by_team,
+    aggregate_by_team_and_group,
+    aggregate_chunks,
+    stream_aggregate_file,
+)
+from cfb_mismatch.adapters.receiving_scheme import (
+    aggregate_receiving_scheme_by_team,
+    load_receiving_scheme,
+)
+
+SAMPLE = "data/external/receiving_scheme 2.csv"
+
+
+def test_aggregate_by_team_handles_missing_values_and_zero_weights():
+    df = pd.DataFrame(
+        {
+            "team_name": ["Alpha", "Alpha", "Bravo", "Bravo", None],
+            "player_game_count": [10, 0, 0, 0, 3],
+            "man_yprr": [2.0, 9.0, 1.0, 3.0, 5.0],
+            "zone_yprr": [np.nan, 4.0, np.nan, np.nan, 1.0],
+        }
+    )
+
+    team_stats = aggregate_by_team(df).set_index("team_name")
+
+    # Zero-weight players don't move a weighted mean...
+    assert team_stats.loc["Alpha", "man_yprr"] == 2.0
+    # ...unless every player with a value has zero weight: plain mean
+    assert team_stats.loc["Alpha", "zone_yprr"] == 4.0
+    assert team_stats.loc["Bravo", "man_yprr"] == 2.0
+    assert np.isnan(team_stats.loc["Bravo", "zone_yprr"])
+    assert team_stats["player_count"].tolist() == [2, 2]
+    assert team_stats.loc["Alpha", "player_game_count_total"] == 10
+
+
+def test_chunked_aggregation_matches_whole_frame():
+    df = pd.read_csv(SAMPLE).sample(frac=1.0, random_state=7)
+    whole = aggregate_by_team(df)
+
+    chunked = aggregate_chunks(df.iloc[i:i + 50] for i in range(0, len(df), 50))
+
+    pd.testing.assert_frame_equal(chunked, whole, check_exact=False, rtol=1e-12)
+
+
+def test_stream_aggregate_file_matches_loader_and_aggregator():
+    expected = aggregate_receiving_scheme_by_team(load_receiving_scheme(SAMPLE))
+
+    streamed = stream_aggregate_file(SAMPLE, "receiving_scheme", chunksize=64)
+
+    pd.testing.assert_frame_equal(streamed, expected, check_exact=False, rtol=1e-12)
+
+
+def test_position_groups_match_filtered_aggregation():
+    df = pd.read_csv(SAMPLE)
+    groups = {"wr": ["WR"], "rb": ["HB", "FB"]}
+
+    teams, by_group = aggregate_by_team_and_group(df, groups)
+
+    pd.testing.assert_frame_equal(teams, aggregate_by_team(df), check_exact=False, rtol=1e-12)
+    rb = by_group[by_group["position_group"] == "rb"].drop(columns="position_group").reset_index(drop=True)
+    expected = aggregate_by_team(df[df["position"].isin(["HB", "FB"])])
+    pd.testing.assert_frame_equal(rb, expected, check_exact=False, rtol=1e-12)
+    assert set(by_group["position_group"]) == {"wr", "rb"}
@@ -0,0 +1,156 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch import cli
+from cfb_mismatch.backtest import (
+    add_season_signals,
+    add_upcoming_signals,
+    evaluate_backtest,
+    run_backtest,
+    score_season
+)
+from cfb_mismatch.ratings import update_ratings
+from cfb_mismatch.rolling import update_form
+from cfb_mismatch.weekly import load_game_store
+
+
+def _season(game_schedule, season, seed):
+    return game_schedule(seasons=(season,), n_teams=8, weeks=6, strength=3 * np.arange(8),
+                         home_field=0.0, noise=4.0, seed=seed)
+
+
+def _write_store(game_schedule, data_dir):
+    os.makedirs(data_dir, exist_ok=True)
+    for season, seed in ((2022, 1), (2023, 2)):
+        _season(game_schedule, season, seed).to_csv(os.path.join(data_dir, f"{season}_regular_games.csv"), index=False)
+
+
+def test_features_only_use_earlier_weeks(game_schedule):
+    games = _season(game_schedule, 2023, 3)
+
+    scored = score_season(games, 2023)
+
+    assert scored.loc[scored['week'] == 1, 'point_differential_edge'].isna().all()
+    week4 = scored[scored['week'] == 4].iloc[0]
+    team = week4['home_team']
+    prior = games[(games['week'] < 4) & ((games['home_team'] == team) | (games['away_team'] == team))]
+    assert week4['home_games_played'] == len(prior)
+    # Changing a later result must not move earlier features
+    future = games.copy()
+    future.loc[future['week'] >= 4, 'home_points'] += 50
+    rescored = score_season(future, 2023)
+    pd.testing.assert_series_equal(
+        rescored.loc[rescored['week'] <= 4, 'point_differential_edge'],
+        scored.loc[scored['week'] <= 4, 'point_differential_edge']
+    )
+
+
+def test_run_backtest_caches_snapshots_and_matches_in_parallel(tmp_path, game_schedule):
+    data_dir = str(tmp_path / 'cfbd')
+    cache_dir = str(tmp_path / 'cache')
+    _write_store(game_schedule, data_dir)
+
+    serial = run_backtest(data_dir, cache_dir=cache_dir)
+    cached = os.listdir(os.path.join(cache_dir, '2023_regular'))
+    parallel = run_backtest(data_dir, cache_dir=cache_dir, n_jobs=2)
+
+    assert sorted(serial['season'].unique()) == [2022, 2023]
+    assert len(cached) == 6
+    assert sorted(os.listdir(os.path.join(cache_dir, '2023_regular'))) == sorted(cached)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_evaluate_backtest_reports_hit_rate_and_calibration(tmp_path, game_schedule):
+    data_dir = str(tmp_path / 'cfbd')
+    _write_store(game_schedule, data_dir)
+    scored = run_backtest(data_dir)
+
+    metrics, calibration = evaluate_backtest(scored, bins=4)
+
+    row = metrics.set_index('signal').loc['point_differential_edge']
+    # Stronger teams keep winning, so past point differential picks winners
+    assert row['hit_rate'] > 0.6
+    assert row['slope'] > 0
+    assert row['brier'] < row['base_rate_brier']
+    by_signal = calibration[calibration['signal'] == 'point_differential_edge']
+    assert by_signal['games'].sum() == row['games']
+
+
+def test_static_signals_come_from_each_seasons_own_summary(game_schedule):
+    scored = pd.concat([
+        score_season(_season(game_schedule, season, seed), season) for season, seed in ((2022, 1), (2023, 2))
+    ], ignore_index=True)
+    teams = [f"Team {i}" for i in range(8)]
+    profile = {'team_name': teams, 'man_yprr': 1.0, 'man_coverage_grade': 60.0}
+    summaries = {
+        2022: pd.DataFrame({**profile, 'mismatch_score': np.arange(8.0)}),
+        2023: pd.DataFrame({**profile, 'mismatch_score': -np.arange(8.0)}),
+    }
+
+    signaled = add_season_signals(scored, summaries)
+
+    number = {team: i for i, team in enumerate(teams)}
+    diff = signaled['home_team'].map(number) - signaled['away_team'].map(number)
+    sign = np.where(signaled['season'] == 2022, 1, -1)
+    np.testing.assert_array_equal(signaled['mismatch_score_edge'], sign * diff)
+    pd.testing.assert_frame_equal(signaled[scored.columns], scored)
+    partial = add_season_signals(scored, {2022: summaries[2022]})
+    assert partial.loc[scored['season'] == 2023, 'mismatch_score_edge'].isna().all()
+
+
+def test_upcoming_games_get_the_signals_they_would_have_had(tmp_path, game_schedule):
+    data_dir = str(tmp_path / 'cfbd')
+    _write_store(game_schedule, data_dir)
+    games = load_game_store(data_dir)
+    played = run_backtest(data_dir, ratings=update_ratings(games).history, form=update_form(games).history)
+    # Drop the 2023 week 5-6 scores: pre-game signals must not change
+    upcoming_dir = str(tmp_path / 'upcoming')
+    os.makedirs(upcoming_dir)
+    for season in (2022, 2023):
+        season_games = pd.read_csv(os.path.join(data_dir, f"{season}_regular_games.csv"))
+        if season == 2023:
+            season_games.loc[season_games['week'] >= 5, ['home_points', 'away_points']] = np.nan
+        season_games.to_csv(os.path.join(upcoming_dir, f"{season}_regular_games.csv"), index=False)
+    games = load_game_store(upcoming_dir)
+    ratings, form = update_ratings(games), update_form(games)
+    scored = run_backtest(upcoming_dir, ratings=ratings.history, form=form.history)
+    pending = (scored['season'] == 2023) & (scored['week'] >= 5)
+    assert scored.loc[pending, 'elo_edge'].isna().all()
+
+    filled = add_upcoming_signals(scored, ratings, form)
+
+    columns = ['home_elo', 'away_elo', 'elo_edge', 'elo_home_win_prob', 'margin_rolling_edge', 'margin_ewm_edge']
+    pd.testing.assert_frame_equal(filled.loc[~pending, scored.columns], scored[~pending])
+    assert filled.loc[pending & (scored['week'] == 5), columns].notna().all().all()
+    # Week 5 follows the last results, so its signals match the fully played store
+    week5 = (played['season'] == 2023) & (played['week'] == 5)
+    pd.testing.assert_frame_equal(
+        filled.loc[pending & (scored['week'] == 5), columns].reset_index(drop=True),
+        played.loc[week5, columns].reset_index(drop=True)
+    )
+
+
+def test_backtest_command_attaches_each_summary_to_its_season(tmp_path, game_schedule):
+    data_dir = str(tmp_path / 'cfbd')
+    _write_store(game_schedule, data_dir)
+    summary = tmp_path / 'summary_2023.csv'
+    pd.DataFrame({
+        'team_name': [f"Team {i}" for i in range(8)], 'man_yprr': np.linspace(1.0, 2.0, 8),
+        'man_coverage_grade': 60.0, 'mismatch_score': np.arange(8.0),
+    }).to_csv(summary, index=False)
+    config = tmp_path / 'settings.yaml'
+    config.write_text("backtest:\n  n_jobs: 1\n")
+    output_dir = tmp_path / 'backtest'
+
+    cli.backtest(argparse.Namespace(
+        config=str(config), data_dir=data_dir, season_type='regular', start_season=None, end_season=None,
+        summary=[f"2023={summary}"], jobs=None, cache_dir=None, no_cache=True, no_elo=True, no_form=True,
+        bins=4, output_dir=str(output_dir)
+    ))
+
+    scored = pd.read_csv(output_dir / 'backtest_games.csv')
+    assert scored.loc[scored['season'] == 2022, 'mismatch_score_edge'].isna().all()
+    assert scored.loc[scored['season'] == 2023, 'mismatch_score_edge'].notna().all()
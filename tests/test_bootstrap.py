@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cfb_mismatch.bootstrap import add_confidence_intervals, replicate_means, team_blocks
+from cfb_mismatch.main import compute_team_stats, generate_summary_report
+from cfb_mismatch.matrix import MetricRegistry
+from cfb_mismatch.mismatches import compute_metrics, standardize_summary, top_mismatches
+from cfb_mismatch.percentiles import PercentileIndex
+
+WEIGHTS = {"stats_weights": {"man_receiving_efficiency": 1.0}}
+
+
+def _receivers():
+    rng = np.random.default_rng(3)
+    teams = np.repeat(["Alpha", "Bravo", "Charlie", "Delta", "Echo"], [1, 3, 6, 6, 8])
+    return pd.DataFrame(
+        {
+            "player": [f"P{i}" for i in range(len(teams))],
+            "team_name": teams,
+            "position": "WR",
+            "player_game_count": rng.integers(1, 10, len(teams)),
+            "man_yprr": rng.normal(2.0, 0.8, len(teams)),
+            "zone_yprr": rng.normal(1.5, 0.5, len(teams)),
+        }
+    )
+
+
+def test_replicate_means_resample_within_teams():
+    df = _receivers()
+    blocks = team_blocks(df, {"man_yprr": "man_yprr"})
+
+    means = replicate_means(blocks, 200, seed=1)
+
+    assert means.shape == (200, 5, 1)
+    # A one-player team always resamples that player
+    assert np.allclose(means[:, 0, 0], df.loc[0, "man_yprr"])
+    # Every replicate mean lies within the team's player range
+    bravo = df.loc[df["team_name"] == "Bravo", "man_yprr"]
+    assert means[:, 1, 0].min() >= bravo.min() - 1e-12
+    assert means[:, 1, 0].max() <= bravo.max() + 1e-12
+
+
+def test_add_confidence_intervals_columns_and_determinism():
+    df = _receivers()
+    summary = generate_summary_report(compute_team_stats(None, None, df), WEIGHTS)
+    player_stats = {"receiving_scheme": df}
+
+    serial = add_confidence_intervals(summary, player_stats, WEIGHTS, replicates=600, seed=5)
+    pooled = add_confidence_intervals(summary, player_stats, WEIGHTS, replicates=600, seed=5, n_jobs=2)
+
+    pd.testing.assert_frame_equal(serial, pooled)
+    assert (serial["man_yprr_ci_low"] <= serial["man_yprr_ci_high"]).all()
+    alpha = serial.set_index("team_name").loc["Alpha"]
+    assert alpha["man_yprr_ci_low"] == pytest.approx(alpha["man_yprr"])
+    assert alpha["man_yprr_ci_high"] == pytest.approx(alpha["man_yprr"])
+    assert serial["mismatch_tier_agreement"].between(0, 1).all()
+    assert {"mismatch_score_ci_low", "mismatch_score_ci_high"} <= set(serial.columns)
+
+    # The interval bounds never feed the pass tilt metrics
+    with_ci, without_ci = compute_metrics(standardize_summary(serial)), compute_metrics(standardize_summary(summary))
+    pd.testing.assert_series_equal(with_ci["OffenseMetric"], without_ci["OffenseMetric"])
+
+
+def test_replicates_are_scored_like_the_summary():
+    # One player per team: every replicate reproduces the summary exactly
+    rng = np.random.default_rng(8)
+    teams = [f"Team {i}" for i in range(10)]
+    df = pd.DataFrame({
+        "player": [f"P{i}" for i in range(10)],
+        "team_name": teams,
+        "position": "WR",
+        "player_game_count": 5,
+        "man_yprr": rng.normal(2.0, 0.8, 10),
+        "zone_yprr": rng.normal(1.5, 0.5, 10),
+        "man_targets_percent": rng.uniform(10, 30, 10),
+    })
+    registry = MetricRegistry.from_config({"metrics": {
+        "man_targets": {"category": "receiving_scheme", "column": "man_targets_percent"},
+        "man_over_zone": {"formula": "man_yprr - zone_yprr"},
+    }})
+    weights = {"stats_weights": {"man_receiving_efficiency": 1.0, "man_targets": 0.5, "man_over_zone": 2.0}}
+    groups = {team.upper(): "East" if i < 5 else "West" for i, team in enumerate(teams)}
+    team_stats = compute_team_stats(None, None, df)
+    index = PercentileIndex()
+    index.add_summary(2024, generate_summary_report(team_stats, weights, registry), registry)
+
+    for options in ({"groups": groups}, {"reference": index.season(2024)}):
+        summary = generate_summary_report(team_stats, weights, registry, **options)
+        intervals = add_confidence_intervals(summary, {"receiving_scheme": df}, weights, replicates=50,
+                                             registry=registry, **options)
+
+        np.testing.assert_allclose(intervals["mismatch_score_ci_low"], summary["mismatch_score"])
+        np.testing.assert_allclose(intervals["mismatch_score_ci_high"], summary["mismatch_score"])
+        assert (intervals["mismatch_tier_agreement"] == 1.0).all()
+
+
+def test_top_mismatches_filters_on_interval_width():
+    summary = pd.DataFrame(
+        {
+            "team_name": ["A", "B", "C", "D"],
+            "man_yprr": [3.0, 1.0, 2.5, 1.5],
+            "man_coverage_grade": [1.0, 1.0, 1.0, 1.0],
+            "mismatch_score_ci_low": [0.0, 0.0, 0.0, 0.0],
+            "mismatch_score_ci_high": [0.9, 0.1, 0.2, 0.2],
+        }
+    )
+    games = pd.DataFrame({"home_team": ["A", "C"], "away_team": ["B", "D"], "week": [1, 1]})
+
+    assert top_mismatches(games, summary, n=2)["matchup"].tolist() == ["A vs B", "C vs D"]
+    assert top_mismatches(games, summary, n=2, max_ci_width=0.5)["matchup"].tolist() == ["C vs D"]
+    with pytest.raises(ValueError):
+        top_mismatches(games, summary.drop(columns=["mismatch_score_ci_low"]), max_ci_width=0.5)
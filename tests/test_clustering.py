@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.clustering import SchemeClusters, add_cluster_labels, add_matchup_clusters, cluster_teams, kmeans
+from cfb_mismatch.matrix import TeamMatrix
+
+
+def _blobs(seed=0):
+    rng = np.random.default_rng(seed)
+    centers = np.array([[70.0, 55.0, 80.0], [55.0, 70.0, 95.0], [60.0, 60.0, 110.0]])
+    sizes = [20, 15, 10]
+    values = np.concatenate([rng.normal(c, 1.0, (n, 3)) for c, n in zip(centers, sizes)])
+    return pd.DataFrame({
+        "team_name": [f"Team {i}" for i in range(sum(sizes))],
+        "man_coverage_grade": values[:, 0],
+        "zone_coverage_grade": values[:, 1],
+        "man_qb_rating_against": values[:, 2],
+    }), np.repeat(np.arange(3), sizes)
+
+
+def test_kmeans_recovers_schemes_and_warm_starts():
+    summary, truth = _blobs()
+    matrix = TeamMatrix.from_frame(summary)
+
+    clusters = cluster_teams(matrix, "defense", 3, restarts=5, seed=1)
+    # Numbered by size, so the 20/15/10 blobs come out as 0/1/2
+    np.testing.assert_array_equal(clusters.labels.to_numpy(), truth)
+    assert clusters.profiles()["teams"].tolist() == [20, 15, 10]
+
+    x = np.random.default_rng(3).normal(size=(200, 4))
+    serial, parallel = kmeans(x, 5, restarts=4, seed=7), kmeans(x, 5, restarts=4, seed=7, n_jobs=2)
+    np.testing.assert_allclose(serial.centers, parallel.centers)
+
+    # One team's week moves it a little: the warm start keeps every label and number
+    summary.loc[0, "man_coverage_grade"] += 0.5
+    previous = {"names": clusters.names, "centers": clusters.centers.tolist()}
+    updated = cluster_teams(TeamMatrix.from_frame(summary), "defense", 3, previous=previous)
+    assert updated.warm_start
+    np.testing.assert_array_equal(updated.labels.to_numpy(), truth)
+    assert cluster_teams(matrix, "offense", 3) is None
+
+
+def test_matchups_get_scoring_against_the_opposing_defense_cluster():
+    summary = pd.DataFrame({"team_name": ["Alpha", "Bravo", "Charlie", "Delta"]})
+    labels = pd.Series([0, 1, 1, -1], index=summary["team_name"].to_numpy())
+    clusters = {"defense": SchemeClusters("defense", [], np.empty((2, 0)), labels, 0.0)}
+    labeled = add_cluster_labels(summary, clusters)
+    games = pd.DataFrame({
+        "home_team": ["Alpha", "Alpha", "Alpha", "Charlie", "Bravo"],
+        "away_team": ["Bravo", "Charlie", "Delta", "Alpha", "Charlie"],
+        "home_points": [30, 10, 20, np.nan, 24],
+        "away_points": [14, 21, 7, np.nan, 17],
+    })
+
+    top = add_matchup_clusters(games[games["home_points"].isna()], games, labeled).iloc[0]
+
+    # Alpha averages 20; 20 against cluster 1 (Bravo, Charlie) -> 0.
+    # Charlie averages 19 and only faced Alpha (cluster 0) at 21 -> +2.
+    assert top["away_defense_cluster"] == 0 and top["home_defense_cluster"] == 1
+    assert top["home_vs_cluster"] == 2.0
+    assert top["away_vs_cluster"] == 0.0
+    assert top["cluster_edge"] == 2.0
+    assert labeled["defense_cluster"].tolist() == [0, 1, 1, -1]
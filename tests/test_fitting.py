@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.fitting import MomentStats, fit_weights, project_simplex
+
+
+def _season(game_schedule, season, seed, n_teams=24):
+    rng = np.random.default_rng(seed)
+    teams = [f"Team {i}" for i in range(n_teams)]
+    summary = pd.DataFrame({
+        'team_name': teams,
+        'man_coverage_grade': rng.normal(60, 8, n_teams),
+        'zone_coverage_grade': rng.normal(60, 8, n_teams),
+        'man_yprr': rng.normal(1.5, 0.3, n_teams),
+    })
+    # Only man coverage and man YPRR drive results
+    strength = (summary['man_coverage_grade'].rank(pct=True) + summary['man_yprr'].rank(pct=True)).to_numpy() * 10
+    games = game_schedule(seasons=(season,), n_teams=n_teams, weeks=8, strength=strength,
+                          home_field=0.0, noise=4.0, seed=seed)
+    return summary, games
+
+
+def test_project_simplex_rows():
+    projected = project_simplex(np.array([[0.5, 0.5, 0.5], [2.0, -1.0, 0.0]]))
+
+    np.testing.assert_allclose(projected.sum(axis=1), 1.0)
+    assert (projected >= 0).all()
+    np.testing.assert_allclose(projected[1], [1.0, 0.0, 0.0])
+
+
+def test_r2_matches_least_squares_fit():
+    rng = np.random.default_rng(0)
+    design = rng.normal(size=(200, 3))
+    margin = design @ np.array([2.0, 1.0, 0.0]) + rng.normal(size=200)
+    w = np.array([0.5, 0.3, 0.2])
+
+    edge = design @ w
+    expected = np.corrcoef(edge, margin)[0, 1] ** 2
+
+    assert np.isclose(MomentStats.from_design(design, margin).r2(w)[0], expected)
+
+
+def test_fit_weights_recovers_driving_features_with_season_folds(game_schedule):
+    seasons = {2022: _season(game_schedule, 2022, 1), 2023: _season(game_schedule, 2023, 2)}
+
+    result = fit_weights(
+        seasons,
+        keys=['man_coverage_defense', 'zone_coverage_defense', 'man_receiving_efficiency'],
+        candidates=500,
+    )
+
+    assert np.isclose(sum(result.weights.values()), 1.0)
+    assert result.weights['zone_coverage_defense'] < 0.1
+    assert result.weights['man_coverage_defense'] > 0.3
+    assert result.weights['man_receiving_efficiency'] > 0.3
+    assert list(result.folds['season']) == [2022, 2023]
+    assert (result.folds['test_hit_rate'] > 0.7).all()
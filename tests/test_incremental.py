@@ -0,0 +1,61 @@
+import pandas as pd
+
+from cfb_mismatch.adapters.aggregation import aggregate_by_team
+from cfb_mismatch.adapters.incremental import PlayerDeltaStore, update_team_stats
+from cfb_mismatch.adapters.receiving_scheme import load_receiving_scheme
+
+SAMPLE = "data/external/receiving_scheme 2.csv"
+
+
+def _next_week(df):
+    week = df.copy()
+    # Some players played again, one left the file, one new player appeared
+    played = week.index[:25]
+    week.loc[played, "player_game_count"] += 1
+    week.loc[played, "man_yprr"] = week.loc[played, "man_yprr"] * 0.9
+    week = week.drop(week.index[40])
+    newcomer = week.iloc[[0]].assign(player_id=999999, player="New Guy", man_yprr=4.2)
+    return pd.concat([week, newcomer], ignore_index=True)
+
+
+def test_delta_update_matches_full_reaggregation():
+    week1 = load_receiving_scheme(SAMPLE)
+    week2 = _next_week(week1)
+
+    store = PlayerDeltaStore("receiving_scheme")
+    store.update(week1)
+    delta = store.update(week2)
+
+    assert delta == {"added": 1, "removed": 1, "changed": 25}
+    pd.testing.assert_frame_equal(
+        store.team_stats(), aggregate_by_team(week2), check_exact=False, rtol=1e-9
+    )
+
+
+def test_update_team_stats_persists_store(tmp_path):
+    week1 = load_receiving_scheme(SAMPLE)
+    update_team_stats(week1, "receiving_scheme", str(tmp_path))
+
+    # Unchanged export: nothing to apply
+    store = PlayerDeltaStore.load(str(tmp_path / "receiving_scheme.pkl"), "receiving_scheme")
+    assert store.update(week1) == {"added": 0, "removed": 0, "changed": 0}
+
+    week2 = _next_week(week1)
+    team_stats = update_team_stats(week2, "receiving_scheme", str(tmp_path))
+    pd.testing.assert_frame_equal(team_stats, aggregate_by_team(week2), check_exact=False, rtol=1e-9)
+
+
+def test_team_dropped_when_all_players_removed():
+    df = pd.DataFrame(
+        {
+            "player_id": [1, 2, 3],
+            "team_name": ["Alpha", "Alpha", "Bravo"],
+            "player_game_count": [3, 2, 4],
+            "man_yprr": [2.0, 1.0, 3.0],
+        }
+    )
+    store = PlayerDeltaStore("receiving_scheme")
+    store.update(df)
+    store.update(df[df["team_name"] == "Alpha"])
+
+    assert store.team_stats()["team_name"].tolist() == ["Alpha"]
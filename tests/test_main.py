@@ -1,6 +1,11 @@
 import pandas as pd
 
-from cfb_mismatch.main import _compute_weighted_scores, _normalize_metric
+from cfb_mismatch.main import (
+    _compute_weighted_scores,
+    _normalize_metric,
+    compute_team_stats,
+    generate_summary_report,
+)
 
 
 def test_normalize_metric_constant_values_returns_zeros():
@@ -47,3 +52,28 @@ def test_compute_weighted_scores_prioritizes_better_metrics():
     # Check that at least one score column was created
     score_columns = [col for col in scored.columns if col.endswith("_score")]
     assert len(score_columns) > 0
+
+
+def test_summary_includes_position_group_columns():
+    df = pd.DataFrame(
+        {
+            "team_name": ["Alpha", "Alpha", "Bravo", "Bravo"],
+            "position": ["WR", "TE", "WR", "TE"],
+            "player_game_count": [4, 4, 2, 2],
+            "man_yprr": [3.0, 1.0, 2.0, 2.0],
+            "zone_yprr": [2.0, 1.0, 1.0, 3.0],
+        }
+    )
+    team_stats = compute_team_stats(
+        None, None, df, position_groups={"receiving": {"wr": ["WR"], "te": ["TE"]}}
+    )
+    weights = {"stats_weights": {"wr_man_receiving_efficiency": 1.0}}
+
+    summary = generate_summary_report(team_stats, weights).set_index("team_name")
+
+    assert "receiving_scheme_by_position" in team_stats
+    assert summary.loc["Alpha", "man_yprr"] == 2.0
+    assert summary.loc["Alpha", "wr_man_yprr"] == 3.0
+    assert summary.loc["Bravo", "te_zone_yprr"] == 3.0
+    # Scored on the WR-only column
+    assert summary.loc["Alpha", "mismatch_score"] > summary.loc["Bravo", "mismatch_score"]
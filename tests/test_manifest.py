@@ -0,0 +1,114 @@
+import pandas as pd
+import pytest
+
+from cfb_mismatch.manifest import load_manifest
+from cfb_mismatch.pipeline import analyze_stage, publish_stage
+
+
+def _write_scheme(path, man_yprr):
+    pd.DataFrame(
+        {
+            "player": ["A", "B"],
+            "player_id": [1, 2],
+            "position": ["WR", "WR"],
+            "team_name": ["Alpha", "Bravo"],
+            "player_game_count": [10, 5],
+            "man_yprr": man_yprr,
+            "zone_yprr": [3.0, 6.0],
+        }
+    ).to_csv(path, index=False)
+
+
+def _run(config, weights, out_dir):
+    result = analyze_stage(config, weights, output_dir=str(out_dir), run_options={"command": "analyze"})
+    publish_stage(result, str(out_dir))
+    return result
+
+
+def test_manifest_skips_unchanged_runs_and_explains_reruns(tmp_path):
+    scheme_path = tmp_path / "scheme.csv"
+    _write_scheme(scheme_path, [2.0, 4.0])
+    config = {"use_stats_files": True, "stats_paths": {"receiving_scheme": str(scheme_path)}}
+    weights = {"stats_weights": {"man_receiving_efficiency": 1.0}}
+    out_dir = tmp_path / "out"
+
+    first = _run(config, weights, out_dir)
+    assert not first.reused
+    assert first.rerun_reasons == ["no previous run manifest"]
+    manifest = load_manifest(str(out_dir))
+    assert set(manifest["outputs"]) == {"team_receiving_scheme.csv", "team_summary.csv"}
+
+    second = _run(config, weights, out_dir)
+    assert second.reused
+    assert second.summary["team_name"].tolist() == first.summary["team_name"].tolist()
+    assert second.summary["mismatch_score"].tolist() == first.summary["mismatch_score"].tolist()
+
+    _write_scheme(scheme_path, [2.0, 5.0])
+    third = _run(config, weights, out_dir)
+    assert not third.reused
+    assert third.rerun_reasons == ["stats file 'receiving_scheme' changed"]
+    assert load_manifest(str(out_dir))["rerun_reasons"] == third.rerun_reasons
+
+    weights["stats_weights"]["zone_receiving_efficiency"] = 1.0
+    assert _run(config, weights, out_dir).rerun_reasons == ["weights changed"]
+
+
+@pytest.mark.parametrize("section", ["ratings", "rolling"])
+def test_game_store_changes_invalidate_ratings_and_form(tmp_path, section):
+    scheme_path = tmp_path / "scheme.csv"
+    _write_scheme(scheme_path, [2.0, 4.0])
+    store = tmp_path / "cfbd"
+    store.mkdir()
+    games = pd.DataFrame({
+        "season": [2024], "week": [1], "home_team": ["Alpha"], "away_team": ["Bravo"],
+        "home_points": [21], "away_points": [14],
+    })
+    games.to_csv(store / "2024_regular_games.csv", index=False)
+    config = {
+        "use_stats_files": True,
+        "stats_paths": {"receiving_scheme": str(scheme_path)},
+        "cfbd_paths": {"data_dir": str(store)},
+        section: {"store_path": None},
+    }
+    weights = {"stats_weights": {"man_receiving_efficiency": 1.0}}
+    out_dir = tmp_path / "out"
+
+    def run():
+        result = analyze_stage(config, weights, season=2024, games_df=games, output_dir=str(out_dir))
+        publish_stage(result, str(out_dir))
+        return result
+
+    run()
+    assert run().reused
+
+    # A postseason file changes the ratings/form without touching this season's games
+    games.to_csv(store / "2024_postseason_games.csv", index=False)
+    rerun = run()
+    assert not rerun.reused
+    assert [r.split(" (")[0] for r in rerun.rerun_reasons] == ["option 'game_store' changed"]
+
+
+def test_team_info_changes_invalidate_grouped_tiers(tmp_path):
+    scheme_path = tmp_path / "scheme.csv"
+    _write_scheme(scheme_path, [2.0, 4.0])
+    store = tmp_path / "cfbd"
+    store.mkdir()
+    info = pd.DataFrame({"school": ["Alpha", "Bravo"], "conference": ["East", "East"]})
+    info.to_csv(store / "team_info.csv", index=False)
+    config = {
+        "use_stats_files": True,
+        "stats_paths": {"receiving_scheme": str(scheme_path)},
+        "cfbd_paths": {"data_dir": str(store)},
+        "normalization": {"group_by": "conference"},
+    }
+    weights = {"stats_weights": {"man_receiving_efficiency": 1.0}}
+    out_dir = tmp_path / "out"
+
+    _run(config, weights, out_dir)
+    assert _run(config, weights, out_dir).reused
+
+    # Realignment moves Bravo into its own group
+    info.assign(conference=["East", "West"]).to_csv(store / "team_info.csv", index=False)
+    rerun = _run(config, weights, out_dir)
+    assert rerun.rerun_reasons == ["CFBD data 'team_info' changed"]
+    assert rerun.summary["mismatch_group"].tolist() == ["East", "West"]
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cfb_mismatch.main import _normalize_metric, compute_team_stats, generate_summary_report, team_groups
+from cfb_mismatch.matrix import MetricRegistry, TeamMatrix, assign_tiers, lookup_spec, normalize_columns
+from cfb_mismatch.mismatches import compute_metrics
+
+
+def test_normalize_columns_matches_series_normalization():
+    values = np.array([
+        [1.0, 5.0, 80.0, np.nan],
+        [3.0, 5.0, 120.0, np.nan],
+        [2.0, 5.0, np.nan, np.nan],
+        [2.0, 5.0, 100.0, np.nan],
+    ])
+    directions = [True, True, False, True]
+
+    normalized = normalize_columns(values, directions)
+
+    for j, higher in enumerate(directions):
+        expected = _normalize_metric(pd.Series(values[:, j]), higher).to_numpy()
+        np.testing.assert_allclose(normalized[:, j], expected)
+
+
+def test_from_team_stats_registers_metrics_and_position_groups():
+    df = pd.DataFrame(
+        {
+            "team_name": ["Alpha", "Alpha", "Bravo"],
+            "position": ["WR", "TE", "WR"],
+            "player_game_count": [4, 4, 2],
+            "man_yprr": [3.0, 1.0, 2.0],
+            "zone_yprr": [2.0, 1.0, 1.0],
+        }
+    )
+    team_stats = compute_team_stats(
+        None, None, df, position_groups={"receiving": {"wr": ["WR"], "te": ["TE"]}}
+    )
+
+    matrix = TeamMatrix.from_team_stats(team_stats)
+
+    assert matrix.teams.tolist() == ["Alpha", "Bravo"]
+    assert matrix.values.flags["C_CONTIGUOUS"]
+    assert matrix.names[:2] == ["man_yprr", "zone_yprr"]
+    assert matrix.spec("te_man_yprr").group == "te"
+    assert matrix.spec("te_man_yprr").category == "receiving_scheme"
+    assert np.isnan(matrix.column("te_man_yprr")[1])
+    assert lookup_spec("cb_man_qb_rating_against").higher_is_better is False
+    assert lookup_spec("man_yprr_score") is None
+
+
+def test_pass_tilt_metrics_ignore_score_and_interval_columns():
+    summary = pd.DataFrame(
+        {
+            "Team": ["Alpha", "Bravo"],
+            "man_yprr": [2.0, 1.0],
+            "zone_yprr": [np.nan, 3.0],
+            "man_yprr_score": [0.5, -0.5],
+            "wr_man_yprr": [9.0, 9.0],
+            "man_coverage_grade": [60.0, 70.0],
+            "man_coverage_grade_ci_low": [10.0, 10.0],
+        }
+    )
+
+    metrics = compute_metrics(summary)
+
+    assert metrics["OffenseMetric"].tolist() == [2.0, 2.0]
+    assert metrics["CoverageMetric"].tolist() == [60.0, 70.0]
+
+
+def test_declared_metrics_are_computed_only_when_requested():
+    df = pd.DataFrame(
+        {
+            "team_name": ["Alpha", "Bravo", "Charlie"],
+            "position": ["WR", "WR", "WR"],
+            "player_game_count": [4, 4, 4],
+            "man_yprr": [3.0, 1.0, 2.0],
+            "zone_yprr": [1.0, 2.0, 2.0],
+            "man_targets_percent": [20.0, 10.0, 15.0],
+        }
+    )
+    registry = MetricRegistry.from_config({
+        "metrics": {
+            "man_target_share": {"category": "receiving_scheme", "column": "man_targets_percent"},
+            "man_zone_gap": {"formula": "man_yprr - zone_yprr"},
+            "unused_ratio": {"formula": "man_yprr / zone_yprr"},
+        },
+        "summary_metrics": ["man_zone_gap"],
+    })
+    weights = {"stats_weights": {"man_target_share": 1.0}}
+
+    summary = generate_summary_report(compute_team_stats(None, None, df), weights, registry)
+
+    assert "unused_ratio" not in summary.columns
+    summary = summary.set_index("team_name")
+    assert summary.loc["Alpha", "man_zone_gap"] == 2.0
+    assert summary.loc["Alpha", "man_target_share"] == 20.0
+    assert summary["mismatch_score"].idxmax() == "Alpha"
+
+
+def test_derived_metrics_are_cached_in_the_matrix():
+    registry = MetricRegistry.from_config({"metrics": {
+        "gap": {"formula": "man_yprr - zone_yprr"},
+        "abs_gap": {"formula": "abs(gap) / 0", "higher_is_better": False},
+    }})
+    matrix = TeamMatrix.from_frame(
+        pd.DataFrame({"team_name": ["A", "B"], "man_yprr": [1.0, 3.0], "zone_yprr": [2.0, 2.0]}),
+        registry=registry,
+    )
+
+    assert "abs_gap" in matrix and "gap" not in matrix.names
+    assert np.isnan(matrix.column("abs_gap")).all()
+    assert matrix.names == ["man_yprr", "zone_yprr", "gap", "abs_gap"]
+    np.testing.assert_array_equal(matrix.column("gap"), [-1.0, 1.0])
+    assert len(matrix.names) == 4
+
+
+def test_registry_rejects_cycles_and_unsafe_formulas():
+    with pytest.raises(ValueError, match="Circular"):
+        MetricRegistry.from_config({"metrics": {"a": {"formula": "b + 1"}, "b": {"formula": "a * 2"}}})
+    with pytest.raises(ValueError, match="Unsupported"):
+        MetricRegistry.from_config({"metrics": {"bad": {"formula": "man_yprr.__class__"}}})
+    with pytest.raises(ValueError, match="Unknown metric 'nope'"):
+        MetricRegistry.from_config({"metrics": {"bad": {"formula": "nope * 2"}}})
+
+
+def test_grouped_normalization_and_tiers_match_per_group():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(40, 3))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[30:, 2] = 1.0  # constant within the last group
+    groups = np.array(['SEC'] * 12 + ['Big Ten'] * 18 + ['FCS'] * 10, dtype=object)
+    directions = [True, False, True]
+
+    normalized = normalize_columns(values, directions, groups)
+    scores = pd.Series(values[:, 0]).fillna(0.0)
+    tiers = assign_tiers(scores, groups)
+
+    for group in np.unique(groups):
+        rows = groups == group
+        np.testing.assert_allclose(normalized[rows], normalize_columns(values[rows], directions))
+        expected = assign_tiers(scores[rows].reset_index(drop=True))
+        assert tiers[rows].astype(str).tolist() == expected.astype(str).tolist()
+    assert (normalized[30:, 2] == 0).all()
+
+
+def test_summary_scores_within_custom_groups():
+    df = pd.DataFrame({
+        "team_name": ["Alpha", "Bravo", "Charlie", "Delta"],
+        "player_game_count": [4, 4, 4, 4],
+        "man_yprr": [1.0, 2.0, 3.0, 4.0],
+    })
+    team_stats = compute_team_stats(None, None, df)
+    weights = {"stats_weights": {"man_receiving_efficiency": 1.0}}
+    config = {"normalization": {"group_by": "custom", "groups": {"A": ["alpha", "Charlie"], "B": ["Bravo", "Delta"]}}}
+
+    summary = generate_summary_report(team_stats, weights, groups=team_groups(config)).set_index("team_name")
+
+    # Charlie and Delta lead their groups; globally Alpha is last
+    assert summary.loc["Charlie", "mismatch_score"] == summary.loc["Delta", "mismatch_score"]
+    assert summary.loc["Alpha", "mismatch_score"] == summary.loc["Bravo", "mismatch_score"]
+    assert summary.loc["Alpha", "mismatch_score_global"] < summary.loc["Bravo", "mismatch_score_global"]
+    assert summary.loc["Charlie", "mismatch_group"] == "A"
+
+    info = pd.DataFrame({"school": ["Alpha", "Bravo"], "classification": ["fbs", "fcs"]})
+    assert team_groups({"normalization": {"group_by": "classification"}}, info) == {"ALPHA": "fbs", "BRAVO": "fcs"}
+    with pytest.raises(ValueError):
+        team_groups({"normalization": {"group_by": "division"}}, info)
@@ -0,0 +1,37 @@
+import gzip
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from cfb_mismatch.output import write_frames
+
+
+def test_write_frames_multi_format_and_skips_unchanged(tmp_path):
+    df = pd.DataFrame({"team_name": ["Alpha", "Bravo"], "man_yprr": [2.5, 1.5]})
+    frames = {str(tmp_path / "team_a"): df, str(tmp_path / "team_b"): df}
+
+    results = write_frames(frames, formats=["csv", "csv.gz"])
+
+    assert sorted(os.path.basename(p) for p in results) == [
+        "team_a.csv", "team_a.csv.gz", "team_b.csv", "team_b.csv.gz"
+    ]
+    assert all(results.values())
+    assert pd.read_csv(tmp_path / "team_a.csv").equals(df)
+    with gzip.open(tmp_path / "team_b.csv.gz", "rb") as f:
+        assert pd.read_csv(io.BytesIO(f.read())).equals(df)
+    # No temp files left behind by the atomic rename
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+    # Identical content is not rewritten; changed content is
+    changed = {str(tmp_path / "team_a"): df.assign(man_yprr=[3.0, 1.5]), str(tmp_path / "team_b"): df}
+    results = write_frames(changed, formats=["csv", "csv.gz"])
+    assert results[str(tmp_path / "team_a.csv")] is True
+    assert results[str(tmp_path / "team_b.csv")] is False
+    assert results[str(tmp_path / "team_b.csv.gz")] is False
+
+
+def test_write_frames_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        write_frames({str(tmp_path / "x"): pd.DataFrame({"a": [1]})}, formats=["xlsx"])
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.main import compute_team_stats, generate_summary_report
+from cfb_mismatch.percentiles import PercentileIndex, percentile_reference, score_frame
+
+WEIGHTS = {"stats_weights": {
+    "man_coverage_defense": 0.3,
+    "man_receiving_efficiency": 0.4,
+    "zone_receiving_efficiency": 0.3,
+}}
+
+
+def _team_stats(n_teams=30, seed=0):
+    rng = np.random.default_rng(seed)
+    teams = [f"Team {i}" for i in range(n_teams)]
+    defense = pd.DataFrame({
+        "team_name": teams,
+        "player_game_count": 9,
+        "man_grades_coverage_defense": rng.integers(50, 60, n_teams).astype(float),  # plenty of ties
+    })
+    receiving = pd.DataFrame({
+        "team_name": teams,
+        "player_game_count": 9,
+        "man_yprr": rng.normal(2.0, 0.5, n_teams),
+        "zone_yprr": np.where(rng.random(n_teams) < 0.2, np.nan, rng.normal(1.8, 0.4, n_teams)),
+    })
+    return compute_team_stats(defense, None, receiving)
+
+
+def test_reference_reproduces_the_run_that_built_it():
+    summary = generate_summary_report(_team_stats(), WEIGHTS)
+    index = PercentileIndex()
+    index.add_summary(2024, summary)
+
+    rescored = generate_summary_report(_team_stats(), WEIGHTS, reference=index.season(2024))
+
+    merged = summary.merge(rescored, on="team_name", suffixes=("", "_indexed"))
+    np.testing.assert_allclose(merged["mismatch_score_indexed"], merged["mismatch_score"])
+    assert (merged["mismatch_tier_indexed"].astype(str) == merged["mismatch_tier"].astype(str)).all()
+
+
+def test_new_teams_score_without_moving_the_reference(tmp_path):
+    summary = generate_summary_report(_team_stats(), WEIGHTS)
+    path = str(tmp_path / "percentiles.npz")
+    index = PercentileIndex()
+    index.add_summary(2024, summary)
+    index.save(path)
+    reference = PercentileIndex.load(path).season(2024)
+
+    best = summary.iloc[[0]].assign(team_name="Clone")
+    new = pd.DataFrame({
+        "team_name": ["Juggernaut", "Clone"],
+        "man_coverage_grade": [99.0, best["man_coverage_grade"].iloc[0]],
+        "man_yprr": [9.0, best["man_yprr"].iloc[0]],
+        "zone_yprr": [9.0, best["zone_yprr"].iloc[0]],
+    })
+    scored = score_frame(new, reference, WEIGHTS).set_index("team_name")
+
+    # Above every reference value: the top percentile
+    assert np.isclose(scored.loc["Juggernaut", "man_yprr_score"], 0.4)
+    assert scored.loc["Juggernaut", "mismatch_tier"] == "Elite"
+    # A copy of a reference team ties with it and scores as it did
+    assert np.isclose(scored.loc["Clone", "mismatch_score"], summary["mismatch_score"].iloc[0])
+
+    config = {"percentiles": {"path": path, "season": None}}
+    assert percentile_reference(config, 2024) is not None
+    assert percentile_reference(config, 2023) is None
+    assert percentile_reference({"percentiles": {"path": str(tmp_path / "missing.npz")}}, 2024) is None
@@ -0,0 +1,68 @@
+import pandas as pd
+
+from cfb_mismatch.mismatches import top_mismatches
+from cfb_mismatch.pipeline import analyze_stage, mismatches_stage, publish_stage
+
+
+def _config(tmp_path):
+    scheme_path = tmp_path / "scheme.csv"
+    defense_path = tmp_path / "defense.csv"
+    pd.DataFrame(
+        {
+            "player": ["A", "B", "C"],
+            "player_id": [1, 2, 3],
+            "position": ["WR", "WR", "WR"],
+            "team_name": ["ALPHA", "BRAVO", "CHARLIE"],
+            "player_game_count": [10, 5, 8],
+            "man_yprr": [2.0, 4.0, 3.0],
+            "zone_yprr": [3.0, 6.0, 4.0],
+        }
+    ).to_csv(scheme_path, index=False)
+    pd.DataFrame(
+        {
+            "player": ["D", "E", "F"],
+            "player_id": [4, 5, 6],
+            "position": ["CB", "CB", "CB"],
+            "team_name": ["ALPHA", "BRAVO", "CHARLIE"],
+            "player_game_count": [9, 9, 9],
+            "man_grades_coverage_defense": [70.0, 60.0, 50.0],
+            "zone_grades_coverage_defense": [65.0, 55.0, 45.0],
+            "man_qb_rating_against": [80.0, 90.0, 100.0],
+            "zone_qb_rating_against": [85.0, 95.0, 105.0],
+        }
+    ).to_csv(defense_path, index=False)
+    return {
+        "use_stats_files": True,
+        "stats_paths": {
+            "receiving_scheme": str(scheme_path),
+            "defense_coverage_scheme": str(defense_path),
+        },
+    }
+
+
+def test_pipeline_passes_games_and_summary_in_memory(tmp_path):
+    games = pd.DataFrame(
+        {
+            "game_id": [1, 2],
+            "week": [3, 3],
+            "home_team": ["Alpha", "Bravo"],
+            "away_team": ["Charlie", "Alpha"],
+            "home_points": [21, 14],
+            "away_points": [17, 28],
+        }
+    )
+    weights = {"stats_weights": {"man_receiving_efficiency": 1.0, "man_coverage_defense": 1.0}}
+
+    result = analyze_stage(_config(tmp_path), weights, season=2025, games_df=games)
+    assert result.cfbd_team_stats is not None
+    assert "win_pct" in result.summary.columns
+
+    top = mismatches_stage(result, top_n=1)
+    assert len(top) == 1
+    assert top.equals(top_mismatches(games, result.summary, n=1))
+
+    out_dir = tmp_path / "out"
+    written = publish_stage(result, str(out_dir))
+    assert (out_dir / "team_summary.csv").exists()
+    assert (out_dir / "top_mismatches_week_3.csv").exists()
+    assert len(written) == 5
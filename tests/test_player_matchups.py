@@ -0,0 +1,132 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cfb_mismatch.player_matchups import DEFAULT_PAIRINGS, MatchupSettings, player_matchups
+
+
+def _players(teams, seed=0):
+    rng = np.random.default_rng(seed)
+    receivers, concept, defenders = [], [], []
+    for team in teams:
+        for i, position in enumerate(["WR", "WR", "WR", "TE", "HB"]):
+            pid = f"{team}-r{i}"
+            routes = rng.integers(40, 400, 2)
+            receivers.append({
+                "player_id": pid, "player": pid, "team_name": team, "position": position,
+                "man_routes": routes[0], "zone_routes": routes[1],
+                "man_yprr": rng.normal(1.8, 0.5), "zone_yprr": rng.normal(1.6, 0.4),
+            })
+            concept.append({"player_id": pid, "slot_routes": routes.sum() * rng.random()})
+        for i, position in enumerate(["CB", "CB", "S", "LB", "DI"]):
+            snaps = rng.integers(30, 300, 2)
+            defenders.append({
+                "player_id": f"{team}-d{i}", "player": f"{team}-d{i}", "team_name": team, "position": position,
+                "man_snap_counts_coverage": snaps[0], "zone_snap_counts_coverage": snaps[1],
+                "man_grades_coverage_defense": rng.normal(65, 10),
+                "zone_grades_coverage_defense": rng.normal(65, 10),
+            })
+    return pd.DataFrame(receivers), pd.DataFrame(concept), pd.DataFrame(defenders)
+
+
+def _brute_force(games, receivers, concept, defenders, settings):
+    receivers = receivers[receivers["man_routes"] + receivers["zone_routes"] >= settings.min_routes].copy()
+    slot = concept.set_index("player_id")["slot_routes"].reindex(receivers["player_id"]).to_numpy()
+    share = slot / (receivers["man_routes"] + receivers["zone_routes"]).to_numpy()
+    slot_wr = (receivers["position"] == "WR") & (share >= settings.slot_share)
+    receivers["alignment"] = np.where(slot_wr, "SLOT", receivers["position"])
+    covering = defenders["man_snap_counts_coverage"] + defenders["zone_snap_counts_coverage"]
+    paired = {p for allowed in settings.pairings.values() for p in allowed}
+    defenders = defenders[(covering >= settings.min_coverage_snaps) & defenders["position"].isin(paired)].copy()
+    features = (
+        (receivers, ["man_yprr", "zone_yprr"]),
+        (defenders, ["man_grades_coverage_defense", "zone_grades_coverage_defense"]),
+    )
+    for frame, cols in features:
+        for col in cols:
+            frame[f"z_{col}"] = (frame[col] - frame[col].mean()) / frame[col].std(ddof=0)
+    man = defenders.groupby("team_name")["man_snap_counts_coverage"].sum()
+    total = man + defenders.groupby("team_name")["zone_snap_counts_coverage"].sum()
+
+    best = {}
+    for _, game in games.iterrows():
+        scores = []
+        for offense, defense in ((game["home_team"], game["away_team"]), (game["away_team"], game["home_team"])):
+            rate = man[defense] / total[defense]
+            rec = receivers[receivers["team_name"] == offense]
+            dfn = defenders[defenders["team_name"] == defense]
+            for (_, r), (_, d) in itertools.product(rec.iterrows(), dfn.iterrows()):
+                if d["position"] in settings.pairings[r["alignment"]]:
+                    scores.append((
+                        rate * (r["z_man_yprr"] - d["z_man_grades_coverage_defense"])
+                        + (1 - rate) * (r["z_zone_yprr"] - d["z_zone_grades_coverage_defense"]),
+                        r["player"], d["player"], r["alignment"], d["position"],
+                    ))
+        best[game["id"]] = sorted(scores, reverse=True)[:settings.top_k]
+    return best
+
+
+def test_blocked_scores_match_a_pairwise_loop():
+    teams = [f"Team {i}" for i in range(8)]
+    receivers, concept, defenders = _players(teams)
+    # Team totals for the man rate include every defender, so keep all of them in coverage
+    defenders = defenders[defenders["position"] != "DI"]
+    games = pd.DataFrame({
+        "id": range(6), "season": 2024, "week": [1, 1, 1, 1, 2, 2],
+        "home_team": ["Team 0", "Team 2", "Team 4", "team 6", "Team 1", "Team 3"],
+        "away_team": ["Team 1", "Team 3", "Team 5", "Team 7", "Team 0", "Team 2"],
+    })
+    settings = MatchupSettings(pairings=DEFAULT_PAIRINGS, min_routes=0, min_coverage_snaps=0, top_k=4, block_size=4)
+
+    matchups = player_matchups(games, receivers, defenders, concept, settings)
+    games["home_team"] = games["home_team"].str.title()
+    expected = _brute_force(games, receivers, concept, defenders, settings)
+
+    assert len(matchups) == 4 * len(games)
+    for game_id, rows in matchups.groupby("id"):
+        assert rows["rank"].tolist() == [1, 2, 3, 4]
+        np.testing.assert_allclose(rows["score"], [e[0] for e in expected[game_id]])
+        assert rows["receiver"].tolist() == [e[1] for e in expected[game_id]]
+        assert rows["defender"].tolist() == [e[2] for e in expected[game_id]]
+        assert rows["receiver_position"].tolist() == [e[3] for e in expected[game_id]]
+
+
+def test_pairing_rules_and_volume_filters():
+    receivers = pd.DataFrame({
+        "player_id": [1, 2, 3], "player": ["Outside", "Slot", "Backup"], "team_name": "Alpha",
+        "position": ["WR", "WR", "WR"], "man_routes": [100, 100, 10], "zone_routes": [100, 100, 10],
+        "man_yprr": [2.0, 1.0, 9.0], "zone_yprr": [2.0, 1.0, 9.0],
+    })
+    concept = pd.DataFrame({"player_id": [1, 2, 3], "slot_routes": [20, 150, 20]})
+    defenders = pd.DataFrame({
+        "player_id": [4, 5, 6], "player": ["Corner", "Safety", "Linebacker"], "team_name": "Bravo",
+        "position": ["CB", "S", "LB"], "man_snap_counts_coverage": [50, 50, 50],
+        "zone_snap_counts_coverage": [150, 150, 150],
+        "man_grades_coverage_defense": [80.0, 50.0, 40.0], "zone_grades_coverage_defense": [80.0, 50.0, 40.0],
+    })
+    games = pd.DataFrame({"home_team": ["Alpha"], "away_team": ["Bravo"]})
+    settings = MatchupSettings.from_config({"player_matchups": {"top_k": 10}})
+
+    matchups = player_matchups(games, receivers, defenders, concept, settings)
+
+    # Backup misses min_routes; the outside WR only sees the CB, the slot WR the CB and S;
+    # nobody is paired with the LB and Bravo has no receivers
+    pairs = list(zip(matchups["receiver"], matchups["receiver_position"], matchups["defender"]))
+    assert sorted(pairs) == [("Outside", "WR", "Corner"), ("Slot", "SLOT", "Corner"), ("Slot", "SLOT", "Safety")]
+    assert matchups["score"].is_monotonic_decreasing
+    assert (matchups["offense"] == "Alpha").all() and matchups["man_rate"].eq(0.25).all()
+    with pytest.raises(ValueError, match="top_k"):
+        MatchupSettings.from_config({"player_matchups": {"top_k": 0}})
+
+
+def test_no_games_give_an_empty_frame_with_the_output_columns():
+    receivers, concept, defenders = _players(["Team 0", "Team 1"])
+    games = pd.DataFrame({"id": [1], "season": 2024, "week": 3, "home_team": ["Team 0"], "away_team": ["Team 1"]})
+
+    scheduled = player_matchups(games, receivers, defenders, concept)
+    empty = player_matchups(games.iloc[:0], receivers, defenders, concept)
+
+    assert empty.empty
+    assert empty.columns.tolist() == scheduled.columns.tolist()
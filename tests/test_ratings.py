@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.backtest import run_backtest
+from cfb_mismatch.ratings import EloRatings, EloSettings, update_ratings, win_probability
+
+
+def _sequential(games, settings):
+    """Reference Elo: one game at a time."""
+    ratings, season = {}, None
+    for game in games.itertuples():
+        if season is not None and game.season != season:
+            ratings = {t: settings.initial + (r - settings.initial) * (1 - settings.season_regression)
+                       for t, r in ratings.items()}
+        season = game.season
+        home = ratings.get(game.home_team, settings.initial)
+        away = ratings.get(game.away_team, settings.initial)
+        margin = game.home_points - game.away_points
+        edge = home - away + settings.home_field
+        result = 1.0 if margin > 0 else 0.0 if margin < 0 else 0.5
+        winner_edge = edge if margin > 0 else -edge
+        mov = np.log(abs(margin) + 1) * 2.2 / (0.001 * winner_edge + 2.2)
+        delta = settings.k * mov * (result - win_probability(edge))
+        ratings[game.home_team], ratings[game.away_team] = home + delta, away - delta
+    return ratings
+
+
+def test_weekly_vectorized_updates_match_game_by_game(game_schedule):
+    games = game_schedule([2022, 2023], n_teams=10, weeks=5)
+    # A team playing twice in one week
+    games = pd.concat([games, pd.DataFrame([{
+        'season': 2023, 'week': 5, 'home_team': 'Team 0', 'away_team': 'Team 1', 'home_points': 30, 'away_points': 10,
+    }])], ignore_index=True)
+    settings = EloSettings()
+
+    ratings = EloRatings(settings)
+    ratings.update(games)
+
+    expected = _sequential(games, settings)
+    current = ratings.current().set_index('team')['elo_rating']
+    for team, rating in expected.items():
+        assert np.isclose(current[team], rating)
+    assert current.index[0] in ('Team 8', 'Team 9')
+
+
+def test_incremental_weeks_match_full_replay(tmp_path, game_schedule):
+    games = game_schedule([2022, 2023], n_teams=40, weeks=12)
+    path = str(tmp_path / "elo.pkl")
+    last = games[(games['season'] == 2023) & (games['week'] == 12)]
+
+    update_ratings(games.drop(last.index), path)
+    stored = EloRatings.load(path)
+    assert stored.update(games.drop(last.index)) == 0
+    incremental = update_ratings(last, path)
+    full = EloRatings()
+    full.update(games)
+
+    pd.testing.assert_frame_equal(incremental.current(), full.current())
+    pd.testing.assert_frame_equal(incremental.history, full.history)
+
+    # A corrected score in an old week replays everything
+    corrected = games.copy()
+    corrected.loc[0, 'home_points'] += 21
+    replayed = update_ratings(corrected, path)
+    assert len(replayed.history) == len(games)
+    assert replayed.history.loc[0, 'home_rating_post'] > full.history.loc[0, 'home_rating_post']
+
+
+def test_point_in_time_ratings_and_backtest_signal(tmp_path, game_schedule):
+    games = game_schedule([2022, 2023], n_teams=40, weeks=12)
+    ratings = EloRatings()
+    ratings.update(games)
+    history = ratings.history
+
+    # Pre-game ratings of week 5 equal the ratings as of week 5
+    as_of = ratings.as_of(2023, 5).set_index('team')['elo_rating']
+    week5 = history[(history['season'] == 2023) & (history['week'] == 5)]
+    np.testing.assert_allclose(week5['home_rating_pre'], as_of[week5['home_team']].to_numpy())
+
+    data_dir = tmp_path / "cfbd"
+    data_dir.mkdir()
+    for season, season_games in games.groupby('season'):
+        season_games.to_csv(data_dir / f"{season}_regular_games.csv", index=False)
+    scored = run_backtest(str(data_dir), ratings=history)
+    assert scored['elo_edge'].notna().all()
+    late = scored[scored['season'] == 2023]
+    assert ((late['elo_edge'] > 0) == (late['home_margin'] > 0)).mean() > 0.65
+
+
+def test_ten_seasons_replay_in_seconds(game_schedule):
+    games = game_schedule(range(2014, 2024), n_teams=130, weeks=14)
+
+    start = time.perf_counter()
+    ratings = EloRatings()
+    ratings.update(games)
+    elapsed = time.perf_counter() - start
+
+    assert len(ratings.history) == len(games)
+    assert elapsed < 5
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.backtest import run_backtest
+from cfb_mismatch.rolling import FormSettings, TeamForm, add_matchup_form, update_form
+
+
+def test_form_matches_pandas_rolling_and_ewm(game_schedule):
+    games = game_schedule([2022, 2023], n_teams=20, weeks=10)
+    # A team playing twice in one week, and a missing yardage value
+    games = pd.concat([games, pd.DataFrame([{
+        'season': 2023, 'week': 10, 'home_team': 'Team 0', 'away_team': 'Team 1',
+        'home_points': 30, 'away_points': 10, 'home_yards': 450.0, 'away_yards': np.nan,
+    }])], ignore_index=True)
+    settings = FormSettings(window=3, halflife=2.0, metrics=('points', 'yards'))
+
+    form = TeamForm(settings)
+    form.update(games)
+
+    history = form.history
+    by_team = history.groupby(['season', 'team'], sort=False)
+    for stat in settings.stats:
+        shifted = by_team[stat].shift()
+        rolling = shifted.groupby([history['season'], history['team']]).transform(
+            lambda x: x.rolling(3, min_periods=1).mean()
+        )
+        ewm = shifted.groupby([history['season'], history['team']]).transform(
+            lambda x: x.ewm(halflife=2.0).mean()
+        )
+        np.testing.assert_allclose(history[f'{stat}_rolling'], rolling)
+        np.testing.assert_allclose(history[f'{stat}_ewm'], ewm)
+    # Every season starts afresh
+    assert history.loc[history['season'] == 2023].groupby('team')['games'].min().eq(0).all()
+
+
+def test_incremental_weeks_match_full_replay(tmp_path, game_schedule):
+    games = game_schedule([2022, 2023], n_teams=20, weeks=10)
+    path = str(tmp_path / "form.pkl")
+    last = games[(games['season'] == 2023) & (games['week'] == 10)]
+
+    update_form(games.drop(last.index), path)
+    assert TeamForm.load(path).update(games.drop(last.index)) == 0
+    incremental = update_form(last, path)
+    full = TeamForm()
+    full.update(games)
+
+    pd.testing.assert_frame_equal(incremental.history, full.history)
+    pd.testing.assert_frame_equal(incremental.as_of(2023), full.as_of(2023))
+    # Other settings rebuild the store
+    assert TeamForm.load(path, FormSettings(window=2)).history.empty
+
+
+def test_as_of_is_point_in_time(game_schedule):
+    games = game_schedule([2022, 2023], n_teams=20, weeks=10)
+    form = TeamForm()
+    form.update(games)
+    history = form.history
+
+    table = form.as_of(2023, 6).set_index('team')
+    week6 = history[(history['season'] == 2023) & (history['week'] == 6)]
+    np.testing.assert_allclose(week6['margin_ewm'], table.loc[week6['team'], 'margin_ewm'])
+    np.testing.assert_allclose(week6['points_for_rolling'], table.loc[week6['team'], 'points_for_rolling'])
+    assert (table['games'] == 5).all()
+    assert form.as_of(2023, 1).empty
+
+    upcoming = games[(games['season'] == 2023) & (games['week'] == 6)].assign(home_points=np.nan)
+    matchups = add_matchup_form(upcoming, form, 2023)
+    np.testing.assert_allclose(
+        matchups['margin_ewm_edge'],
+        table.loc[matchups['home_team'], 'margin_ewm'].to_numpy()
+        - table.loc[matchups['away_team'], 'margin_ewm'].to_numpy()
+    )
+
+
+def test_backtest_margin_form_signal(tmp_path, game_schedule):
+    games = game_schedule([2022, 2023], n_teams=20, weeks=10)
+    form = TeamForm()
+    form.update(games)
+
+    data_dir = tmp_path / "cfbd"
+    data_dir.mkdir()
+    for season, season_games in games.groupby('season'):
+        season_games.to_csv(data_dir / f"{season}_regular_games.csv", index=False)
+    scored = run_backtest(str(data_dir), form=form.history)
+
+    assert scored.loc[scored['week'] == 1, 'margin_ewm_edge'].isna().all()
+    late = scored[scored['week'] > 4]
+    assert late['margin_ewm_edge'].notna().all()
+    assert ((late['margin_ewm_edge'] > 0) == (late['home_margin'] > 0)).mean() > 0.6
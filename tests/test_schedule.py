@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.main import compute_team_stats, generate_integrated_report
+from cfb_mismatch.adapters.cfbd_data import aggregate_team_games
+from cfb_mismatch.schedule import strength_of_schedule
+
+
+def _reference(games, season, team, values, played):
+    """Mean of ``values`` over a team's opponents, one game at a time."""
+    season_games = games[games['season'] == season]
+    opponents = []
+    for game in season_games.itertuples():
+        if (not np.isnan(game.home_points)) != played:
+            continue
+        if game.home_team == team:
+            opponents.append(game.away_team)
+        elif game.away_team == team:
+            opponents.append(game.home_team)
+    known = [values[(season, o)] for o in opponents if not np.isnan(values.get((season, o), np.nan))]
+    return np.mean(known) if known else np.nan
+
+
+def test_sparse_products_match_game_by_game_averages(game_schedule):
+    games = game_schedule(seasons=(2022, 2023), n_teams=12, weeks=8, played_weeks=5)
+    rating = pd.DataFrame({'team': [f"TEAM {i}" for i in range(11)], 'elo_rating': 1400 + 10.0 * np.arange(11)})
+
+    sos = strength_of_schedule(games, rating)
+
+    win_pct = {}
+    for season, season_games in games.dropna().groupby('season'):
+        margin = season_games['home_points'] - season_games['away_points']
+        sides = pd.concat([
+            pd.DataFrame({'team': season_games['home_team'], 'win': np.sign(margin)}),
+            pd.DataFrame({'team': season_games['away_team'], 'win': -np.sign(margin)}),
+        ])
+        for team, pct in ((sides.groupby('team')['win'].mean() + 1) / 2).items():
+            win_pct[(season, team)] = pct
+    elo = {(s, f"Team {i}"): 1400 + 10.0 * i for s in (2022, 2023) for i in range(11)}
+    for row in sos.itertuples():
+        for column, values, played in (
+            ('sos_win_pct', win_pct, True),
+            ('sos_win_pct_remaining', win_pct, False),
+            ('sos_elo_rating', elo, True),
+            ('sos_elo_rating_remaining', elo, False),
+        ):
+            expected = _reference(games, row.season, row.team, values, played)
+            assert np.isclose(getattr(row, column), expected, equal_nan=True)
+
+    assert (sos.loc[sos['season'] == 2022, 'games_remaining'] == 0).all()
+    current = sos[sos['season'] == 2023]
+    assert (current['games_played'] + current['games_remaining'] == 8).all()
+
+
+def test_many_seasons_in_one_pass(game_schedule):
+    games = game_schedule(seasons=range(2000, 2025), n_teams=130, weeks=13)
+
+    sos = strength_of_schedule(games)
+
+    assert len(sos) == 25 * 130
+    assert sos['sos_win_pct'].between(0, 1).all()
+    assert np.isclose(sos['sos_opp_win_pct'].mean(), 0.5, atol=0.02)
+
+
+def test_integrated_report_includes_opposing_profile(game_schedule):
+    defense = pd.DataFrame({
+        "team_name": ["ALPHA", "BRAVO", "CHARLIE"],
+        "player_game_count": [9, 9, 9],
+        "man_grades_coverage_defense": [70.0, 60.0, 50.0],
+        "zone_grades_coverage_defense": [70.0, 60.0, 50.0],
+    })
+    team_stats = compute_team_stats(defense, None, None)
+    games = pd.DataFrame({
+        "week": [1, 2, 3],
+        "home_team": ["Alpha", "Bravo", "Alpha"],
+        "away_team": ["Charlie", "Alpha", "Bravo"],
+        "home_points": [21, 14, np.nan],
+        "away_points": [17, 28, np.nan],
+    })
+
+    summary = generate_integrated_report(team_stats, aggregate_team_games(games), games=games).set_index("team_name")
+
+    assert summary.loc["ALPHA", "sos_coverage"] == 55.0
+    assert summary.loc["ALPHA", "sos_coverage_remaining"] == 60.0
+    assert summary.loc["CHARLIE", "sos_win_pct"] == 1.0
+    assert summary.loc["CHARLIE", "games_remaining"] == 0
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cfb_mismatch.adapters.aggregation import aggregate_by_team, stream_aggregate_file
+from cfb_mismatch.adapters.receiving_scheme import (
+    aggregate_receiving_scheme_by_team,
+    load_receiving_scheme,
+)
+from cfb_mismatch.adapters.schema import build_dtype_plan, read_stats_csv
+
+SAMPLE = "data/external/receiving_scheme 2.csv"
+
+
+def test_build_dtype_plan_classifies_columns():
+    plan = build_dtype_plan(
+        ["player", "player_id", "team_name", "position", "man_routes", "man_yprr", "zone_grades_offense"],
+        "receiving_scheme",
+        float_dtype="float32",
+    )
+
+    assert "player" not in plan
+    assert plan["team_name"] == "category"
+    assert plan["position"] == "category"
+    assert plan["player_id"] == "Int32"
+    assert plan["man_routes"] == "Int32"
+    assert plan["man_yprr"] == "float32"
+    assert plan["zone_grades_offense"] == "float32"
+
+    with pytest.raises(ValueError):
+        build_dtype_plan(["a"], "unknown_file")
+    with pytest.raises(ValueError):
+        build_dtype_plan(["a"], "receiving_scheme", float_dtype="float16")
+
+
+def test_read_stats_csv_falls_back_for_fractional_counts(tmp_path):
+    path = tmp_path / "scheme.csv"
+    path.write_text("player,team_name,player_game_count,man_routes,man_yprr\nA,Alpha,10,10.5,2.0\nB,Alpha,5,4,1.0\n")
+
+    df = read_stats_csv(str(path), "receiving_scheme")
+
+    assert df["team_name"].dtype == "category"
+    assert df["man_routes"].tolist() == [10.5, 4.0]
+
+    # Streaming accepts the same file
+    streamed = pd.concat(read_stats_csv(str(path), "receiving_scheme", chunksize=1))
+    assert streamed["man_routes"].tolist() == [10.5, 4.0]
+    assert stream_aggregate_file(str(path), "receiving_scheme", chunksize=1).equals(aggregate_by_team(df))
+
+
+def test_load_receiving_scheme_is_leaner_and_aggregates_identically():
+    raw = pd.read_csv(SAMPLE)
+    lean = load_receiving_scheme(SAMPLE, float_dtype="float32")
+
+    assert lean["team_name"].dtype == "category"
+    assert lean["player_game_count"].dtype == "Int16"
+    assert lean["man_yprr"].dtype == np.float32
+    assert lean.memory_usage(deep=True).sum() < 0.6 * raw.memory_usage(deep=True).sum()
+
+    expected = aggregate_receiving_scheme_by_team(raw)
+    actual = aggregate_receiving_scheme_by_team(load_receiving_scheme(SAMPLE))
+    assert actual["team_name"].astype(str).tolist() == expected["team_name"].tolist()
+    pd.testing.assert_series_equal(actual["man_yprr"], expected["man_yprr"])
+    assert actual["player_count"].tolist() == expected["player_count"].tolist()
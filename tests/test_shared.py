@@ -0,0 +1,40 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cfb_mismatch.shared import attach, share_array, share_frame
+
+
+def _column_sums(ref):
+    return attach(ref).sum(axis=0)
+
+
+@pytest.mark.parametrize("backend", ["shm", "memmap"])
+def test_workers_attach_to_shared_array(backend, tmp_path):
+    array = np.arange(12, dtype=float).reshape(4, 3)
+
+    with share_array(array, backend, directory=str(tmp_path)) as shared:
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            sums = list(pool.map(_column_sums, [shared.ref] * 3))
+        view = attach(shared.ref)
+        assert not view.flags.writeable
+        del view
+
+    for result in sums:
+        np.testing.assert_array_equal(result, array.sum(axis=0))
+    assert os.listdir(tmp_path) == []
+
+
+def test_shared_frame_keeps_labels_and_numeric_columns():
+    df = pd.DataFrame(
+        {"mismatch_score": [0.5, -0.2], "man_yprr": [1.2, np.nan], "mismatch_tier": ["High", "Low"]},
+        index=pd.Index(["ALPHA", "BRAVO"], name="TeamKey"),
+    )
+
+    with share_frame(df) as shared:
+        frame = attach(shared.ref)
+        pd.testing.assert_frame_equal(frame, df[["mismatch_score", "man_yprr"]])
+        del frame
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cfb_mismatch.similarity import SimilarityIndex
+
+
+def _summaries(seasons=range(2015, 2025), n_teams=40, seed=0):
+    rng = np.random.default_rng(seed)
+    summaries = {}
+    for season in seasons:
+        summary = pd.DataFrame({
+            "team_name": [f"Team {i}" for i in range(n_teams)],
+            "man_coverage_grade": rng.normal(60, 5, n_teams),
+            "zone_coverage_grade": rng.normal(60, 5, n_teams),
+            "man_yprr": rng.normal(2.0, 0.5, n_teams),
+            "zone_yprr": rng.normal(1.8, 0.4, n_teams),
+            "mismatch_score": rng.normal(size=n_teams),  # not a metric
+        })
+        summary.loc[rng.random(n_teams) < 0.1, "zone_yprr"] = np.nan
+        summaries[season] = summary
+    return summaries
+
+
+def test_neighbours_match_brute_force_distances():
+    summaries = _summaries()
+    weights = {"man_yprr": 2.0, "zone_coverage_grade": 0.0}
+    index = SimilarityIndex.from_summaries(summaries, weights=weights)
+    assert index.names == ["man_coverage_grade", "zone_coverage_grade", "man_yprr", "zone_yprr"]
+
+    table = pd.concat([s.assign(season=y) for y, s in summaries.items()], ignore_index=True)
+    metrics = table[index.names]
+    z = ((metrics - metrics.mean()) / metrics.std(ddof=0)).fillna(0.0)
+    w = np.array([1.0, 0.0, 2.0, 1.0])
+    target = table.index[(table["team_name"] == "Team 7") & (table["season"] == 2024)][0]
+    dist = np.sqrt((((z - z.loc[target]) ** 2) * w).sum(axis=1)).drop(target)
+    expected = dist.nsmallest(5)
+
+    neighbours = index.nearest("team 7", k=5)
+
+    assert neighbours["query"].iloc[0] == "Team 7 (2024)"
+    np.testing.assert_allclose(neighbours["distance"], expected.to_numpy())
+    assert neighbours["team"].tolist() == table.loc[expected.index, "team_name"].tolist()
+    assert neighbours["season"].tolist() == table.loc[expected.index, "season"].tolist()
+
+
+def test_profile_queries_use_only_the_given_metrics():
+    summaries = _summaries()
+    index = SimilarityIndex.from_summaries(summaries, metrics=["man_coverage_grade", "man_yprr"])
+    target = summaries[2020].iloc[3]
+
+    profiles = pd.DataFrame({"man_coverage_grade": [target["man_coverage_grade"]]}, index=["coverage"])
+    found = index.query(profiles, k=1)
+    assert (found["season"].iloc[0], found["team"].iloc[0]) == (2020, "Team 3")
+    assert found["distance"].iloc[0] == 0
+
+    same = index.nearest("Team 3", season=2020, k=3, same_season=True)
+    assert (same["season"] == 2020).all() and "Team 3" not in same["team"].tolist()
+
+    with pytest.raises(ValueError):
+        index.nearest("Team 99")
+    with pytest.raises(ValueError):
+        SimilarityIndex.from_summaries(summaries, weights={"elo_rating": 1.0})
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from cfb_mismatch.ratings import win_probability
+from cfb_mismatch.simulation import build_schedule, simulate_season
+
+
+def _schedule(game_schedule, played_weeks=5):
+    # Higher-numbered teams win every played game
+    games = game_schedule(n_teams=12, weeks=10, played_weeks=played_weeks, strength=10 * np.arange(12),
+                          home_field=0.0, noise=0.0)
+    for side in ('home', 'away'):
+        number = games[f'{side}_team'].str.removeprefix('Team ').astype(int)
+        games[f'{side}_conference'] = np.where(number % 2, 'East', 'West')
+    ratings = {f"Team {i}": 1400 + 20 * i for i in range(12)}
+    return games, ratings
+
+
+def test_expected_wins_and_spread_match_win_probabilities(game_schedule):
+    games, ratings = _schedule(game_schedule)
+
+    result = simulate_season(games, ratings, sims=40000, chunk_size=7000, seed=1)
+
+    schedule = build_schedule(games, ratings)
+    p = win_probability(schedule.edge)
+    T = len(schedule.teams)
+    expected = schedule.wins + np.bincount(schedule.home, p, T) + np.bincount(schedule.away, 1 - p, T)
+    variance = np.bincount(schedule.home, p * (1 - p), T) + np.bincount(schedule.away, p * (1 - p), T)
+    teams = result.teams.set_index('team').loc[schedule.teams]
+    np.testing.assert_allclose(teams['expected_wins'], expected, atol=0.03)
+    np.testing.assert_allclose(teams['wins_sd'], np.sqrt(variance), atol=0.02)
+
+    assert (teams['wins'] + teams['losses'] + teams['remaining_games'] == 10).all()
+    distribution = result.win_distribution.groupby('team')['probability'].sum()
+    np.testing.assert_allclose(distribution, 1.0)
+    assert np.isclose(result.teams.groupby('conference')['p_conference_title'].sum(), 1.0).all()
+
+
+def test_finished_season_is_deterministic(game_schedule):
+    games, ratings = _schedule(game_schedule, played_weeks=10)
+
+    result = simulate_season(games, ratings, sims=500).teams.set_index('team')
+
+    assert (result['expected_wins'] == result['wins']).all()
+    assert (result['p_bowl_eligible'] == (result['wins'] >= 6)).all()
+    # Team 10 and Team 11 win every game they play, so they lead East/West
+    assert result.loc['Team 11', 'p_conference_title'] == 1.0
+    assert result.loc['Team 10', 'p_conference_title'] == 1.0
+
+
+def test_results_do_not_depend_on_jobs_or_chunking_of_seeds(game_schedule):
+    games, ratings = _schedule(game_schedule)
+
+    serial = simulate_season(games, ratings, sims=6000, chunk_size=2000, seed=3, rating_sd=40)
+    pooled = simulate_season(games, ratings, sims=6000, chunk_size=2000, seed=3, rating_sd=40, n_jobs=2)
+
+    pd.testing.assert_frame_equal(serial.teams, pooled.teams)
+    pd.testing.assert_frame_equal(serial.win_distribution, pooled.win_distribution)
@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import requests
+
+from cfb_mismatch.adapters import cfbd_data
+from cfb_mismatch.adapters.cfbd_data import fetch_cfbd_lines_from_api, flatten_cfbd_lines
+from cfb_mismatch import cli
+from cfb_mismatch.value import LineModel, find_value, value_summary
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "cfbd_lines_2023_week1.json")
+
+
+def _records():
+    with open(FIXTURE) as f:
+        return json.load(f)
+
+
+class _Response:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def test_flatten_lines_one_row_per_provider():
+    lines = flatten_cfbd_lines(_records())
+
+    assert len(lines) == 3
+    assert lines['provider'].tolist() == ['consensus', 'Bovada', 'consensus']
+    assert lines.loc[0, 'home_team'] == 'Alpha'
+    assert lines.loc[0, 'spread'] == -7.5
+    assert lines.loc[1, 'over_under'] == 53.0
+    assert np.isnan(lines.loc[1, 'spread_open'])
+    assert lines['game_id'].tolist() == [401520145, 401520145, 401520146]
+
+
+def test_fetch_lines_uses_recorded_response(monkeypatch):
+    calls = []
+
+    def fake_get(url, headers=None, params=None):
+        calls.append((url, params))
+        return _Response(_records())
+
+    monkeypatch.setattr(cfbd_data.requests, "get", fake_get)
+
+    lines = fetch_cfbd_lines_from_api(2023, "regular", api_key="test-key")
+
+    assert calls == [("https://api.collegefootballdata.com/lines", {"year": 2023, "seasonType": "regular"})]
+    assert len(lines) == 3
+
+    def failing_get(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("offline")
+
+    monkeypatch.setattr(cfbd_data.requests, "get", failing_get)
+    assert fetch_cfbd_lines_from_api(2023, "regular", api_key="test-key") is None
+
+
+def test_find_value_flags_and_grades_every_provider():
+    lines = flatten_cfbd_lines(_records())
+    implied = pd.DataFrame({
+        'season': [2023, 2023],
+        'week': [1, 1],
+        'home_team': ['Alpha', 'Charlie'],
+        'away_team': ['Bravo', 'Delta'],
+        'model_margin': [12.0, -1.0],
+        'model_total': [50.0, 50.0],
+    })
+
+    value = find_value(lines, implied, spread_threshold=3.0, total_threshold=4.0)
+
+    alpha = value[value['home_team'] == 'Alpha'].set_index('provider')
+    # Model says Alpha by 12 against -7.5 / -7: edges 4.5 and 5, home side, covered (won by 21)
+    np.testing.assert_allclose(alpha['spread_edge'].loc[['consensus', 'Bovada']], [4.5, 5.0])
+    assert alpha['spread_value'].all() and (alpha['spread_pick'] == 'home').all()
+    assert (alpha['spread_result'] == 1.0).all()
+    assert not alpha['total_value'].any()
+
+    charlie = value[value['home_team'] == 'Charlie'].iloc[0]
+    # Delta -3 vs model Delta by 1: edge 2 toward home, not flagged; Delta won by 3 (push)
+    assert charlie['spread_edge'] == 2.0 and not charlie['spread_value']
+    assert np.isnan(charlie['spread_result'])
+    # Total 44 vs 50: over flagged; 37 scored, loss
+    assert charlie['total_value'] and charlie['total_pick'] == 'over' and charlie['total_result'] == 0.0
+
+    summary = value_summary(value).set_index('market')
+    assert summary.loc['spread', 'flagged'] == 2 and summary.loc['spread', 'hit_rate'] == 1.0
+    assert summary.loc['total', 'flagged'] == 1 and summary.loc['total', 'hit_rate'] == 0.0
+
+
+def test_line_model_recovers_linear_margin_and_total():
+    rng = np.random.default_rng(0)
+    n = 400
+    scored = pd.DataFrame({
+        'season': 2022,
+        'week': rng.integers(1, 13, n),
+        'home_team': [f"H{i}" for i in range(n)],
+        'away_team': [f"A{i}" for i in range(n)],
+        'elo_edge': rng.normal(0, 150, n),
+        'home_avg_points_scored': rng.normal(28, 6, n),
+        'away_avg_points_scored': rng.normal(28, 6, n),
+        'home_avg_points_allowed': rng.normal(24, 6, n),
+        'away_avg_points_allowed': rng.normal(24, 6, n),
+    })
+    margin = 2.5 + scored['elo_edge'] / 25 + rng.normal(0, 1, n)
+    total = 10 + 0.5 * (scored['home_avg_points_scored'] + scored['away_avg_points_scored']) \
+        + 0.3 * (scored['home_avg_points_allowed'] + scored['away_avg_points_allowed']) + rng.normal(0, 1, n)
+    scored['home_points'] = (total + margin) / 2
+    scored['away_points'] = (total - margin) / 2
+    scored.loc[:9, 'elo_edge'] = np.nan
+
+    model = LineModel.fit(scored)
+
+    assert model.margin.features == ['elo_edge']
+    assert np.isclose(model.margin.coef[0], 1 / 25, rtol=0.05)
+    np.testing.assert_allclose(model.total.coef, [0.5, 0.3], atol=0.03)
+    implied = model.predict(scored.iloc[10:20])
+    np.testing.assert_allclose(implied['model_margin'], margin.iloc[10:20], atol=4)
+
+
+def test_find_line_value_prices_upcoming_games(tmp_path, monkeypatch, game_schedule):
+    data_dir = tmp_path / 'cfbd'
+    data_dir.mkdir()
+    games = game_schedule(seasons=(2021, 2022, 2023), weeks=8, played_weeks=6, noise=3.0, seed=4)
+    for season, season_games in games.groupby('season'):
+        season_games.to_csv(data_dir / f"{season}_regular_games.csv", index=False)
+    upcoming = games[games['home_points'].isna()]
+    lines = upcoming.assign(provider='consensus', spread=0.0, over_under=56.0)
+    lines.reindex(columns=cfbd_data.LINE_COLUMNS).to_csv(data_dir / "2023_regular_lines.csv", index=False)
+    config = tmp_path / 'settings.yaml'
+    config.write_text(f"cfbd_paths:\n  data_dir: {data_dir}\n")
+    output_dir = tmp_path / 'value'
+    implied = []
+    monkeypatch.setattr(cli, 'find_value', lambda lines, games, **kwargs: (
+        implied.append(games) or find_value(lines, games, **kwargs)
+    ))
+
+    cli.find_line_value(argparse.Namespace(
+        config=str(config), season=2023, season_type='regular', week=None, data_dir=None, summary=None,
+        train_seasons=None, spread_threshold=0.0, total_threshold=None, providers=None, top=5,
+        output_dir=str(output_dir)
+    ))
+
+    value = pd.read_csv(output_dir / "2023_line_value.csv")
+    assert len(value) == len(upcoming)
+    # Unscored games get pre-game ratings and form rather than the training mean
+    pending = implied[0][implied[0]['home_points'].isna()]
+    assert len(pending) == len(upcoming)
+    assert pending[['elo_edge', 'margin_ewm_edge']].notna().all().all()
+    strength = dict(zip([f"Team {i}" for i in range(12)], np.linspace(-14, 14, 12)))
+    edge = value['home_team'].map(strength) - value['away_team'].map(strength)
+    assert np.corrcoef(value['model_margin'], edge)[0, 1] > 0.8
+    # An explicit zero threshold flags every line
+    assert value['spread_value'].all()
@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+
+from cfb_mismatch.watch import StatsWatcher
+
+
+def _write_scheme(path, man_yprr):
+    pd.DataFrame(
+        {
+            "player": ["A", "B", "C"],
+            "player_id": [1, 2, 3],
+            "position": ["WR", "WR", "WR"],
+            "team_name": ["Alpha", "Alpha", "Bravo"],
+            "player_game_count": [10, 5, 8],
+            "man_yprr": man_yprr,
+            "zone_yprr": [3.0, 6.0, 4.0],
+        }
+    ).to_csv(path, index=False)
+
+
+def _write_defense(path):
+    pd.DataFrame(
+        {
+            "player": ["D", "E"],
+            "player_id": [4, 5],
+            "position": ["CB", "CB"],
+            "team_name": ["Alpha", "Bravo"],
+            "player_game_count": [9, 9],
+            "man_grades_coverage_defense": [70.0, 60.0],
+            "zone_grades_coverage_defense": [65.0, 55.0],
+            "man_qb_rating_against": [80.0, 90.0],
+            "zone_qb_rating_against": [85.0, 95.0],
+        }
+    ).to_csv(path, index=False)
+
+
+def test_watcher_recomputes_only_changed_category(tmp_path):
+    scheme_path = tmp_path / "scheme.csv"
+    defense_path = tmp_path / "defense.csv"
+    out_dir = tmp_path / "out"
+    _write_scheme(scheme_path, [2.0, 4.0, 3.0])
+    _write_defense(defense_path)
+
+    config = {
+        "use_stats_files": True,
+        "stats_paths": {
+            "receiving_scheme": str(scheme_path),
+            "defense_coverage_scheme": str(defense_path),
+        },
+    }
+    weights = {"stats_weights": {"man_receiving_efficiency": 1.0, "man_coverage_defense": 1.0}}
+    watcher = StatsWatcher(config, weights, str(out_dir))
+
+    written = watcher.refresh()
+    assert len(written) == 3
+    assert watcher.poll() == []
+
+    _write_scheme(scheme_path, [2.0, 4.0, 9.0])
+    stat = os.stat(scheme_path)
+    os.utime(scheme_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert watcher.detect_changes() == ["receiving_scheme"]
+    written = watcher.poll()
+
+    assert sorted(os.path.basename(p) for p in written) == ["team_receiving_scheme.csv", "team_summary.csv"]
+    summary = pd.read_csv(out_dir / "team_summary.csv")
+    assert summary.loc[summary["team_name"] == "Bravo", "man_yprr"].iloc[0] == 9.0
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from cfb_mismatch.adapters.aggregation import aggregate_by_team
+from cfb_mismatch.whatif import RosterWhatIf
+
+WEIGHTS = {"stats_weights": {"man_receiving_efficiency": 1.0, "zone_receiving_efficiency": 1.0}}
+
+
+def _receivers():
+    return pd.DataFrame(
+        {
+            "player": ["Ace", "Deuce", "Trey", "Quad", "Five"],
+            "player_id": [1, 2, 3, 4, 5],
+            "team_name": ["Alpha", "Alpha", "Alpha", "Bravo", "Charlie"],
+            "player_game_count": [6, 4, 2, 5, 5],
+            "man_yprr": [3.0, 1.0, 2.0, 2.5, 1.5],
+            "zone_yprr": [2.0, 1.5, 1.0, 2.0, 1.0],
+        }
+    )
+
+
+def test_exclude_player_matches_reaggregation_and_rescores():
+    df = _receivers()
+    whatif = RosterWhatIf({"receiving_scheme": df}, WEIGHTS)
+
+    result = whatif.run(exclude=["ace"])
+
+    expected = aggregate_by_team(df[df["player"] != "Ace"])
+    pd.testing.assert_frame_equal(result.team_stats["receiving_scheme"], expected)
+    assert result.affected_teams == ["Alpha"]
+    alpha = result.comparison.set_index("team_name").loc["Alpha"]
+    assert alpha["man_yprr_before"] == pytest.approx((18 + 4 + 4) / 12)
+    assert alpha["man_yprr_after"] == pytest.approx((4 + 4) / 6)
+    assert alpha["mismatch_score_change"] < 0
+    # The baseline is untouched by a scenario
+    assert whatif.baseline_team_stats["receiving_scheme"]["player_count"].tolist() == [3, 1, 1]
+
+
+def test_include_only_and_reweight():
+    df = _receivers()
+    whatif = RosterWhatIf({"receiving_scheme": df}, WEIGHTS)
+
+    only = whatif.run(include_only=["2", "Trey"]).team_stats["receiving_scheme"]
+    expected = aggregate_by_team(df[df["player_id"] != 1])
+    pd.testing.assert_frame_equal(only, expected)
+
+    doubled = whatif.run(reweight={"Trey": 2.0}).team_stats["receiving_scheme"]
+    alpha = doubled.set_index("team_name").loc["Alpha"]
+    assert alpha["man_yprr"] == pytest.approx((18 + 4 + 8) / 14)
+    assert alpha["player_game_count_total"] == pytest.approx(14)
+
+
+def test_numeric_selector_skips_rows_without_an_id():
+    df = _receivers().astype({"player_id": "Int32"})
+    df.loc[4, "player_id"] = pd.NA
+    whatif = RosterWhatIf({"receiving_scheme": df}, WEIGHTS)
+
+    assert whatif.match_players("2")["receiving_scheme"].tolist() == [1]
+    assert whatif.match_players("Five")["receiving_scheme"].tolist() == [4]
+
+
+def test_unknown_player_raises():
+    whatif = RosterWhatIf({"receiving_scheme": _receivers()}, WEIGHTS)
+    with pytest.raises(ValueError, match="Nobody"):
+        whatif.run(exclude=["Nobody"])